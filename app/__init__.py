@@ -20,6 +20,9 @@ def create_app(config_class=Config):
     app.config.from_object(config_class)
 
     db.init_app(app)
+    # PRAGMA del perfil SQLite en cada conexión nueva (ver config.PERFILES_SQLITE)
+    from app import bd_sqlite
+    bd_sqlite.init_app(app)
     migrate.init_app(app, db)
     login.init_app(app)
 
@@ -27,6 +30,34 @@ def create_app(config_class=Config):
 
     from app import models
 
+    # Caché en memoria del catálogo de productos (ver app/productos/catalogo_cache.py)
+    from app.productos import catalogo_cache, motor_precios, hojas_precios, sincronizacion, fragmentos
+    catalogo_cache.init_app(app)
+    motor_precios.init_app(app)
+    hojas_precios.init_app(app)
+    sincronizacion.init_app(app)
+    fragmentos.init_app(app)
+
+    # Caché de identidades para el user_loader de Flask-Login (ver app/auth/identidad.py)
+    from app.auth import identidad
+    identidad.init_app(app)
+
+    # Hash de contraseñas en un pool acotado (ver app/auth/hash_contrasenas.py)
+    from app.auth import hash_contrasenas
+    hash_contrasenas.init_app(app)
+
+    # Escritura diferida de ultimo_login y otra telemetría de usuarios (ver app/auth/telemetria.py)
+    from app.auth import telemetria
+    telemetria.init_app(app)
+
+    # Cola de despacho de entregas a domicilio (ver app/pedidos/despacho.py)
+    from app.pedidos import despacho
+    despacho.init_app(app)
+
+    # Perfilador de SQL por petición, solo si PERFILADOR_SQL_HABILITADO (ver app/perfilador_sql.py)
+    from app import perfilador_sql
+    perfilador_sql.init_app(app)
+
     # --- Registrar Blueprints ---
     from app.auth.routes import bp as auth_bp
     app.register_blueprint(auth_bp, url_prefix='/auth')
@@ -34,6 +65,18 @@ def create_app(config_class=Config):
     from app.productos import bp as productos_bp
     app.register_blueprint(productos_bp, url_prefix='/productos')
 
+    from app.pedidos import bp as pedidos_bp
+    app.register_blueprint(pedidos_bp, url_prefix='/pedidos')
+
+    from app.caja import bp as caja_bp
+    app.register_blueprint(caja_bp, url_prefix='/caja')
+
+    from app.reportes import bp as reportes_bp
+    app.register_blueprint(reportes_bp, url_prefix='/reportes')
+
+    from app.clientes import bp as clientes_bp
+    app.register_blueprint(clientes_bp, url_prefix='/clientes')
+
     # Añadir filtro personalizado para nl2br (newline to break)
     @app.template_filter('nl2br')
     def nl2br_filter(s):
@@ -56,11 +99,9 @@ def create_app(config_class=Config):
     def dashboard():
         return render_template('dashboard.html')
 
-    # --- Nueva ruta para servir sw.js desde la raíz ---
-    @app.route('/sw.js')
-    def service_worker():
-        # Asegúrate de que el archivo sw.js esté en la carpeta 'app'
-        return send_from_directory(app.root_path, 'sw.js')
-    # --- Fin de la nueva ruta ---
+    # Recursos con huella y precomprimidos (/activos/...) y /sw.js con su lista de
+    # precache generada desde el manifiesto (ver app/estaticos.py)
+    from app import estaticos
+    estaticos.init_app(app)
 
     return app
@@ -0,0 +1,141 @@
+"""Hash y verificación de contraseñas en un ejecutor acotado.
+
+scrypt/pbkdf2 son deliberadamente costosos en CPU. Si cada login los calcula
+en su propio hilo de petición, una ráfaga de logins (cambio de turno) se come
+la CPU y todas las demás páginas se vuelven lentas. Aquí el cálculo se hace en
+un pool de HASH_TRABAJADORES hilos (hashlib libera el GIL mientras calcula),
+con un máximo de HASH_COLA_MAXIMA solicitudes en espera o en curso: cuando se
+llena se rechaza de inmediato con `HashSaturado` en lugar de encolar sin
+límite. Una solicitud ocupa su cupo hasta que el pool termina con ella (o la
+cancela), aunque quien la pidió ya se haya cansado de esperar: si el
+resultado no llega en HASH_TIMEOUT_SEGUNDOS también se responde
+`HashSaturado`.
+
+El método de hash es configurable (HASH_METODO, con el formato de Werkzeug:
+'scrypt', 'scrypt:16384:8:1', 'pbkdf2:sha256:600000', ...). Los hashes
+guardados con otros parámetros se regeneran de forma transparente en el
+siguiente login correcto (`necesita_rehash`).
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import current_app, has_app_context
+from werkzeug.security import check_password_hash, generate_password_hash
+
+METODO_DEFECTO = 'scrypt'
+
+class HashSaturado(RuntimeError):
+    """El ejecutor de hash tiene su cola llena; el llamador debe reintentar más tarde."""
+
+class EjecutorHash:
+    """Pool de hilos de tamaño fijo con límite de solicitudes pendientes."""
+
+    def __init__(self, trabajadores=2, cola_maxima=16, timeout=10.0):
+        self.trabajadores = trabajadores
+        self.cola_maxima = cola_maxima
+        self.timeout = timeout
+        self._cupos = threading.BoundedSemaphore(cola_maxima)
+        self._pool = ThreadPoolExecutor(max_workers=trabajadores, thread_name_prefix='hash') if trabajadores else None
+        self._lock = threading.Lock()
+        self.en_curso = 0
+        self.completados = 0
+        self.fallidos = 0
+        self.rechazados = 0
+        self.vencidos = 0
+
+    def ejecutar(self, funcion, *args):
+        """Ejecuta `funcion(*args)` en el pool y espera el resultado. Lanza `HashSaturado` si no hay cupo."""
+        if self._pool is None: # Sin pool: en el hilo de la petición (comportamiento anterior)
+            return funcion(*args)
+        if not self._cupos.acquire(blocking=False):
+            with self._lock:
+                self.rechazados += 1
+            raise HashSaturado('Demasiadas verificaciones de contraseña en curso.')
+        with self._lock:
+            self.en_curso += 1
+        try:
+            futuro = self._pool.submit(funcion, *args)
+        except BaseException:
+            self._liberar(None)
+            raise
+        # El cupo se libera cuando el pool termina (o cancela) la tarea, no cuando el llamador deja de esperar
+        futuro.add_done_callback(self._liberar)
+        try:
+            return futuro.result(timeout=self.timeout)
+        except TimeoutError:
+            futuro.cancel() # Si aún no empezó, no se calcula; si ya empezó, su cupo se libera al terminar
+            with self._lock:
+                self.vencidos += 1
+            raise HashSaturado('La verificación de contraseña tardó demasiado.')
+
+    def _liberar(self, futuro):
+        with self._lock:
+            self.en_curso -= 1
+            if futuro is not None and not futuro.cancelled() and futuro.exception() is None:
+                self.completados += 1
+            else:
+                self.fallidos += 1
+        self._cupos.release()
+
+    def estadisticas(self):
+        return {
+            'trabajadores': self.trabajadores,
+            'cola_maxima': self.cola_maxima,
+            'en_curso': self.en_curso,
+            'completados': self.completados,
+            'fallidos': self.fallidos,
+            'rechazados': self.rechazados,
+            'vencidos': self.vencidos,
+        }
+
+def init_app(app):
+    app.config.setdefault('HASH_METODO', METODO_DEFECTO)
+    app.config.setdefault('HASH_TRABAJADORES', 2)
+    app.config.setdefault('HASH_COLA_MAXIMA', 16)
+    app.config.setdefault('HASH_TIMEOUT_SEGUNDOS', 10.0)
+    app.extensions['hash_contrasenas'] = EjecutorHash(
+        trabajadores=int(app.config['HASH_TRABAJADORES']),
+        cola_maxima=int(app.config['HASH_COLA_MAXIMA']),
+        timeout=float(app.config['HASH_TIMEOUT_SEGUNDOS'])
+    )
+
+def _ejecutor():
+    if has_app_context():
+        return current_app.extensions.get('hash_contrasenas')
+    return None
+
+def metodo_configurado():
+    return current_app.config.get('HASH_METODO', METODO_DEFECTO) if has_app_context() else METODO_DEFECTO
+
+_prefijos = {} # método configurado -> prefijo completo que Werkzeug guarda en el hash
+
+def _prefijo_de(metodo):
+    # 'scrypt' se guarda como 'scrypt:32768:8:1'; se calcula una vez con un hash de muestra
+    prefijo = _prefijos.get(metodo)
+    if prefijo is None:
+        prefijo = _prefijos[metodo] = generate_password_hash('', method=metodo).split('$', 1)[0]
+    return prefijo
+
+def generar(password):
+    """Genera el hash de `password` con el método configurado (en el pool)."""
+    metodo = metodo_configurado()
+    ejecutor = _ejecutor()
+    if ejecutor is None:
+        return generate_password_hash(password, method=metodo)
+    return ejecutor.ejecutar(generate_password_hash, password, metodo)
+
+def verificar(password_hash, password):
+    """Verifica `password` contra `password_hash` (en el pool). Puede lanzar `HashSaturado`."""
+    ejecutor = _ejecutor()
+    if ejecutor is None:
+        return check_password_hash(password_hash, password)
+    return ejecutor.ejecutar(check_password_hash, password_hash, password)
+
+def necesita_rehash(password_hash):
+    """Indica si el hash se generó con un método o parámetros distintos de los configurados."""
+    return password_hash.split('$', 1)[0] != _prefijo_de(metodo_configurado())
+
+def obtener_estadisticas():
+    estadisticas = current_app.extensions['hash_contrasenas'].estadisticas()
+    estadisticas['metodo'] = _prefijo_de(metodo_configurado())
+    return estadisticas
@@ -0,0 +1,167 @@
+"""Caché de identidades para el `user_loader` de Flask-Login.
+
+Cada petición autenticada llamaba a `db.session.get(Usuario, id)` solo para
+saber quién es el usuario y qué rol tiene. Aquí se guarda, por ID, un registro
+ligero e inmutable (`IdentidadUsuario`: id, username, nombre_completo, rol y
+activo) en un LRU acotado por tamaño y con TTL. El registro no está ligado a
+ninguna sesión de SQLAlchemy, así que puede compartirse entre hilos.
+
+Una entrada se invalida cuando se confirma (commit) un cambio en alguno de
+esos campos del Usuario, o cuando el usuario se elimina. El TTL acota el
+tiempo que puede servirse una identidad modificada fuera de este proceso
+(otro worker o un UPDATE manual).
+"""
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from flask import current_app, has_app_context
+from flask_login import UserMixin
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import Usuario
+
+CAMPOS_IDENTIDAD = ('id', 'username', 'nombre_completo', 'rol', 'activo')
+
+@dataclass(frozen=True, eq=False) # eq/hash de UserMixin (por ID)
+class IdentidadUsuario(UserMixin):
+    id: int
+    username: str
+    nombre_completo: str
+    rol: str
+    activo: bool
+
+    def __repr__(self):
+        return f'<IdentidadUsuario {self.username} ({self.rol})>'
+
+class CacheIdentidades:
+    """LRU con TTL de identidades por ID de usuario (seguro entre hilos)."""
+
+    def __init__(self, ttl=300.0, maximo=1000):
+        self.ttl = ttl
+        self.maximo = maximo
+        self._entradas = OrderedDict() # id -> (vence, IdentidadUsuario)
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.expiradas = 0
+        self.desalojadas = 0
+        self.invalidaciones = 0
+
+    def obtener(self, usuario_id):
+        ahora = time.monotonic()
+        with self._lock:
+            entrada = self._entradas.get(usuario_id)
+            if entrada is not None:
+                vence, identidad = entrada
+                if vence > ahora:
+                    self._entradas.move_to_end(usuario_id)
+                    self.aciertos += 1
+                    return identidad
+                del self._entradas[usuario_id]
+                self.expiradas += 1
+            self.fallos += 1
+        return None
+
+    def guardar(self, identidad):
+        with self._lock:
+            self._entradas[identidad.id] = (time.monotonic() + self.ttl, identidad)
+            self._entradas.move_to_end(identidad.id)
+            while len(self._entradas) > self.maximo:
+                self._entradas.popitem(last=False)
+                self.desalojadas += 1
+
+    def invalidar(self, usuario_id):
+        with self._lock:
+            if self._entradas.pop(usuario_id, None) is not None:
+                self.invalidaciones += 1
+
+    def limpiar(self):
+        with self._lock:
+            self._entradas.clear()
+
+    def estadisticas(self):
+        lecturas = self.aciertos + self.fallos
+        return {
+            'entradas': len(self._entradas),
+            'maximo': self.maximo,
+            'ttl_segundos': self.ttl,
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': round(self.aciertos / lecturas, 4) if lecturas else None,
+            'expiradas': self.expiradas,
+            'desalojadas': self.desalojadas,
+            'invalidaciones': self.invalidaciones,
+        }
+
+def init_app(app):
+    app.config.setdefault('IDENTIDAD_CACHE_HABILITADO', True)
+    app.config.setdefault('IDENTIDAD_CACHE_TTL', 300.0)
+    app.config.setdefault('IDENTIDAD_CACHE_MAXIMO', 1000)
+    app.extensions['identidad_cache'] = CacheIdentidades(
+        ttl=float(app.config['IDENTIDAD_CACHE_TTL']),
+        maximo=int(app.config['IDENTIDAD_CACHE_MAXIMO'])
+    )
+
+def obtener_cache():
+    """Devuelve la caché de la aplicación actual, o None si no hay contexto o está desactivada."""
+    if not has_app_context() or not current_app.config.get('IDENTIDAD_CACHE_HABILITADO', True):
+        return None
+    return current_app.extensions.get('identidad_cache')
+
+def _leer_identidad(usuario_id):
+    # Solo las columnas de la identidad: no se carga password_hash ni se agrega nada a la sesión
+    fila = db.session.execute(
+        select(*(getattr(Usuario, campo) for campo in CAMPOS_IDENTIDAD)).where(Usuario.id == usuario_id)
+    ).first()
+    return IdentidadUsuario(*fila) if fila is not None else None
+
+def cargar_identidad(usuario_id):
+    """Devuelve la `IdentidadUsuario` de `usuario_id` (desde la caché si es posible) o None."""
+    cache = obtener_cache()
+    if cache is None:
+        return _leer_identidad(usuario_id)
+    identidad = cache.obtener(usuario_id)
+    if identidad is None:
+        identidad = _leer_identidad(usuario_id)
+        if identidad is not None:
+            cache.guardar(identidad)
+    return identidad
+
+def invalidar_identidad(usuario_id):
+    """Descarta la identidad en caché de un usuario (p. ej. tras un UPDATE fuera del ORM)."""
+    if has_app_context() and 'identidad_cache' in current_app.extensions:
+        current_app.extensions['identidad_cache'].invalidar(usuario_id)
+
+def obtener_estadisticas():
+    estadisticas = current_app.extensions['identidad_cache'].estadisticas()
+    estadisticas['habilitada'] = bool(current_app.config.get('IDENTIDAD_CACHE_HABILITADO', True))
+    return estadisticas
+
+# --- Eventos de sesión: invalidar al confirmar cambios de identidad ---
+
+def _cambio_identidad(usuario):
+    estado = inspect(usuario)
+    return any(estado.attrs[campo].history.has_changes() for campo in CAMPOS_IDENTIDAD)
+
+@event.listens_for(Session, 'after_flush')
+def _registrar_usuarios_modificados(session, flush_context):
+    ids = [
+        usuario.id for usuario in session.dirty
+        if isinstance(usuario, Usuario) and _cambio_identidad(usuario)
+    ]
+    ids += [usuario.id for usuario in session.deleted if isinstance(usuario, Usuario)]
+    if ids:
+        session.info.setdefault('usuarios_modificados', set()).update(ids)
+
+@event.listens_for(Session, 'after_commit')
+def _invalidar_tras_commit(session):
+    for usuario_id in session.info.pop('usuarios_modificados', ()):
+        invalidar_identidad(usuario_id)
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _descartar_tras_rollback(session, previous_transaction):
+    session.info.pop('usuarios_modificados', None)
@@ -1,4 +1,4 @@
-from flask import render_template, redirect, url_for, flash, request
+from flask import render_template, redirect, url_for, flash, request, jsonify, abort
 from flask_login import login_user, logout_user, current_user, login_required
 from app import db
 from app.auth import bp
@@ -7,6 +7,7 @@ from app.models import Usuario # Mantener la importación si se usa el tipo Usua
 # from datetime import datetime # Ya no es necesario importar datetime aquí
 from urllib.parse import urlsplit # Para el next_page
 from app.auth import services # Importar el módulo de servicios
+from app.auth import identidad, hash_contrasenas
 
 @bp.route('/login', methods=['GET', 'POST'])
 def login():
@@ -20,17 +21,26 @@ def login():
         user = services.obtener_usuario_por_username(form.username.data)
 
         # Verificar si el usuario existe y la contraseña es correcta
-        if user is None or not user.check_password(form.password.data):
+        # (el hash se calcula en un pool acotado; si está saturado se rechaza de inmediato)
+        try:
+            password_valida = user is not None and user.check_password(form.password.data)
+        except hash_contrasenas.HashSaturado:
+            flash('Hay muchos inicios de sesión en curso. Intenta de nuevo en unos segundos.', 'warning')
+            return render_template('auth/login.html', title='Iniciar Sesión', form=form), 503
+        if not password_valida:
             flash('Nombre de usuario o contraseña inválidos.', 'danger')
             return redirect(url_for('auth.login'))
 
+        # Si cambió HASH_METODO, regenerar el hash con la contraseña recién verificada
+        services.rehash_si_necesario(user, form.password.data)
+
         # Si la autenticación es exitosa
         login_user(user, remember=form.remember_me.data)
 
-        # Actualizar la fecha del último login usando el servicio
+        # Registrar la fecha del último login (se escribe por lotes en segundo plano,
+        # ver app/auth/telemetria.py)
         try:
-            services.actualizar_ultimo_login(user)
-            db.session.commit() # Confirmar la transacción
+            services.registrar_ultimo_login(user)
         except Exception as e:
             db.session.rollback()
             print(f"Error al actualizar ultimo_login para {user.username}: {e}")
@@ -53,4 +63,18 @@ def logout():
     flash('Has cerrado sesión exitosamente.', 'info')
     return redirect(url_for('index'))
 
+@bp.route('/identidades/estadisticas')
+@login_required
+def estadisticas_identidades():
+    if current_user.rol != 'ADMINISTRADOR':
+        abort(403)
+    return jsonify(identidad.obtener_estadisticas())
+
+@bp.route('/hash/estadisticas')
+@login_required
+def estadisticas_hash():
+    if current_user.rol != 'ADMINISTRADOR':
+        abort(403)
+    return jsonify(hash_contrasenas.obtener_estadisticas())
+
 # Podríamos añadir rutas para registro, reseteo de contraseña, etc. aquí en el futuro.
\ No newline at end of file
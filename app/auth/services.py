@@ -1,5 +1,6 @@
 from app import db
 from app.models import Usuario
+from app.auth import telemetria, hash_contrasenas
 from datetime import datetime
 
 def obtener_usuario_por_username(username):
@@ -17,5 +18,35 @@ def actualizar_ultimo_login(usuario):
     # db.session.add(usuario) # No es necesario add si el objeto ya está en la sesión
     return usuario
 
+def registrar_ultimo_login(usuario):
+    """Registra el último login sin escribir en la petición (buffer write-behind).
+
+    Con TELEMETRIA_WRITE_BEHIND desactivado se comporta como antes:
+    actualiza el atributo y confirma la transacción.
+    """
+    buffer = telemetria.obtener_buffer()
+    if buffer is not None:
+        buffer.registrar(usuario.id, ultimo_login=datetime.utcnow())
+        return
+    actualizar_ultimo_login(usuario)
+    db.session.commit()
+
+def rehash_si_necesario(usuario, password):
+    """Regenera el hash si se guardó con otro método/parámetros que HASH_METODO.
+
+    Solo se llama tras verificar la contraseña. Es best-effort: si el pool de
+    hash está saturado o falla el commit, se reintenta en el siguiente login.
+    """
+    if not hash_contrasenas.necesita_rehash(usuario.password_hash):
+        return False
+    try:
+        usuario.set_password(password)
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        print(f"No se pudo regenerar el hash de {usuario.username}: {e}")
+        return False
+    return True
+
 # Puedes añadir más funciones de servicio aquí si implementas registro,
 # reseteo de contraseña, etc., que involucren interacción con la BD.
\ No newline at end of file
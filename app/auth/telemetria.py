@@ -0,0 +1,166 @@
+"""Buffer de escritura diferida (write-behind) para telemetría de usuarios.
+
+Datos no críticos como `ultimo_login` no justifican una transacción de
+escritura (y el bloqueo de escritura de SQLite) en cada login. Aquí se
+acumulan en memoria por usuario y un hilo en segundo plano los escribe cada
+TELEMETRIA_INTERVALO_SEGUNDOS con un UPDATE por lotes (executemany). Al
+terminar el proceso se vacía lo pendiente.
+
+* `registrar(usuario_id, columna=valor, ...)`: el último valor gana.
+* `incrementar(usuario_id, columna, cantidad)`: se suman y se aplican como
+  `columna = columna + n` (para contadores futuros).
+
+Los datos son eventualmente consistentes: pueden tardar un intervalo en verse
+en la BD, y se pierden si el proceso muere sin pasar por su cierre normal.
+"""
+import atexit
+import os
+import threading
+import time
+
+from flask import current_app, has_app_context
+from sqlalchemy import bindparam, update
+
+from app import db
+from app.models import Usuario
+
+class BufferTelemetria:
+    """Cambios pendientes por usuario y el hilo que los vacía periódicamente."""
+
+    def __init__(self, app, intervalo=5.0):
+        self.app = app
+        self.intervalo = intervalo
+        self._lock = threading.Lock()
+        self._valores = {} # usuario_id -> {columna: valor}
+        self._incrementos = {} # usuario_id -> {columna: cantidad}
+        self._despertar = threading.Event()
+        self._detenido = False
+        self._hilo = None
+        self._pid = None
+        self.vaciados = 0
+        self.filas_escritas = 0
+        self.errores = 0
+        self.ms_ultimo_vaciado = 0.0
+
+    # --- API ---
+
+    def registrar(self, usuario_id, **valores):
+        with self._lock:
+            self._valores.setdefault(usuario_id, {}).update(valores)
+        self._asegurar_hilo()
+
+    def incrementar(self, usuario_id, columna, cantidad=1):
+        with self._lock:
+            pendientes = self._incrementos.setdefault(usuario_id, {})
+            pendientes[columna] = pendientes.get(columna, 0) + cantidad
+        self._asegurar_hilo()
+
+    def pendientes(self):
+        with self._lock:
+            return len(self._valores.keys() | self._incrementos.keys())
+
+    def vaciar(self):
+        """Escribe todo lo pendiente en una transacción. Devuelve el número de filas actualizadas."""
+        with self._lock:
+            valores, self._valores = self._valores, {}
+            incrementos, self._incrementos = self._incrementos, {}
+        if not valores and not incrementos:
+            return 0
+
+        inicio = time.perf_counter()
+        try:
+            with self.app.app_context(), db.engine.begin() as conn:
+                filas = _escribir(conn, valores, incrementos)
+        except Exception as e:
+            # Se devuelven al buffer (sin pisar valores más nuevos) para el siguiente intento
+            with self._lock:
+                for usuario_id, cambios in valores.items():
+                    self._valores[usuario_id] = dict(cambios, **self._valores.get(usuario_id, {}))
+                for usuario_id, cambios in incrementos.items():
+                    pendientes = self._incrementos.setdefault(usuario_id, {})
+                    for columna, cantidad in cambios.items():
+                        pendientes[columna] = pendientes.get(columna, 0) + cantidad
+            self.errores += 1
+            self.app.logger.warning(f"No se pudo vaciar la telemetría de usuarios: {e}")
+            return 0
+        self.vaciados += 1
+        self.filas_escritas += filas
+        self.ms_ultimo_vaciado = (time.perf_counter() - inicio) * 1000
+        return filas
+
+    def detener(self):
+        """Detiene el hilo y vacía lo pendiente (se llama al salir del proceso)."""
+        self._detenido = True
+        self._despertar.set()
+        if self._hilo is not None and self._hilo.is_alive() and self._pid == os.getpid():
+            self._hilo.join(timeout=self.intervalo + 5)
+        self.vaciar()
+
+    def estadisticas(self):
+        return {
+            'pendientes': self.pendientes(),
+            'intervalo_segundos': self.intervalo,
+            'vaciados': self.vaciados,
+            'filas_escritas': self.filas_escritas,
+            'errores': self.errores,
+            'ms_ultimo_vaciado': round(self.ms_ultimo_vaciado, 3),
+        }
+
+    # --- Hilo en segundo plano ---
+
+    def _asegurar_hilo(self):
+        # Se arranca en el primer uso y de nuevo tras un fork (p. ej. workers de gunicorn)
+        if self._hilo is not None and self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._hilo is not None and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._hilo = threading.Thread(target=self._ciclo, name='telemetria-usuarios', daemon=True)
+            self._hilo.start()
+
+    def _ciclo(self):
+        while not self._detenido:
+            self._despertar.wait(self.intervalo)
+            if self._detenido:
+                return
+            self.vaciar()
+
+def _escribir(conn, valores, incrementos):
+    """Un executemany por combinación de columnas (todas las filas de un executemany comparten columnas)."""
+    tabla = Usuario.__table__
+    filas = 0
+    grupos = {}
+    for usuario_id, cambios in valores.items():
+        grupos.setdefault(tuple(sorted(cambios)), []).append(dict(cambios, _id=usuario_id))
+    for columnas, parametros in grupos.items():
+        sentencia = update(tabla).where(tabla.c.id == bindparam('_id')).values(
+            {columna: bindparam(columna) for columna in columnas}
+        )
+        filas += conn.execute(sentencia, parametros).rowcount
+    grupos = {}
+    for usuario_id, cambios in incrementos.items():
+        grupos.setdefault(tuple(sorted(cambios)), []).append(
+            dict({f'_inc_{columna}': cantidad for columna, cantidad in cambios.items()}, _id=usuario_id)
+        )
+    for columnas, parametros in grupos.items():
+        sentencia = update(tabla).where(tabla.c.id == bindparam('_id')).values(
+            {columna: tabla.c[columna] + bindparam(f'_inc_{columna}') for columna in columnas}
+        )
+        filas += conn.execute(sentencia, parametros).rowcount
+    return filas
+
+def init_app(app):
+    app.config.setdefault('TELEMETRIA_WRITE_BEHIND', True)
+    app.config.setdefault('TELEMETRIA_INTERVALO_SEGUNDOS', 5.0)
+    if not app.config['TELEMETRIA_WRITE_BEHIND']:
+        return
+    buffer = BufferTelemetria(app, float(app.config['TELEMETRIA_INTERVALO_SEGUNDOS']))
+    app.extensions['telemetria_usuarios'] = buffer
+    atexit.register(buffer.detener)
+
+def obtener_buffer():
+    """Devuelve el buffer de la aplicación actual, o None si está desactivado."""
+    if not has_app_context():
+        return None
+    return current_app.extensions.get('telemetria_usuarios')
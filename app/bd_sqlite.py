@@ -0,0 +1,29 @@
+"""Aplica los PRAGMA del perfil SQLite (config.SQLITE_PRAGMAS) en cada conexión.
+
+Los PRAGMA como journal_mode=WAL persisten en el archivo, pero busy_timeout,
+synchronous, foreign_keys, cache_size, mmap_size y temp_store son por
+conexión, así que se fijan en el evento `connect` del engine.
+"""
+from sqlalchemy import event
+
+from app import db
+
+def _aplicar_pragmas(pragmas):
+    def _al_conectar(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for nombre, valor in pragmas.items():
+                cursor.execute(f'PRAGMA {nombre} = {valor}')
+        finally:
+            cursor.close()
+    return _al_conectar
+
+def init_app(app):
+    app.config.setdefault('SQLITE_PRAGMAS', {})
+    pragmas = dict(app.config['SQLITE_PRAGMAS'])
+    if not pragmas:
+        return
+    with app.app_context():
+        engine = db.engine
+    if engine.dialect.name == 'sqlite':
+        event.listen(engine, 'connect', _aplicar_pragmas(pragmas))
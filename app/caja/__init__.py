@@ -0,0 +1,6 @@
+from flask import Blueprint
+
+bp = Blueprint('caja', __name__)
+
+# Importar rutas al final para evitar importaciones circulares
+from app.caja import routes
@@ -0,0 +1,103 @@
+from flask import request, abort, jsonify
+from flask_login import login_required, current_user
+from app import db
+from app.caja import bp
+from app.caja import services # Importar el módulo de servicios
+from app.models import CorteCaja
+
+# Roles que pueden operar la caja
+ROLES_CAJA = ('ADMINISTRADOR', 'CAJERO')
+
+MAX_MOVIMIENTOS_POR_LOTE = 1000
+
+def _exigir_rol_caja():
+    if current_user.rol not in ROLES_CAJA:
+        abort(403)
+
+def _json_objeto():
+    datos = request.get_json(silent=True)
+    return datos if isinstance(datos, dict) else None
+
+def _ejecutar(operacion, codigo_exito=200):
+    """Ejecuta `operacion()` y confirma; ErrorCaja se responde como 422 y revierte."""
+    try:
+        respuesta = operacion()
+        db.session.commit()
+    except services.ErrorCaja as e:
+        db.session.rollback()
+        return jsonify({'errores': [str(e)]}), 422
+    except Exception:
+        db.session.rollback()
+        raise
+    return jsonify(respuesta), codigo_exito
+
+# Ruta para ABRIR un turno de caja (JSON)
+@bp.route('/cortes', methods=['POST'])
+@login_required
+def abrir_corte():
+    _exigir_rol_caja()
+    datos = _json_objeto()
+    if datos is None:
+        return jsonify({'errores': ['Se esperaba un objeto JSON.']}), 400
+
+    def _abrir():
+        corte = services.abrir_corte(
+            datos.get('caja'), current_user.id, datos.get('fondo_inicial', 0), datos.get('denominaciones')
+        )
+        return services.resumen_corte(corte.id).como_dict()
+    return _ejecutar(_abrir, 201)
+
+# Ruta para REGISTRAR movimientos (JSON): un objeto o {"movimientos": [...]}, un solo commit
+@bp.route('/movimientos', methods=['POST'])
+@login_required
+def registrar_movimientos():
+    _exigir_rol_caja()
+    datos = _json_objeto()
+    if datos is None:
+        return jsonify({'errores': ['Se esperaba un objeto JSON.']}), 400
+    movimientos = datos['movimientos'] if 'movimientos' in datos else [datos]
+    if not isinstance(movimientos, list) or not movimientos:
+        return jsonify({'errores': ['"movimientos" debe ser una lista no vacía.']}), 400
+    if len(movimientos) > MAX_MOVIMIENTOS_POR_LOTE:
+        return jsonify({'errores': [f'Máximo {MAX_MOVIMIENTOS_POR_LOTE} movimientos por lote.']}), 413
+    return _ejecutar(lambda: {'ids': services.registrar_movimientos(movimientos, current_user.id)}, 201)
+
+# Ruta para VER los totales de un turno (desde los acumulados)
+@bp.route('/cortes/<int:corte_id>')
+@login_required
+def ver_corte(corte_id):
+    _exigir_rol_caja()
+    resumen = services.resumen_corte(corte_id)
+    if resumen is None:
+        abort(404)
+    return jsonify(resumen.como_dict())
+
+# Ruta para CERRAR un turno con el conteo físico opcional: {"conteo": {"500": 3, ...}, "notas": "..."}
+@bp.route('/cortes/<int:corte_id>/cerrar', methods=['POST'])
+@login_required
+def cerrar_corte(corte_id):
+    _exigir_rol_caja()
+    datos = _json_objeto() or {}
+
+    def _cerrar():
+        resumen = services.cerrar_corte(corte_id, current_user.id, datos.get('conteo'), datos.get('notas'))
+        corte = db.session.get(CorteCaja, corte_id)
+        return dict(resumen.como_dict(), efectivo_contado=corte.efectivo_contado, diferencia=corte.diferencia)
+    return _ejecutar(_cerrar)
+
+# Ruta para VERIFICAR los acumulados de un turno contra los movimientos (solo lectura)
+@bp.route('/cortes/<int:corte_id>/verificar')
+@login_required
+def verificar_corte(corte_id):
+    if current_user.rol != 'ADMINISTRADOR':
+        abort(403)
+    try:
+        resultado = services.verificar_corte(corte_id)
+    except services.ErrorCaja:
+        abort(404)
+    return jsonify({
+        'corte_id': resultado.corte_id,
+        'movimientos': resultado.movimientos,
+        'correcto': resultado.correcto,
+        'diferencias': resultado.diferencias,
+    })
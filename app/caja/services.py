@@ -0,0 +1,479 @@
+"""Movimientos de caja y corte incremental.
+
+Cada turno de una caja (CorteCaja) mantiene acumulados que se actualizan en la
+misma transacción que cada movimiento, con un UPSERT por conjuntos:
+
+* `acumulados_caja`: monto y número de movimientos por (tipo, forma de pago).
+* `acumulados_denominacion_caja`: billetes y monedas que deberían estar en la
+  caja, por denominación (el fondo inicial más lo que entra menos lo que sale).
+
+Así el corte lee unas cuantas filas de acumulados sin importar cuántos
+movimientos tuvo el turno. `verificar_corte` recalcula los mismos totales
+desde los movimientos (el libro) y, si se le pide, reconstruye los acumulados.
+El fondo inicial se registra como un movimiento más (tipo FONDO), así el libro
+basta para reconstruir cualquier acumulado.
+
+Como en el resto de los servicios, el commit lo hace quien llama.
+"""
+import math
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from sqlalchemy import func, insert, select, delete
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+
+from app import db
+from app.models import (
+    CorteCaja, MovimientoCaja, MovimientoDenominacion, DenominacionCorteCaja,
+    acumulados_caja, acumulados_denominacion_caja
+)
+
+# Tipo de movimiento -> signo sobre el efectivo de la caja
+TIPOS_MOVIMIENTO = {'VENTA': 1, 'INGRESO': 1, 'EGRESO': -1, 'RETIRO': -1}
+TIPO_FONDO = 'FONDO' # Solo lo registra `abrir_corte`; no cuenta como ingreso
+SIGNOS = dict(TIPOS_MOVIMIENTO, **{TIPO_FONDO: 1})
+FORMAS_PAGO = ('EFECTIVO', 'TARJETA', 'TRANSFERENCIA')
+DENOMINACIONES = (1000.0, 500.0, 200.0, 100.0, 50.0, 20.0, 10.0, 5.0, 2.0, 1.0, 0.5)
+TOLERANCIA = 0.005 # Diferencia máxima (en pesos) para considerar iguales dos montos
+MAX_CANTIDAD_DENOMINACION = 1_000_000 # Piezas de una denominación en un movimiento o conteo
+MAX_ID = 2**63 - 1 # Mayor entero que acepta SQLite
+
+class ErrorCaja(ValueError):
+    """Operación de caja inválida (caja sin turno abierto, monto o denominaciones incorrectos, ...)."""
+
+@dataclass(frozen=True)
+class ResumenCorte:
+    corte_id: int
+    caja: str
+    estado: str
+    fondo_inicial: float
+    por_tipo: dict # (tipo, forma_pago) -> {'monto': float, 'movimientos': int}
+    denominaciones: dict # denominacion -> cantidad esperada en la caja
+    total_ingresos: float
+    total_egresos: float
+    efectivo_esperado: float
+    movimientos: int
+
+    def como_dict(self):
+        return {
+            'corte_id': self.corte_id,
+            'caja': self.caja,
+            'estado': self.estado,
+            'fondo_inicial': self.fondo_inicial,
+            'por_tipo': [
+                {'tipo': tipo, 'forma_pago': forma_pago, **valores}
+                for (tipo, forma_pago), valores in sorted(self.por_tipo.items())
+            ],
+            'denominaciones': {f'{denominacion:g}': cantidad for denominacion, cantidad in sorted(self.denominaciones.items())},
+            'total_ingresos': self.total_ingresos,
+            'total_egresos': self.total_egresos,
+            'efectivo_esperado': self.efectivo_esperado,
+            'movimientos': self.movimientos,
+        }
+
+@dataclass
+class ResultadoVerificacion:
+    corte_id: int
+    movimientos: int = 0
+    diferencias: list = field(default_factory=list) # Descripciones de acumulados que no cuadran con el libro
+    reconstruido: bool = False
+
+    @property
+    def correcto(self):
+        return not self.diferencias
+
+# --- Validación ---
+
+def _texto(valor, campo):
+    """Devuelve `valor` sin espacios ('' si no viene). Lanza ErrorCaja si no es texto."""
+    if valor is None:
+        return ''
+    if not isinstance(valor, str):
+        raise ErrorCaja(f"El campo '{campo}' debe ser texto.")
+    return valor.strip()
+
+def _id(valor, campo):
+    """Convierte un ID (entero o texto con dígitos) a int. None si no viene; ErrorCaja si es inválido."""
+    if valor is None or valor == '':
+        return None
+    if isinstance(valor, bool) or not isinstance(valor, (int, str)) or not str(valor).isdecimal() \
+            or not 0 < int(valor) <= MAX_ID:
+        raise ErrorCaja(f"{campo} '{valor}' no es un ID válido.")
+    return int(valor)
+
+def _monto(valor, descripcion):
+    """Convierte un monto a float redondeado a centavos. Lanza ErrorCaja si no es un número finito."""
+    try:
+        if isinstance(valor, bool):
+            raise TypeError
+        monto = round(float(valor), 2)
+    except (TypeError, ValueError, OverflowError):
+        raise ErrorCaja(f"{descripcion} '{valor}' no es un número.")
+    if not math.isfinite(monto):
+        raise ErrorCaja(f"{descripcion} '{valor}' no es un número finito.")
+    return monto
+
+def _cantidad_entera(cantidad):
+    """Cantidad de piezas como int; TypeError/ValueError si no es un entero exacto (1.7 o '2.5' no se truncan)."""
+    if isinstance(cantidad, bool):
+        raise TypeError
+    if isinstance(cantidad, int):
+        return cantidad
+    if isinstance(cantidad, float):
+        if not cantidad.is_integer():
+            raise ValueError
+        return int(cantidad)
+    if isinstance(cantidad, str) and re.fullmatch(r'-?[0-9]+', cantidad.strip()):
+        return int(cantidad)
+    raise TypeError
+
+def _denominaciones(lista, permitir_negativas=True):
+    """Normaliza [{'denominacion': 100, 'cantidad': 2}, ...] (o {100: 2}) a {100.0: 2}."""
+    if not lista:
+        return {}
+    if isinstance(lista, dict):
+        pares = lista.items()
+    elif isinstance(lista, list) and all(isinstance(d, dict) for d in lista):
+        pares = ((d.get('denominacion'), d.get('cantidad')) for d in lista)
+    else:
+        raise ErrorCaja('Las denominaciones deben ser un objeto {denominación: cantidad} o una lista de objetos.')
+    resultado = {}
+    for denominacion, cantidad in pares:
+        try:
+            if isinstance(cantidad, bool) or isinstance(denominacion, bool):
+                raise TypeError
+            denominacion = float(denominacion)
+            cantidad = _cantidad_entera(cantidad)
+        except (TypeError, ValueError, OverflowError):
+            raise ErrorCaja(f"Denominación inválida: {denominacion!r} x {cantidad!r}.")
+        if denominacion not in DENOMINACIONES:
+            raise ErrorCaja(f"La denominación {denominacion:g} no existe.")
+        if abs(cantidad) > MAX_CANTIDAD_DENOMINACION:
+            raise ErrorCaja(f"La cantidad de {denominacion:g} no puede pasar de {MAX_CANTIDAD_DENOMINACION}.")
+        if cantidad < 0 and not permitir_negativas:
+            raise ErrorCaja(f"La cantidad de {denominacion:g} no puede ser negativa.")
+        resultado[denominacion] = resultado.get(denominacion, 0) + cantidad
+    return {denominacion: cantidad for denominacion, cantidad in resultado.items() if cantidad}
+
+def _importe(denominaciones):
+    return round(sum(denominacion * cantidad for denominacion, cantidad in denominaciones.items()), 2)
+
+def _validar_movimiento(datos, tipos=TIPOS_MOVIMIENTO):
+    tipo = datos.get('tipo')
+    if not isinstance(tipo, str) or tipo not in tipos:
+        raise ErrorCaja(f"Tipo de movimiento '{tipo}' no válido ({', '.join(TIPOS_MOVIMIENTO)}).")
+    forma_pago = datos.get('forma_pago') or 'EFECTIVO'
+    if not isinstance(forma_pago, str) or forma_pago not in FORMAS_PAGO:
+        raise ErrorCaja(f"Forma de pago '{forma_pago}' no válida ({', '.join(FORMAS_PAGO)}).")
+    monto = _monto(datos.get('monto'), 'Monto')
+    if not monto > 0:
+        raise ErrorCaja('El monto debe ser mayor que 0.')
+    denominaciones = _denominaciones(datos.get('denominaciones'))
+    if denominaciones:
+        if forma_pago != 'EFECTIVO':
+            raise ErrorCaja('Solo los movimientos en efectivo llevan denominaciones.')
+        # Lo que entra (o sale) físicamente debe cuadrar con el monto; el cambio va en negativo
+        if abs(_importe(denominaciones) - monto) > TOLERANCIA:
+            raise ErrorCaja(f"Las denominaciones suman {_importe(denominaciones):.2f} y el monto es {monto:.2f}.")
+    concepto = _texto(datos.get('concepto'), 'concepto')[:200] or None
+    pedido_id = _id(datos.get('pedido_id'), 'pedido_id')
+    return tipo, forma_pago, monto, denominaciones, concepto, pedido_id
+
+# --- Turnos ---
+
+def obtener_corte_abierto(caja):
+    return db.session.scalars(
+        select(CorteCaja).where(CorteCaja.caja == caja, CorteCaja.estado == 'ABIERTO')
+    ).first()
+
+def abrir_corte(caja, usuario_id, fondo_inicial=0.0, denominaciones=None):
+    """Abre un turno para `caja` con su fondo inicial. Lanza ErrorCaja si ya hay uno abierto."""
+    caja = _texto(caja, 'caja').upper()
+    if not caja:
+        raise ErrorCaja('Indica la caja.')
+    if obtener_corte_abierto(caja) is not None:
+        raise ErrorCaja(f"La caja {caja} ya tiene un turno abierto.")
+    fondo_inicial = _monto(fondo_inicial or 0, 'Fondo inicial')
+    if fondo_inicial < 0:
+        raise ErrorCaja('El fondo inicial no puede ser negativo.')
+    _denominaciones(denominaciones, permitir_negativas=False) # Solo valida: el fondo no lleva cambio
+
+    corte = CorteCaja(caja=caja, usuario_id=usuario_id, fondo_inicial=fondo_inicial, estado='ABIERTO')
+    db.session.add(corte)
+    db.session.flush()
+    if fondo_inicial > 0:
+        _registrar([{
+            'corte_id': corte.id, 'tipo': TIPO_FONDO, 'monto': fondo_inicial,
+            'concepto': 'Fondo inicial', 'denominaciones': denominaciones,
+        }], usuario_id, corte.fecha_apertura, SIGNOS)
+    return corte
+
+# --- Movimientos ---
+
+def registrar_movimientos(lista, usuario_id, fecha=None):
+    """Registra varios movimientos y actualiza los acumulados de sus turnos (sin commit).
+
+    Cada elemento de `lista` trae `caja` (o `corte_id`), `tipo`, `monto` y
+    opcionalmente `forma_pago`, `concepto`, `pedido_id` y `denominaciones`.
+    Si alguno es inválido se lanza ErrorCaja y no se escribe nada. Devuelve los
+    IDs de los movimientos en el orden de entrada.
+    """
+    return _registrar(lista, usuario_id, fecha, TIPOS_MOVIMIENTO)
+
+def _registrar(lista, usuario_id, fecha, tipos):
+    if not lista:
+        return []
+    fecha = fecha or datetime.utcnow()
+    if not all(isinstance(datos, dict) for datos in lista):
+        raise ErrorCaja('Cada movimiento debe ser un objeto.')
+    # Turno de cada movimiento: (corte_id, None) o (None, caja)
+    destinos = []
+    for posicion, datos in enumerate(lista):
+        try:
+            corte_id = _id(datos.get('corte_id') or None, 'corte_id')
+            caja = _texto(datos.get('caja'), 'caja').upper() if corte_id is None else None
+        except ErrorCaja as e:
+            raise ErrorCaja(f"Movimiento {posicion}: {e}")
+        destinos.append((corte_id, caja))
+
+    # Turnos abiertos del lote con una sola consulta
+    cajas = {caja for corte_id, caja in destinos if corte_id is None}
+    ids_corte = {corte_id for corte_id, caja in destinos if corte_id is not None}
+    condiciones = []
+    if cajas:
+        condiciones.append(CorteCaja.caja.in_(cajas))
+    if ids_corte:
+        condiciones.append(CorteCaja.id.in_(ids_corte))
+    abiertos = db.session.execute(
+        select(CorteCaja.id, CorteCaja.caja).where(CorteCaja.estado == 'ABIERTO', db.or_(*condiciones))
+    ).all()
+    corte_por_caja = {fila.caja: fila.id for fila in abiertos}
+    cortes_abiertos = {fila.id for fila in abiertos}
+
+    filas = []
+    denominaciones_por_fila = []
+    deltas_tipo = {} # (corte_id, tipo, forma_pago) -> [monto, movimientos]
+    deltas_denominacion = {} # (corte_id, denominacion) -> cantidad
+    for posicion, (datos, (corte_id, caja)) in enumerate(zip(lista, destinos)):
+        if corte_id is not None:
+            if corte_id not in cortes_abiertos:
+                raise ErrorCaja(f"Movimiento {posicion}: el turno {corte_id} no existe o ya está cerrado.")
+        else:
+            corte_id = corte_por_caja.get(caja)
+            if corte_id is None:
+                raise ErrorCaja(f"Movimiento {posicion}: la caja '{caja}' no tiene un turno abierto.")
+        try:
+            tipo, forma_pago, monto, denominaciones, concepto, pedido_id = _validar_movimiento(datos, tipos)
+        except ErrorCaja as e:
+            raise ErrorCaja(f"Movimiento {posicion}: {e}")
+
+        filas.append({
+            'corte_id': corte_id, 'usuario_id': usuario_id, 'pedido_id': pedido_id,
+            'tipo': tipo, 'forma_pago': forma_pago, 'monto': monto, 'concepto': concepto, 'fecha': fecha,
+        })
+        denominaciones_por_fila.append(denominaciones)
+        acumulado = deltas_tipo.setdefault((corte_id, tipo, forma_pago), [0.0, 0])
+        acumulado[0] += monto
+        acumulado[1] += 1
+        signo = SIGNOS[tipo]
+        for denominacion, cantidad in denominaciones.items():
+            clave = (corte_id, denominacion)
+            deltas_denominacion[clave] = deltas_denominacion.get(clave, 0) + signo * cantidad
+
+    conn = db.session.connection()
+    tabla = MovimientoCaja.__table__
+    ids = conn.execute(insert(tabla).returning(tabla.c.id, sort_by_parameter_order=True), filas).scalars().all()
+    filas_denominacion = [
+        {'movimiento_id': movimiento_id, 'denominacion': denominacion, 'cantidad': cantidad}
+        for movimiento_id, denominaciones in zip(ids, denominaciones_por_fila)
+        for denominacion, cantidad in denominaciones.items()
+    ]
+    if filas_denominacion:
+        conn.execute(insert(MovimientoDenominacion.__table__), filas_denominacion)
+    _sumar_acumulados(conn, deltas_tipo, deltas_denominacion)
+    return ids
+
+def registrar_movimiento(datos, usuario_id, fecha=None):
+    """Registra un movimiento (sin commit). Devuelve su ID."""
+    return registrar_movimientos([datos], usuario_id, fecha)[0]
+
+def _sumar_acumulados(conn, deltas_tipo, deltas_denominacion):
+    """UPSERT por conjuntos: suma los deltas a los acumulados (creando las filas que falten)."""
+    if deltas_tipo:
+        sentencia = sqlite_insert(acumulados_caja)
+        conn.execute(
+            sentencia.on_conflict_do_update(
+                index_elements=['corte_id', 'tipo', 'forma_pago'],
+                set_={
+                    'monto': acumulados_caja.c.monto + sentencia.excluded.monto,
+                    'movimientos': acumulados_caja.c.movimientos + sentencia.excluded.movimientos,
+                }
+            ),
+            [
+                {'corte_id': corte_id, 'tipo': tipo, 'forma_pago': forma_pago, 'monto': monto, 'movimientos': movimientos}
+                for (corte_id, tipo, forma_pago), (monto, movimientos) in deltas_tipo.items()
+            ]
+        )
+    if deltas_denominacion:
+        sentencia = sqlite_insert(acumulados_denominacion_caja)
+        conn.execute(
+            sentencia.on_conflict_do_update(
+                index_elements=['corte_id', 'denominacion'],
+                set_={'cantidad': acumulados_denominacion_caja.c.cantidad + sentencia.excluded.cantidad}
+            ),
+            [
+                {'corte_id': corte_id, 'denominacion': denominacion, 'cantidad': cantidad}
+                for (corte_id, denominacion), cantidad in deltas_denominacion.items()
+            ]
+        )
+
+# --- Corte ---
+
+def _resumen(corte, por_tipo, denominaciones):
+    total_ingresos = total_egresos = efectivo = 0.0
+    movimientos = 0
+    for (tipo, forma_pago), valores in por_tipo.items():
+        signo = SIGNOS.get(tipo, 1)
+        if tipo != TIPO_FONDO:
+            movimientos += valores['movimientos']
+            if signo > 0:
+                total_ingresos += valores['monto']
+            else:
+                total_egresos += valores['monto']
+        if forma_pago == 'EFECTIVO':
+            efectivo += signo * valores['monto']
+    return ResumenCorte(
+        corte_id=corte.id, caja=corte.caja, estado=corte.estado, fondo_inicial=corte.fondo_inicial,
+        por_tipo=por_tipo, denominaciones=denominaciones,
+        total_ingresos=round(total_ingresos, 2), total_egresos=round(total_egresos, 2),
+        efectivo_esperado=round(efectivo, 2), movimientos=movimientos
+    )
+
+def _leer_acumulados(corte_id):
+    por_tipo = {
+        (fila.tipo, fila.forma_pago): {'monto': round(fila.monto, 2), 'movimientos': fila.movimientos}
+        for fila in db.session.execute(select(acumulados_caja).where(acumulados_caja.c.corte_id == corte_id))
+    }
+    denominaciones = {
+        fila.denominacion: fila.cantidad
+        for fila in db.session.execute(
+            select(acumulados_denominacion_caja).where(acumulados_denominacion_caja.c.corte_id == corte_id)
+        ) if fila.cantidad
+    }
+    return por_tipo, denominaciones
+
+def resumen_corte(corte_id):
+    """Totales del turno desde los acumulados (no recorre movimientos). None si no existe."""
+    corte = db.session.get(CorteCaja, corte_id)
+    if corte is None:
+        return None
+    return _resumen(corte, *_leer_acumulados(corte_id))
+
+def cerrar_corte(corte_id, usuario_id, conteo=None, notas=None):
+    """Cierra el turno con los totales de los acumulados y el conteo físico (opcional). Devuelve el ResumenCorte."""
+    corte = db.session.get(CorteCaja, corte_id)
+    if corte is None:
+        raise ErrorCaja(f"El turno {corte_id} no existe.")
+    if corte.estado != 'ABIERTO':
+        raise ErrorCaja(f"El turno {corte_id} ya está cerrado.")
+    contado = _denominaciones(conteo, permitir_negativas=False) if conteo is not None else None
+    notas = _texto(notas, 'notas')
+
+    resumen = _resumen(corte, *_leer_acumulados(corte_id))
+    corte.estado = 'CERRADO'
+    corte.fecha_cierre = datetime.utcnow()
+    corte.usuario_id = usuario_id
+    corte.total_ingresos = resumen.total_ingresos
+    corte.total_egresos = resumen.total_egresos
+    corte.efectivo_esperado = resumen.efectivo_esperado
+    if notas:
+        corte.notas = notas
+    if contado is not None:
+        corte.efectivo_contado = _importe(contado)
+        corte.diferencia = round(corte.efectivo_contado - resumen.efectivo_esperado, 2)
+    filas = [
+        {
+            'corte_id': corte_id,
+            'denominacion': denominacion,
+            'cantidad_esperada': resumen.denominaciones.get(denominacion, 0),
+            'cantidad_contada': contado.get(denominacion, 0) if contado is not None else None,
+        }
+        for denominacion in sorted(set(resumen.denominaciones) | set(contado or ()), reverse=True)
+    ]
+    if filas:
+        db.session.execute(insert(DenominacionCorteCaja.__table__), filas)
+    db.session.flush()
+    return _resumen(corte, resumen.por_tipo, resumen.denominaciones)
+
+# --- Verificación contra el libro ---
+
+def totales_desde_movimientos(corte_id):
+    """Recalcula (por_tipo, denominaciones) recorriendo todos los movimientos del turno."""
+    por_tipo = {
+        (fila.tipo, fila.forma_pago): {'monto': round(fila.monto, 2), 'movimientos': fila.movimientos}
+        for fila in db.session.execute(
+            select(
+                MovimientoCaja.tipo, MovimientoCaja.forma_pago,
+                func.sum(MovimientoCaja.monto).label('monto'), func.count().label('movimientos')
+            ).where(MovimientoCaja.corte_id == corte_id).group_by(MovimientoCaja.tipo, MovimientoCaja.forma_pago)
+        )
+    }
+    denominaciones = {}
+    filas = db.session.execute(
+        select(MovimientoCaja.tipo, MovimientoDenominacion.denominacion, func.sum(MovimientoDenominacion.cantidad))
+        .join(MovimientoCaja, MovimientoCaja.id == MovimientoDenominacion.movimiento_id)
+        .where(MovimientoCaja.corte_id == corte_id)
+        .group_by(MovimientoCaja.tipo, MovimientoDenominacion.denominacion)
+    )
+    for tipo, denominacion, cantidad in filas:
+        denominaciones[denominacion] = denominaciones.get(denominacion, 0) + SIGNOS.get(tipo, 1) * cantidad
+    return por_tipo, {denominacion: cantidad for denominacion, cantidad in denominaciones.items() if cantidad}
+
+def verificar_corte(corte_id, reconstruir=False):
+    """Compara los acumulados del turno con el libro de movimientos.
+
+    Con `reconstruir` reemplaza los acumulados por los recalculados (sin
+    commit). Para un turno cerrado también se revisan los totales guardados
+    en el CorteCaja, pero no se modifican.
+    """
+    corte = db.session.get(CorteCaja, corte_id)
+    if corte is None:
+        raise ErrorCaja(f"El turno {corte_id} no existe.")
+    resultado = ResultadoVerificacion(corte_id)
+    por_tipo, denominaciones = _leer_acumulados(corte_id)
+    libro_por_tipo, libro_denominaciones = totales_desde_movimientos(corte_id)
+    resultado.movimientos = sum(valores['movimientos'] for valores in libro_por_tipo.values())
+
+    for clave in sorted(set(por_tipo) | set(libro_por_tipo)):
+        acumulado = por_tipo.get(clave, {'monto': 0.0, 'movimientos': 0})
+        libro = libro_por_tipo.get(clave, {'monto': 0.0, 'movimientos': 0})
+        if abs(acumulado['monto'] - libro['monto']) > TOLERANCIA or acumulado['movimientos'] != libro['movimientos']:
+            resultado.diferencias.append(
+                f"{clave[0]}/{clave[1]}: acumulado {acumulado['monto']:.2f} ({acumulado['movimientos']} mov.), "
+                f"libro {libro['monto']:.2f} ({libro['movimientos']} mov.)"
+            )
+    for denominacion in sorted(set(denominaciones) | set(libro_denominaciones), reverse=True):
+        if denominaciones.get(denominacion, 0) != libro_denominaciones.get(denominacion, 0):
+            resultado.diferencias.append(
+                f"${denominacion:g}: acumulado {denominaciones.get(denominacion, 0)}, "
+                f"libro {libro_denominaciones.get(denominacion, 0)}"
+            )
+    if corte.estado == 'CERRADO':
+        libro = _resumen(corte, libro_por_tipo, libro_denominaciones)
+        for campo in ('total_ingresos', 'total_egresos', 'efectivo_esperado'):
+            guardado = getattr(corte, campo)
+            if guardado is None or abs(guardado - getattr(libro, campo)) > TOLERANCIA:
+                resultado.diferencias.append(f"Corte.{campo}: guardado {guardado}, libro {getattr(libro, campo):.2f}")
+
+    if reconstruir and resultado.diferencias:
+        conn = db.session.connection()
+        conn.execute(delete(acumulados_caja).where(acumulados_caja.c.corte_id == corte_id))
+        conn.execute(delete(acumulados_denominacion_caja).where(acumulados_denominacion_caja.c.corte_id == corte_id))
+        _sumar_acumulados(
+            conn,
+            {(corte_id, *clave): (valores['monto'], valores['movimientos']) for clave, valores in libro_por_tipo.items()},
+            {(corte_id, denominacion): cantidad for denominacion, cantidad in libro_denominaciones.items()}
+        )
+        resultado.reconstruido = True
+    return resultado
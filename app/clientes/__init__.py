@@ -0,0 +1,6 @@
+from flask import Blueprint
+
+bp = Blueprint('clientes', __name__)
+
+# Importar rutas al final para evitar importaciones circulares
+from app.clientes import routes
@@ -0,0 +1,266 @@
+"""Búsqueda de clientes para el mostrador (autocompletado por nombre, alias o teléfono).
+
+El cajero teclea "juan per", "Pérez", "el güero" o los últimos dígitos del
+teléfono. Hay dos índices:
+
+* `busqueda_clientes`: tabla SQLite FTS5 con el nombre completo y el alias de
+  los clientes activos. El tokenizador `unicode61 remove_diacritics 2`
+  normaliza a minúsculas sin acentos, y los índices de prefijo de 1 a 3
+  caracteres hacen que cada término tecleado ("jua", "pe") se resuelva sin
+  recorrer la tabla. El rowid no es el id del cliente sino su posición en el
+  orden por nombre (`busqueda_clientes_claves` los asocia): FTS5 entrega las
+  coincidencias en orden de rowid, así que los primeros N por nombre salen
+  sin ordenar todas las coincidencias de un prefijo común como "j".
+* `telefonos.numero_invertido`: los dígitos al revés con un índice B-tree;
+  "termina en 5678" es el rango ['8765', '8766') de ese índice, y "empieza
+  con" usa el índice de `telefonos.numero`.
+
+El índice de texto se actualiza en el mismo flush que crea, modifica,
+desactiva o borra un cliente (los teléfonos no necesitan sincronización: su
+columna invertida se calcula en el modelo). Las posiciones se reparten con
+huecos de HUECO_ORDEN; un cliente nuevo o renombrado toma el punto medio
+entre sus vecinos y, si ya no cabe, se renumera todo el índice. Las escrituras con sentencias
+Core no pasan por el flush: después de ellas hay que llamar a `reindexar`.
+Si la BD no es SQLite o no tiene FTS5, la búsqueda cae a un LIKE.
+"""
+import re
+import unicodedata
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, or_, select, text
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import Cliente, Telefono
+
+TABLA_INDICE = 'busqueda_clientes'
+TABLA_CLAVES = 'busqueda_clientes_claves' # Asocia cada cliente con su posición (rowid del índice)
+HUECO_ORDEN = 2 ** 32 # Separación entre posiciones al renumerar: admite 2**31 clientes
+LIMITE_DEFECTO = 10
+LIMITE_MAXIMO = 50
+MIN_DIGITOS_TELEFONO = 3
+
+SQL_CREAR_INDICE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLA_INDICE} USING fts5("
+    "nombre, alias, tokenize = 'unicode61 remove_diacritics 2', prefix = '1 2 3')",
+    # orden = nombre completo; (orden, cliente_id) es el orden de los resultados
+    f"CREATE TABLE IF NOT EXISTS {TABLA_CLAVES} ("
+    "cliente_id INTEGER PRIMARY KEY, clave INTEGER NOT NULL UNIQUE, orden TEXT NOT NULL)",
+    f"CREATE INDEX IF NOT EXISTS ix_{TABLA_CLAVES}_orden ON {TABLA_CLAVES} (orden, cliente_id)",
+)
+
+# Consultas formadas solo por dígitos y separadores de teléfono
+PATRON_TELEFONO = re.compile(r'[\d\s()+./-]+')
+
+# --- Mantenimiento del índice ---
+
+def indice_disponible(conn=None):
+    """Indica si la BD tiene el índice FTS5 de clientes (el resultado se recuerda por aplicación)."""
+    if has_app_context():
+        disponible = current_app.extensions.get('busqueda_clientes_fts')
+        if disponible is not None:
+            return disponible
+    conn = conn or db.session.connection()
+    disponible = conn.dialect.name == 'sqlite' and conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE name = :nombre"), {'nombre': TABLA_CLAVES}
+    ).first() is not None
+    if has_app_context():
+        current_app.extensions['busqueda_clientes_fts'] = disponible
+    return disponible
+
+def _documento(cliente):
+    nombre = f"{cliente.nombre} {cliente.apellidos}" if cliente.apellidos else cliente.nombre
+    return {'id': cliente.id, 'nombre': nombre, 'alias': cliente.alias or ''}
+
+SQL_DESINDEXAR = (
+    text(f"DELETE FROM {TABLA_INDICE} WHERE rowid = (SELECT clave FROM {TABLA_CLAVES} WHERE cliente_id = :id)"),
+    text(f"DELETE FROM {TABLA_CLAVES} WHERE cliente_id = :id"),
+)
+SQL_INDEXAR = (
+    text(f"INSERT INTO {TABLA_CLAVES} (cliente_id, clave, orden) VALUES (:id, :clave, :nombre)"),
+    text(f"INSERT INTO {TABLA_INDICE} (rowid, nombre, alias) VALUES (:clave, :nombre, :alias)"),
+)
+# Posiciones del cliente anterior y del siguiente en el orden (orden, cliente_id)
+SQL_VECINOS = text(
+    f"SELECT (SELECT clave FROM {TABLA_CLAVES} WHERE (orden, cliente_id) < (:nombre, :id) "
+    "ORDER BY orden DESC, cliente_id DESC LIMIT 1), "
+    f"(SELECT clave FROM {TABLA_CLAVES} WHERE (orden, cliente_id) > (:nombre, :id) "
+    "ORDER BY orden, cliente_id LIMIT 1)"
+)
+
+SQL_REINDEXAR = (
+    f"DELETE FROM {TABLA_INDICE}",
+    f"DELETE FROM {TABLA_CLAVES}",
+    f"INSERT INTO {TABLA_CLAVES} (cliente_id, clave, orden) "
+    f"SELECT id, ROW_NUMBER() OVER (ORDER BY orden, id) * {HUECO_ORDEN}, orden FROM ("
+    "  SELECT id, nombre || COALESCE(' ' || NULLIF(apellidos, ''), '') AS orden FROM clientes WHERE activo = 1)",
+    f"INSERT INTO {TABLA_INDICE} (rowid, nombre, alias) "
+    # En orden de rowid: FTS5 vuelca lo pendiente cada vez que recibe un rowid menor
+    f"SELECT k.clave, k.orden, COALESCE(c.alias, '') FROM {TABLA_CLAVES} k JOIN clientes c ON c.id = k.cliente_id "
+    "ORDER BY k.clave",
+    # Une los segmentos del índice en uno solo: las búsquedas leen menos páginas
+    f"INSERT INTO {TABLA_INDICE} ({TABLA_INDICE}) VALUES ('optimize')",
+)
+
+def reindexar(commit=True):
+    """Crea (si falta) y reconstruye el índice de texto desde `clientes`. Devuelve el número de clientes indexados.
+
+    Con commit=False queda dentro de la transacción en curso.
+    """
+    conn = db.session.connection()
+    if conn.dialect.name != 'sqlite':
+        return 0
+    for sentencia in SQL_CREAR_INDICE + SQL_REINDEXAR:
+        conn.execute(text(sentencia))
+    total = conn.execute(text(f"SELECT COUNT(*) FROM {TABLA_CLAVES}")).scalar()
+    if commit:
+        db.session.commit()
+    if has_app_context():
+        current_app.extensions['busqueda_clientes_fts'] = True
+    return total
+
+@event.listens_for(Session, 'after_flush')
+def _sincronizar_indice(session, flush_context):
+    modificados = [
+        obj for obj in (*session.new, *session.dirty)
+        if isinstance(obj, Cliente) and (obj in session.new or session.is_modified(obj, include_collections=False))
+    ]
+    borrados = [obj.id for obj in session.deleted if isinstance(obj, Cliente)]
+    if not modificados and not borrados:
+        return
+    conn = session.connection()
+    if not indice_disponible(conn):
+        return
+    for sentencia in SQL_DESINDEXAR:
+        conn.execute(sentencia, [{'id': cliente_id} for cliente_id in borrados + [obj.id for obj in modificados]])
+    for documento in (_documento(obj) for obj in modificados if obj.activo):
+        anterior, siguiente = conn.execute(SQL_VECINOS, documento).one()
+        anterior = anterior or 0
+        siguiente = siguiente if siguiente is not None else anterior + 2 * HUECO_ORDEN
+        if siguiente - anterior < 2:
+            # Sin hueco entre los vecinos: se renumera desde `clientes`, que ya tiene este flush
+            for sentencia in SQL_REINDEXAR:
+                conn.execute(text(sentencia))
+            return
+        documento['clave'] = (anterior + siguiente) // 2
+        for sentencia in SQL_INDEXAR:
+            conn.execute(sentencia, documento)
+
+# --- Consultas ---
+
+def _rangos_telefono(digitos):
+    """Límites [desde, hasta) de la terminación (sobre los dígitos invertidos) y del inicio del número."""
+    def rango(prefijo):
+        return prefijo, prefijo[:-1] + chr(ord(prefijo[-1]) + 1)
+    (inv_desde, inv_hasta), (num_desde, num_hasta) = rango(digitos[::-1]), rango(digitos)
+    return {'inv_desde': inv_desde, 'inv_hasta': inv_hasta, 'num_desde': num_desde, 'num_hasta': num_hasta}
+
+# IDs de cliente cuyo teléfono termina o empieza con los dígitos: un rango por índice
+SQL_CLIENTES_POR_TELEFONO = (
+    "SELECT cliente_id FROM telefonos WHERE numero_invertido >= :inv_desde AND numero_invertido < :inv_hasta "
+    "UNION SELECT cliente_id FROM telefonos WHERE numero >= :num_desde AND numero < :num_hasta"
+)
+
+# Sin bm25: para calcular el IDF recorre la lista completa de cada prefijo ("g*" son
+# decenas de miles de clientes) y eso triplica el tiempo de la consulta. El rowid es
+# la posición por nombre, así que ORDER BY rowid LIMIT deja de leer la lista de cada
+# término en cuanto tiene los primeros: no se ordenan todas las coincidencias.
+SQL_BUSCAR = (
+    f"SELECT c.id, c.nombre, c.apellidos, c.alias, c.tipo_cliente FROM ("
+    f"  SELECT rowid FROM {TABLA_INDICE} WHERE {TABLA_INDICE} MATCH :expresion ORDER BY rowid LIMIT :limite"
+    f") AS cand JOIN {TABLA_CLAVES} AS k ON k.clave = cand.rowid JOIN clientes AS c ON c.id = k.cliente_id "
+    f"ORDER BY cand.rowid"
+)
+
+# Con teléfono ("4821" o "luis 4821") se parte de los pocos clientes con esos dígitos
+# y el texto, si hay, se comprueba en Python: cruzarlo con el índice FTS5 cliente por
+# cliente recorre la lista de "luis*" en cada uno. MAX_POR_TELEFONO acota los candidatos.
+MAX_POR_TELEFONO = 1000
+SQL_BUSCAR_TELEFONO = (
+    "SELECT id, nombre, apellidos, alias, tipo_cliente FROM clientes "
+    f"WHERE activo = 1 AND id IN ({SQL_CLIENTES_POR_TELEFONO}) ORDER BY nombre, id LIMIT :limite"
+)
+
+def _normalizar(texto):
+    """Palabras en minúsculas y sin acentos, como las deja el tokenizador unicode61 remove_diacritics 2."""
+    sin_acentos = ''.join(
+        caracter for caracter in unicodedata.normalize('NFD', texto or '') if not unicodedata.combining(caracter)
+    )
+    return re.findall(r'\w+', sin_acentos.lower())
+
+def _coincide(fila, prefijos):
+    palabras = _normalizar(f"{fila.nombre} {fila.apellidos or ''} {fila.alias or ''}")
+    return all(any(palabra.startswith(prefijo) for palabra in palabras) for prefijo in prefijos)
+
+def _separar(consulta):
+    """Devuelve (términos de texto, dígitos de teléfono o None)."""
+    consulta = (consulta or '').strip()
+    if PATRON_TELEFONO.fullmatch(consulta):
+        return [], re.sub(r'\D', '', consulta)
+    terminos = re.findall(r'\w+', consulta)
+    # En "juan 5678" los números largos se toman como terminación de teléfono
+    numeros = [termino for termino in terminos if termino.isdigit() and len(termino) >= MIN_DIGITOS_TELEFONO]
+    texto = [termino for termino in terminos if termino not in numeros]
+    return texto, (numeros[-1] if numeros else None)
+
+def buscar(consulta, limite=LIMITE_DEFECTO):
+    """Busca clientes activos. Todos los términos deben aparecer (como palabra o prefijo de palabra).
+
+    Una consulta de solo dígitos (y separadores) busca por teléfono: por
+    terminación o por inicio, con al menos MIN_DIGITOS_TELEFONO dígitos.
+    Devuelve una lista de diccionarios con id, nombre, alias, tipo_cliente y
+    telefonos, ordenados por nombre.
+    """
+    terminos, digitos = _separar(consulta)
+    if digitos is not None and len(digitos) < MIN_DIGITOS_TELEFONO:
+        digitos = None
+    if not terminos and not digitos:
+        return []
+    limite = max(1, min(int(limite), LIMITE_MAXIMO))
+
+    if digitos:
+        prefijos = [prefijo for termino in terminos for prefijo in _normalizar(termino)]
+        filas = db.session.execute(
+            text(SQL_BUSCAR_TELEFONO), dict(_rangos_telefono(digitos), limite=MAX_POR_TELEFONO if prefijos else limite)
+        ).all()
+        filas = [fila for fila in filas if _coincide(fila, prefijos)][:limite]
+    elif indice_disponible():
+        expresion = ' '.join('"{}"*'.format(termino.replace('"', '')) for termino in terminos)
+        filas = db.session.execute(
+            text(SQL_BUSCAR), {'expresion': expresion, 'limite': limite}
+        ).all()
+    else:
+        filas = _buscar_con_like(terminos, limite)
+    return _con_telefonos(filas)
+
+def _buscar_con_like(terminos, limite):
+    """Respaldo sin FTS5: LIKE por contenido (sensible a acentos)."""
+    consulta = select(Cliente.id, Cliente.nombre, Cliente.apellidos, Cliente.alias, Cliente.tipo_cliente).where(
+        Cliente.activo.is_(True)
+    )
+    for termino in terminos:
+        patron = f'%{termino}%'
+        consulta = consulta.where(or_(Cliente.nombre.ilike(patron), Cliente.apellidos.ilike(patron),
+                                      Cliente.alias.ilike(patron)))
+    return db.session.execute(consulta.order_by(Cliente.nombre, Cliente.id).limit(limite)).all()
+
+def _con_telefonos(filas):
+    """Arma los resultados con los teléfonos de cada cliente (una consulta para todos)."""
+    if not filas:
+        return []
+    telefonos = {}
+    for cliente_id, numero in db.session.execute(
+        select(Telefono.cliente_id, Telefono.numero)
+        .where(Telefono.cliente_id.in_([fila.id for fila in filas])).order_by(Telefono.id)
+    ):
+        telefonos.setdefault(cliente_id, []).append(numero)
+    return [
+        {
+            'id': fila.id,
+            'nombre': f"{fila.nombre} {fila.apellidos}" if fila.apellidos else fila.nombre,
+            'alias': fila.alias,
+            'tipo_cliente': fila.tipo_cliente,
+            'telefonos': telefonos.get(fila.id, []),
+        }
+        for fila in filas
+    ]
@@ -0,0 +1,14 @@
+from flask import request, jsonify
+from flask_login import login_required
+from app.clientes import bp
+from app.clientes import services # Importar el módulo de servicios
+
+# --- Búsqueda / autocompletado ---
+
+@bp.route('/buscar')
+@login_required
+def buscar():
+    # Disponible para cualquier usuario autenticado (los cajeros la usan en mostrador)
+    consulta = request.args.get('q', '').strip()
+    limite = request.args.get('limite', 10, type=int)
+    return jsonify({'q': consulta, 'resultados': services.buscar_clientes(consulta, limite)})
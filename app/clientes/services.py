@@ -0,0 +1,7 @@
+from app.clientes import busqueda
+
+# --- Búsqueda ---
+
+def buscar_clientes(consulta, limite=busqueda.LIMITE_DEFECTO):
+    """Busca clientes activos por fragmentos de nombre, apellidos o alias, o por dígitos del teléfono."""
+    return busqueda.buscar(consulta, limite)
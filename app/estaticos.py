@@ -0,0 +1,218 @@
+"""Recursos estáticos con huella de contenido, precomprimidos y con caché inmutable.
+
+`flask construir-estaticos` copia cada recurso de app/static (CSS, JS e
+imágenes) a app/static/dist con el hash de su contenido en el nombre
+(`css/estilo.css` -> `css/estilo.3f2a9c1b2d4e.css`). De los de texto escribe
+además las variantes `.gz` y, si está instalado el paquete `brotli`, `.br`
+(solo si resultan más chicas). El resultado se registra en el manifiesto
+`dist/activos.json`.
+
+Con el manifiesto cargado:
+
+* `activo_url('css/estilo.css')` (global de Jinja) devuelve la URL con huella
+  `/activos/css/estilo.3f2a9c1b2d4e.css`;
+* `/activos/<archivo>` sirve solo los archivos del manifiesto, con
+  `Cache-Control: immutable` de un año y la variante precomprimida que acepte
+  el navegador (`Content-Encoding` + `Vary: Accept-Encoding`). Un cambio de
+  contenido es una URL nueva, así que nunca hay que revalidar;
+* `/sw.js` se sirve con `CACHE_NAME` y `PRECACHE` antepuestos: la versión de
+  la caché del service worker y la lista de URLs con huella salen del
+  manifiesto, en lugar de mantenerse a mano.
+
+Sin manifiesto (p. ej. en desarrollo, antes de construir) `activo_url` cae a
+`url_for('static', ...)` y la versión del service worker se calcula del
+contenido de los mismos recursos.
+
+Quedan fuera, con URL fija: manifest.json (la URL identifica a la PWA),
+offline.html (el service worker la busca por ruta) y los íconos que cita
+manifest.json. Las referencias url() dentro del CSS no se reescriben.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+
+from flask import abort, current_app, request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError: # Opcional: sin él solo se generan variantes gzip
+    brotli = None
+
+CARPETA_DIST = 'dist'
+ARCHIVO_MANIFIESTO = 'activos.json'
+EXTENSIONES = ('.css', '.js', '.png', '.jpg', '.jpeg', '.webp', '.svg', '.ico', '.woff2')
+COMPRIMIBLES = ('.css', '.js', '.svg')
+LARGO_HUELLA = 12
+UN_ANIO = 365 * 24 * 3600
+CACHE_INMUTABLE = f'public, max-age={UN_ANIO}, immutable'
+
+# Preferencia de codificación: (nombre en Accept-Encoding, sufijo del archivo)
+CODIFICACIONES = (('br', '.br'), ('gzip', '.gz'))
+
+# --- Construcción ---
+
+def _recursos(carpeta_static):
+    """Rutas relativas (con '/') de los recursos con huella, sin lo que ya está en dist."""
+    for raiz, carpetas, archivos in os.walk(carpeta_static):
+        if os.path.samefile(raiz, carpeta_static) and CARPETA_DIST in carpetas:
+            carpetas.remove(CARPETA_DIST)
+        carpetas.sort()
+        for nombre in sorted(archivos):
+            if nombre.lower().endswith(EXTENSIONES):
+                yield os.path.relpath(os.path.join(raiz, nombre), carpeta_static).replace(os.sep, '/')
+
+def _huella(contenido):
+    return hashlib.sha256(contenido).hexdigest()[:LARGO_HUELLA]
+
+def _nombre_con_huella(ruta, huella):
+    base, extension = posixpath.splitext(ruta)
+    return f'{base}.{huella}{extension}'
+
+def _escribir(destino, contenido):
+    os.makedirs(os.path.dirname(destino), exist_ok=True)
+    temporal = destino + '.tmp'
+    with open(temporal, 'wb') as archivo:
+        archivo.write(contenido)
+    os.replace(temporal, destino)
+
+def _variantes(contenido):
+    """{sufijo: bytes} de las variantes precomprimidas que ahorran algo."""
+    variantes = {'.gz': gzip.compress(contenido, compresslevel=9, mtime=0)} # mtime fijo: bytes reproducibles
+    if brotli is not None:
+        variantes['.br'] = brotli.compress(contenido, quality=11)
+    return {sufijo: datos for sufijo, datos in variantes.items() if len(datos) < len(contenido)}
+
+def version_de(activos):
+    """Versión del conjunto: cambia si cambia cualquier recurso."""
+    return _huella(json.dumps(sorted((ruta, datos['ruta']) for ruta, datos in activos.items())).encode('utf-8'))
+
+def construir(carpeta_static, limpiar=False):
+    """Genera los archivos con huella, sus variantes y el manifiesto. Devuelve el manifiesto.
+
+    Los archivos de construcciones anteriores se conservan (páginas ya
+    abiertas pueden seguir pidiéndolos) salvo con limpiar=True.
+    """
+    dist = os.path.join(carpeta_static, CARPETA_DIST)
+    activos = {}
+    for ruta in _recursos(carpeta_static):
+        with open(os.path.join(carpeta_static, ruta), 'rb') as archivo:
+            contenido = archivo.read()
+        con_huella = _nombre_con_huella(ruta, _huella(contenido))
+        destino = os.path.join(dist, con_huella)
+        variantes = _variantes(contenido) if ruta.lower().endswith(COMPRIMIBLES) else {}
+        if not os.path.exists(destino):
+            _escribir(destino, contenido)
+            for sufijo, datos in variantes.items():
+                _escribir(destino + sufijo, datos)
+        activos[ruta] = {
+            'ruta': con_huella,
+            'bytes': len(contenido),
+            'codificaciones': {
+                nombre: len(variantes[sufijo]) for nombre, sufijo in CODIFICACIONES if sufijo in variantes
+            },
+        }
+    manifiesto = {'version': version_de(activos), 'activos': activos}
+    _escribir(os.path.join(dist, ARCHIVO_MANIFIESTO),
+              json.dumps(manifiesto, indent=2, sort_keys=True).encode('utf-8'))
+    if limpiar:
+        _limpiar(dist, activos)
+    return manifiesto
+
+def _limpiar(dist, activos):
+    vigentes = {ARCHIVO_MANIFIESTO}
+    for datos in activos.values():
+        vigentes.add(datos['ruta'])
+        vigentes.update(datos['ruta'] + sufijo for _, sufijo in CODIFICACIONES)
+    for raiz, _, archivos in os.walk(dist):
+        for nombre in archivos:
+            ruta = os.path.relpath(os.path.join(raiz, nombre), dist).replace(os.sep, '/')
+            if ruta not in vigentes:
+                os.remove(os.path.join(raiz, nombre))
+
+# --- Aplicación ---
+
+class Estaticos:
+    """Manifiesto cargado, índice inverso para servir y el service worker ya armado."""
+
+    def __init__(self, carpeta_static, manifiesto):
+        self.carpeta_static = carpeta_static
+        self.dist = os.path.join(carpeta_static, CARPETA_DIST)
+        self.activos = manifiesto['activos'] if manifiesto else {}
+        self.por_ruta = {datos['ruta']: datos for datos in self.activos.values()}
+        self.version = manifiesto['version'] if manifiesto else self._version_sin_manifiesto()
+        self.service_worker = None # Bytes de /sw.js, se arman en la primera petición
+
+    def _version_sin_manifiesto(self):
+        activos = {}
+        for ruta in _recursos(self.carpeta_static):
+            with open(os.path.join(self.carpeta_static, ruta), 'rb') as archivo:
+                activos[ruta] = {'ruta': _huella(archivo.read())}
+        return 'dev-' + version_de(activos)
+
+def cargar_manifiesto(carpeta_static):
+    ruta = os.path.join(carpeta_static, CARPETA_DIST, ARCHIVO_MANIFIESTO)
+    if not os.path.exists(ruta):
+        return None
+    with open(ruta, encoding='utf-8') as archivo:
+        return json.load(archivo)
+
+def init_app(app):
+    app.extensions['estaticos'] = Estaticos(app.static_folder, cargar_manifiesto(app.static_folder))
+    app.add_url_rule('/activos/<path:archivo>', 'activo', servir_activo)
+    app.add_url_rule('/sw.js', 'service_worker', servir_service_worker)
+    app.jinja_env.globals['activo_url'] = activo_url
+
+def _estaticos():
+    return current_app.extensions['estaticos']
+
+def activo_url(nombre):
+    """URL con huella de un recurso de app/static (o la de /static si no está en el manifiesto)."""
+    datos = _estaticos().activos.get(nombre)
+    if datos is None:
+        return url_for('static', filename=nombre)
+    return url_for('activo', archivo=datos['ruta'])
+
+def servir_activo(archivo):
+    estaticos = _estaticos()
+    datos = estaticos.por_ruta.get(archivo)
+    if datos is None:
+        abort(404)
+    codificacion = next(
+        (nombre for nombre, _ in CODIFICACIONES
+         if nombre in datos['codificaciones'] and request.accept_encodings[nombre]),
+        None
+    )
+    sufijo = dict(CODIFICACIONES)[codificacion] if codificacion else ''
+    respuesta = send_from_directory(estaticos.dist, archivo + sufijo, max_age=UN_ANIO,
+                                    mimetype=mimetypes.guess_type(archivo)[0])
+    respuesta.headers['Cache-Control'] = CACHE_INMUTABLE
+    if datos['codificaciones']:
+        respuesta.vary.add('Accept-Encoding')
+    if codificacion:
+        respuesta.content_encoding = codificacion
+    return respuesta
+
+def _armar_service_worker(estaticos):
+    with open(os.path.join(current_app.root_path, 'sw.js'), 'rb') as archivo:
+        cuerpo = archivo.read()
+    rutas = sorted(estaticos.activos) or list(_recursos(estaticos.carpeta_static))
+    precache = [activo_url(ruta) for ruta in rutas]
+    encabezado = (
+        '// Generado al servir /sw.js desde el manifiesto de recursos (ver app/estaticos.py)\n'
+        f'const CACHE_NAME = {json.dumps("polleria-mvp-" + estaticos.version)};\n'
+        f'const PRECACHE = {json.dumps(precache, indent=4)};\n\n'
+    )
+    return encabezado.encode('utf-8') + cuerpo
+
+def servir_service_worker():
+    estaticos = _estaticos()
+    if estaticos.service_worker is None or current_app.debug:
+        estaticos.service_worker = _armar_service_worker(estaticos)
+    respuesta = current_app.response_class(estaticos.service_worker, mimetype='application/javascript')
+    # El navegador compara el script en cada visita; con no-cache lo revalida por ETag
+    respuesta.headers['Cache-Control'] = 'no-cache'
+    respuesta.set_etag(hashlib.sha256(estaticos.service_worker).hexdigest()[:LARGO_HUELLA * 2])
+    return respuesta.make_conditional(request)
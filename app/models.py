@@ -1,16 +1,19 @@
+import re
 from datetime import datetime
 from app import db, login # Importamos la instancia db y login creada en app/__init__.py
-from werkzeug.security import generate_password_hash, check_password_hash
 from flask_login import UserMixin # Importar UserMixin
 from sqlalchemy import CheckConstraint, UniqueConstraint # Importar para constraints
+from sqlalchemy.orm import validates
 
 # --- Modelos de Autenticación y Usuarios (existentes) ---
 # Flask-Login requiere una función 'user_loader'
 @login.user_loader
 def load_user(id):
     # Flask-Login pasa el ID como string, convertir a int
-    # Usar db.session.get para SQLAlchemy 2.x (recomendado)
-    return db.session.get(Usuario, int(id))
+    # Se devuelve una identidad ligera desde caché (ver app/auth/identidad.py),
+    # no el objeto Usuario: en la mayoría de las peticiones no se toca la BD.
+    from app.auth import identidad
+    return identidad.cargar_identidad(int(id))
 
 # Si integramos Flask-Login, Usuario debería heredar de UserMixin
 class Usuario(UserMixin, db.Model): # Añadir UserMixin
@@ -26,16 +29,19 @@ class Usuario(UserMixin, db.Model): # Añadir UserMixin
     ultimo_login = db.Column(db.DateTime, nullable=True)
 
     # Relaciones (se añadirán a medida que definamos otros modelos)
-    # pedidos_registrados = db.relationship('Pedido', foreign_keys='Pedido.usuario_id', back_populates='usuario_creador', lazy='dynamic')
-    # pedidos_asignados_repartidor = db.relationship('Pedido', foreign_keys='Pedido.repartidor_id', back_populates='repartidor_asignado', lazy='dynamic')
-    # movimientos_caja_registrados = db.relationship('MovimientoCaja', back_populates='usuario_responsable', lazy='dynamic')
-    # cortes_caja_realizados = db.relationship('CorteCaja', back_populates='usuario_responsable_corte', lazy='dynamic')
+    pedidos_registrados = db.relationship('Pedido', foreign_keys='Pedido.usuario_id', back_populates='usuario_creador', lazy='dynamic')
+    pedidos_asignados_repartidor = db.relationship('Pedido', foreign_keys='Pedido.repartidor_id', back_populates='repartidor_asignado', lazy='dynamic')
+    movimientos_caja_registrados = db.relationship('MovimientoCaja', back_populates='usuario_responsable', lazy='dynamic')
+    cortes_caja_realizados = db.relationship('CorteCaja', back_populates='usuario_responsable_corte', lazy='dynamic')
 
+    # El hash se calcula en un pool acotado con el método de HASH_METODO (ver app/auth/hash_contrasenas.py)
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        from app.auth import hash_contrasenas
+        self.password_hash = hash_contrasenas.generar(password)
 
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        from app.auth import hash_contrasenas
+        return hash_contrasenas.verificar(self.password_hash, password)
 
     def __repr__(self):
         return f'<Usuario {self.username} ({self.rol})>'
@@ -54,9 +60,9 @@ class Cliente(db.Model):
     activo = db.Column(db.Boolean, nullable=False, default=True, index=True)
 
     # Relaciones
-    # telefonos = db.relationship('Telefono', back_populates='cliente', lazy='dynamic', cascade='all, delete-orphan')
+    telefonos = db.relationship('Telefono', back_populates='cliente', lazy='dynamic', cascade='all, delete-orphan')
     # direcciones = db.relationship('Direccion', back_populates='cliente', lazy='dynamic', cascade='all, delete-orphan')
-    # pedidos = db.relationship('Pedido', back_populates='cliente', lazy='dynamic')
+    pedidos = db.relationship('Pedido', back_populates='cliente', lazy='dynamic')
 
     def get_nombre_completo(self):
         if self.apellidos:
@@ -66,6 +72,28 @@ class Cliente(db.Model):
     def __repr__(self):
         return f'<Cliente {self.id}: {self.get_nombre_completo()}>'
 
+class Telefono(db.Model):
+    __tablename__ = 'telefonos'
+
+    id = db.Column(db.Integer, primary_key=True)
+    cliente_id = db.Column(db.Integer, db.ForeignKey('clientes.id'), nullable=False, index=True)
+    numero = db.Column(db.String(20), nullable=False, index=True) # Solo dígitos, ej: '5512345678'
+    # Dígitos al revés: buscar por terminación ("los últimos 4") es un rango sobre este índice
+    numero_invertido = db.Column(db.String(20), nullable=False, index=True)
+    tipo = db.Column(db.String(20), nullable=False, default='CELULAR') # Ej: 'CELULAR', 'CASA', 'TRABAJO'
+
+    # Relaciones
+    cliente = db.relationship('Cliente', back_populates='telefonos')
+
+    @validates('numero')
+    def _normalizar_numero(self, clave, numero):
+        numero = re.sub(r'\D', '', numero or '')
+        self.numero_invertido = numero[::-1]
+        return numero
+
+    def __repr__(self):
+        return f'<Telefono {self.numero} (cliente {self.cliente_id})>'
+
 # --- Tablas de Asociación para Modificaciones (Many-to-Many) ---
 
 producto_modificacion_association = db.Table('producto_modificacion_association',
@@ -98,8 +126,13 @@ class Producto(db.Model):
         lazy='dynamic'
     )
     precios = db.relationship('Precio', foreign_keys='Precio.producto_id', back_populates='producto_base', lazy='dynamic', cascade='all, delete-orphan')
-    # items_pedido = db.relationship('PedidoItem', foreign_keys='PedidoItem.producto_id', back_populates='producto', lazy='dynamic') # Se añadirá con PedidoItem
+    items_pedido = db.relationship('PedidoItem', foreign_keys='PedidoItem.producto_id', back_populates='producto', lazy='dynamic')
 
+    # Listados paginados por nombre con filtro (productos/services.py): sin ordenamiento temporal
+    __table_args__ = (
+        db.Index('ix_productos_activo_nombre', 'activo', 'nombre'),
+        db.Index('ix_productos_categoria_nombre', 'categoria', 'nombre'),
+    )
 
     def __repr__(self):
         return f'<Producto {self.id}: {self.nombre}>'
@@ -123,7 +156,7 @@ class Subproducto(db.Model):
         lazy='dynamic'
     )
     precios = db.relationship('Precio', foreign_keys='Precio.subproducto_id', back_populates='subproducto_base', lazy='dynamic', cascade='all, delete-orphan')
-    # items_pedido = db.relationship('PedidoItem', foreign_keys='PedidoItem.subproducto_id', back_populates='subproducto', lazy='dynamic') # Se añadirá con PedidoItem
+    items_pedido = db.relationship('PedidoItem', foreign_keys='PedidoItem.subproducto_id', back_populates='subproducto', lazy='dynamic')
 
     def __repr__(self):
         return f'<Subproducto {self.codigo_subprod}: {self.nombre} (Padre: {self.producto_padre_id})>'
@@ -150,8 +183,12 @@ class Modificacion(db.Model):
         back_populates='modificaciones_aplicables',
         lazy='dynamic'
     )
-    # items_pedido = db.relationship('PedidoItem', back_populates='modificacion_aplicada', lazy='dynamic') # Se añadirá con PedidoItem
+    items_pedido = db.relationship('PedidoItem', back_populates='modificacion_aplicada', lazy='dynamic')
 
+    # Listado paginado por (nombre, id) con filtro de activo; el id va implícito en el índice
+    __table_args__ = (
+        db.Index('ix_modificaciones_activo_nombre', 'activo', 'nombre'),
+    )
 
     def __repr__(self):
         return f'<Modificacion {self.codigo_modif}: {self.nombre}>'
@@ -188,5 +225,275 @@ class Precio(db.Model):
         target = f"Prod:{self.producto_id}" if self.producto_id else f"SubP:{self.subproducto_id}"
         return f'<Precio {self.id} ({target}) Cliente:{self.tipo_cliente} ${self.precio_kg}>'
 
+# --- Registro de cambios del catálogo (sincronización incremental) ---
+# Cada alta, cambio o baja de un registro del catálogo deja una fila aquí, en la
+# misma transacción (ver app/productos/sincronizacion.py). El id es el cursor
+# que guardan los clientes: AUTOINCREMENT garantiza que nunca se reutiliza.
+
+class CambioCatalogo(db.Model):
+    __tablename__ = 'cambios_catalogo'
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    id = db.Column(db.Integer, primary_key=True)
+    entidad = db.Column(db.String(20), nullable=False) # 'producto', 'subproducto', 'modificacion', 'precio' o 'catalogo'
+    clave = db.Column(db.String(20), nullable=True) # id del registro como texto (None en un REINICIO)
+    operacion = db.Column(db.String(10), nullable=False) # 'GUARDADO', 'BORRADO' o 'REINICIO'
+    fecha = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f'<CambioCatalogo {self.id} {self.operacion} {self.entidad}:{self.clave}>'
+
+# --- Modelos de Pedidos ---
+# Los pedidos se registran por lotes con sentencias Core (ver app/pedidos/services.py);
+# los precios y descripciones se copian al pedido para que no cambien si luego cambia el catálogo.
+
+class Pedido(db.Model):
+    __tablename__ = 'pedidos'
+
+    id = db.Column(db.Integer, primary_key=True)
+    cliente_id = db.Column(db.Integer, db.ForeignKey('clientes.id'), nullable=True, index=True) # None: venta de mostrador
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), nullable=False, index=True) # Quién lo registró
+    repartidor_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), nullable=True, index=True)
+    tipo_cliente = db.Column(db.String(50), nullable=False, default='PUBLICO') # Tipo con el que se cotizó
+    tipo_venta = db.Column(db.String(30), nullable=False, default='MOSTRADOR') # Ej: 'MOSTRADOR', 'DOMICILIO', 'PARA_LLEVAR'
+    estado = db.Column(db.String(30), nullable=False, default='PENDIENTE', index=True) # Ej: 'PENDIENTE', 'EN_PREPARACION', 'ENTREGADO'
+    forma_pago = db.Column(db.String(30), nullable=True) # Ej: 'EFECTIVO', 'TARJETA'
+    subtotal_items = db.Column(db.Float, nullable=False, default=0.0)
+    subtotal_adicionales = db.Column(db.Float, nullable=False, default=0.0)
+    total = db.Column(db.Float, nullable=False, default=0.0)
+    notas = db.Column(db.Text, nullable=True)
+    fecha_pedido = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    fecha_entrega_programada = db.Column(db.DateTime, nullable=True)
+    zona_entrega = db.Column(db.String(50), nullable=True) # Ej: 'CENTRO'; agrupa los viajes de reparto
+    # Clave generada por el cliente (ej. UUID del service worker): reenviar el mismo pedido no lo duplica
+    clave_idempotencia = db.Column(db.String(64), unique=True, index=True, nullable=True)
+
+    # Relaciones
+    cliente = db.relationship('Cliente', back_populates='pedidos')
+    usuario_creador = db.relationship('Usuario', foreign_keys=[usuario_id], back_populates='pedidos_registrados')
+    repartidor_asignado = db.relationship('Usuario', foreign_keys=[repartidor_id], back_populates='pedidos_asignados_repartidor')
+    items = db.relationship('PedidoItem', back_populates='pedido', lazy='dynamic', cascade='all, delete-orphan')
+    adicionales = db.relationship('ProductoAdicional', back_populates='pedido', lazy='dynamic', cascade='all, delete-orphan')
+    movimientos_caja = db.relationship('MovimientoCaja', back_populates='pedido', lazy='dynamic')
+
+    def __repr__(self):
+        return f'<Pedido {self.id} ({self.estado}) ${self.total}>'
+
+class PedidoItem(db.Model):
+    __tablename__ = 'pedido_items'
+
+    id = db.Column(db.Integer, primary_key=True)
+    pedido_id = db.Column(db.Integer, db.ForeignKey('pedidos.id'), nullable=False, index=True)
+    producto_id = db.Column(db.String(10), db.ForeignKey('productos.id'), nullable=True, index=True)
+    subproducto_id = db.Column(db.Integer, db.ForeignKey('subproductos.id'), nullable=True, index=True)
+    modificacion_id = db.Column(db.Integer, db.ForeignKey('modificaciones.id'), nullable=True, index=True)
+    descripcion = db.Column(db.String(200), nullable=False) # Nombre del artículo (y modificación) al momento del pedido
+    cantidad_kg = db.Column(db.Float, nullable=False)
+    precio_kg = db.Column(db.Float, nullable=False)
+    subtotal = db.Column(db.Float, nullable=False)
+    tipo_cliente_aplicado = db.Column(db.String(50), nullable=False) # Puede ser el tipo base si no había precio propio
+    precio_id = db.Column(db.Integer, nullable=True) # Escalón usado (sin FK: el precio puede borrarse después)
+    etiqueta_promo = db.Column(db.String(100), nullable=True)
+    notas = db.Column(db.String(200), nullable=True)
+
+    # Relaciones
+    pedido = db.relationship('Pedido', back_populates='items')
+    producto = db.relationship('Producto', foreign_keys=[producto_id], back_populates='items_pedido')
+    subproducto = db.relationship('Subproducto', foreign_keys=[subproducto_id], back_populates='items_pedido')
+    modificacion_aplicada = db.relationship('Modificacion', back_populates='items_pedido')
+
+    # Constraints
+    __table_args__ = (
+        CheckConstraint(
+            '(producto_id IS NOT NULL AND subproducto_id IS NULL) OR (producto_id IS NULL AND subproducto_id IS NOT NULL)',
+            name='chk_pedido_item_target_not_both_or_none'
+        ),
+        CheckConstraint('cantidad_kg > 0', name='chk_pedido_item_cantidad_positiva'),
+    )
+
+    def __repr__(self):
+        target = f"Prod:{self.producto_id}" if self.producto_id else f"SubP:{self.subproducto_id}"
+        return f'<PedidoItem {self.id} Pedido:{self.pedido_id} ({target}) {self.cantidad_kg}kg>'
+
+class ProductoAdicional(db.Model):
+    """Artículos fuera del catálogo por kilo que se agregan a un pedido (ej: tortillas, salsas, refrescos)."""
+    __tablename__ = 'productos_adicionales'
+
+    id = db.Column(db.Integer, primary_key=True)
+    pedido_id = db.Column(db.Integer, db.ForeignKey('pedidos.id'), nullable=False, index=True)
+    nombre = db.Column(db.String(100), nullable=False)
+    cantidad = db.Column(db.Float, nullable=False, default=1.0)
+    precio_unitario = db.Column(db.Float, nullable=False)
+    subtotal = db.Column(db.Float, nullable=False)
+
+    # Relaciones
+    pedido = db.relationship('Pedido', back_populates='adicionales')
+
+    __table_args__ = (
+        CheckConstraint('cantidad > 0', name='chk_producto_adicional_cantidad_positiva'),
+    )
+
+    def __repr__(self):
+        return f'<ProductoAdicional {self.nombre} x{self.cantidad} (Pedido:{self.pedido_id})>'
+
+# --- Modelos de Caja ---
+# Cada CorteCaja es un turno de una caja: se abre con un fondo, recibe movimientos y se cierra.
+# Los acumulados por tipo/forma de pago y por denominación se actualizan en la misma
+# transacción que cada movimiento (ver app/caja/services.py), así el cierre no recorre movimientos.
+
+class CorteCaja(db.Model):
+    __tablename__ = 'cortes_caja'
+
+    id = db.Column(db.Integer, primary_key=True)
+    caja = db.Column(db.String(20), nullable=False, index=True) # Identificador de la caja, ej: 'CAJA1'
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), nullable=False, index=True)
+    estado = db.Column(db.String(20), nullable=False, default='ABIERTO', index=True) # 'ABIERTO' o 'CERRADO'
+    fondo_inicial = db.Column(db.Float, nullable=False, default=0.0)
+    fecha_apertura = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, index=True)
+    fecha_cierre = db.Column(db.DateTime, nullable=True)
+    # Se llenan al cerrar, a partir de los acumulados
+    total_ingresos = db.Column(db.Float, nullable=True)
+    total_egresos = db.Column(db.Float, nullable=True)
+    efectivo_esperado = db.Column(db.Float, nullable=True)
+    efectivo_contado = db.Column(db.Float, nullable=True)
+    diferencia = db.Column(db.Float, nullable=True) # contado - esperado
+    notas = db.Column(db.Text, nullable=True)
+
+    # Relaciones
+    usuario_responsable_corte = db.relationship('Usuario', back_populates='cortes_caja_realizados')
+    movimientos = db.relationship('MovimientoCaja', back_populates='corte', lazy='dynamic')
+    denominaciones = db.relationship('DenominacionCorteCaja', back_populates='corte', lazy='dynamic', cascade='all, delete-orphan')
+
+    # Constraints
+    __table_args__ = (
+        # Solo un turno abierto por caja
+        db.Index('uq_corte_caja_abierto', 'caja', unique=True, sqlite_where=db.text("estado = 'ABIERTO'")),
+    )
+
+    def __repr__(self):
+        return f'<CorteCaja {self.id} {self.caja} ({self.estado})>'
+
+class MovimientoCaja(db.Model):
+    __tablename__ = 'movimientos_caja'
+
+    id = db.Column(db.Integer, primary_key=True)
+    corte_id = db.Column(db.Integer, db.ForeignKey('cortes_caja.id'), nullable=False, index=True)
+    usuario_id = db.Column(db.Integer, db.ForeignKey('usuarios.id'), nullable=False, index=True)
+    pedido_id = db.Column(db.Integer, db.ForeignKey('pedidos.id'), nullable=True, index=True)
+    tipo = db.Column(db.String(20), nullable=False) # Ej: 'VENTA', 'INGRESO', 'EGRESO', 'RETIRO'
+    forma_pago = db.Column(db.String(30), nullable=False, default='EFECTIVO')
+    monto = db.Column(db.Float, nullable=False) # Siempre positivo; el tipo indica si entra o sale
+    concepto = db.Column(db.String(200), nullable=True)
+    fecha = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    # Relaciones
+    corte = db.relationship('CorteCaja', back_populates='movimientos')
+    usuario_responsable = db.relationship('Usuario', back_populates='movimientos_caja_registrados')
+    pedido = db.relationship('Pedido', back_populates='movimientos_caja')
+    denominaciones = db.relationship('MovimientoDenominacion', back_populates='movimiento', lazy='dynamic', cascade='all, delete-orphan')
+
+    __table_args__ = (
+        CheckConstraint('monto > 0', name='chk_movimiento_caja_monto_positivo'),
+    )
+
+    def __repr__(self):
+        return f'<MovimientoCaja {self.id} {self.tipo} ${self.monto} (Corte:{self.corte_id})>'
+
+class MovimientoDenominacion(db.Model):
+    """Billetes y monedas de un movimiento en efectivo (cantidad negativa: cambio entregado)."""
+    __tablename__ = 'movimientos_denominaciones'
+
+    id = db.Column(db.Integer, primary_key=True)
+    movimiento_id = db.Column(db.Integer, db.ForeignKey('movimientos_caja.id'), nullable=False, index=True)
+    denominacion = db.Column(db.Float, nullable=False)
+    cantidad = db.Column(db.Integer, nullable=False)
+
+    # Relaciones
+    movimiento = db.relationship('MovimientoCaja', back_populates='denominaciones')
+
+    def __repr__(self):
+        return f'<MovimientoDenominacion ${self.denominacion} x{self.cantidad} (Mov:{self.movimiento_id})>'
+
+class DenominacionCorteCaja(db.Model):
+    """Conteo por denominación al cerrar un turno, junto a lo que se esperaba según los movimientos."""
+    __tablename__ = 'denominaciones_corte_caja'
+
+    id = db.Column(db.Integer, primary_key=True)
+    corte_id = db.Column(db.Integer, db.ForeignKey('cortes_caja.id'), nullable=False, index=True)
+    denominacion = db.Column(db.Float, nullable=False)
+    cantidad_esperada = db.Column(db.Integer, nullable=False, default=0)
+    cantidad_contada = db.Column(db.Integer, nullable=True)
+
+    # Relaciones
+    corte = db.relationship('CorteCaja', back_populates='denominaciones')
+
+    __table_args__ = (
+        UniqueConstraint('corte_id', 'denominacion', name='uq_denominacion_corte'),
+    )
+
+    def __repr__(self):
+        return f'<DenominacionCorteCaja ${self.denominacion} Corte:{self.corte_id}>'
+
+# Acumulados por turno, mantenidos por app/caja/services.py (se pueden reconstruir desde los movimientos)
+acumulados_caja = db.Table('acumulados_caja',
+    db.Column('corte_id', db.Integer, db.ForeignKey('cortes_caja.id'), primary_key=True),
+    db.Column('tipo', db.String(20), primary_key=True),
+    db.Column('forma_pago', db.String(30), primary_key=True),
+    db.Column('monto', db.Float, nullable=False, default=0.0),
+    db.Column('movimientos', db.Integer, nullable=False, default=0)
+)
+
+acumulados_denominacion_caja = db.Table('acumulados_denominacion_caja',
+    db.Column('corte_id', db.Integer, db.ForeignKey('cortes_caja.id'), primary_key=True),
+    db.Column('denominacion', db.Float, primary_key=True),
+    db.Column('cantidad', db.Integer, nullable=False, default=0) # Billetes/monedas que deberían estar en la caja
+)
+
+# --- Resúmenes de ventas ---
+# Tablas pre-agregadas que se actualizan en la misma transacción que cada pedido
+# (ver app/reportes/resumen_ventas.py) y se reconstruyen con `flask ventas-reconstruir`.
+# Son WITHOUT ROWID: la llave primaria (que empieza por el periodo) es la tabla
+# misma, así que un rango de fechas se lee sin saltos a otra estructura.
+
+# Por pedido: día x tipo de cliente x usuario que registró
+ventas_diarias = db.Table('ventas_diarias',
+    db.Column('fecha', db.Date, primary_key=True),
+    db.Column('tipo_cliente', db.String(50), primary_key=True),
+    db.Column('usuario_id', db.Integer, db.ForeignKey('usuarios.id'), primary_key=True),
+    db.Column('pedidos', db.Integer, nullable=False, default=0),
+    db.Column('importe_items', db.Float, nullable=False, default=0.0),
+    db.Column('importe_adicionales', db.Float, nullable=False, default=0.0),
+    db.Column('total', db.Float, nullable=False, default=0.0),
+    sqlite_with_rowid=False
+)
+
+# Por artículo: día x producto/subproducto x tipo de cliente x usuario
+# (producto_id es el padre para los subproductos; subproducto_id = 0 para el producto mismo)
+ventas_diarias_articulos = db.Table('ventas_diarias_articulos',
+    db.Column('fecha', db.Date, primary_key=True),
+    db.Column('producto_id', db.String(10), primary_key=True),
+    db.Column('subproducto_id', db.Integer, primary_key=True),
+    db.Column('tipo_cliente', db.String(50), primary_key=True),
+    db.Column('usuario_id', db.Integer, db.ForeignKey('usuarios.id'), primary_key=True),
+    db.Column('items', db.Integer, nullable=False, default=0),
+    db.Column('cantidad_kg', db.Float, nullable=False, default=0.0),
+    db.Column('importe', db.Float, nullable=False, default=0.0),
+    sqlite_with_rowid=False
+)
+
+# Por artículo y mes ('AAAA-MM'): los reportes de rangos largos leen los meses
+# completos de aquí y solo los días sueltos de los extremos del resumen diario
+ventas_mensuales_articulos = db.Table('ventas_mensuales_articulos',
+    db.Column('mes', db.String(7), primary_key=True),
+    db.Column('producto_id', db.String(10), primary_key=True),
+    db.Column('subproducto_id', db.Integer, primary_key=True),
+    db.Column('tipo_cliente', db.String(50), primary_key=True),
+    db.Column('usuario_id', db.Integer, db.ForeignKey('usuarios.id'), primary_key=True),
+    db.Column('items', db.Integer, nullable=False, default=0),
+    db.Column('cantidad_kg', db.Float, nullable=False, default=0.0),
+    db.Column('importe', db.Float, nullable=False, default=0.0),
+    sqlite_with_rowid=False
+)
+
 # --- Otros modelos que se definirán más adelante ---
-# Telefono, Direccion, Pedido, PedidoItem, ProductoAdicional, MovimientoCaja, MovimientoDenominacion, CorteCaja, DenominacionCorteCaja, ConfiguracionSistema
\ No newline at end of file
+# Direccion, ConfiguracionSistema
\ No newline at end of file
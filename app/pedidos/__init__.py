@@ -0,0 +1,6 @@
+from flask import Blueprint
+
+bp = Blueprint('pedidos', __name__)
+
+# Importar rutas al final para evitar importaciones circulares
+from app.pedidos import routes
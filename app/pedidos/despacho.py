@@ -0,0 +1,337 @@
+"""Despacho de entregas a domicilio.
+
+Los pedidos DOMICILIO sin repartidor se mantienen en memoria en montículos
+(heapq) ordenados por hora prometida: uno global y uno por zona de entrega.
+Asignar un viaje toma la entrega más urgente y lo completa con las siguientes
+de la misma zona cuya hora prometida no pasa de DESPACHO_VENTANA_MINUTOS
+después de la primera, hasta DESPACHO_CAPACIDAD pedidos. Cada entrega
+asignada cuesta O(log n): no se vuelven a consultar todos los pedidos
+abiertos en cada asignación.
+
+La hora prometida es `fecha_entrega_programada` o, si no hay,
+`fecha_pedido` + DESPACHO_PROMESA_MINUTOS.
+
+La BD sigue siendo la autoridad. La asignación es un UPDATE condicionado a
+que el pedido siga sin repartidor y en un estado despachable, así que una
+entrega cancelada o asignada por otro proceso simplemente se descarta. Los
+pedidos nuevos entran a la cola al confirmarse su transacción (ver
+`registrar_nuevos`) y los asignados vuelven a ella si la transacción de la
+asignación se revierte.
+
+Nota: como las demás cachés, la cola vive en el proceso. Con varios workers
+cada uno relee los pendientes de la BD cada DESPACHO_RECARGA_SEGUNDOS para
+ver los pedidos que registraron los demás.
+"""
+import heapq
+import itertools
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, select, update
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import Pedido, Usuario
+
+TIPO_VENTA_DOMICILIO = 'DOMICILIO'
+ESTADOS_DESPACHABLES = ('PENDIENTE', 'EN_PREPARACION')
+ESTADOS_CERRADOS = ('ENTREGADO', 'CANCELADO')
+ROL_REPARTIDOR = 'REPARTIDOR'
+
+@dataclass(frozen=True)
+class EntregaPendiente:
+    pedido_id: int
+    prometido: datetime # Hora prometida de entrega (UTC, sin zona horaria)
+    zona: str # '' si el pedido no indica zona
+
+@dataclass(frozen=True)
+class Asignacion:
+    repartidor_id: int
+    zona: str
+    entregas: tuple # EntregaPendiente asignadas, en orden de hora prometida
+
+    @property
+    def pedidos(self):
+        return [entrega.pedido_id for entrega in self.entregas]
+
+class Despachador:
+    """Cola de prioridad de entregas pendientes (global y por zona) con borrado perezoso.
+
+    Una entrada de los montículos es (prometido, secuencia, pedido_id) y solo
+    vale si `_pendientes[pedido_id]` tiene esa secuencia; las demás son basura
+    que se descarta al llegar a la cima.
+    """
+
+    def __init__(self, capacidad=3, ventana=timedelta(minutes=30)):
+        self.capacidad = capacidad
+        self.ventana = ventana
+        self._lock = threading.Lock()
+        self._global = []
+        self._por_zona = {} # zona -> montículo
+        self._pendientes = {} # pedido_id -> (EntregaPendiente, secuencia)
+        self._secuencia = itertools.count()
+        self.cargado_en = None # time.monotonic() de la última lectura completa de la BD
+        self.recargas = 0
+        self.viajes = 0
+        self.entregas_tomadas = 0
+        self.descartadas = 0 # Tomadas de la cola pero ya asignadas o cerradas en la BD
+
+    def __len__(self):
+        return len(self._pendientes)
+
+    def _registrar(self, entrega):
+        if entrega.pedido_id in self._pendientes:
+            return None
+        secuencia = next(self._secuencia)
+        self._pendientes[entrega.pedido_id] = (entrega, secuencia)
+        return (entrega.prometido, secuencia, entrega.pedido_id)
+
+    def cargar(self, entregas):
+        """Reemplaza la cola por `entregas` (lectura completa de la BD) en O(n)."""
+        with self._lock:
+            self._global = []
+            self._por_zona = {}
+            self._pendientes = {}
+            for entrega in entregas:
+                entrada = self._registrar(entrega)
+                if entrada is not None:
+                    self._global.append(entrada)
+                    self._por_zona.setdefault(entrega.zona, []).append(entrada)
+            heapq.heapify(self._global)
+            for monticulo in self._por_zona.values():
+                heapq.heapify(monticulo)
+            self.cargado_en = time.monotonic()
+            self.recargas += 1
+
+    def agregar(self, entregas):
+        with self._lock:
+            for entrega in entregas:
+                entrada = self._registrar(entrega)
+                if entrada is not None:
+                    heapq.heappush(self._global, entrada)
+                    heapq.heappush(self._por_zona.setdefault(entrega.zona, []), entrada)
+
+    def quitar(self, pedido_ids):
+        """Saca entregas de la cola; sus entradas se limpian al llegar a la cima."""
+        with self._lock:
+            for pedido_id in pedido_ids:
+                self._pendientes.pop(pedido_id, None)
+
+    def _vigente(self, entrada):
+        registro = self._pendientes.get(entrada[2])
+        return registro is not None and registro[1] == entrada[1]
+
+    def _cima(self, monticulo):
+        while monticulo and not self._vigente(monticulo[0]):
+            heapq.heappop(monticulo)
+        return monticulo[0] if monticulo else None
+
+    def siguiente_viaje(self, capacidad=None):
+        """Saca de la cola el próximo viaje: la entrega más urgente y las de su zona dentro de la ventana."""
+        capacidad = capacidad or self.capacidad
+        with self._lock:
+            primera = self._cima(self._global)
+            if primera is None:
+                return []
+            heapq.heappop(self._global)
+            zona = self._pendientes[primera[2]][0].zona
+            monticulo = self._por_zona[zona]
+            limite = primera[0] + self.ventana
+            viaje = []
+            # La primera es también la cima vigente de su zona (misma prioridad en ambos montículos)
+            while len(viaje) < capacidad:
+                entrada = self._cima(monticulo)
+                if entrada is None or entrada[0] > limite:
+                    break
+                heapq.heappop(monticulo)
+                viaje.append(self._pendientes.pop(entrada[2])[0])
+            if not monticulo:
+                del self._por_zona[zona]
+            # Las entradas sacadas por zona quedan como basura en el global; compactar si pesa
+            if len(self._global) > 2 * len(self._pendientes) + 1024:
+                self._global = [entrada for entrada in self._global if self._vigente(entrada)]
+                heapq.heapify(self._global)
+            self.viajes += 1
+            self.entregas_tomadas += len(viaje)
+            return viaje
+
+    def contar_descartadas(self, cantidad):
+        with self._lock:
+            self.descartadas += cantidad
+
+    def estadisticas(self):
+        with self._lock:
+            por_zona = {}
+            for entrega, _ in self._pendientes.values():
+                por_zona[entrega.zona] = por_zona.get(entrega.zona, 0) + 1
+            return {
+                'pendientes': len(self._pendientes),
+                'por_zona': por_zona,
+                'entradas_en_cola': len(self._global),
+                'capacidad': self.capacidad,
+                'ventana_minutos': self.ventana.total_seconds() / 60,
+                'viajes': self.viajes,
+                'entregas_tomadas': self.entregas_tomadas,
+                'descartadas': self.descartadas,
+                'recargas': self.recargas,
+            }
+
+def init_app(app):
+    app.config.setdefault('DESPACHO_CAPACIDAD', 3)
+    app.config.setdefault('DESPACHO_VENTANA_MINUTOS', 30)
+    app.config.setdefault('DESPACHO_PROMESA_MINUTOS', 45)
+    app.config.setdefault('DESPACHO_RECARGA_SEGUNDOS', 60)
+    app.extensions['despacho'] = Despachador(
+        capacidad=int(app.config['DESPACHO_CAPACIDAD']),
+        ventana=timedelta(minutes=float(app.config['DESPACHO_VENTANA_MINUTOS']))
+    )
+
+def hora_prometida(fecha_pedido, fecha_entrega_programada=None):
+    """Hora prometida en UTC sin zona horaria (como se guarda fecha_pedido)."""
+    if fecha_entrega_programada is None:
+        return fecha_pedido + timedelta(minutes=float(current_app.config.get('DESPACHO_PROMESA_MINUTOS', 45)))
+    if fecha_entrega_programada.tzinfo is not None:
+        return fecha_entrega_programada.astimezone(timezone.utc).replace(tzinfo=None)
+    return fecha_entrega_programada
+
+def _leer_pendientes():
+    tabla = Pedido.__table__
+    filas = db.session.execute(
+        select(tabla.c.id, tabla.c.fecha_pedido, tabla.c.fecha_entrega_programada, tabla.c.zona_entrega)
+        .where(
+            tabla.c.tipo_venta == TIPO_VENTA_DOMICILIO,
+            tabla.c.repartidor_id.is_(None),
+            tabla.c.estado.in_(ESTADOS_DESPACHABLES)
+        )
+        .order_by(tabla.c.id)
+    ).all()
+    return [
+        EntregaPendiente(fila.id, hora_prometida(fila.fecha_pedido, fila.fecha_entrega_programada), fila.zona_entrega or '')
+        for fila in filas
+    ]
+
+def obtener_despachador():
+    """Devuelve la cola de la aplicación actual, leyéndola de la BD si no está cargada o ya venció."""
+    despachador = current_app.extensions['despacho']
+    recarga = float(current_app.config.get('DESPACHO_RECARGA_SEGUNDOS', 60))
+    if despachador.cargado_en is None or time.monotonic() - despachador.cargado_en > recarga:
+        despachador.cargar(_leer_pendientes())
+    return despachador
+
+def registrar_nuevos(session, pedidos):
+    """Anota los pedidos DOMICILIO recién insertados; entran a la cola cuando la transacción se confirma.
+
+    `pedidos` son pares (pedido_id, valores) como los escribe el servicio de captura.
+    """
+    nuevos = [
+        EntregaPendiente(
+            pedido_id,
+            hora_prometida(valores['fecha_pedido'], valores.get('fecha_entrega_programada')),
+            valores.get('zona_entrega') or ''
+        )
+        for pedido_id, valores in pedidos if valores.get('tipo_venta') == TIPO_VENTA_DOMICILIO
+    ]
+    if nuevos:
+        session.info.setdefault('despacho_nuevos', []).extend(nuevos)
+
+def asignar_siguiente(repartidor_id, capacidad=None):
+    """Asigna al repartidor el próximo viaje (sin commit). Devuelve `Asignacion` o None si no hay entregas.
+
+    Las entregas que la BD ya no considera despachables se descartan y se toma el siguiente viaje.
+    """
+    despachador = obtener_despachador()
+    tabla = Pedido.__table__
+    while True:
+        viaje = despachador.siguiente_viaje(capacidad)
+        if not viaje:
+            return None
+        asignados = set(db.session.execute(
+            update(tabla)
+            .where(
+                tabla.c.id.in_([entrega.pedido_id for entrega in viaje]),
+                tabla.c.repartidor_id.is_(None),
+                tabla.c.estado.in_(ESTADOS_DESPACHABLES)
+            )
+            .values(repartidor_id=repartidor_id)
+            .returning(tabla.c.id)
+        ).scalars())
+        if len(asignados) < len(viaje):
+            despachador.contar_descartadas(len(viaje) - len(asignados))
+        if asignados:
+            entregas = tuple(entrega for entrega in viaje if entrega.pedido_id in asignados)
+            db.session.info.setdefault('despacho_tomados', []).extend(entregas)
+            return Asignacion(repartidor_id, entregas[0].zona, entregas)
+
+def repartidores_disponibles(repartidor_ids=None):
+    """IDs de repartidores activos sin entregas abiertas (opcionalmente solo de `repartidor_ids`), en una consulta."""
+    ocupados = select(Pedido.repartidor_id).where(
+        Pedido.repartidor_id.is_not(None),
+        Pedido.estado.not_in(ESTADOS_CERRADOS)
+    )
+    consulta = select(Usuario.id).where(
+        Usuario.rol == ROL_REPARTIDOR,
+        Usuario.activo.is_(True),
+        Usuario.id.not_in(ocupados)
+    )
+    if repartidor_ids is not None:
+        consulta = consulta.where(Usuario.id.in_(repartidor_ids))
+    return db.session.execute(consulta.order_by(Usuario.id)).scalars().all()
+
+def despachar(repartidor_ids, capacidad=None):
+    """Un turno de despacho (sin commit): un viaje por repartidor, en el orden dado, mientras haya entregas."""
+    asignaciones = []
+    for repartidor_id in repartidor_ids:
+        asignacion = asignar_siguiente(repartidor_id, capacidad)
+        if asignacion is None:
+            break
+        asignaciones.append(asignacion)
+    return asignaciones
+
+def detalle_entregas(pedido_ids):
+    """Lo que el repartidor necesita de cada pedido, en una consulta."""
+    tabla = Pedido.__table__
+    filas = db.session.execute(
+        select(
+            tabla.c.id, tabla.c.cliente_id, tabla.c.zona_entrega, tabla.c.estado, tabla.c.forma_pago,
+            tabla.c.total, tabla.c.notas, tabla.c.fecha_pedido, tabla.c.fecha_entrega_programada
+        ).where(tabla.c.id.in_(pedido_ids))
+    ).all()
+    por_id = {fila.id: fila for fila in filas}
+    return [
+        {
+            'id': fila.id,
+            'cliente_id': fila.cliente_id,
+            'zona_entrega': fila.zona_entrega,
+            'estado': fila.estado,
+            'forma_pago': fila.forma_pago,
+            'total': fila.total,
+            'notas': fila.notas,
+            'prometido': hora_prometida(fila.fecha_pedido, fila.fecha_entrega_programada).isoformat(),
+        }
+        for fila in map(por_id.get, pedido_ids) if fila is not None
+    ]
+
+def obtener_estadisticas():
+    return obtener_despachador().estadisticas()
+
+# --- Eventos de sesión: la cola sigue a las transacciones confirmadas ---
+
+@event.listens_for(Session, 'after_commit')
+def _aplicar_tras_commit(session):
+    nuevos = session.info.pop('despacho_nuevos', None)
+    session.info.pop('despacho_tomados', None)
+    if nuevos and has_app_context() and 'despacho' in current_app.extensions:
+        despachador = current_app.extensions['despacho']
+        # Si la cola aún no se ha leído, la primera lectura ya incluirá estos pedidos
+        if despachador.cargado_en is not None:
+            despachador.agregar(nuevos)
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _revertir_tras_rollback(session, previous_transaction):
+    session.info.pop('despacho_nuevos', None)
+    tomados = session.info.pop('despacho_tomados', None)
+    if tomados and has_app_context() and 'despacho' in current_app.extensions:
+        current_app.extensions['despacho'].agregar(tomados)
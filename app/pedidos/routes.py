@@ -0,0 +1,171 @@
+from flask import request, abort, jsonify, url_for
+from flask_login import login_required, current_user
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.pedidos import bp
+from app.pedidos import services # Importar el módulo de servicios
+from app.pedidos import despacho
+
+# Roles que pueden capturar pedidos
+ROLES_CAPTURA = ('ADMINISTRADOR', 'CAJERO')
+
+MAX_PEDIDOS_POR_LOTE = 500
+MAX_PEDIDOS_POR_SINCRONIZACION = 500
+MAX_REPARTIDORES_POR_DESPACHO = 200
+
+def _exigir_rol_captura():
+    if current_user.rol not in ROLES_CAPTURA:
+        abort(403)
+
+def _confirmar(operacion):
+    """Ejecuta `operacion()` y confirma; revierte ante cualquier error.
+
+    Si otra petición registró a la vez un pedido con la misma clave_idempotencia
+    (p. ej. un reintento del service worker), el UNIQUE falla: se revierte y se
+    reintenta una vez, y esta vez el pedido sale como duplicado.
+    """
+    for intento in range(2):
+        try:
+            resultado = operacion()
+            db.session.commit()
+            return resultado
+        except IntegrityError:
+            db.session.rollback()
+            if intento:
+                raise
+        except Exception:
+            db.session.rollback()
+            raise
+
+def _registrado_a_dict(registrado):
+    return {
+        'id': registrado.id,
+        'total': registrado.total,
+        'items': registrado.items,
+        'adicionales': registrado.adicionales,
+        'clave_idempotencia': registrado.clave,
+        'url': url_for('pedidos.ver_pedido', pedido_id=registrado.id),
+    }
+
+# Ruta para CREAR un pedido (JSON): una transacción por pedido.
+# Con clave_idempotencia, reenviarlo devuelve el pedido ya registrado (200) en lugar de duplicarlo.
+@bp.route('/', methods=['POST'])
+@login_required
+def crear_pedido():
+    _exigir_rol_captura()
+    datos = request.get_json(silent=True)
+    if not isinstance(datos, dict):
+        return jsonify({'errores': ['Se esperaba un objeto JSON.']}), 400
+    resultado = _confirmar(lambda: services.registrar_pedidos([datos], current_user.id, omitir_invalidos=True))
+    if resultado.rechazados:
+        return jsonify({'errores': resultado.rechazados[0]}), 422
+    if resultado.duplicados:
+        return jsonify(_registrado_a_dict(resultado.duplicados[0])), 200
+    return jsonify(_registrado_a_dict(resultado.registrados[0])), 201
+
+# Ruta para CREAR varios pedidos (JSON): un solo commit; los inválidos se reportan y se omiten
+@bp.route('/lote', methods=['POST'])
+@login_required
+def crear_pedidos_lote():
+    _exigir_rol_captura()
+    datos = request.get_json(silent=True)
+    pedidos = datos.get('pedidos') if isinstance(datos, dict) else None
+    if not isinstance(pedidos, list):
+        return jsonify({'errores': ['Se esperaba {"pedidos": [...]}.']}), 400
+    if len(pedidos) > MAX_PEDIDOS_POR_LOTE:
+        return jsonify({'errores': [f'Máximo {MAX_PEDIDOS_POR_LOTE} pedidos por lote.']}), 413
+    resultado = _confirmar(lambda: services.registrar_pedidos(pedidos, current_user.id, omitir_invalidos=True))
+    return jsonify({
+        'registrados': [_registrado_a_dict(registrado) for registrado in resultado.registrados],
+        'rechazados': [
+            {'posicion': posicion, 'errores': errores}
+            for posicion, errores in sorted(resultado.rechazados.items())
+        ],
+        'duplicados': [
+            dict(_registrado_a_dict(registrado), posicion=posicion)
+            for posicion, registrado in sorted(resultado.duplicados.items())
+        ],
+    }), 201 if resultado.registrados or resultado.duplicados else 422
+
+# Ruta para SINCRONIZAR pedidos capturados sin conexión (cola del service worker):
+# {"pedidos": [{"clave_idempotencia": "...", "capturado_en": "ISO 8601", ...}]}, un solo commit.
+# Siempre responde el estado de cada pedido por clave; reenviar el lote no duplica nada.
+@bp.route('/sincronizar', methods=['POST'])
+@login_required
+def sincronizar_pedidos():
+    _exigir_rol_captura()
+    datos = request.get_json(silent=True)
+    pedidos = datos.get('pedidos') if isinstance(datos, dict) else None
+    if not isinstance(pedidos, list):
+        return jsonify({'errores': ['Se esperaba {"pedidos": [...]}.']}), 400
+    if len(pedidos) > MAX_PEDIDOS_POR_SINCRONIZACION:
+        return jsonify({'errores': [f'Máximo {MAX_PEDIDOS_POR_SINCRONIZACION} pedidos por sincronización.']}), 413
+    estados = _confirmar(lambda: services.sincronizar_pedidos(pedidos, current_user.id))
+    conteo = {'REGISTRADO': 0, 'DUPLICADO': 0, 'RECHAZADO': 0}
+    for estado in estados:
+        conteo[estado['estado']] += 1
+    return jsonify({
+        'resultados': estados,
+        'registrados': conteo['REGISTRADO'],
+        'duplicados': conteo['DUPLICADO'],
+        'rechazados': conteo['RECHAZADO'],
+    })
+
+def _asignacion_a_dict(asignacion):
+    return {
+        'repartidor_id': asignacion.repartidor_id,
+        'zona_entrega': asignacion.zona or None,
+        'pedidos': despacho.detalle_entregas(asignacion.pedidos),
+    }
+
+# Ruta para que un REPARTIDOR TOME su próximo viaje (JSON): 204 si no hay entregas pendientes
+@bp.route('/despacho/siguiente', methods=['POST'])
+@login_required
+def tomar_siguiente_viaje():
+    if current_user.rol != despacho.ROL_REPARTIDOR:
+        abort(403)
+    asignacion = _confirmar(lambda: despacho.asignar_siguiente(current_user.id))
+    if asignacion is None:
+        return '', 204
+    return jsonify(_asignacion_a_dict(asignacion))
+
+# Ruta para DESPACHAR un turno (JSON): {"repartidores": [ids]} opcional; sin lista, todos los
+# repartidores activos sin entregas abiertas. Un viaje por repartidor, un solo commit.
+@bp.route('/despacho', methods=['POST'])
+@login_required
+def despachar():
+    _exigir_rol_captura()
+    datos = request.get_json(silent=True) or {}
+    repartidores = datos.get('repartidores') if isinstance(datos, dict) else None
+    if repartidores is not None:
+        if not isinstance(repartidores, list) or not all(isinstance(r, int) for r in repartidores):
+            return jsonify({'errores': ['Se esperaba {"repartidores": [ids]}.']}), 400
+        if len(repartidores) > MAX_REPARTIDORES_POR_DESPACHO:
+            return jsonify({'errores': [f'Máximo {MAX_REPARTIDORES_POR_DESPACHO} repartidores por despacho.']}), 413
+        disponibles = set(despacho.repartidores_disponibles(repartidores))
+        repartidores = [r for r in dict.fromkeys(repartidores) if r in disponibles]
+    else:
+        repartidores = despacho.repartidores_disponibles()
+    asignaciones = _confirmar(lambda: despacho.despachar(repartidores))
+    asignados = {asignacion.repartidor_id for asignacion in asignaciones}
+    return jsonify({
+        'asignaciones': [_asignacion_a_dict(asignacion) for asignacion in asignaciones],
+        'sin_viaje': [r for r in repartidores if r not in asignados],
+    })
+
+# Ruta para VER el estado de la cola de despacho (JSON)
+@bp.route('/despacho/estado')
+@login_required
+def estado_despacho():
+    _exigir_rol_captura()
+    return jsonify(despacho.obtener_estadisticas())
+
+# Ruta para VER un pedido (JSON)
+@bp.route('/<int:pedido_id>')
+@login_required
+def ver_pedido(pedido_id):
+    _exigir_rol_captura()
+    pedido = services.obtener_pedido(pedido_id)
+    if pedido is None:
+        abort(404)
+    return jsonify(pedido)
@@ -0,0 +1,521 @@
+"""Captura de pedidos orientada a throughput.
+
+Un pedido (o un lote de pedidos) se procesa en tres pasos sin consultas por
+artículo:
+
+1. Validación contra la foto en memoria del catálogo (catalogo_cache): que
+   cada producto/subproducto exista y esté activo y que la modificación le sea
+   aplicable. Los clientes del lote se leen con una sola consulta.
+2. Cotización de todos los artículos del lote en una sola pasada sobre la
+   tabla de precios compilada (motor_precios.cotizar_lote).
+3. Escritura con sentencias Core por conjuntos: un INSERT ... RETURNING para
+   los pedidos y un executemany para items y adicionales, dentro de la
+   transacción de la sesión. Como en el resto de los servicios, el commit lo
+   hace quien llama (una transacción por pedido o por lote).
+4. En la misma transacción se suman los pedidos a los resúmenes diarios de
+   ventas (app/reportes/resumen_ventas.py) con un UPSERT por conjuntos, y los
+   de DOMICILIO se anotan para la cola de despacho (app/pedidos/despacho.py).
+
+El precio, el tipo de cliente aplicado y la descripción se copian al item para
+que el pedido no cambie si después cambia el catálogo.
+
+Un pedido puede traer `clave_idempotencia` (la genera el cliente, p. ej. el
+service worker al capturar sin conexión): si ya existe un pedido con esa
+clave no se vuelve a registrar y se reporta en `ResultadoRegistro.duplicados`.
+Los pedidos diferidos (`sincronizar_pedidos`) conservan su hora de captura
+(`capturado_en`) como fecha del pedido y se cotizan con los precios de ese día.
+"""
+import math
+import re
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+
+from flask import current_app
+from sqlalchemy import func, insert, select
+
+from app import db
+from app.models import Cliente, Pedido, PedidoItem, ProductoAdicional
+from app.pedidos import despacho
+from app.productos import catalogo_cache, motor_precios
+from app.reportes import resumen_ventas
+
+TIPOS_VENTA = ('MOSTRADOR', 'DOMICILIO', 'PARA_LLEVAR')
+FORMAS_PAGO = ('EFECTIVO', 'TARJETA', 'TRANSFERENCIA')
+ESTADOS_PEDIDO = ('PENDIENTE', 'EN_PREPARACION', 'EN_CAMINO', 'ENTREGADO', 'CANCELADO')
+TIPO_CLIENTE_DEFECTO = 'PUBLICO'
+
+MAX_ITEMS_POR_PEDIDO = 200
+MAX_CANTIDAD_KG = 1000.0
+MAX_CANTIDAD_ADICIONAL = 1000.0
+MAX_PRECIO_UNITARIO = 100000.0
+MAX_ID = 2**63 - 1 # Mayor entero que acepta SQLite
+
+# Claves de idempotencia: UUID u otro identificador opaco del cliente
+PATRON_CLAVE = re.compile(r'[A-Za-z0-9_-]{8,64}')
+
+class PedidoInvalido(ValueError):
+    """El pedido no pasó la validación; `errores` lista los motivos."""
+
+    def __init__(self, errores):
+        super().__init__('; '.join(errores))
+        self.errores = list(errores)
+
+@dataclass(frozen=True)
+class PedidoRegistrado:
+    id: int
+    total: float
+    items: int
+    adicionales: int
+    clave: str = None # clave_idempotencia, si el pedido la trajo
+
+@dataclass
+class ResultadoRegistro:
+    registrados: list = field(default_factory=list) # PedidoRegistrado, en el orden de entrada
+    rechazados: dict = field(default_factory=dict) # posición en la entrada -> lista de errores
+    duplicados: dict = field(default_factory=dict) # posición -> PedidoRegistrado ya existente con esa clave
+
+# --- Validación ---
+
+def _catalogo():
+    """Foto del catálogo para validar; si la caché está desactivada se arma una para este lote."""
+    snapshot = catalogo_cache.obtener_snapshot()
+    if snapshot is None:
+        snapshot = catalogo_cache.construir_snapshot(catalogo_cache.version_catalogo())
+    return snapshot
+
+def _numero(valor, campo, errores, minimo=0.0, maximo=None, estricto=True):
+    try:
+        if isinstance(valor, bool):
+            raise TypeError
+        numero = float(valor)
+    except (TypeError, ValueError, OverflowError):
+        errores.append(f"{campo}: '{valor}' no es un número.")
+        return None
+    if not math.isfinite(numero):
+        errores.append(f"{campo}: '{valor}' no es un número finito.")
+        return None
+    if numero <= minimo if estricto else numero < minimo:
+        errores.append(f"{campo}: debe ser mayor {'que' if estricto else 'o igual a'} {minimo:g}.")
+        return None
+    if maximo is not None and numero > maximo:
+        errores.append(f"{campo}: no puede ser mayor que {maximo:g}.")
+        return None
+    return numero
+
+def _id(valor):
+    """`valor` como ID (entero positivo que cabe en SQLite), o None si no lo es."""
+    if isinstance(valor, bool) or (isinstance(valor, float) and not valor.is_integer()):
+        return None
+    try:
+        numero = int(valor)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    return numero if 0 < numero <= MAX_ID else None
+
+def _entero(valor, campo, errores):
+    if valor is None or valor == '':
+        return None
+    numero = _id(valor)
+    if numero is None:
+        errores.append(f"{campo}: '{valor}' no es un ID válido.")
+    return numero
+
+def _texto(valor, campo, errores, longitud):
+    if valor is None:
+        return None
+    texto = str(valor).strip()
+    if len(texto) > longitud:
+        errores.append(f"{campo}: máximo {longitud} caracteres.")
+    return texto or None
+
+def _validar_item(datos, posicion, catalogo, errores):
+    """Devuelve el item normalizado (sin precio) o None si tiene errores."""
+    campo = f"items[{posicion}]"
+    if not isinstance(datos, dict):
+        errores.append(f"{campo}: debe ser un objeto.")
+        return None
+    producto_id = datos.get('producto_id') or None
+    subproducto_id = _entero(datos.get('subproducto_id'), f"{campo}.subproducto_id", errores)
+    modificacion_id = _entero(datos.get('modificacion_id'), f"{campo}.modificacion_id", errores)
+    cantidad_kg = _numero(datos.get('cantidad_kg'), f"{campo}.cantidad_kg", errores, maximo=MAX_CANTIDAD_KG)
+    notas = _texto(datos.get('notas'), f"{campo}.notas", errores, 200)
+
+    if subproducto_id is None and datos.get('subproducto_id') not in (None, ''):
+        return None # El ID inválido ya quedó en errores
+    if (producto_id is None) == (subproducto_id is None):
+        errores.append(f"{campo}: indica producto_id o subproducto_id (solo uno).")
+        return None
+    if producto_id is not None:
+        articulo = catalogo.productos_por_id.get(str(producto_id).strip().upper())
+        if articulo is None or not articulo.activo:
+            errores.append(f"{campo}: el producto '{producto_id}' no existe o no está activo.")
+            return None
+    else:
+        articulo = catalogo.subproductos_por_id.get(subproducto_id)
+        if articulo is None or not articulo.activo:
+            errores.append(f"{campo}: el subproducto {subproducto_id} no existe o no está activo.")
+            return None
+
+    descripcion = articulo.nombre
+    if modificacion_id is not None:
+        modificacion = catalogo.modificaciones_por_id.get(modificacion_id)
+        if modificacion is None or not modificacion.activo or modificacion not in articulo.modificaciones:
+            errores.append(f"{campo}: la modificación {modificacion_id} no aplica a '{articulo.nombre}'.")
+            return None
+        descripcion = f"{articulo.nombre} ({modificacion.nombre})"
+    if cantidad_kg is None:
+        return None
+
+    return {
+        'producto_id': articulo.id if producto_id is not None else None,
+        'subproducto_id': articulo.id if producto_id is None else None,
+        'modificacion_id': modificacion_id,
+        'descripcion': descripcion[:200],
+        'cantidad_kg': cantidad_kg,
+        'notas': notas,
+    }
+
+def _validar_adicional(datos, posicion, errores):
+    campo = f"adicionales[{posicion}]"
+    if not isinstance(datos, dict):
+        errores.append(f"{campo}: debe ser un objeto.")
+        return None
+    nombre = _texto(datos.get('nombre'), f"{campo}.nombre", errores, 100)
+    if not nombre:
+        errores.append(f"{campo}.nombre: es obligatorio.")
+    cantidad = _numero(datos.get('cantidad', 1), f"{campo}.cantidad", errores, maximo=MAX_CANTIDAD_ADICIONAL)
+    precio_unitario = _numero(datos.get('precio_unitario'), f"{campo}.precio_unitario", errores,
+                              maximo=MAX_PRECIO_UNITARIO, estricto=False)
+    if not nombre or cantidad is None or precio_unitario is None:
+        return None
+    return {
+        'nombre': nombre,
+        'cantidad': cantidad,
+        'precio_unitario': precio_unitario,
+        'subtotal': round(cantidad * precio_unitario, 2),
+    }
+
+def _clave(datos):
+    """clave_idempotencia del pedido si tiene formato válido, si no None."""
+    clave = datos.get('clave_idempotencia') if isinstance(datos, dict) else None
+    return clave if isinstance(clave, str) and PATRON_CLAVE.fullmatch(clave) else None
+
+def _utc_sin_zona(fecha):
+    """Las fechas se guardan en UTC sin zona: una con desfase se convierte antes de quitársela."""
+    if fecha.tzinfo is not None:
+        fecha = fecha.astimezone(timezone.utc).replace(tzinfo=None)
+    return fecha
+
+def _fecha_captura(valor, ventana, errores):
+    """`capturado_en` (ISO 8601) como datetime UTC sin zona, dentro de `ventana` = (mínimo, ahora)."""
+    try:
+        fecha = valor if isinstance(valor, datetime) else datetime.fromisoformat(str(valor).replace('Z', '+00:00'))
+    except ValueError:
+        errores.append(f"capturado_en: '{valor}' no es una fecha ISO 8601.")
+        return None
+    fecha = _utc_sin_zona(fecha)
+    minimo, ahora = ventana
+    if fecha < minimo:
+        errores.append(f"capturado_en: el pedido es más antiguo de lo permitido ({minimo.isoformat()} UTC).")
+        return None
+    return min(fecha, ahora) # Un reloj adelantado en el dispositivo no produce pedidos en el futuro
+
+def _validar_pedido(datos, catalogo, clientes, ventana_captura=None):
+    """Devuelve (pedido, items, adicionales) normalizados; lanza PedidoInvalido con todos los errores.
+
+    Con `ventana_captura` = (mínimo, ahora) se acepta `capturado_en` como fecha del pedido.
+    """
+    if not isinstance(datos, dict):
+        raise PedidoInvalido(['El pedido debe ser un objeto.'])
+    errores = []
+
+    clave = datos.get('clave_idempotencia')
+    if clave is not None and _clave(datos) is None:
+        errores.append('clave_idempotencia: de 8 a 64 caracteres entre letras, dígitos, "-" y "_".')
+    fecha_captura = None
+    if ventana_captura is not None and datos.get('capturado_en'):
+        fecha_captura = _fecha_captura(datos['capturado_en'], ventana_captura, errores)
+
+    # Con cliente_id manda el tipo registrado del cliente; sin él, el indicado debe tener precios en el catálogo
+    cliente_id = _entero(datos.get('cliente_id'), 'cliente_id', errores)
+    tipo_cliente = _texto(datos.get('tipo_cliente'), 'tipo_cliente', errores, 50)
+    if cliente_id is not None:
+        cliente = clientes.get(cliente_id)
+        if cliente is None or not cliente.activo:
+            errores.append(f"cliente_id: el cliente {cliente_id} no existe o no está activo.")
+        else:
+            tipo_cliente = cliente.tipo_cliente
+    elif tipo_cliente is not None:
+        tipo_cliente = tipo_cliente.upper()
+        if tipo_cliente != TIPO_CLIENTE_DEFECTO and tipo_cliente not in catalogo.tipos_cliente:
+            validos = ', '.join(sorted(catalogo.tipos_cliente | {TIPO_CLIENTE_DEFECTO}))
+            errores.append(f"tipo_cliente: '{tipo_cliente}' no es un tipo de cliente válido ({validos}).")
+    tipo_cliente = tipo_cliente or TIPO_CLIENTE_DEFECTO
+
+    tipo_venta = datos.get('tipo_venta') or 'MOSTRADOR'
+    if tipo_venta not in TIPOS_VENTA:
+        errores.append(f"tipo_venta: '{tipo_venta}' no es válido ({', '.join(TIPOS_VENTA)}).")
+    forma_pago = datos.get('forma_pago') or None
+    if forma_pago is not None and forma_pago not in FORMAS_PAGO:
+        errores.append(f"forma_pago: '{forma_pago}' no es válida ({', '.join(FORMAS_PAGO)}).")
+    notas = _texto(datos.get('notas'), 'notas', errores, 2000)
+    zona_entrega = _texto(datos.get('zona_entrega'), 'zona_entrega', errores, 50)
+    fecha_entrega = datos.get('fecha_entrega_programada') or None
+    if fecha_entrega is not None:
+        try:
+            if not isinstance(fecha_entrega, datetime):
+                fecha_entrega = datetime.fromisoformat(str(fecha_entrega).replace('Z', '+00:00'))
+            fecha_entrega = _utc_sin_zona(fecha_entrega) # Como la cola de despacho: 12:00-06:00 es 18:00
+        except ValueError:
+            errores.append(f"fecha_entrega_programada: '{fecha_entrega}' no es una fecha ISO 8601.")
+
+    items_datos = datos.get('items') or []
+    adicionales_datos = datos.get('adicionales') or []
+    if not isinstance(items_datos, list) or not isinstance(adicionales_datos, list):
+        raise PedidoInvalido(errores + ['items y adicionales deben ser listas.'])
+    if not items_datos and not adicionales_datos:
+        errores.append('El pedido no tiene artículos.')
+    if len(items_datos) > MAX_ITEMS_POR_PEDIDO:
+        errores.append(f"El pedido tiene más de {MAX_ITEMS_POR_PEDIDO} artículos.")
+        items_datos = []
+
+    items = [_validar_item(item, i, catalogo, errores) for i, item in enumerate(items_datos)]
+    adicionales = [_validar_adicional(adicional, i, errores) for i, adicional in enumerate(adicionales_datos)]
+    if errores:
+        raise PedidoInvalido(errores)
+
+    pedido = {
+        'cliente_id': cliente_id,
+        'tipo_cliente': tipo_cliente,
+        'tipo_venta': tipo_venta,
+        'forma_pago': forma_pago,
+        'notas': notas,
+        'zona_entrega': zona_entrega.upper() if zona_entrega else None,
+        'fecha_entrega_programada': fecha_entrega,
+        'clave_idempotencia': clave,
+    }
+    if fecha_captura is not None:
+        pedido['fecha_pedido'] = fecha_captura
+    return pedido, items, adicionales
+
+def _leer_clientes(lista):
+    """Clientes referidos en el lote, con una sola consulta: id -> fila (id, tipo_cliente, activo)."""
+    ids = {_id(datos.get('cliente_id')) for datos in lista if isinstance(datos, dict)}
+    ids.discard(None) # Los inválidos los reporta _validar_pedido
+    if not ids:
+        return {}
+    filas = db.session.execute(
+        select(Cliente.id, Cliente.tipo_cliente, Cliente.activo).where(Cliente.id.in_(ids))
+    ).all()
+    return {fila.id: fila for fila in filas}
+
+def _leer_existentes(claves):
+    """Pedidos ya registrados con alguna de `claves`, con una sola consulta: clave -> PedidoRegistrado."""
+    if not claves:
+        return {}
+    items = select(func.count()).where(PedidoItem.pedido_id == Pedido.id).scalar_subquery()
+    adicionales = select(func.count()).where(ProductoAdicional.pedido_id == Pedido.id).scalar_subquery()
+    filas = db.session.execute(
+        select(Pedido.id, Pedido.total, items, adicionales, Pedido.clave_idempotencia)
+        .where(Pedido.clave_idempotencia.in_(claves))
+    ).all()
+    return {fila[4]: PedidoRegistrado(*fila) for fila in filas}
+
+# --- Registro ---
+
+def _error_de_lote(rechazados):
+    return PedidoInvalido([
+        f"Pedido {posicion}: {error}"
+        for posicion, errores in sorted(rechazados.items()) for error in errores
+    ])
+
+def registrar_pedidos(lista, usuario_id, omitir_invalidos=False, fecha=None, ventana_captura=None):
+    """Valida, cotiza y guarda un lote de pedidos en la transacción actual (sin commit).
+
+    Con `omitir_invalidos` los pedidos con errores se reportan en
+    `ResultadoRegistro.rechazados` y el resto se guarda; si no, cualquier error
+    lanza `PedidoInvalido` y no se escribe nada. Los pedidos cuya
+    `clave_idempotencia` ya existe no se validan ni se escriben: van a
+    `ResultadoRegistro.duplicados`. `ventana_captura` = (mínimo, ahora) habilita
+    `capturado_en` (ver `sincronizar_pedidos`).
+    """
+    fecha = fecha or datetime.utcnow()
+    catalogo = _catalogo()
+    clientes = _leer_clientes(lista)
+    existentes = _leer_existentes({clave for clave in map(_clave, lista) if clave})
+    resultado = ResultadoRegistro()
+
+    validos = [] # (posicion, pedido, items, adicionales)
+    claves_lote = set()
+    for posicion, datos in enumerate(lista):
+        clave = _clave(datos)
+        if clave in existentes:
+            resultado.duplicados[posicion] = existentes[clave]
+            continue
+        if clave is not None and clave in claves_lote:
+            resultado.rechazados[posicion] = ['clave_idempotencia: repetida en el lote.']
+            continue
+        try:
+            validos.append((posicion, *_validar_pedido(datos, catalogo, clientes, ventana_captura)))
+        except PedidoInvalido as e:
+            resultado.rechazados[posicion] = e.errores
+            continue
+        if clave is not None:
+            claves_lote.add(clave)
+    if resultado.rechazados and not omitir_invalidos:
+        raise _error_de_lote(resultado.rechazados)
+
+    # Las cotizaciones del lote en una pasada por día de captura sobre la misma tabla de precios
+    # (un solo día salvo en sincronizaciones de pedidos diferidos)
+    por_dia = {}
+    for entrada in validos:
+        entrada[1].setdefault('fecha_pedido', fecha)
+        por_dia.setdefault(entrada[1]['fecha_pedido'].date(), []).append(entrada)
+    cotizaciones = {}
+    for dia, grupo in por_dia.items():
+        por_cotizar = [
+            dict(item, tipo_cliente=pedido['tipo_cliente'])
+            for _, pedido, items, _ in grupo for item in items
+        ]
+        cotizadas = iter(motor_precios.cotizar_lote(por_cotizar, TIPO_CLIENTE_DEFECTO, dia))
+        for posicion, _, items, _ in grupo:
+            cotizaciones[posicion] = [next(cotizadas) for _ in items]
+
+    listos = []
+    for posicion, pedido, items, adicionales in validos:
+        errores = []
+        for i, item in enumerate(items):
+            cotizacion = cotizaciones[posicion][i]
+            if cotizacion is None:
+                errores.append(f"items[{i}]: '{item['descripcion']}' no tiene precio para {pedido['tipo_cliente']}.")
+                continue
+            item.update(
+                precio_kg=cotizacion.precio_kg,
+                subtotal=cotizacion.subtotal,
+                tipo_cliente_aplicado=cotizacion.tipo_cliente_aplicado,
+                precio_id=cotizacion.precio_id,
+                etiqueta_promo=cotizacion.etiqueta_promo
+            )
+        if errores:
+            resultado.rechazados[posicion] = errores
+            continue
+        subtotal_items = round(sum(item['subtotal'] for item in items), 2)
+        subtotal_adicionales = round(sum(adicional['subtotal'] for adicional in adicionales), 2)
+        pedido.update(
+            usuario_id=usuario_id,
+            repartidor_id=None,
+            estado='PENDIENTE',
+            subtotal_items=subtotal_items,
+            subtotal_adicionales=subtotal_adicionales,
+            total=round(subtotal_items + subtotal_adicionales, 2)
+        )
+        listos.append((posicion, pedido, items, adicionales))
+    if resultado.rechazados and not omitir_invalidos:
+        raise _error_de_lote(resultado.rechazados)
+    if not listos:
+        return resultado
+
+    resultado.registrados = _insertar(listos, catalogo)
+    return resultado
+
+def _insertar(listos, catalogo):
+    """Un INSERT ... RETURNING para los pedidos, un executemany por tabla hija y los resúmenes."""
+    conn = db.session.connection()
+    tabla = Pedido.__table__
+    ids = conn.execute(
+        insert(tabla).returning(tabla.c.id, sort_by_parameter_order=True),
+        [pedido for _, pedido, _, _ in listos]
+    ).scalars().all()
+
+    filas_items = []
+    filas_adicionales = []
+    registrados = []
+    for pedido_id, (_, pedido, items, adicionales) in zip(ids, listos):
+        filas_items += [dict(item, pedido_id=pedido_id) for item in items]
+        filas_adicionales += [dict(adicional, pedido_id=pedido_id) for adicional in adicionales]
+        registrados.append(PedidoRegistrado(
+            pedido_id, pedido['total'], len(items), len(adicionales), pedido['clave_idempotencia']
+        ))
+    if filas_items:
+        conn.execute(insert(PedidoItem.__table__), filas_items)
+    if filas_adicionales:
+        conn.execute(insert(ProductoAdicional.__table__), filas_adicionales)
+
+    padres = {
+        item['subproducto_id']: catalogo.subproductos_por_id[item['subproducto_id']].producto_padre_id
+        for item in filas_items if item['subproducto_id'] is not None
+    }
+    resumen_ventas.acumular_pedidos(conn, [(pedido, items) for _, pedido, items, _ in listos], padres)
+    despacho.registrar_nuevos(db.session, [(pedido_id, pedido) for pedido_id, (_, pedido, _, _) in zip(ids, listos)])
+    return registrados
+
+def registrar_pedido(datos, usuario_id, fecha=None):
+    """Registra un pedido (sin commit). Devuelve `PedidoRegistrado` o lanza `PedidoInvalido`.
+
+    Si su clave_idempotencia ya estaba registrada devuelve ese pedido sin escribir nada.
+    """
+    resultado = registrar_pedidos([datos], usuario_id, omitir_invalidos=True, fecha=fecha)
+    if resultado.rechazados:
+        raise PedidoInvalido(resultado.rechazados[0])
+    return resultado.duplicados[0] if resultado.duplicados else resultado.registrados[0]
+
+def sincronizar_pedidos(lista, usuario_id, ahora=None):
+    """Registra pedidos capturados sin conexión (sin commit); reenviar el mismo lote es seguro.
+
+    Cada pedido debe traer `clave_idempotencia` y puede traer `capturado_en`
+    (no más antiguo que PEDIDOS_SYNC_MAX_HORAS). Devuelve una lista en el orden
+    de entrada con el estado de cada pedido: REGISTRADO, DUPLICADO (ya estaba
+    registrado) o RECHAZADO con sus errores.
+    """
+    ahora = ahora or datetime.utcnow()
+    ventana = (ahora - timedelta(hours=current_app.config.get('PEDIDOS_SYNC_MAX_HORAS', 72)), ahora)
+    claves = [_clave(datos) for datos in lista]
+    sin_clave = {posicion for posicion, clave in enumerate(claves) if clave is None}
+    resultado = registrar_pedidos(
+        [datos for posicion, datos in enumerate(lista) if posicion not in sin_clave],
+        usuario_id, omitir_invalidos=True, fecha=ahora, ventana_captura=ventana
+    )
+
+    registrados = {registrado.clave: registrado for registrado in resultado.registrados}
+    duplicados = {registrado.clave: registrado for registrado in resultado.duplicados.values()}
+    posiciones = [posicion for posicion in range(len(lista)) if posicion not in sin_clave]
+    rechazados = {posiciones[posicion]: errores for posicion, errores in resultado.rechazados.items()}
+    estados = []
+    for posicion, clave in enumerate(claves):
+        if posicion in sin_clave:
+            estados.append({'clave': None, 'estado': 'RECHAZADO', 'errores': [
+                'clave_idempotencia: obligatoria para sincronizar (8 a 64 caracteres entre letras, dígitos, "-" y "_").'
+            ]})
+        elif posicion in rechazados:
+            estados.append({'clave': clave, 'estado': 'RECHAZADO', 'errores': rechazados[posicion]})
+        else:
+            registrado = registrados.get(clave)
+            estado = 'REGISTRADO' if registrado is not None else 'DUPLICADO'
+            registrado = registrado or duplicados[clave]
+            estados.append({'clave': clave, 'estado': estado, 'id': registrado.id, 'total': registrado.total})
+    return estados
+
+# --- Consulta ---
+
+def obtener_pedido(pedido_id):
+    """Devuelve el pedido con sus items y adicionales como diccionario (3 consultas), o None."""
+    pedido = db.session.execute(select(Pedido.__table__).where(Pedido.id == pedido_id)).first()
+    if pedido is None:
+        return None
+    items = db.session.execute(
+        select(PedidoItem.__table__).where(PedidoItem.pedido_id == pedido_id).order_by(PedidoItem.id)
+    ).all()
+    adicionales = db.session.execute(
+        select(ProductoAdicional.__table__).where(ProductoAdicional.pedido_id == pedido_id).order_by(ProductoAdicional.id)
+    ).all()
+    return dict(
+        _serializable(pedido._asdict()),
+        items=[_serializable(item._asdict()) for item in items],
+        adicionales=[_serializable(adicional._asdict()) for adicional in adicionales]
+    )
+
+def _serializable(fila):
+    return {
+        clave: valor.isoformat() if isinstance(valor, (date, datetime)) else valor
+        for clave, valor in fila.items()
+    }
@@ -0,0 +1,130 @@
+"""Perfilador de SQL por petición (opcional).
+
+Se activa con PERFILADOR_SQL_HABILITADO = True (variable de entorno
+PERFILADOR_SQL=1). Cuando está desactivado no se registra ningún evento ni
+señal, así que no agrega costo alguno.
+
+Activado, por cada petición:
+
+* cuenta las sentencias SQL y el tiempo total en BD (eventos del engine),
+* mide el tiempo de renderizado de plantillas (señales de Flask),
+* detecta sentencias idénticas repetidas (típico N+1) y las registra en el log,
+* registra las consultas que superan PERFILADOR_SQL_UMBRAL_LENTO_MS junto con
+  su `EXPLAIN QUERY PLAN` (solo SQLite),
+* agrega la cabecera `Server-Timing` con db, tpl y total, visible en la
+  pestaña de red de las herramientas de desarrollo del navegador.
+"""
+import time
+from collections import Counter
+
+from flask import current_app, g, has_request_context, request
+from flask import request_started, request_finished, before_render_template, template_rendered
+from sqlalchemy import event
+
+from app import db
+
+class PerfilPeticion:
+    """Acumulado de una petición."""
+
+    __slots__ = ('inicio', 'sentencias', 'ms_db', 'ms_plantillas', 'inicio_plantilla', 'repeticiones')
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.sentencias = 0
+        self.ms_db = 0.0
+        self.ms_plantillas = 0.0
+        self.inicio_plantilla = []
+        self.repeticiones = Counter()
+
+def _perfil_actual():
+    if has_request_context():
+        return g.get('_perfil_sql')
+    return None
+
+# --- Eventos del engine ---
+
+# El inicio se guarda en el contexto de ejecución de la sentencia y no en una pila
+# de la conexión: si la sentencia falla no llega after_cursor_execute, y el
+# contexto se descarta con ella en vez de dejar un inicio huérfano.
+def _antes_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    context._perfil_inicio = time.perf_counter()
+
+def _despues_de_ejecutar(conn, cursor, statement, parameters, context, executemany):
+    ms = (time.perf_counter() - context._perfil_inicio) * 1000
+    perfil = _perfil_actual()
+    if perfil is None:
+        return
+    perfil.sentencias += 1
+    perfil.ms_db += ms
+    perfil.repeticiones[statement] += 1
+    if ms >= current_app.config['PERFILADOR_SQL_UMBRAL_LENTO_MS']:
+        _registrar_consulta_lenta(conn, statement, parameters, ms, executemany)
+
+def _plan_de_consulta(conn, statement, parameters):
+    """Devuelve las líneas de EXPLAIN QUERY PLAN (SQLite) o None si no aplica."""
+    if conn.dialect.name != 'sqlite' or not statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+        return None
+    # Cursor DBAPI propio: ejecutar por la Connection volvería a disparar estos eventos
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        cursor.execute('EXPLAIN QUERY PLAN ' + statement, parameters or ())
+        return [fila[-1] for fila in cursor.fetchall()]
+    except Exception as e: # Un plan fallido no debe romper la petición
+        return [f'(no disponible: {e})']
+    finally:
+        cursor.close()
+
+def _registrar_consulta_lenta(conn, statement, parameters, ms, executemany):
+    plan = None if executemany else _plan_de_consulta(conn, statement, parameters)
+    mensaje = f"Consulta lenta ({ms:.1f} ms) en {request.method} {request.path}:\n  {statement}"
+    if plan:
+        mensaje += '\n  Plan:\n' + '\n'.join(f'    {linea}' for linea in plan)
+    current_app.logger.warning(mensaje)
+
+# --- Señales de Flask ---
+
+def _al_iniciar_peticion(sender, **extra):
+    g._perfil_sql = PerfilPeticion()
+
+def _antes_de_plantilla(sender, template, context, **extra):
+    perfil = _perfil_actual()
+    if perfil is not None:
+        perfil.inicio_plantilla.append(time.perf_counter())
+
+def _plantilla_renderizada(sender, template, context, **extra):
+    perfil = _perfil_actual()
+    if perfil is not None and perfil.inicio_plantilla:
+        perfil.ms_plantillas += (time.perf_counter() - perfil.inicio_plantilla.pop()) * 1000
+
+def _al_terminar_peticion(sender, response, **extra):
+    perfil = _perfil_actual()
+    if perfil is None:
+        return
+    ms_total = (time.perf_counter() - perfil.inicio) * 1000
+    response.headers.add(
+        'Server-Timing',
+        f'db;dur={perfil.ms_db:.2f};desc="{perfil.sentencias} consultas", '
+        f'tpl;dur={perfil.ms_plantillas:.2f}, total;dur={ms_total:.2f}'
+    )
+
+    umbral = sender.config['PERFILADOR_SQL_UMBRAL_REPETIDAS']
+    repetidas = [(sql, veces) for sql, veces in perfil.repeticiones.most_common() if veces >= umbral]
+    for sql, veces in repetidas:
+        sender.logger.warning(f"Posible N+1 en {request.method} {request.path}: {veces} ejecuciones de\n  {sql}")
+
+def init_app(app):
+    app.config.setdefault('PERFILADOR_SQL_HABILITADO', False)
+    app.config.setdefault('PERFILADOR_SQL_UMBRAL_LENTO_MS', 100.0)
+    app.config.setdefault('PERFILADOR_SQL_UMBRAL_REPETIDAS', 5)
+    if not app.config['PERFILADOR_SQL_HABILITADO']:
+        return
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', _antes_de_ejecutar)
+    event.listen(engine, 'after_cursor_execute', _despues_de_ejecutar)
+
+    request_started.connect(_al_iniciar_peticion, app)
+    request_finished.connect(_al_terminar_peticion, app)
+    before_render_template.connect(_antes_de_plantilla, app)
+    template_rendered.connect(_plantilla_renderizada, app)
@@ -0,0 +1,216 @@
+"""Búsqueda por texto y prefijo sobre el catálogo.
+
+Los cajeros buscan artículos tecleando fragmentos ("pulpa", "mila", "PP-").
+Este módulo mantiene un índice SQLite FTS5 (`busqueda_catalogo`) sobre:
+
+* Producto: id, nombre y descripción
+* Subproducto: codigo_subprod, nombre y descripción
+* Modificacion: codigo_modif, nombre y descripción
+
+El tokenizador `unicode61 remove_diacritics 2` hace la búsqueda insensible a
+acentos y mayúsculas ("freir" encuentra "Freír") y los índices de prefijo de
+2 y 3 caracteres mantienen rápidas las búsquedas de autocompletado.
+
+El índice se actualiza en el mismo flush que crea/modifica los registros. Si
+la BD no es SQLite o no tiene FTS5, la búsqueda cae a un LIKE sobre las tablas.
+"""
+import re
+
+from flask import current_app, has_app_context
+from sqlalchemy import event, or_, select, text
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import Producto, Subproducto, Modificacion
+
+TABLA_INDICE = 'busqueda_catalogo'
+TABLA_CLAVES = 'busqueda_catalogo_claves' # Asocia (tipo, ref_id) con el rowid del índice
+LIMITE_DEFECTO = 20
+LIMITE_MAXIMO = 50
+
+SQL_CREAR_INDICE = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLA_INDICE} USING fts5("
+    "codigo, nombre, descripcion, "
+    "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')",
+    f"CREATE TABLE IF NOT EXISTS {TABLA_CLAVES} ("
+    "id INTEGER PRIMARY KEY, tipo VARCHAR(20) NOT NULL, ref_id VARCHAR(20) NOT NULL, "
+    "producto_id VARCHAR(10), UNIQUE (tipo, ref_id))",
+)
+
+# tipo -> (modelo, atributo del código)
+TIPOS = {
+    'producto': (Producto, 'id'),
+    'subproducto': (Subproducto, 'codigo_subprod'),
+    'modificacion': (Modificacion, 'codigo_modif'),
+}
+
+def _tipo_de(obj):
+    for tipo, (modelo, _) in TIPOS.items():
+        if isinstance(obj, modelo):
+            return tipo
+    return None
+
+def _documento(tipo, obj):
+    """Devuelve (ref_id, producto_id, codigo, nombre, descripcion) para indexar `obj`."""
+    _, campo_codigo = TIPOS[tipo]
+    producto_id = obj.id if tipo == 'producto' else getattr(obj, 'producto_padre_id', None)
+    return str(obj.id), producto_id, getattr(obj, campo_codigo), obj.nombre, obj.descripcion or ''
+
+# --- Mantenimiento del índice ---
+
+def indice_disponible(conn=None):
+    """Indica si la BD tiene el índice FTS5 (el resultado se recuerda por aplicación)."""
+    if has_app_context():
+        disponible = current_app.extensions.get('busqueda_fts')
+        if disponible is not None:
+            return disponible
+    conn = conn or db.session.connection()
+    disponible = conn.dialect.name == 'sqlite' and conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE name = :nombre"), {'nombre': TABLA_INDICE}
+    ).first() is not None
+    if has_app_context():
+        current_app.extensions['busqueda_fts'] = disponible
+    return disponible
+
+def _indexar(conn, tipo, obj):
+    ref_id, producto_id, codigo, nombre, descripcion = _documento(tipo, obj)
+    conn.execute(
+        text(f"INSERT INTO {TABLA_CLAVES} (tipo, ref_id, producto_id) VALUES (:tipo, :ref_id, :producto_id) "
+             "ON CONFLICT (tipo, ref_id) DO UPDATE SET producto_id = excluded.producto_id"),
+        {'tipo': tipo, 'ref_id': ref_id, 'producto_id': producto_id}
+    )
+    rowid = conn.execute(
+        text(f"SELECT id FROM {TABLA_CLAVES} WHERE tipo = :tipo AND ref_id = :ref_id"),
+        {'tipo': tipo, 'ref_id': ref_id}
+    ).scalar_one()
+    conn.execute(text(f"DELETE FROM {TABLA_INDICE} WHERE rowid = :rowid"), {'rowid': rowid})
+    conn.execute(
+        text(f"INSERT INTO {TABLA_INDICE} (rowid, codigo, nombre, descripcion) "
+             "VALUES (:rowid, :codigo, :nombre, :descripcion)"),
+        {'rowid': rowid, 'codigo': codigo, 'nombre': nombre, 'descripcion': descripcion}
+    )
+
+def _desindexar(conn, tipo, obj):
+    rowid = conn.execute(
+        text(f"SELECT id FROM {TABLA_CLAVES} WHERE tipo = :tipo AND ref_id = :ref_id"),
+        {'tipo': tipo, 'ref_id': str(obj.id)}
+    ).scalar()
+    if rowid is not None:
+        conn.execute(text(f"DELETE FROM {TABLA_INDICE} WHERE rowid = :rowid"), {'rowid': rowid})
+        conn.execute(text(f"DELETE FROM {TABLA_CLAVES} WHERE id = :rowid"), {'rowid': rowid})
+
+def crear_indice(conn):
+    """Crea (si no existen) la tabla FTS5 y la tabla de claves."""
+    for sentencia in SQL_CREAR_INDICE:
+        conn.execute(text(sentencia))
+
+# Reconstrucción por conjuntos (INSERT ... SELECT), independiente del ORM
+SQL_REINDEXAR = (
+    f"DELETE FROM {TABLA_INDICE}",
+    f"DELETE FROM {TABLA_CLAVES}",
+    f"INSERT INTO {TABLA_CLAVES} (tipo, ref_id, producto_id) SELECT 'producto', id, id FROM productos",
+    f"INSERT INTO {TABLA_CLAVES} (tipo, ref_id, producto_id) "
+    "SELECT 'subproducto', CAST(id AS TEXT), producto_padre_id FROM subproductos",
+    f"INSERT INTO {TABLA_CLAVES} (tipo, ref_id, producto_id) "
+    "SELECT 'modificacion', CAST(id AS TEXT), NULL FROM modificaciones",
+    f"INSERT INTO {TABLA_INDICE} (rowid, codigo, nombre, descripcion) "
+    f"SELECT c.id, p.id, p.nombre, COALESCE(p.descripcion, '') FROM productos p "
+    f"JOIN {TABLA_CLAVES} c ON c.tipo = 'producto' AND c.ref_id = p.id",
+    f"INSERT INTO {TABLA_INDICE} (rowid, codigo, nombre, descripcion) "
+    f"SELECT c.id, s.codigo_subprod, s.nombre, COALESCE(s.descripcion, '') FROM subproductos s "
+    f"JOIN {TABLA_CLAVES} c ON c.tipo = 'subproducto' AND c.ref_id = CAST(s.id AS TEXT)",
+    f"INSERT INTO {TABLA_INDICE} (rowid, codigo, nombre, descripcion) "
+    f"SELECT c.id, m.codigo_modif, m.nombre, COALESCE(m.descripcion, '') FROM modificaciones m "
+    f"JOIN {TABLA_CLAVES} c ON c.tipo = 'modificacion' AND c.ref_id = CAST(m.id AS TEXT)",
+)
+
+def reindexar(commit=True):
+    """Reconstruye el índice completo desde las tablas del catálogo. Devuelve el número de documentos.
+
+    Útil tras cargas masivas que no pasan por el ORM (y por tanto no disparan
+    la sincronización en el flush). Con commit=False queda dentro de la
+    transacción en curso.
+    """
+    conn = db.session.connection()
+    if conn.dialect.name != 'sqlite':
+        return 0
+    crear_indice(conn)
+    for sentencia in SQL_REINDEXAR:
+        conn.execute(text(sentencia))
+    total = conn.execute(text(f"SELECT COUNT(*) FROM {TABLA_CLAVES}")).scalar()
+    if commit:
+        db.session.commit()
+    if has_app_context():
+        current_app.extensions['busqueda_fts'] = True
+    return total
+
+@event.listens_for(Session, 'after_flush')
+def _sincronizar_indice(session, flush_context):
+    pendientes = [(obj, False) for obj in (*session.new, *session.dirty) if _tipo_de(obj)]
+    pendientes += [(obj, True) for obj in session.deleted if _tipo_de(obj)]
+    if not pendientes:
+        return
+    conn = session.connection()
+    if not indice_disponible(conn):
+        return
+    for obj, eliminado in pendientes:
+        if eliminado:
+            _desindexar(conn, _tipo_de(obj), obj)
+        elif session.is_modified(obj, include_collections=False) or obj in session.new:
+            _indexar(conn, _tipo_de(obj), obj)
+
+# --- Consultas ---
+
+def _terminos(consulta):
+    """Separa la consulta en términos alfanuméricos (FTS5 trata '-', '(' etc. como separadores)."""
+    return re.findall(r'\w+', consulta or '')
+
+# Se ordenan todas las coincidencias y luego se limita. `ORDER BY rank` (con la
+# función de rank fijada en la consulta) deja que FTS5 ordene internamente; es
+# cerca del doble de rápido que `ORDER BY bm25(...)` con prefijos comunes.
+SQL_BUSCAR = text(
+    f"SELECT c.tipo, c.ref_id, c.producto_id, cand.codigo, cand.nombre FROM ("
+    f"  SELECT rowid, codigo, nombre, rank AS puntaje "
+    f"  FROM {TABLA_INDICE} WHERE {TABLA_INDICE} MATCH :expresion AND rank MATCH 'bm25(10.0, 5.0, 1.0)' "
+    f"  ORDER BY rank LIMIT :limite"
+    f") AS cand JOIN {TABLA_CLAVES} AS c ON c.id = cand.rowid "
+    f"ORDER BY cand.puntaje"
+)
+
+def buscar(consulta, limite=LIMITE_DEFECTO):
+    """Busca en el catálogo. Todos los términos deben aparecer (como palabra o prefijo de palabra).
+
+    Devuelve una lista de diccionarios con tipo, id, codigo, nombre y producto_id,
+    ordenados por relevancia (bm25).
+    """
+    terminos = _terminos(consulta)
+    if not terminos:
+        return []
+    limite = max(1, min(int(limite), LIMITE_MAXIMO))
+    if not indice_disponible():
+        return _buscar_con_like(terminos, limite)
+
+    expresion = ' '.join('"{}"*'.format(termino.replace('"', '')) for termino in terminos)
+    filas = db.session.execute(SQL_BUSCAR, {'expresion': expresion, 'limite': limite}).all()
+    return [
+        {'tipo': tipo, 'id': int(ref_id) if tipo != 'producto' else ref_id,
+         'codigo': codigo, 'nombre': nombre, 'producto_id': producto_id}
+        for tipo, ref_id, producto_id, codigo, nombre in filas
+    ]
+
+def _buscar_con_like(terminos, limite):
+    """Respaldo sin FTS5: LIKE por prefijo/contenido (sensible a acentos)."""
+    resultados = []
+    for tipo, (modelo, campo_codigo) in TIPOS.items():
+        columna_codigo = getattr(modelo, campo_codigo)
+        consulta = select(modelo)
+        for termino in terminos:
+            patron = f'%{termino}%'
+            consulta = consulta.where(or_(columna_codigo.ilike(patron), modelo.nombre.ilike(patron)))
+        for obj in db.session.scalars(consulta.order_by(modelo.nombre).limit(limite - len(resultados))):
+            ref_id, producto_id, codigo, nombre, _ = _documento(tipo, obj)
+            resultados.append({'tipo': tipo, 'id': obj.id, 'codigo': codigo,
+                               'nombre': nombre, 'producto_id': producto_id})
+        if len(resultados) >= limite:
+            break
+    return resultados
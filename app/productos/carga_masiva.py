@@ -0,0 +1,330 @@
+"""Carga masiva del catálogo por conjuntos.
+
+En lugar de una consulta `filter_by(...).first()` por fila y por código de
+asociación, aquí se precargan una sola vez las llaves existentes de cada tabla
+en diccionarios/conjuntos, se calculan en memoria las filas faltantes (y, si
+se pide, las que cambiaron) y se escriben con `executemany` dentro de la
+transacción de la sesión.
+
+Las reglas de unicidad son las mismas que aplican los formularios y el modelo:
+Producto.id (en mayúsculas, como `ProductoForm.validate_id`) y Producto.nombre,
+Subproducto.codigo_subprod y Modificacion.codigo_modif (en mayúsculas) y las UniqueConstraint de Precio por (producto|subproducto,
+tipo_cliente, cantidad_minima_kg).
+
+Como estas escrituras no pasan por el flush del ORM, al final se marca el
+catálogo como modificado (nueva versión de la caché al confirmar) y hay que
+reconstruir el índice de búsqueda con `finalizar_carga()`.
+"""
+import itertools
+import time
+from dataclasses import dataclass, field
+
+from sqlalchemy import bindparam, select
+
+from app import db
+from app.models import (
+    Producto, Subproducto, Modificacion, Precio,
+    producto_modificacion_association, subproducto_modificacion_association
+)
+from app.productos import busqueda, catalogo_cache
+
+TABLAS = (
+    'modificaciones', 'productos', 'subproductos',
+    'producto_modificacion_association', 'subproducto_modificacion_association', 'precios'
+)
+TAMANO_IN = 500 # Máximo de llaves por consulta IN
+MAX_MUESTRAS = 50 # Cambios individuales que se guardan para mostrar (modo simulación)
+MAX_ADVERTENCIAS = 200 # Advertencias que se guardan con su texto; del resto solo se cuentan
+
+@dataclass
+class ResultadoCarga:
+    insertados: dict = field(default_factory=lambda: dict.fromkeys(TABLAS, 0))
+    actualizados: dict = field(default_factory=lambda: dict.fromkeys(TABLAS, 0))
+    omitidos: dict = field(default_factory=lambda: dict.fromkeys(TABLAS, 0))
+    advertencias: list = field(default_factory=list)
+    advertencias_omitidas: int = 0
+    muestras: list = field(default_factory=list) # (acción, tabla, llave)
+    segundos: float = 0.0
+
+    def acumular(self, otro):
+        for tabla in TABLAS:
+            self.insertados[tabla] += otro.insertados[tabla]
+            self.actualizados[tabla] += otro.actualizados[tabla]
+            self.omitidos[tabla] += otro.omitidos[tabla]
+        for advertencia in otro.advertencias:
+            self.advertir(advertencia)
+        self.advertencias_omitidas += otro.advertencias_omitidas
+        self.muestras.extend(otro.muestras[:MAX_MUESTRAS - len(self.muestras)])
+        self.segundos += otro.segundos
+
+    def advertir(self, texto):
+        if len(self.advertencias) < MAX_ADVERTENCIAS:
+            self.advertencias.append(texto)
+        else:
+            self.advertencias_omitidas += 1
+
+    def _muestra(self, accion, tabla, llave):
+        if len(self.muestras) < MAX_MUESTRAS:
+            self.muestras.append((accion, tabla, llave))
+
+    def resumen(self):
+        """Líneas de texto con el detalle por tabla, para la CLI."""
+        lineas = [
+            f"  {tabla:<38} insertados: {self.insertados[tabla]:>7}  "
+            f"actualizados: {self.actualizados[tabla]:>7}  omitidos: {self.omitidos[tabla]:>7}"
+            for tabla in TABLAS
+        ]
+        if self.advertencias_omitidas:
+            lineas.append(f"  Advertencias no mostradas (solo se guardan {MAX_ADVERTENCIAS}): {self.advertencias_omitidas}")
+        lineas.append(f"  Tiempo total: {self.segundos:.3f} s")
+        return lineas
+
+class IndiceCatalogo:
+    """Llaves existentes del catálogo precargadas en memoria (una consulta por tabla).
+
+    Se actualiza a medida que se insertan filas, así que puede reutilizarse
+    entre varios lotes de una misma carga. En simulación, las filas que se
+    insertarían reciben IDs provisionales negativos.
+    """
+
+    def __init__(self, conn):
+        self.modificaciones = dict(conn.execute(select(Modificacion.codigo_modif, Modificacion.id)).all())
+        self.productos = set(conn.execute(select(Producto.id)).scalars())
+        self.nombres_productos = dict(conn.execute(select(Producto.nombre, Producto.id)).all()) # nombre es único
+        self.subproductos = dict(conn.execute(select(Subproducto.codigo_subprod, Subproducto.id)).all())
+        self.asoc_productos = set(conn.execute(select(producto_modificacion_association)).all())
+        self.asoc_subproductos = set(conn.execute(select(subproducto_modificacion_association)).all())
+        self.precios = {
+            _llave_precio(fila.producto_id, fila.subproducto_id, fila.tipo_cliente, fila.cantidad_minima_kg): fila.id
+            for fila in conn.execute(select(
+                Precio.id, Precio.producto_id, Precio.subproducto_id, Precio.tipo_cliente, Precio.cantidad_minima_kg
+            ))
+        }
+        self._provisionales = itertools.count(-1, -1)
+
+    def id_provisional(self):
+        return next(self._provisionales)
+
+def _llave_precio(producto_id, subproducto_id, tipo_cliente, cantidad_minima_kg):
+    return (producto_id, subproducto_id, tipo_cliente, float(cantidad_minima_kg or 0.0))
+
+def _separar(filas, existe, llave):
+    """Divide `filas` en (nuevas, existentes) según `existe(llave(fila))`, descartando duplicados del lote."""
+    nuevas, existentes, vistas = [], [], set()
+    for fila in filas:
+        clave = llave(fila)
+        if clave in vistas:
+            continue
+        vistas.add(clave)
+        (existentes if existe(clave) else nuevas).append(fila)
+    return nuevas, existentes
+
+def _en_bloques(valores, tamano=TAMANO_IN):
+    for i in range(0, len(valores), tamano):
+        yield valores[i:i + tamano]
+
+def _ids_por_codigo(conn, columna_codigo, columna_id, codigos):
+    """Recupera {código: id} de filas recién insertadas (consultas IN acotadas)."""
+    ids = {}
+    for bloque in _en_bloques(codigos):
+        ids.update(conn.execute(select(columna_codigo, columna_id).where(columna_codigo.in_(bloque))).all())
+    return ids
+
+def _actualizar_cambiados(conn, tabla, columna_llave, filas, columnas, simular):
+    """Actualiza (executemany) solo las filas cuyo contenido difiere del actual. Devuelve las cambiadas."""
+    if not filas:
+        return []
+    llave = tabla.c[columna_llave]
+    actuales = {}
+    for bloque in _en_bloques([fila[columna_llave] for fila in filas]):
+        for fila_bd in conn.execute(select(llave, *(tabla.c[col] for col in columnas)).where(llave.in_(bloque))).mappings():
+            actuales[fila_bd[columna_llave]] = fila_bd
+    cambiadas = [
+        fila for fila in filas
+        if fila[columna_llave] in actuales
+        and any(fila[col] != actuales[fila[columna_llave]][col] for col in columnas)
+    ]
+    if cambiadas and not simular:
+        sentencia = tabla.update().where(llave == bindparam('_llave')).values({col: bindparam(col) for col in columnas})
+        conn.execute(sentencia, [dict({col: fila[col] for col in columnas}, _llave=fila[columna_llave]) for fila in cambiadas])
+    return cambiadas
+
+def cargar_catalogo(modificaciones=(), productos=(), subproductos=(), asoc_productos=(),
+                    asoc_subproductos=(), precios=(), actualizar_existentes=False, indice=None,
+                    simular=False):
+    """Inserta (y opcionalmente actualiza) el catálogo por conjuntos en la transacción actual.
+
+    - modificaciones: dicts con codigo_modif, nombre y opcionalmente descripcion/activo
+    - productos: dicts con id, nombre, categoria y opcionalmente descripcion/activo
+    - subproductos: dicts con codigo_subprod, producto_padre_id, nombre y opcionalmente descripcion/activo
+    - asoc_productos: pares (producto_id, codigo_modif)
+    - asoc_subproductos: pares (codigo_subprod, codigo_modif)
+    - precios: dicts con producto_id o codigo_subprod, tipo_cliente, precio_kg y opcionalmente
+      cantidad_minima_kg, etiqueta_promo, fecha_inicio_vigencia, fecha_fin_vigencia y activo
+
+    Con actualizar_existentes=True las filas existentes cuyo contenido cambió se
+    actualizan (las idénticas cuentan como omitidas). Con simular=True no se
+    escribe nada: solo se calcula qué se insertaría/actualizaría.
+    No hace commit: el llamador decide (así una carga completa es una sola transacción).
+    Devuelve un `ResultadoCarga`.
+    """
+    inicio = time.perf_counter()
+    resultado = ResultadoCarga()
+    conn = db.session.connection()
+    indice = indice or IndiceCatalogo(conn)
+
+    def _insertar(tabla, nombre_tabla, filas, llave):
+        if filas and not simular:
+            conn.execute(tabla.insert(), filas)
+        resultado.insertados[nombre_tabla] += len(filas)
+        for fila in filas:
+            resultado._muestra('insertar', nombre_tabla, llave(fila))
+
+    def _actualizar(tabla, nombre_tabla, columna_llave, existentes, columnas, llave):
+        if not actualizar_existentes:
+            resultado.omitidos[nombre_tabla] += len(existentes)
+            return
+        cambiadas = _actualizar_cambiados(conn, tabla, columna_llave, existentes, columnas, simular)
+        resultado.actualizados[nombre_tabla] += len(cambiadas)
+        resultado.omitidos[nombre_tabla] += len(existentes) - len(cambiadas)
+        for fila in cambiadas:
+            resultado._muestra('actualizar', nombre_tabla, llave(fila))
+
+    # 1. Modificaciones (llave: codigo_modif)
+    filas = [
+        {'codigo_modif': m['codigo_modif'].upper(), 'nombre': m['nombre'],
+         'descripcion': m.get('descripcion'), 'activo': m.get('activo', True)}
+        for m in modificaciones
+    ]
+    llave = lambda f: f['codigo_modif']
+    nuevas, existentes = _separar(filas, indice.modificaciones.__contains__, llave)
+    _insertar(Modificacion.__table__, 'modificaciones', nuevas, llave)
+    if nuevas:
+        codigos = [f['codigo_modif'] for f in nuevas]
+        if simular:
+            indice.modificaciones.update((codigo, indice.id_provisional()) for codigo in codigos)
+        else:
+            indice.modificaciones.update(_ids_por_codigo(conn, Modificacion.codigo_modif, Modificacion.id, codigos))
+    _actualizar(Modificacion.__table__, 'modificaciones', 'codigo_modif', existentes,
+                ('nombre', 'descripcion', 'activo'), llave)
+
+    # 2. Productos (llave: id)
+    filas = [
+        {'id': p['id'].upper(), 'nombre': p['nombre'], 'descripcion': p.get('descripcion'),
+         'categoria': p['categoria'], 'activo': p.get('activo', True)}
+        for p in productos
+    ]
+    filas_validas = []
+    for fila in filas:
+        duenio = indice.nombres_productos.get(fila['nombre'])
+        if duenio is not None and duenio != fila['id']:
+            resultado.advertir(f"Producto '{fila['id']}' omitido: el nombre '{fila['nombre']}' ya es del producto '{duenio}'.")
+            resultado.omitidos['productos'] += 1
+            continue
+        indice.nombres_productos[fila['nombre']] = fila['id']
+        filas_validas.append(fila)
+    filas = filas_validas
+    llave = lambda f: f['id']
+    nuevas, existentes = _separar(filas, indice.productos.__contains__, llave)
+    _insertar(Producto.__table__, 'productos', nuevas, llave)
+    indice.productos.update(f['id'] for f in nuevas)
+    _actualizar(Producto.__table__, 'productos', 'id', existentes,
+                ('nombre', 'descripcion', 'categoria', 'activo'), llave)
+
+    # 3. Subproductos (llave: codigo_subprod; el padre debe existir)
+    filas = []
+    for s in subproductos:
+        padre = s['producto_padre_id'].upper()
+        if padre not in indice.productos:
+            resultado.advertir(f"Producto padre '{padre}' no encontrado para el subproducto '{s['codigo_subprod']}'.")
+            resultado.omitidos['subproductos'] += 1
+            continue
+        filas.append({'codigo_subprod': s['codigo_subprod'].upper(), 'producto_padre_id': padre,
+                      'nombre': s['nombre'], 'descripcion': s.get('descripcion'), 'activo': s.get('activo', True)})
+    llave = lambda f: f['codigo_subprod']
+    nuevas, existentes = _separar(filas, indice.subproductos.__contains__, llave)
+    _insertar(Subproducto.__table__, 'subproductos', nuevas, llave)
+    if nuevas:
+        codigos = [f['codigo_subprod'] for f in nuevas]
+        if simular:
+            indice.subproductos.update((codigo, indice.id_provisional()) for codigo in codigos)
+        else:
+            indice.subproductos.update(_ids_por_codigo(conn, Subproducto.codigo_subprod, Subproducto.id, codigos))
+    _actualizar(Subproducto.__table__, 'subproductos', 'codigo_subprod', existentes,
+                ('producto_padre_id', 'nombre', 'descripcion', 'activo'), llave)
+
+    # 4. Asociaciones con modificaciones (diferencia de conjuntos contra lo existente)
+    for nombre_tabla, pares, mapa_destino, existentes_asoc, tabla, columna in (
+        ('producto_modificacion_association', asoc_productos, None, indice.asoc_productos,
+         producto_modificacion_association, 'producto_id'),
+        ('subproducto_modificacion_association', asoc_subproductos, indice.subproductos, indice.asoc_subproductos,
+         subproducto_modificacion_association, 'subproducto_id'),
+    ):
+        por_insertar = []
+        for destino, codigo_modif in pares:
+            destino = destino.upper()
+            destino_id = destino if mapa_destino is None else mapa_destino.get(destino)
+            mod_id = indice.modificaciones.get(codigo_modif.upper())
+            if mod_id is None or destino_id is None or (mapa_destino is None and destino_id not in indice.productos):
+                resultado.advertir(f"Asociación '{destino}' - '{codigo_modif}' ignorada: código no encontrado.")
+                resultado.omitidos[nombre_tabla] += 1
+                continue
+            par = (destino_id, mod_id)
+            if par in existentes_asoc:
+                resultado.omitidos[nombre_tabla] += 1
+                continue
+            existentes_asoc.add(par)
+            por_insertar.append(({columna: destino_id, 'modificacion_id': mod_id}, (destino, codigo_modif.upper())))
+        # La muestra usa los códigos legibles en lugar de los IDs
+        llaves = dict((id(fila), codigos) for fila, codigos in por_insertar)
+        _insertar(tabla, nombre_tabla, [fila for fila, _ in por_insertar], lambda f: llaves[id(f)])
+
+    # 5. Precios (llave: UniqueConstraints de Precio)
+    filas = []
+    for p in precios:
+        fila = {
+            'producto_id': p['producto_id'].upper() if p.get('producto_id') else None,
+            'subproducto_id': None,
+            'tipo_cliente': p['tipo_cliente'],
+            'precio_kg': p['precio_kg'],
+            'cantidad_minima_kg': float(p.get('cantidad_minima_kg') or 0.0),
+            'etiqueta_promo': p.get('etiqueta_promo'),
+            'fecha_inicio_vigencia': p.get('fecha_inicio_vigencia'),
+            'fecha_fin_vigencia': p.get('fecha_fin_vigencia'),
+            'activo': p.get('activo', True),
+        }
+        codigo_sub = p.get('codigo_subprod')
+        if codigo_sub:
+            fila['subproducto_id'] = indice.subproductos.get(codigo_sub.upper())
+            if fila['subproducto_id'] is None:
+                resultado.advertir(f"Subproducto con código '{codigo_sub}' no encontrado para el precio.")
+                resultado.omitidos['precios'] += 1
+                continue
+        elif fila['producto_id'] not in indice.productos:
+            resultado.advertir(f"Producto '{fila['producto_id']}' no encontrado para el precio.")
+            resultado.omitidos['precios'] += 1
+            continue
+        filas.append(fila)
+
+    def llave(fila):
+        return _llave_precio(fila['producto_id'], fila['subproducto_id'], fila['tipo_cliente'], fila['cantidad_minima_kg'])
+
+    nuevas, existentes = _separar(filas, indice.precios.__contains__, llave)
+    _insertar(Precio.__table__, 'precios', nuevas, llave)
+    # Los IDs nuevos no se necesitan; se registran como existentes para los lotes siguientes
+    indice.precios.update((llave(fila), None) for fila in nuevas)
+    for fila in existentes:
+        fila['id'] = indice.precios[llave(fila)]
+    # Un precio insertado en un lote anterior de esta misma carga (id None) no se vuelve a tocar
+    resultado.omitidos['precios'] += sum(1 for fila in existentes if fila['id'] is None)
+    _actualizar(Precio.__table__, 'precios', 'id', [fila for fila in existentes if fila['id'] is not None],
+                ('precio_kg', 'etiqueta_promo', 'fecha_inicio_vigencia', 'fecha_fin_vigencia', 'activo'), llave)
+
+    if not simular and (any(resultado.insertados.values()) or any(resultado.actualizados.values())):
+        catalogo_cache.marcar_catalogo_modificado(db.session)
+    resultado.segundos = time.perf_counter() - inicio
+    return resultado
+
+def finalizar_carga():
+    """Reconstruye el índice de búsqueda (sin commit) tras escrituras que no pasaron por el ORM."""
+    busqueda.reindexar(commit=False)
@@ -0,0 +1,364 @@
+"""Caché en memoria del catálogo de productos.
+
+El catálogo (Producto, Subproducto, Modificacion, Precio y sus tablas de
+asociación) cambia pocas veces al día pero se lee miles de veces. Este módulo
+mantiene una "foto" inmutable y completa del catálogo en memoria, junto con un
+contador de versión que se incrementa cada vez que se confirma (commit) un
+cambio sobre alguno de esos modelos. La foto se reconstruye de forma perezosa
+en la siguiente lectura.
+
+Con varios workers de gunicorn cada uno tiene su propia caché. Para ver los
+cambios confirmados por los demás, cada proceso compara MAX(cambios_catalogo.id)
+(el registro compartido, ver sincronizacion) con el último valor conocido y,
+si cambió, incrementa su versión. La comprobación se hace como máximo una vez
+cada CATALOGO_COMPROBACION_SEGUNDOS por proceso, en la primera lectura de un
+contexto (petición, comando) pasado ese intervalo: el resto de las peticiones,
+incluidos los 304 de condicional, no tocan la BD. Un cambio hecho en otro
+worker se ve a más tardar tras ese intervalo; los del propio proceso, al
+instante. Los UPDATE hechos a mano fuera de la aplicación no dejan registro:
+tras uno, hay que reiniciar o desactivar la caché con
+CATALOGO_CACHE_HABILITADO = False.
+"""
+import secrets
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from types import MappingProxyType
+
+from flask import current_app, g, has_app_context
+from sqlalchemy import event, func, select
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import (
+    Producto, Subproducto, Modificacion, Precio, CambioCatalogo,
+    producto_modificacion_association, subproducto_modificacion_association
+)
+
+MODELOS_CATALOGO = (Producto, Subproducto, Modificacion, Precio)
+
+# --- Registros inmutables que forman la foto del catálogo ---
+# Exponen los mismos nombres de atributo que los modelos para que las
+# plantillas funcionen igual con una foto que con objetos ORM.
+
+def copiar_campos(cls, origen, **extra):
+    """Crea un registro `cls` copiando sus campos de un objeto ORM o fila (los de `extra` se pasan tal cual)."""
+    valores = {
+        campo: getattr(origen, campo)
+        for campo in cls.__dataclass_fields__ if campo not in extra
+    }
+    return cls(**valores, **extra)
+
+@dataclass(frozen=True)
+class ModificacionSnapshot:
+    id: int
+    codigo_modif: str
+    nombre: str
+    descripcion: str
+    activo: bool
+
+@dataclass(frozen=True)
+class PrecioSnapshot:
+    id: int
+    producto_id: str
+    subproducto_id: int
+    tipo_cliente: str
+    precio_kg: float
+    cantidad_minima_kg: float
+    etiqueta_promo: str
+    fecha_inicio_vigencia: object
+    fecha_fin_vigencia: object
+    activo: bool
+
+@dataclass(frozen=True)
+class SubproductoSnapshot:
+    id: int
+    producto_padre_id: str
+    codigo_subprod: str
+    nombre: str
+    descripcion: str
+    activo: bool
+    modificaciones: tuple # Modificaciones aplicables, ordenadas por nombre
+    precios: tuple # Ordenados por tipo de cliente y cantidad mínima
+
+    @property
+    def modificaciones_aplicables(self):
+        return self.modificaciones
+
+@dataclass(frozen=True)
+class ProductoSnapshot:
+    id: str
+    nombre: str
+    descripcion: str
+    categoria: str
+    activo: bool
+    subproductos: tuple # Ordenados por nombre
+    modificaciones: tuple # Modificaciones directas, ordenadas por nombre
+    precios: tuple # Ordenados por tipo de cliente y cantidad mínima
+
+    @property
+    def modificaciones_directas(self):
+        return self.modificaciones
+
+@dataclass(frozen=True)
+class CatalogoSnapshot:
+    version: int
+    productos: tuple # Ordenados por nombre
+    productos_por_id: MappingProxyType
+    subproductos_por_id: MappingProxyType
+    modificaciones: tuple # Ordenadas por nombre
+    modificaciones_por_id: MappingProxyType
+    precios: tuple
+    cursor_cambios: int = 0 # Último CambioCatalogo visto al armarla (ver sincronizacion)
+    tipos_cliente: frozenset = frozenset() # Tipos de cliente que tienen algún precio
+
+def _orden_precio(precio):
+    return (precio.tipo_cliente, precio.cantidad_minima_kg)
+
+def construir_snapshot(version):
+    """Lee el catálogo completo con un número fijo de consultas y arma la foto inmutable."""
+    # Usamos una conexión propia para leer únicamente datos confirmados y no
+    # ensuciar el identity map de la sesión de la petición.
+    with db.engine.connect() as conn:
+        # El cursor se lee primero: lo que cambie mientras se lee el resto queda
+        # después de él y el cliente lo recibe (otra vez) en su siguiente delta.
+        cursor_cambios = conn.execute(select(func.max(CambioCatalogo.id))).scalar() or 0
+        filas_mod = conn.execute(select(Modificacion.__table__)).all()
+        filas_prod = conn.execute(select(Producto.__table__)).all()
+        filas_sub = conn.execute(select(Subproducto.__table__)).all()
+        filas_precio = conn.execute(select(Precio.__table__)).all()
+        asoc_prod = conn.execute(select(producto_modificacion_association)).all()
+        asoc_sub = conn.execute(select(subproducto_modificacion_association)).all()
+
+    modificaciones_por_id = {fila.id: copiar_campos(ModificacionSnapshot, fila) for fila in filas_mod}
+
+    def _mods_ordenadas(ids):
+        mods = [modificaciones_por_id[mod_id] for mod_id in ids if mod_id in modificaciones_por_id]
+        return tuple(sorted(mods, key=lambda m: m.nombre))
+
+    mods_por_producto = {}
+    for producto_id, modificacion_id in asoc_prod:
+        mods_por_producto.setdefault(producto_id, []).append(modificacion_id)
+    mods_por_subproducto = {}
+    for subproducto_id, modificacion_id in asoc_sub:
+        mods_por_subproducto.setdefault(subproducto_id, []).append(modificacion_id)
+
+    precios = [copiar_campos(PrecioSnapshot, fila) for fila in filas_precio]
+    precios_por_producto = {}
+    precios_por_subproducto = {}
+    for precio in precios:
+        if precio.producto_id is not None:
+            precios_por_producto.setdefault(precio.producto_id, []).append(precio)
+        else:
+            precios_por_subproducto.setdefault(precio.subproducto_id, []).append(precio)
+
+    subproductos_por_padre = {}
+    subproductos_por_id = {}
+    for fila in filas_sub:
+        sub = copiar_campos(
+            SubproductoSnapshot, fila,
+            modificaciones=_mods_ordenadas(mods_por_subproducto.get(fila.id, ())),
+            precios=tuple(sorted(precios_por_subproducto.get(fila.id, ()), key=_orden_precio))
+        )
+        subproductos_por_id[sub.id] = sub
+        subproductos_por_padre.setdefault(sub.producto_padre_id, []).append(sub)
+
+    productos_por_id = {}
+    for fila in filas_prod:
+        productos_por_id[fila.id] = copiar_campos(
+            ProductoSnapshot, fila,
+            subproductos=tuple(sorted(subproductos_por_padre.get(fila.id, ()), key=lambda s: s.nombre)),
+            modificaciones=_mods_ordenadas(mods_por_producto.get(fila.id, ())),
+            precios=tuple(sorted(precios_por_producto.get(fila.id, ()), key=_orden_precio))
+        )
+
+    return CatalogoSnapshot(
+        version=version,
+        productos=tuple(sorted(productos_por_id.values(), key=lambda p: p.nombre)),
+        productos_por_id=MappingProxyType(productos_por_id),
+        subproductos_por_id=MappingProxyType(subproductos_por_id),
+        modificaciones=tuple(sorted(modificaciones_por_id.values(), key=lambda m: m.nombre)),
+        modificaciones_por_id=MappingProxyType(modificaciones_por_id),
+        precios=tuple(precios),
+        cursor_cambios=cursor_cambios,
+        tipos_cliente=frozenset(precio.tipo_cliente for precio in precios)
+    )
+
+class CatalogoCache:
+    """Guarda la foto vigente del catálogo y la reconstruye cuando cambia la versión."""
+
+    def __init__(self, intervalo_comprobacion=1.0):
+        self.intervalo_comprobacion = intervalo_comprobacion
+        self._proxima_comprobacion = 0.0 # time.monotonic()
+        self._lock_reconstruccion = threading.Lock()
+        self._lock_version = threading.Lock()
+        self._version = 0
+        self._snapshot = None
+        # Distingue la numeración de este proceso de la de otros workers o reinicios
+        self.epoca = secrets.token_hex(4)
+        self.modificado_en = datetime.now(timezone.utc).replace(microsecond=0)
+        self.cursor_conocido = None # MAX(cambios_catalogo.id) que ya refleja la versión
+        self.cambios_externos = 0
+        self.comprobaciones = 0
+        self.aciertos = 0
+        self.fallos = 0
+        self.reconstrucciones = 0
+        self.ms_ultima_reconstruccion = 0.0
+        self.ms_total_reconstruccion = 0.0
+
+    @property
+    def version(self):
+        return self._version
+
+    def invalidar(self):
+        """Incrementa la versión del catálogo; la foto se reconstruye en la siguiente lectura."""
+        with self._lock_version:
+            self._version += 1
+            # Siempre creciente aunque haya varios cambios en el mismo segundo (Last-Modified no tiene más precisión)
+            ahora = datetime.now(timezone.utc).replace(microsecond=0)
+            self.modificado_en = max(ahora, self.modificado_en + timedelta(seconds=1))
+
+    def toca_comprobar(self):
+        """Indica (y reserva) si ya pasó el intervalo desde la última comprobación de cambios externos."""
+        ahora = time.monotonic()
+        with self._lock_version:
+            if ahora < self._proxima_comprobacion:
+                return False
+            self._proxima_comprobacion = ahora + self.intervalo_comprobacion
+            self.comprobaciones += 1
+            return True
+
+    def comprobar_cambios_externos(self, cursor):
+        """Incrementa la versión si el registro de cambios avanzó desde el último cursor conocido."""
+        with self._lock_version:
+            if cursor == self.cursor_conocido:
+                return False
+            anterior, self.cursor_conocido = self.cursor_conocido, cursor
+        if anterior is None and self._snapshot is None:
+            return False # Primera lectura del proceso: no hay nada que descartar
+        self.cambios_externos += 1
+        self.invalidar()
+        return True
+
+    def obtener(self):
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == self._version:
+            self.aciertos += 1
+            return snapshot
+
+        # Solo un hilo reconstruye; el resto espera y reutiliza su resultado
+        with self._lock_reconstruccion:
+            version = self._version
+            snapshot = self._snapshot
+            if snapshot is not None and snapshot.version == version:
+                self.aciertos += 1
+                return snapshot
+
+            self.fallos += 1
+            inicio = time.perf_counter()
+            snapshot = construir_snapshot(version)
+            duracion_ms = (time.perf_counter() - inicio) * 1000
+            self._snapshot = snapshot
+            self.reconstrucciones += 1
+            self.ms_ultima_reconstruccion = duracion_ms
+            self.ms_total_reconstruccion += duracion_ms
+            return snapshot
+
+    def estadisticas(self):
+        lecturas = self.aciertos + self.fallos
+        return {
+            'version': self._version,
+            'version_snapshot': self._snapshot.version if self._snapshot else None,
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': round(self.aciertos / lecturas, 4) if lecturas else None,
+            'reconstrucciones': self.reconstrucciones,
+            'cursor_conocido': self.cursor_conocido,
+            'cambios_externos': self.cambios_externos,
+            'comprobaciones': self.comprobaciones,
+            'ms_ultima_reconstruccion': round(self.ms_ultima_reconstruccion, 3),
+            'ms_total_reconstruccion': round(self.ms_total_reconstruccion, 3),
+        }
+
+def init_app(app):
+    app.config.setdefault('CATALOGO_CACHE_HABILITADO', True)
+    app.config.setdefault('CATALOGO_COMPROBACION_SEGUNDOS', 1.0)
+    app.extensions['catalogo_cache'] = CatalogoCache(float(app.config['CATALOGO_COMPROBACION_SEGUNDOS']))
+
+def leer_cursor_cambios():
+    """MAX(cambios_catalogo.id): cuántos cambios del catálogo se han confirmado, visto por todos los procesos."""
+    with db.engine.connect() as conn:
+        return conn.execute(select(func.max(CambioCatalogo.id))).scalar() or 0
+
+def obtener_cache():
+    """Devuelve la caché de la aplicación actual (o None si no hay contexto).
+
+    La primera vez en cada contexto comprueba (si ya toca, ver toca_comprobar) los
+    cambios confirmados por otros procesos y anota en `g.version_catalogo_inicial` la versión vigente antes de
+    que el contexto lea datos del catálogo (ver fragmentos).
+    """
+    if not has_app_context():
+        return None
+    cache = current_app.extensions.get('catalogo_cache')
+    if cache is not None and 'version_catalogo_inicial' not in g:
+        if current_app.config.get('CATALOGO_CACHE_HABILITADO', True) and cache.toca_comprobar():
+            cache.comprobar_cambios_externos(leer_cursor_cambios())
+        g.version_catalogo_inicial = cache.version
+    return cache
+
+def obtener_snapshot():
+    """Devuelve la foto vigente del catálogo, o None si la caché está desactivada."""
+    cache = obtener_cache()
+    if cache is None or not current_app.config.get('CATALOGO_CACHE_HABILITADO', True):
+        return None
+    return cache.obtener()
+
+def version_catalogo():
+    cache = obtener_cache()
+    return cache.version if cache is not None else 0
+
+def invalidar_catalogo():
+    """Fuerza una nueva versión del catálogo (útil tras cargas masivas que no pasan por el ORM)."""
+    cache = obtener_cache()
+    if cache is not None:
+        cache.invalidar()
+
+def marcar_catalogo_modificado(session):
+    """Marca la transacción de `session` como modificadora del catálogo.
+
+    Necesario para escrituras con sentencias Core (insert/update masivos), que
+    no pasan por el flush del ORM; la versión se incrementa al hacer commit.
+    Como no se sabe qué filas cambiaron, el registro de cambios anota un
+    REINICIO y los clientes sincronizados vuelven a bajar el catálogo completo.
+    """
+    session.info['catalogo_modificado'] = True
+    session.info['catalogo_escritura_core'] = True
+
+# --- Eventos de sesión: detectar cambios de catálogo y versionar al confirmar ---
+
+@event.listens_for(Session, 'after_flush')
+def _marcar_cambios_catalogo(session, flush_context):
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, MODELOS_CATALOGO):
+            session.info['catalogo_modificado'] = True
+            return
+
+@event.listens_for(Session, 'after_commit')
+def _versionar_tras_commit(session):
+    if session.info.pop('catalogo_modificado', False):
+        cache = current_app.extensions.get('catalogo_cache') if has_app_context() else None
+        if cache is None:
+            return
+        # El propio commit ya avanzó el registro de cambios: no contarlo como cambio externo.
+        # Se lee antes de invalidar: una foto armada después ve al menos hasta este cursor.
+        cursor = leer_cursor_cambios()
+        g.setdefault('version_catalogo_inicial', cache.version)
+        cache.invalidar()
+        cache.cursor_conocido = cursor
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _versionar_tras_rollback(session, previous_transaction):
+    # Si hubo flush de cambios de catálogo y luego rollback, descartamos por seguridad
+    if session.info.pop('catalogo_modificado', False):
+        invalidar_catalogo()
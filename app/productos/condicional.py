@@ -0,0 +1,64 @@
+"""GET condicional (ETag / Last-Modified) para las páginas del catálogo.
+
+Las páginas de administración del catálogo (listado de productos, detalle de
+producto, listado de modificaciones) solo cambian cuando cambia el catálogo o
+el rol de quien las ve (el menú depende del rol). El validador se deriva de
+eso sin tocar la BD ni Jinja:
+
+    ETag = "<época del proceso>-<versión del catálogo>-<hash del rol>"
+    Last-Modified = momento del último cambio confirmado del catálogo
+
+La versión es un contador del proceso que también avanza con los cambios
+confirmados por otros workers (a más tardar tras CATALOGO_COMPROBACION_SEGUNDOS,
+ver catalogo_cache); la época lo distingue del
+de otros workers y de reinicios, así que un validador nunca se reutiliza para
+un contenido distinto. Si la petición trae un validador vigente se responde
+304 antes de ejecutar la vista.
+
+No se usa validador cuando:
+* CATALOGO_CACHE_HABILITADO es False;
+* hay mensajes flash pendientes (la página los muestra una sola vez);
+* la vista no responde 200 (redirecciones por permisos o por no encontrado).
+"""
+import hashlib
+from functools import wraps
+
+from flask import current_app, request, session
+from flask_login import current_user
+from werkzeug.http import is_resource_modified
+
+from app.productos import catalogo_cache
+
+# Se puede guardar, pero siempre se revalida; solo para la sesión de quien la pidió
+CACHE_CONTROL = 'private, no-cache'
+
+def validador_catalogo():
+    """Devuelve (etag, last_modified) de la página actual, o (None, None) si no debe validarse."""
+    cache = catalogo_cache.obtener_cache()
+    if (cache is None or not current_app.config.get('CATALOGO_CACHE_HABILITADO', True)
+            or '_flashes' in session or not current_user.is_authenticated):
+        return None, None
+    rol = hashlib.sha256(current_user.rol.encode('utf-8')).hexdigest()[:8]
+    return f'{cache.epoca}-{cache.version}-{rol}', cache.modificado_en
+
+def _con_validador(respuesta, etag, modificado_en):
+    respuesta.set_etag(etag)
+    respuesta.last_modified = modificado_en
+    respuesta.headers['Cache-Control'] = CACHE_CONTROL
+    respuesta.vary.add('Cookie')
+    return respuesta
+
+def condicional_catalogo(vista):
+    """Decorador (después de @login_required): responde 304 si el cliente ya tiene la versión vigente."""
+    @wraps(vista)
+    def envoltura(*args, **kwargs):
+        etag, modificado_en = validador_catalogo()
+        if etag is None:
+            return vista(*args, **kwargs)
+        if not is_resource_modified(request.environ, etag=etag, last_modified=modificado_en):
+            return _con_validador(current_app.response_class(status=304), etag, modificado_en)
+        respuesta = current_app.make_response(vista(*args, **kwargs))
+        if respuesta.status_code == 200 and '_flashes' not in session:
+            _con_validador(respuesta, etag, modificado_en)
+        return respuesta
+    return envoltura
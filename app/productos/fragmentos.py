@@ -0,0 +1,146 @@
+"""Caché de fragmentos renderizados de las plantillas del catálogo.
+
+Las páginas del catálogo repiten el mismo HTML en cada petición: cada fila de
+los listados de productos y modificaciones, y en el detalle de un producto
+sus datos generales, cada subproducto con sus modificaciones y la tabla de
+precios. Con la etiqueta `{% cache %}` una plantilla guarda un fragmento ya
+renderizado:
+
+    {% cache 'listar_productos.fila', producto.id %}
+        <tr>...</tr>
+    {% endcache %}
+
+La llave es la lista de expresiones de la etiqueta (nombre del fragmento e id
+de la entidad) más la versión del catálogo (ver catalogo_cache). Los
+fragmentos se guardan en un LRU acotado por FRAGMENTOS_CACHE_MAXIMO. Cada
+commit que cambia el catálogo incrementa la versión, y con ella se descartan
+todos los fragmentos anteriores.
+
+La versión es la que tenía el catálogo la primera vez que la petición lo
+consultó (g.version_catalogo_inicial, ver catalogo_cache.obtener_cache), o en
+el primer `{% cache %}` si la vista no lo consultó antes. Como se toma antes
+de leer los datos, un fragmento armado con datos viejos nunca queda guardado
+con una versión nueva. Las peticiones que no renderizan fragmentos (estáticos,
+login, sw.js) no la leen.
+
+Un fragmento no debe depender del usuario ni de la petición (rol, mensajes
+flash, formularios con CSRF): se comparte entre todas las peticiones. Con
+CATALOGO_CACHE_HABILITADO = False o FRAGMENTOS_CACHE_MAXIMO = 0
+los bloques se renderizan siempre.
+"""
+import threading
+from collections import OrderedDict
+
+from flask import current_app, g, has_app_context, has_request_context
+from jinja2 import nodes
+from jinja2.ext import Extension
+
+from app.productos import catalogo_cache
+
+class CacheFragmentos:
+    """LRU de fragmentos HTML de una sola versión del catálogo (seguro entre hilos)."""
+
+    def __init__(self, maximo=2000):
+        self.maximo = maximo
+        self.version = None
+        self._entradas = OrderedDict() # llave -> Markup
+        self._lock = threading.Lock()
+        self.aciertos = 0
+        self.fallos = 0
+        self.desalojados = 0
+        self.invalidaciones = 0
+
+    def _cambiar_version(self, version):
+        if version != self.version:
+            if self._entradas:
+                self.invalidaciones += 1
+            self._entradas.clear()
+            self.version = version
+
+    def obtener(self, llave, version):
+        with self._lock:
+            if version != self.version:
+                # Una versión más nueva descarta lo guardado; una más vieja (petición rezagada) no se sirve
+                if self.version is None or version > self.version:
+                    self._cambiar_version(version)
+                self.fallos += 1
+                return None
+            html = self._entradas.get(llave)
+            if html is None:
+                self.fallos += 1
+                return None
+            self._entradas.move_to_end(llave)
+            self.aciertos += 1
+            return html
+
+    def guardar(self, llave, version, html):
+        with self._lock:
+            if version != self.version:
+                return
+            self._entradas[llave] = html
+            self._entradas.move_to_end(llave)
+            while len(self._entradas) > self.maximo:
+                self._entradas.popitem(last=False)
+                self.desalojados += 1
+
+    def estadisticas(self):
+        lecturas = self.aciertos + self.fallos
+        return {
+            'version': self.version,
+            'entradas': len(self._entradas),
+            'maximo': self.maximo,
+            'aciertos': self.aciertos,
+            'fallos': self.fallos,
+            'tasa_aciertos': round(self.aciertos / lecturas, 4) if lecturas else None,
+            'desalojados': self.desalojados,
+            'invalidaciones': self.invalidaciones,
+        }
+
+def obtener_cache():
+    """Devuelve la caché de la aplicación actual, o None si no hay contexto o está desactivada."""
+    if (not has_app_context() or not current_app.config.get('CATALOGO_CACHE_HABILITADO', True)
+            or not current_app.config.get('FRAGMENTOS_CACHE_MAXIMO', 2000)):
+        return None
+    return current_app.extensions.get('fragmentos_cache')
+
+def _version_de_la_peticion():
+    if not has_request_context():
+        return catalogo_cache.version_catalogo() # Render fuera de una petición
+    if 'version_catalogo_inicial' not in g:
+        catalogo_cache.obtener_cache() # Primer {% cache %} de la petición: la anota en g
+    return g.version_catalogo_inicial
+
+class FragmentosExtension(Extension):
+    """Etiqueta `{% cache llave, ... %}...{% endcache %}` de Jinja."""
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        lineno = next(parser.stream).lineno
+        llave = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            llave.append(parser.parse_expression())
+        cuerpo = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(self.call_method('_fragmento', [nodes.List(llave)]), [], [], cuerpo).set_lineno(lineno)
+
+    def _fragmento(self, llave, caller):
+        cache = obtener_cache()
+        if cache is None:
+            return caller()
+        llave = tuple(llave)
+        version = _version_de_la_peticion()
+        html = cache.obtener(llave, version)
+        if html is None:
+            html = caller()
+            cache.guardar(llave, version, html)
+        return html
+
+def init_app(app):
+    app.config.setdefault('FRAGMENTOS_CACHE_MAXIMO', 2000)
+    app.extensions['fragmentos_cache'] = CacheFragmentos(maximo=int(app.config['FRAGMENTOS_CACHE_MAXIMO']) or 1)
+    app.jinja_env.add_extension(FragmentosExtension)
+
+def obtener_estadisticas():
+    estadisticas = current_app.extensions['fragmentos_cache'].estadisticas()
+    estadisticas['habilitada'] = obtener_cache() is not None
+    return estadisticas
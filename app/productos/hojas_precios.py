@@ -0,0 +1,159 @@
+"""Hojas de precios materializadas por tipo de cliente.
+
+Las terminales de mostrador y la PWA muestran la lista de precios completa
+de un tipo de cliente (PUBLICO, COCINA, LEAL, ALIADO, MAYOREO...). En lugar
+de resolverla desde las filas de `Precio` en cada petición, este módulo
+guarda por tipo de cliente un documento JSON ya serializado: cada producto y
+subproducto activo con sus escalones vigentes (de motor_precios) y etiquetas
+de promoción.
+
+Una hoja se regenera solo cuando cambia la versión del catálogo (un commit
+sobre Precio, Producto, Subproducto o Modificacion, ver catalogo_cache) o la
+fecha de vigencia. El ETag es fuerte: el hash SHA-256 del cuerpo. La
+serialización es determinista, así que una regeneración que no cambia
+ningún precio (p. ej. por editar una modificación) conserva el ETag, y
+todos los workers calculan el mismo para el mismo contenido. Quien consulta
+manda `If-None-Match` y recibe `304 Not Modified` sin que se arme nada.
+
+Con CATALOGO_CACHE_HABILITADO = False no hay foto versionada que seguir: la
+hoja se arma en cada petición (el ETag sigue ahorrando la transferencia).
+"""
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+
+from flask import current_app, has_app_context
+
+from app.productos import catalogo_cache, motor_precios
+
+@dataclass(frozen=True)
+class HojaPrecios:
+    tipo_cliente: str
+    fecha: date # Fecha de vigencia de los precios
+    version: int # Versión del catálogo con la que se armó
+    cuerpo: bytes # JSON ya serializado
+    etag: str # SHA-256 del cuerpo (sin comillas)
+    articulos: int
+
+def tipos_cliente(snapshot):
+    """Tipos de cliente con al menos un precio activo, más el tipo base."""
+    tipos = {precio.tipo_cliente for precio in snapshot.precios if precio.activo}
+    tipos.add(motor_precios.TIPO_CLIENTE_BASE)
+    return sorted(tipos)
+
+def _escalones(tabla, tipo_cliente, producto_id=None, subproducto_id=None):
+    """(tipo aplicado, escalones) con la misma regla de respaldo al tipo base que al cotizar."""
+    for tipo in dict.fromkeys((tipo_cliente, motor_precios.TIPO_CLIENTE_BASE)):
+        precios = tabla.escalones(tipo, producto_id, subproducto_id)
+        if precios:
+            return tipo, [
+                {
+                    'cantidad_minima_kg': precio.cantidad_minima_kg,
+                    'precio_kg': precio.precio_kg,
+                    'etiqueta_promo': precio.etiqueta_promo,
+                }
+                for precio in precios
+            ]
+    return None, []
+
+def construir_hoja(snapshot, tabla, tipo_cliente):
+    """Arma la hoja de `tipo_cliente` con la foto del catálogo y la tabla de precios compilada."""
+    productos = []
+    articulos = 0
+    for producto in snapshot.productos:
+        if not producto.activo:
+            continue
+        aplicado, escalones = _escalones(tabla, tipo_cliente, producto_id=producto.id)
+        subproductos = []
+        for sub in producto.subproductos:
+            if not sub.activo:
+                continue
+            sub_aplicado, sub_escalones = _escalones(tabla, tipo_cliente, subproducto_id=sub.id)
+            subproductos.append({
+                'id': sub.id,
+                'codigo': sub.codigo_subprod,
+                'nombre': sub.nombre,
+                'tipo_cliente_aplicado': sub_aplicado,
+                'escalones': sub_escalones,
+            })
+        productos.append({
+            'id': producto.id,
+            'nombre': producto.nombre,
+            'categoria': producto.categoria,
+            'tipo_cliente_aplicado': aplicado,
+            'escalones': escalones,
+            'subproductos': subproductos,
+        })
+        articulos += 1 + len(subproductos)
+    documento = {'tipo_cliente': tipo_cliente, 'fecha': tabla.fecha.isoformat(), 'productos': productos}
+    # Serialización determinista: el mismo contenido produce los mismos bytes (y el mismo ETag)
+    cuerpo = json.dumps(documento, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+    return HojaPrecios(
+        tipo_cliente=tipo_cliente,
+        fecha=tabla.fecha,
+        version=snapshot.version,
+        cuerpo=cuerpo,
+        etag=hashlib.sha256(cuerpo).hexdigest(),
+        articulos=articulos
+    )
+
+class HojasPrecios:
+    """Guarda la hoja vigente de cada tipo de cliente y la regenera cuando cambia el catálogo o la fecha."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._hojas = {}
+        self.aciertos = 0
+        self.generaciones = 0
+        self.ms_ultima_generacion = 0.0
+
+    def obtener(self, tipo_cliente, fecha):
+        version = catalogo_cache.version_catalogo()
+        hoja = self._hojas.get(tipo_cliente)
+        if hoja is not None and hoja.version == version and hoja.fecha == fecha:
+            self.aciertos += 1
+            return hoja
+        # Solo un hilo regenera; el resto espera y reutiliza su resultado
+        with self._lock:
+            hoja = self._hojas.get(tipo_cliente)
+            if hoja is not None and hoja.version == catalogo_cache.version_catalogo() and hoja.fecha == fecha:
+                self.aciertos += 1
+                return hoja
+            snapshot = catalogo_cache.obtener_snapshot()
+            if tipo_cliente not in tipos_cliente(snapshot):
+                return None
+            inicio = time.perf_counter()
+            hoja = construir_hoja(snapshot, motor_precios.obtener_tabla_precios(fecha), tipo_cliente)
+            self.ms_ultima_generacion = (time.perf_counter() - inicio) * 1000
+            self.generaciones += 1
+            self._hojas[tipo_cliente] = hoja
+            return hoja
+
+    def estadisticas(self):
+        return {
+            'hojas': {tipo: hoja.etag for tipo, hoja in sorted(self._hojas.items())},
+            'aciertos': self.aciertos,
+            'generaciones': self.generaciones,
+            'ms_ultima_generacion': round(self.ms_ultima_generacion, 3),
+        }
+
+def init_app(app):
+    app.extensions['hojas_precios'] = HojasPrecios()
+
+def obtener_hoja(tipo_cliente, fecha=None):
+    """Devuelve la `HojaPrecios` vigente de `tipo_cliente`, o None si ese tipo no tiene precios."""
+    fecha = fecha or date.today()
+    if (has_app_context() and 'hojas_precios' in current_app.extensions
+            and current_app.config.get('CATALOGO_CACHE_HABILITADO', True)):
+        return current_app.extensions['hojas_precios'].obtener(tipo_cliente, fecha)
+    # Sin caché del catálogo: una hoja de un solo uso, sin materializar
+    snapshot = catalogo_cache.obtener_snapshot() or catalogo_cache.construir_snapshot(catalogo_cache.version_catalogo())
+    if tipo_cliente not in tipos_cliente(snapshot):
+        return None
+    return construir_hoja(snapshot, motor_precios.obtener_tabla_precios(fecha), tipo_cliente)
+
+def obtener_estadisticas():
+    return current_app.extensions['hojas_precios'].estadisticas()
@@ -0,0 +1,272 @@
+"""Exportación e importación del catálogo en flujo (JSONL o CSV).
+
+Sirve para sincronizar catálogos entre sucursales sin pasar por los
+formularios. El archivo usa códigos en lugar de IDs internos (subproductos por
+`codigo_subprod`, modificaciones por `codigo_modif`), así que es portable
+entre bases de datos distintas.
+
+Cada registro lleva un campo `tipo` y los registros se escriben en orden de
+dependencia (modificaciones, productos, subproductos, asociaciones, precios),
+de modo que al importar cada referencia ya fue vista antes. Tanto la
+exportación como la importación trabajan con generadores y lotes de tamaño
+fijo: la memoria no crece con el tamaño del archivo (salvo el índice de llaves
+del catálogo, ver `carga_masiva.IndiceCatalogo`).
+"""
+import csv
+import json
+import math
+from datetime import date
+from itertools import islice
+
+from sqlalchemy import select
+
+from app import db
+from app.models import (
+    Producto, Subproducto, Modificacion, Precio,
+    producto_modificacion_association, subproducto_modificacion_association
+)
+from app.productos import carga_masiva
+
+FORMATOS = ('jsonl', 'csv')
+TAMANO_LOTE = 1000
+
+# tipo de registro -> campos que se exportan (en este orden)
+CAMPOS_POR_TIPO = {
+    'modificacion': ('codigo_modif', 'nombre', 'descripcion', 'activo'),
+    'producto': ('id', 'nombre', 'descripcion', 'categoria', 'activo'),
+    'subproducto': ('codigo_subprod', 'producto_padre_id', 'nombre', 'descripcion', 'activo'),
+    'producto_modificacion': ('producto_id', 'codigo_modif'),
+    'subproducto_modificacion': ('codigo_subprod', 'codigo_modif'),
+    'precio': ('producto_id', 'codigo_subprod', 'tipo_cliente', 'precio_kg', 'cantidad_minima_kg',
+               'etiqueta_promo', 'fecha_inicio_vigencia', 'fecha_fin_vigencia', 'activo'),
+}
+TIPOS_REGISTRO = tuple(CAMPOS_POR_TIPO)
+
+# En CSV todos los tipos comparten un encabezado (unión de campos)
+CAMPOS_CSV = ('tipo',) + tuple(dict.fromkeys(
+    campo for campos in CAMPOS_POR_TIPO.values() for campo in campos
+))
+
+# Campos obligatorios y longitud máxima (las mismas que el modelo y los formularios)
+OBLIGATORIOS = {
+    'modificacion': ('codigo_modif', 'nombre'),
+    'producto': ('id', 'nombre', 'categoria'),
+    'subproducto': ('codigo_subprod', 'producto_padre_id', 'nombre'),
+    'producto_modificacion': ('producto_id', 'codigo_modif'),
+    'subproducto_modificacion': ('codigo_subprod', 'codigo_modif'),
+    'precio': ('tipo_cliente', 'precio_kg'),
+}
+LONGITUDES = {
+    'id': 10, 'producto_id': 10, 'producto_padre_id': 10, 'codigo_subprod': 15,
+    'codigo_modif': 20, 'nombre': 100, 'categoria': 50, 'tipo_cliente': 50, 'etiqueta_promo': 100,
+}
+CAMPOS_BOOL = ('activo',)
+CAMPOS_FLOAT = ('precio_kg', 'cantidad_minima_kg')
+CAMPOS_FECHA = ('fecha_inicio_vigencia', 'fecha_fin_vigencia')
+VALORES_VERDADEROS = ('1', 'true', 't', 'si', 'sí', 's', 'yes', 'y')
+
+class ErrorRegistro(ValueError):
+    """Registro del archivo que no se puede importar."""
+
+# --- Exportación ---
+
+def _consultas_exportacion():
+    """(tipo, consulta) en orden de dependencia; todas devuelven los campos de CAMPOS_POR_TIPO."""
+    sub = Subproducto.__table__
+    mod = Modificacion.__table__
+    return (
+        ('modificacion', select(mod.c.codigo_modif, mod.c.nombre, mod.c.descripcion, mod.c.activo)
+            .order_by(mod.c.codigo_modif)),
+        ('producto', select(*(Producto.__table__.c[campo] for campo in CAMPOS_POR_TIPO['producto']))
+            .order_by(Producto.id)),
+        ('subproducto', select(sub.c.codigo_subprod, sub.c.producto_padre_id, sub.c.nombre, sub.c.descripcion, sub.c.activo)
+            .order_by(sub.c.codigo_subprod)),
+        ('producto_modificacion', select(producto_modificacion_association.c.producto_id, mod.c.codigo_modif)
+            .join(mod, mod.c.id == producto_modificacion_association.c.modificacion_id)
+            .order_by(producto_modificacion_association.c.producto_id, mod.c.codigo_modif)),
+        ('subproducto_modificacion', select(sub.c.codigo_subprod, mod.c.codigo_modif)
+            .select_from(subproducto_modificacion_association)
+            .join(sub, sub.c.id == subproducto_modificacion_association.c.subproducto_id)
+            .join(mod, mod.c.id == subproducto_modificacion_association.c.modificacion_id)
+            .order_by(sub.c.codigo_subprod, mod.c.codigo_modif)),
+        ('precio', select(Precio.producto_id, sub.c.codigo_subprod, Precio.tipo_cliente, Precio.precio_kg,
+                          Precio.cantidad_minima_kg, Precio.etiqueta_promo, Precio.fecha_inicio_vigencia,
+                          Precio.fecha_fin_vigencia, Precio.activo)
+            .outerjoin(sub, sub.c.id == Precio.subproducto_id)
+            .order_by(Precio.id)),
+    )
+
+def exportar_registros(tipos=TIPOS_REGISTRO, tamano_lote=TAMANO_LOTE):
+    """Genera los registros del catálogo como diccionarios (con su `tipo`), leyendo por lotes."""
+    with db.engine.connect() as conn:
+        conn = conn.execution_options(stream_results=True, yield_per=tamano_lote)
+        for tipo, consulta in _consultas_exportacion():
+            if tipo not in tipos:
+                continue
+            for fila in conn.execute(consulta):
+                registro = {'tipo': tipo}
+                registro.update(fila._mapping)
+                yield registro
+
+def _a_texto(valor):
+    if isinstance(valor, date):
+        return valor.isoformat()
+    return valor
+
+def escribir_jsonl(registros, salida):
+    total = 0
+    for registro in registros:
+        salida.write(json.dumps({k: _a_texto(v) for k, v in registro.items()}, ensure_ascii=False))
+        salida.write('\n')
+        total += 1
+    return total
+
+def escribir_csv(registros, salida):
+    escritor = csv.DictWriter(salida, fieldnames=CAMPOS_CSV, extrasaction='ignore')
+    escritor.writeheader()
+    total = 0
+    for registro in registros:
+        escritor.writerow({
+            k: ('1' if v else '0') if k in CAMPOS_BOOL and v is not None else _a_texto(v)
+            for k, v in registro.items()
+        })
+        total += 1
+    return total
+
+def exportar(salida, formato='jsonl', tipos=TIPOS_REGISTRO):
+    """Escribe el catálogo en `salida` (archivo de texto abierto). Devuelve el número de registros."""
+    escribir = escribir_csv if formato == 'csv' else escribir_jsonl
+    return escribir(exportar_registros(tipos), salida)
+
+# --- Importación ---
+
+def leer_jsonl(entrada):
+    """Genera (número de línea, registro) de un archivo JSONL; ignora líneas vacías."""
+    for numero, linea in enumerate(entrada, start=1):
+        linea = linea.strip()
+        if not linea:
+            continue
+        try:
+            yield numero, json.loads(linea)
+        except json.JSONDecodeError as e:
+            yield numero, ErrorRegistro(f"JSON inválido: {e.msg}")
+
+def leer_csv(entrada):
+    """Genera (número de línea, registro) de un CSV con encabezado; las celdas vacías son None."""
+    lector = csv.DictReader(entrada)
+    for registro in lector:
+        yield lector.line_num, {k: (v if v != '' else None) for k, v in registro.items() if k}
+
+LECTORES = {'jsonl': leer_jsonl, 'csv': leer_csv}
+
+def normalizar_registro(registro):
+    """Valida y convierte los tipos de un registro leído. Lanza `ErrorRegistro` si no es válido."""
+    if isinstance(registro, ErrorRegistro):
+        raise registro
+    if not isinstance(registro, dict):
+        raise ErrorRegistro("Se esperaba un objeto por línea.")
+    tipo = registro.get('tipo')
+    if tipo not in CAMPOS_POR_TIPO:
+        raise ErrorRegistro(f"Tipo de registro desconocido: {tipo!r}.")
+    resultado = {}
+    for campo in CAMPOS_POR_TIPO[tipo]:
+        valor = registro.get(campo)
+        if isinstance(valor, str):
+            valor = valor.strip() or None
+        if valor is None:
+            resultado[campo] = None
+            continue
+        # JSON trae tipos propios: los números enteros valen como texto, listas y objetos nunca
+        if isinstance(valor, (list, dict)) or (isinstance(valor, bool) and campo not in CAMPOS_BOOL):
+            raise ErrorRegistro(f"Valor inválido para '{campo}': {valor!r}.")
+        try:
+            if campo in CAMPOS_BOOL:
+                valor = valor if isinstance(valor, bool) else str(valor).lower() in VALORES_VERDADEROS
+            elif campo in CAMPOS_FLOAT:
+                valor = float(valor)
+                if not math.isfinite(valor):
+                    raise ValueError
+            elif campo in CAMPOS_FECHA:
+                if not isinstance(valor, str):
+                    raise ValueError
+                valor = date.fromisoformat(valor)
+            elif isinstance(valor, int):
+                valor = str(valor)
+            elif not isinstance(valor, str):
+                raise ValueError
+        except (TypeError, ValueError, OverflowError):
+            raise ErrorRegistro(f"Valor inválido para '{campo}': {valor!r}.")
+        if campo in LONGITUDES and len(str(valor)) > LONGITUDES[campo]:
+            raise ErrorRegistro(f"'{campo}' excede {LONGITUDES[campo]} caracteres.")
+        resultado[campo] = valor
+
+    faltantes = [campo for campo in OBLIGATORIOS[tipo] if resultado.get(campo) is None]
+    if faltantes:
+        raise ErrorRegistro(f"Faltan campos obligatorios para '{tipo}': {', '.join(faltantes)}.")
+    if tipo == 'precio':
+        if bool(resultado['producto_id']) == bool(resultado['codigo_subprod']):
+            raise ErrorRegistro("Un precio debe indicar producto_id o codigo_subprod (solo uno).")
+        if resultado['precio_kg'] <= 0:
+            raise ErrorRegistro(f"precio_kg debe ser mayor que 0: {resultado['precio_kg']:g}.")
+        if resultado['cantidad_minima_kg'] is not None and resultado['cantidad_minima_kg'] < 0:
+            raise ErrorRegistro(f"cantidad_minima_kg no puede ser negativa: {resultado['cantidad_minima_kg']:g}.")
+    if 'activo' in resultado and resultado['activo'] is None:
+        resultado['activo'] = True # Mismo default que el modelo
+    return tipo, resultado
+
+def _en_lotes(iterable, tamano):
+    iterador = iter(iterable)
+    while True:
+        lote = list(islice(iterador, tamano))
+        if not lote:
+            return
+        yield lote
+
+def _cargar_lote(lote, indice, actualizar_existentes, simular):
+    """Agrupa un lote ya normalizado por tipo y lo pasa a `cargar_catalogo`."""
+    grupos = {tipo: [] for tipo in TIPOS_REGISTRO}
+    for tipo, registro in lote:
+        grupos[tipo].append(registro)
+    return carga_masiva.cargar_catalogo(
+        modificaciones=grupos['modificacion'],
+        productos=grupos['producto'],
+        subproductos=grupos['subproducto'],
+        asoc_productos=[(r['producto_id'], r['codigo_modif']) for r in grupos['producto_modificacion']],
+        asoc_subproductos=[(r['codigo_subprod'], r['codigo_modif']) for r in grupos['subproducto_modificacion']],
+        precios=grupos['precio'],
+        actualizar_existentes=actualizar_existentes,
+        indice=indice,
+        simular=simular
+    )
+
+def importar(entrada, formato='jsonl', actualizar_existentes=True, simular=False, tamano_lote=TAMANO_LOTE):
+    """Importa el catálogo desde `entrada` por lotes, con un commit por lote.
+
+    Las llaves existentes se precargan una sola vez y se reutilizan entre
+    lotes, así que cada verificación de unicidad es una búsqueda en un
+    conjunto. Con simular=True no se escribe nada y el `ResultadoCarga`
+    describe las diferencias (incluye una muestra de los cambios).
+    Los registros inválidos se reportan como advertencias y se omiten.
+    """
+    resultado = carga_masiva.ResultadoCarga()
+    indice = carga_masiva.IndiceCatalogo(db.session.connection())
+
+    def _normalizados():
+        for numero, registro in LECTORES[formato](entrada):
+            try:
+                yield normalizar_registro(registro)
+            except ErrorRegistro as e:
+                resultado.advertir(f"Línea {numero}: {e}")
+
+    try:
+        for lote in _en_lotes(_normalizados(), tamano_lote):
+            resultado.acumular(_cargar_lote(lote, indice, actualizar_existentes, simular))
+            if not simular:
+                db.session.commit()
+        if not simular and (any(resultado.insertados.values()) or any(resultado.actualizados.values())):
+            carga_masiva.finalizar_carga()
+            db.session.commit()
+    finally:
+        # En simulación (o si algo falló) no queda nada pendiente en la sesión
+        db.session.rollback()
+    return resultado
@@ -0,0 +1,205 @@
+"""Motor de resolución de precios.
+
+Responde preguntas del tipo "¿cuánto cuestan 3.4 kg de PP para un cliente
+COCINA hoy?" sin tocar la BD. La tabla `Precio` se compila (a partir de la
+foto del catálogo) en arreglos de escalones ordenados por `cantidad_minima_kg`
+para cada combinación (producto/subproducto, tipo_cliente). El escalón
+aplicable se encuentra con búsqueda binaria: el de mayor cantidad mínima que
+no supere la cantidad pedida.
+
+La tabla compilada se reutiliza mientras no cambien la versión del catálogo
+(que también ve los cambios de otros workers, ver catalogo_cache) ni la fecha
+de vigencia consultada. Con CATALOGO_CACHE_HABILITADO = False se compila en
+cada llamada.
+"""
+import threading
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date
+
+from flask import current_app, has_app_context
+from sqlalchemy import select
+
+from app import db
+from app.models import Precio
+from app.productos import catalogo_cache
+
+# Si un tipo de cliente no tiene precio para el artículo se usa el de este tipo
+TIPO_CLIENTE_BASE = 'PUBLICO'
+
+@dataclass(frozen=True)
+class Cotizacion:
+    producto_id: str
+    subproducto_id: int
+    tipo_cliente: str # Tipo de cliente solicitado
+    tipo_cliente_aplicado: str # Tipo cuyo precio se usó (puede ser TIPO_CLIENTE_BASE)
+    cantidad_kg: float
+    precio_kg: float
+    subtotal: float
+    etiqueta_promo: str
+    precio_id: int
+
+def _clave(producto_id, subproducto_id, tipo_cliente):
+    if subproducto_id is not None:
+        return ('S', subproducto_id, tipo_cliente)
+    return ('P', producto_id.upper() if producto_id else producto_id, tipo_cliente)
+
+def _vigente(precio, fecha):
+    if not precio.activo:
+        return False
+    if precio.fecha_inicio_vigencia is not None and precio.fecha_inicio_vigencia > fecha:
+        return False
+    if precio.fecha_fin_vigencia is not None and precio.fecha_fin_vigencia < fecha:
+        return False
+    return True
+
+class TablaPrecios:
+    """Escalones de precio vigentes en una fecha, listos para resolver por búsqueda binaria."""
+
+    def __init__(self, precios, fecha, version=None):
+        self.fecha = fecha
+        self.version = version
+        agrupados = {}
+        for precio in precios:
+            if _vigente(precio, fecha):
+                clave = _clave(precio.producto_id, precio.subproducto_id, precio.tipo_cliente)
+                agrupados.setdefault(clave, []).append(precio)
+
+        # Por cada clave: (lista de cantidades mínimas, lista de precios) en paralelo
+        self._escalones = {}
+        for clave, lista in agrupados.items():
+            lista.sort(key=lambda p: p.cantidad_minima_kg)
+            self._escalones[clave] = ([p.cantidad_minima_kg for p in lista], lista)
+
+    def __len__(self):
+        return len(self._escalones)
+
+    def escalones(self, tipo_cliente, producto_id=None, subproducto_id=None):
+        """Devuelve los precios vigentes (ordenados por cantidad mínima) para un artículo y tipo de cliente."""
+        entrada = self._escalones.get(_clave(producto_id, subproducto_id, tipo_cliente))
+        return list(entrada[1]) if entrada else []
+
+    def _buscar(self, clave, cantidad_kg):
+        entrada = self._escalones.get(clave)
+        if entrada is None:
+            return None
+        minimos, precios = entrada
+        indice = bisect_right(minimos, cantidad_kg) - 1
+        return precios[indice] if indice >= 0 else None
+
+    def resolver(self, tipo_cliente, cantidad_kg, producto_id=None, subproducto_id=None):
+        """Devuelve el `Precio` aplicable (o None) y el tipo de cliente cuyo precio se usó."""
+        precio = self._buscar(_clave(producto_id, subproducto_id, tipo_cliente), cantidad_kg)
+        if precio is not None:
+            return precio, tipo_cliente
+        if tipo_cliente != TIPO_CLIENTE_BASE:
+            precio = self._buscar(_clave(producto_id, subproducto_id, TIPO_CLIENTE_BASE), cantidad_kg)
+            if precio is not None:
+                return precio, TIPO_CLIENTE_BASE
+        return None, None
+
+    def _candidatos(self, tipo_cliente, producto_id, subproducto_id):
+        """Escalones donde buscar, en orden: los del tipo solicitado y los del tipo base."""
+        candidatos = []
+        for tipo in (tipo_cliente, TIPO_CLIENTE_BASE) if tipo_cliente != TIPO_CLIENTE_BASE else (tipo_cliente,):
+            entrada = self._escalones.get(_clave(producto_id, subproducto_id, tipo))
+            if entrada is not None:
+                candidatos.append((tipo, entrada))
+        return candidatos
+
+    def cotizar(self, tipo_cliente, cantidad_kg, producto_id=None, subproducto_id=None):
+        precio, tipo_aplicado = self.resolver(tipo_cliente, cantidad_kg, producto_id, subproducto_id)
+        return _cotizacion(precio, tipo_cliente, tipo_aplicado, cantidad_kg)
+
+    def cotizar_lote(self, items, tipo_cliente):
+        """Cotiza varios artículos; los escalones de cada (artículo, tipo de cliente) se buscan una sola vez."""
+        memo = {}
+        cotizaciones = []
+        for item in items:
+            tipo = item.get('tipo_cliente', tipo_cliente)
+            producto_id = item.get('producto_id')
+            subproducto_id = item.get('subproducto_id')
+            cantidad_kg = item['cantidad_kg']
+            llave = (producto_id, subproducto_id, tipo)
+            candidatos = memo.get(llave)
+            if candidatos is None:
+                candidatos = memo[llave] = self._candidatos(tipo, producto_id, subproducto_id)
+            precio = tipo_aplicado = None
+            for tipo_candidato, (minimos, precios) in candidatos:
+                indice = bisect_right(minimos, cantidad_kg) - 1
+                if indice >= 0:
+                    precio, tipo_aplicado = precios[indice], tipo_candidato
+                    break
+            cotizaciones.append(_cotizacion(precio, tipo, tipo_aplicado, cantidad_kg))
+        return cotizaciones
+
+def _cotizacion(precio, tipo_cliente, tipo_aplicado, cantidad_kg):
+    if precio is None:
+        return None
+    return Cotizacion(
+        producto_id=precio.producto_id,
+        subproducto_id=precio.subproducto_id,
+        tipo_cliente=tipo_cliente,
+        tipo_cliente_aplicado=tipo_aplicado,
+        cantidad_kg=cantidad_kg,
+        precio_kg=precio.precio_kg,
+        subtotal=round(precio.precio_kg * cantidad_kg, 2),
+        etiqueta_promo=precio.etiqueta_promo,
+        precio_id=precio.id
+    )
+
+class MotorPrecios:
+    """Mantiene la tabla compilada de la aplicación y la recompila cuando cambia su clave."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tabla = None
+        self.compilaciones = 0
+
+    def tabla(self, fecha):
+        version = catalogo_cache.version_catalogo()
+        tabla = self._tabla
+        if tabla is not None and tabla.version == version and tabla.fecha == fecha:
+            return tabla
+        with self._lock:
+            tabla = self._tabla
+            if tabla is None or tabla.version != version or tabla.fecha != fecha:
+                tabla = TablaPrecios(_precios_fuente(), fecha, version)
+                self._tabla = tabla
+                self.compilaciones += 1
+            return tabla
+
+def _precios_fuente():
+    snapshot = catalogo_cache.obtener_snapshot()
+    if snapshot is not None:
+        return snapshot.precios
+    # Caché desactivada: una sola consulta (filas, no objetos ORM, para que la
+    # tabla compilada no dependa de la sesión de la petición)
+    return db.session.execute(select(Precio.__table__)).all()
+
+def init_app(app):
+    app.extensions['motor_precios'] = MotorPrecios()
+
+def obtener_tabla_precios(fecha=None):
+    """Devuelve la tabla compilada para `fecha` (hoy por defecto).
+
+    Sin la caché del catálogo no hay versión confiable con qué reutilizarla: se compila en cada llamada.
+    """
+    fecha = fecha or date.today()
+    if (not has_app_context() or 'motor_precios' not in current_app.extensions
+            or not current_app.config.get('CATALOGO_CACHE_HABILITADO', True)):
+        return TablaPrecios(_precios_fuente(), fecha)
+    return current_app.extensions['motor_precios'].tabla(fecha)
+
+def cotizar(tipo_cliente, cantidad_kg, producto_id=None, subproducto_id=None, fecha=None):
+    """Cotiza un artículo (producto o subproducto). Devuelve una `Cotizacion` o None si no hay precio."""
+    return obtener_tabla_precios(fecha).cotizar(tipo_cliente, cantidad_kg, producto_id, subproducto_id)
+
+def cotizar_lote(items, tipo_cliente, fecha=None):
+    """Cotiza un carrito completo en una sola pasada sobre la misma tabla compilada.
+
+    `items` es un iterable de diccionarios con `cantidad_kg` y `producto_id` o
+    `subproducto_id`; cada uno puede traer su propio `tipo_cliente`. Devuelve
+    una lista de `Cotizacion` (o None para artículos sin precio) en el mismo orden.
+    """
+    return obtener_tabla_precios(fecha).cotizar_lote(items, tipo_cliente)
@@ -1,26 +1,53 @@
-from flask import render_template, flash, redirect, url_for, request, abort
+from flask import render_template, flash, redirect, url_for, request, abort, jsonify, Response
 from flask_login import login_required, current_user
 from app import db
 from app.productos import bp
 from app.models import Producto, Subproducto, Modificacion, Precio # Importar modelos si aún se necesitan para tipos o relaciones directas
 from app.productos.forms import ProductoForm, SubproductoForm, ModificacionForm # Importar los formularios
 from app.productos import services # Importar el módulo de servicios
+from app.productos.condicional import condicional_catalogo # 304 si el catálogo no cambió
+
+# --- Utilidades de listados ---
+
+def _leer_filtros_listado(con_categoria=False):
+    """Lee filtros y orden de la query string. Devuelve (kwargs para el servicio, filtros para la plantilla)."""
+    filtros = {}
+    kwargs = {}
+    activo = request.args.get('activo', '')
+    if activo in ('1', '0'):
+        filtros['activo'] = activo
+        kwargs['activo'] = activo == '1'
+    if con_categoria and request.args.get('categoria'):
+        filtros['categoria'] = kwargs['categoria'] = request.args['categoria']
+    if request.args.get('orden') == 'desc':
+        filtros['orden'] = 'desc'
+        kwargs['descendente'] = True
+    if request.args.get('tamano'):
+        filtros['tamano'] = kwargs['tamano'] = request.args['tamano']
+    return kwargs, filtros
 
 # --- Rutas para Productos Principales ---
 
 # Ruta para LISTAR productos
 @bp.route('/')
 @login_required
+@condicional_catalogo
 def listar_productos():
     if current_user.rol != 'ADMINISTRADOR':
         flash('No tienes permiso para acceder a esta sección.', 'danger')
         return redirect(url_for('index'))
 
-    # Usar la función de servicio para obtener los productos
-    productos_list = services.obtener_todos_los_productos()
+    # Obtener solo la página pedida (paginación por llave sobre el nombre)
+    kwargs, filtros = _leer_filtros_listado(con_categoria=True)
+    pagina = services.paginar_productos(
+        despues=request.args.get('despues'), antes=request.args.get('antes'), **kwargs
+    )
 
     return render_template('productos/listar_productos.html',
-                           productos=productos_list,
+                           productos=pagina.items,
+                           pagina=pagina,
+                           filtros=filtros,
+                           categorias=services.obtener_categorias_producto(),
                            title="Gestión de Productos")
 
 # Ruta para CREAR un nuevo producto
@@ -87,28 +114,24 @@ def editar_producto(producto_id):
 # Ruta para VER detalles de un producto
 @bp.route('/ver/<string:producto_id>')
 @login_required
+@condicional_catalogo
 def ver_producto(producto_id):
     if current_user.rol != 'ADMINISTRADOR': # O el rol que deba tener acceso a ver detalles
         flash('No tienes permiso para ver los detalles de este producto.', 'danger')
         return redirect(url_for('productos.listar_productos'))
 
-    # Usar la función de servicio para obtener el producto
-    producto = services.obtener_producto_por_id(producto_id)
+    # Obtener el árbol completo del producto (foto del catálogo o carga con número fijo de consultas)
+    producto = services.obtener_producto_del_catalogo(producto_id)
     if not producto:
         flash(f'Producto con ID "{producto_id}" no encontrado.', 'warning')
         return redirect(url_for('productos.listar_productos'))
 
-    # Usar funciones de servicio para obtener las relaciones
-    modificaciones_directas = services.obtener_modificaciones_para_producto(producto) # Asumiendo que agregamos esta función al servicio
-    subproductos_asociados = services.obtener_subproductos_para_producto(producto)
-    precios_del_producto = services.obtener_precios_para_producto(producto)
-
     return render_template('productos/ver_producto.html',
                            title=f"Detalle: {producto.nombre}",
                            producto=producto,
-                           modificaciones=modificaciones_directas,
-                           subproductos=subproductos_asociados,
-                           precios=precios_del_producto)
+                           modificaciones=producto.modificaciones,
+                           subproductos=producto.subproductos,
+                           precios=producto.precios)
 
 # --- Rutas para Subproductos ---
 
@@ -182,16 +205,22 @@ def editar_subproducto(subproducto_id):
 
 @bp.route('/modificaciones')
 @login_required
+@condicional_catalogo
 def listar_modificaciones():
     if current_user.rol != 'ADMINISTRADOR':
         flash('No tienes permiso para acceder a esta sección.', 'danger')
         return redirect(url_for('index')) # O a productos.listar_productos
 
-    # Usar la función de servicio para obtener las modificaciones
-    modificaciones_list = services.obtener_todas_las_modificaciones()
+    # Obtener solo la página pedida (paginación por llave sobre el nombre)
+    kwargs, filtros = _leer_filtros_listado()
+    pagina = services.paginar_modificaciones(
+        despues=request.args.get('despues'), antes=request.args.get('antes'), **kwargs
+    )
 
     return render_template('productos/listar_modificaciones.html',
-                           modificaciones=modificaciones_list,
+                           modificaciones=pagina.items,
+                           pagina=pagina,
+                           filtros=filtros,
                            title="Gestión de Modificaciones")
 
 @bp.route('/modificacion/crear', methods=['GET', 'POST'])
@@ -249,6 +278,64 @@ def editar_modificacion(modificacion_id):
                            form=form,
                            es_editar=True)
 
+# --- Búsqueda / autocompletado ---
+
+@bp.route('/buscar')
+@login_required
+def buscar():
+    # Disponible para cualquier usuario autenticado (los cajeros la usan en mostrador)
+    consulta = request.args.get('q', '').strip()
+    limite = request.args.get('limite', 20, type=int)
+    resultados = services.buscar_en_catalogo(consulta, limite)
+    for resultado in resultados:
+        if resultado['tipo'] == 'modificacion':
+            resultado['url'] = url_for('productos.editar_modificacion', modificacion_id=resultado['id'])
+        else:
+            resultado['url'] = url_for('productos.ver_producto', producto_id=resultado['producto_id'])
+    return jsonify({'q': consulta, 'resultados': resultados})
+
+# --- Hojas de precios ---
+
+# Hoja de precios de un tipo de cliente (JSON ya serializado) con ETag fuerte.
+# Las terminales la consultan con If-None-Match y reciben 304 mientras no cambien los precios.
+@bp.route('/precios/<tipo_cliente>')
+@login_required
+def hoja_precios(tipo_cliente):
+    hoja = services.obtener_hoja_precios(tipo_cliente)
+    if hoja is None:
+        abort(404)
+    if hoja.etag in request.if_none_match:
+        respuesta = Response(status=304)
+    else:
+        respuesta = Response(hoja.cuerpo, mimetype='application/json')
+    respuesta.set_etag(hoja.etag)
+    # Puede guardarse, pero siempre se revalida con el ETag antes de usarla
+    respuesta.headers['Cache-Control'] = 'private, no-cache'
+    return respuesta
+
+# Catálogo para la copia local de la PWA (IndexedDB): árbol completo con un cursor,
+# o con ?since=<cursor> solo lo que cambió desde entonces (ver productos/sincronizacion.py).
+@bp.route('/api/catalogo')
+@login_required
+def api_catalogo():
+    desde = request.args.get('since')
+    if desde is not None:
+        if not (desde.isascii() and desde.isdigit()): # isdigit() a secas acepta '²' o '٣', que int() rechaza
+            return jsonify({'errores': ['"since" debe ser un cursor devuelto por esta API.']}), 400
+        desde = int(desde)
+    respuesta = Response(services.obtener_catalogo_sincronizacion(desde), mimetype='application/json')
+    respuesta.headers['Cache-Control'] = 'private, no-store'
+    return respuesta
+
+# --- Diagnóstico ---
+
+@bp.route('/cache/estadisticas')
+@login_required
+def estadisticas_cache():
+    if current_user.rol != 'ADMINISTRADOR':
+        abort(403)
+    return jsonify(services.obtener_estadisticas_cache_catalogo())
+
 # Nota: Las rutas para eliminar productos, subproductos o modificaciones
 # seguirían un patrón similar, llamando a funciones de servicio como
 # services.eliminar_producto(producto_id), services.eliminar_subproducto(subproducto_id),
@@ -1,17 +1,224 @@
+import base64
+import json
+from dataclasses import dataclass
+from flask import current_app
 from app import db
-from app.models import Producto, Subproducto, Modificacion, Precio
+from sqlalchemy import select, or_, tuple_
+from app.models import (
+    Producto, Subproducto, Modificacion, Precio,
+    producto_modificacion_association, subproducto_modificacion_association
+)
+from app.productos import catalogo_cache, busqueda, hojas_precios, sincronizacion, fragmentos
+from app.productos.catalogo_cache import (
+    copiar_campos, ProductoSnapshot, SubproductoSnapshot, ModificacionSnapshot, PrecioSnapshot
+)
+
+# Las funciones de lectura sirven desde la foto en memoria del catálogo
+# (catalogo_cache) cuando está habilitada; si no, consultan la BD como antes.
+# Las funciones que devuelven objetos para editar siempre usan el ORM.
+
+# --- Paginación por llave (keyset / seek) ---
+# En lugar de OFFSET, cada página se pide "después de" (o "antes de") la última
+# fila vista, usando el índice de `nombre`. El costo de una página no depende
+# de qué tan profundo se navegue y solo se cargan `tamano` filas en memoria.
+
+TAMANO_PAGINA_DEFECTO = 50
+TAMANO_PAGINA_MAXIMO = 200
+
+@dataclass(frozen=True)
+class PaginaKeyset:
+    items: list
+    cursor_anterior: str # None si es la primera página
+    cursor_siguiente: str # None si es la última página
+    tamano: int
+
+def codificar_cursor(valores):
+    """Convierte los valores de la llave de orden en un cursor opaco apto para URL."""
+    crudo = json.dumps(list(valores), separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(crudo).decode('ascii').rstrip('=')
+
+def decodificar_cursor(cursor):
+    """Devuelve la lista de valores de un cursor, o None si está vacío o es inválido."""
+    if not cursor:
+        return None
+    try:
+        crudo = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        valores = json.loads(crudo.decode('utf-8'))
+    except (ValueError, UnicodeDecodeError):
+        return None
+    return valores if isinstance(valores, list) else None
+
+def _cursor_valido(cursor, columnas):
+    """Indica si los valores del cursor corresponden (en número y tipo) a las columnas de orden."""
+    if cursor is None or len(cursor) != len(columnas):
+        return False
+    for valor, columna in zip(cursor, columnas):
+        tipo = columna.type.python_type
+        if tipo is int:
+            if isinstance(valor, bool) or not isinstance(valor, int) or abs(valor) >= 2**63:
+                return False
+        elif tipo is not str or not isinstance(valor, str):
+            return False
+    return True
+
+def _normalizar_tamano(tamano):
+    try:
+        tamano = int(tamano)
+    except (TypeError, ValueError):
+        return TAMANO_PAGINA_DEFECTO
+    return max(1, min(tamano, TAMANO_PAGINA_MAXIMO))
+
+def _paginar_keyset(consulta, columnas, despues=None, antes=None, tamano=None, descendente=False):
+    """Ejecuta `consulta` paginada por las `columnas` de orden (la última debe desempatar)."""
+    tamano = _normalizar_tamano(tamano)
+    cursor = decodificar_cursor(antes or despues)
+    if not _cursor_valido(cursor, columnas): # Cursor editado a mano o de otra versión: primera página
+        cursor = None
+    hacia_atras = bool(antes) and cursor is not None
+
+    # Al retroceder se recorre en sentido inverso y luego se invierte el resultado
+    ascendente = descendente == hacia_atras
+    llave = tuple_(*columnas) if len(columnas) > 1 else columnas[0]
+    if cursor is not None:
+        valor = tuple_(*cursor) if len(columnas) > 1 else cursor[0]
+        consulta = consulta.where(llave > valor if ascendente else llave < valor)
+    orden = [col.asc() if ascendente else col.desc() for col in columnas]
+
+    filas = db.session.scalars(consulta.order_by(*orden).limit(tamano + 1)).all()
+    hay_mas = len(filas) > tamano
+    filas = filas[:tamano]
+    if hacia_atras:
+        filas.reverse()
+
+    def _cursor_de(obj):
+        return codificar_cursor(getattr(obj, col.key) for col in columnas)
+
+    if not filas:
+        return PaginaKeyset(items=[], cursor_anterior=None, cursor_siguiente=None, tamano=tamano)
+    if hacia_atras:
+        anterior = _cursor_de(filas[0]) if hay_mas else None
+        siguiente = _cursor_de(filas[-1])
+    else:
+        anterior = _cursor_de(filas[0]) if cursor is not None else None
+        siguiente = _cursor_de(filas[-1]) if hay_mas else None
+    return PaginaKeyset(items=filas, cursor_anterior=anterior, cursor_siguiente=siguiente, tamano=tamano)
 
 # --- Servicios para Productos ---
 
 def obtener_todos_los_productos():
     """Obtiene todos los productos ordenados por nombre."""
+    snapshot = catalogo_cache.obtener_snapshot()
+    if snapshot is not None:
+        return snapshot.productos
     return Producto.query.order_by(Producto.nombre.asc()).all()
 
+def paginar_productos(despues=None, antes=None, tamano=None, activo=None, categoria=None, descendente=False):
+    """Obtiene una página de productos ordenados por nombre (único), con filtros opcionales."""
+    consulta = select(Producto)
+    if activo is not None:
+        consulta = consulta.where(Producto.activo == activo)
+    if categoria:
+        consulta = consulta.where(Producto.categoria == categoria)
+    return _paginar_keyset(consulta, [Producto.nombre], despues, antes, tamano, descendente)
+
+def obtener_categorias_producto():
+    """Obtiene las categorías distintas en uso, ordenadas alfabéticamente."""
+    snapshot = catalogo_cache.obtener_snapshot()
+    if snapshot is not None:
+        return sorted({producto.categoria for producto in snapshot.productos})
+    return db.session.scalars(select(Producto.categoria).distinct().order_by(Producto.categoria)).all()
+
 def obtener_producto_por_id(producto_id):
     """Obtiene un producto por su ID."""
     # Usamos .upper() aquí también para consistencia con cómo se guarda
     return db.session.get(Producto, producto_id.upper())
 
+def obtener_producto_del_catalogo(producto_id):
+    """Obtiene el árbol de solo lectura de un producto (foto del catálogo si está disponible, si no la BD)."""
+    snapshot = catalogo_cache.obtener_snapshot()
+    if snapshot is not None:
+        return snapshot.productos_por_id.get(producto_id.upper())
+    return cargar_arbol_producto(producto_id)
+
+def cargar_arbol_producto(producto_id):
+    """Carga un producto con subproductos, modificaciones y precios en un número fijo de consultas.
+
+    Las relaciones del modelo son lazy='dynamic' y no admiten selectinload, así
+    que se aplica la misma estrategia a mano: una consulta por nivel filtrando
+    con IN por los IDs del nivel anterior. Son como máximo 5 consultas sin
+    importar cuántos subproductos tenga, lo que evita el N+1 de recorrer
+    `sub.modificaciones` en la plantilla.
+    Devuelve un ProductoSnapshot (mismos atributos que usan las plantillas) o None.
+    """
+    producto = db.session.get(Producto, producto_id.upper())
+    if producto is None:
+        return None
+
+    subproductos = db.session.scalars(
+        select(Subproducto)
+        .where(Subproducto.producto_padre_id == producto.id)
+        .order_by(Subproducto.nombre.asc())
+    ).all()
+    ids_subproductos = [sub.id for sub in subproductos]
+
+    # Modificaciones directas del producto y aplicables de todos sus subproductos
+    mods_producto = db.session.scalars(
+        select(Modificacion)
+        .join(producto_modificacion_association,
+              producto_modificacion_association.c.modificacion_id == Modificacion.id)
+        .where(producto_modificacion_association.c.producto_id == producto.id)
+        .order_by(Modificacion.nombre.asc())
+    ).all()
+    mods_por_subproducto = {}
+    if ids_subproductos:
+        filas = db.session.execute(
+            select(subproducto_modificacion_association.c.subproducto_id, Modificacion)
+            .join(Modificacion, subproducto_modificacion_association.c.modificacion_id == Modificacion.id)
+            .where(subproducto_modificacion_association.c.subproducto_id.in_(ids_subproductos))
+            .order_by(Modificacion.nombre.asc())
+        ).all()
+        for subproducto_id, mod in filas:
+            mods_por_subproducto.setdefault(subproducto_id, []).append(copiar_campos(ModificacionSnapshot, mod))
+
+    # Precios del producto y de sus subproductos en una sola consulta
+    condicion_precios = Precio.producto_id == producto.id
+    if ids_subproductos:
+        condicion_precios = or_(condicion_precios, Precio.subproducto_id.in_(ids_subproductos))
+    precios = db.session.scalars(
+        select(Precio)
+        .where(condicion_precios)
+        .order_by(Precio.tipo_cliente.asc(), Precio.cantidad_minima_kg.asc())
+    ).all()
+    precios_por_subproducto = {}
+    precios_producto = []
+    for precio in precios:
+        registro = copiar_campos(PrecioSnapshot, precio)
+        if precio.producto_id is not None:
+            precios_producto.append(registro)
+        else:
+            precios_por_subproducto.setdefault(precio.subproducto_id, []).append(registro)
+
+    return copiar_campos(
+        ProductoSnapshot, producto,
+        subproductos=tuple(
+            copiar_campos(
+                SubproductoSnapshot, sub,
+                modificaciones=tuple(mods_por_subproducto.get(sub.id, ())),
+                precios=tuple(precios_por_subproducto.get(sub.id, ()))
+            )
+            for sub in subproductos
+        ),
+        modificaciones=tuple(copiar_campos(ModificacionSnapshot, mod) for mod in mods_producto),
+        precios=tuple(precios_producto)
+    )
+
+def _snapshot_de(registro, indice):
+    """Busca el registro equivalente en la foto del catálogo (None si no está o la caché está desactivada)."""
+    snapshot = catalogo_cache.obtener_snapshot()
+    if snapshot is None or registro.id is None:
+        return None
+    return getattr(snapshot, indice).get(registro.id)
+
 def crear_producto(data):
     """Crea un nuevo producto."""
     nuevo_producto = Producto(
@@ -39,6 +246,9 @@ def actualizar_producto(producto, data):
 
 def obtener_subproductos_para_producto(producto):
     """Obtiene los subproductos asociados a un producto padre, ordenados por nombre."""
+    producto_snapshot = _snapshot_de(producto, 'productos_por_id')
+    if producto_snapshot is not None:
+        return producto_snapshot.subproductos
     # Asumimos que la relación 'subproductos' en el modelo Producto es lazy='dynamic' o similar
     return producto.subproductos.order_by(Subproducto.nombre.asc()).all()
 
@@ -72,8 +282,18 @@ def actualizar_subproducto(subproducto, data):
 
 def obtener_todas_las_modificaciones():
     """Obtiene todas las modificaciones ordenadas por nombre."""
+    snapshot = catalogo_cache.obtener_snapshot()
+    if snapshot is not None:
+        return snapshot.modificaciones
     return Modificacion.query.order_by(Modificacion.nombre.asc()).all()
 
+def paginar_modificaciones(despues=None, antes=None, tamano=None, activo=None, descendente=False):
+    """Obtiene una página de modificaciones ordenadas por nombre (el ID desempata nombres repetidos)."""
+    consulta = select(Modificacion)
+    if activo is not None:
+        consulta = consulta.where(Modificacion.activo == activo)
+    return _paginar_keyset(consulta, [Modificacion.nombre, Modificacion.id], despues, antes, tamano, descendente)
+
 def obtener_modificacion_por_id(modificacion_id):
     """Obtiene una modificación por su ID (entero)."""
     return db.session.get(Modificacion, modificacion_id)
@@ -101,12 +321,18 @@ def actualizar_modificacion(modificacion, data):
 
 def obtener_modificaciones_para_producto(producto):
     """Obtiene las modificaciones asociadas directamente a un producto, ordenadas por nombre."""
+    producto_snapshot = _snapshot_de(producto, 'productos_por_id')
+    if producto_snapshot is not None:
+        return producto_snapshot.modificaciones
     # Accede a la relación 'modificaciones_directas' definida en el modelo Producto
     # Como la relación es lazy='dynamic', .all() ejecuta la consulta
     return producto.modificaciones_directas.order_by(Modificacion.nombre.asc()).all()
 
 def obtener_modificaciones_para_subproducto(subproducto):
     """Obtiene las modificaciones aplicables a un subproducto, ordenadas por nombre."""
+    subproducto_snapshot = _snapshot_de(subproducto, 'subproductos_por_id')
+    if subproducto_snapshot is not None:
+        return subproducto_snapshot.modificaciones
     # Accede a la relación 'modificaciones_aplicables' definida en el modelo Subproducto
     return subproducto.modificaciones_aplicables.order_by(Modificacion.nombre.asc()).all()
 
@@ -114,7 +340,45 @@ def obtener_modificaciones_para_subproducto(subproducto):
 
 def obtener_precios_para_producto(producto):
     """Obtiene los precios asociados a un producto, ordenados por tipo de cliente y cantidad mínima."""
+    producto_snapshot = _snapshot_de(producto, 'productos_por_id')
+    if producto_snapshot is not None:
+        return producto_snapshot.precios
     # Asumimos que la relación 'precios' en el modelo Producto es lazy='dynamic' o similar
     return producto.precios.order_by(Precio.tipo_cliente.asc(), Precio.cantidad_minima_kg.asc()).all()
 
+# --- Búsqueda ---
+
+def buscar_en_catalogo(consulta, limite=busqueda.LIMITE_DEFECTO):
+    """Busca productos, subproductos y modificaciones por fragmentos de código, nombre o descripción."""
+    return busqueda.buscar(consulta, limite)
+
+# --- Hojas de precios ---
+
+def obtener_hoja_precios(tipo_cliente):
+    """Devuelve la hoja de precios materializada de `tipo_cliente` (o None si no tiene precios)."""
+    return hojas_precios.obtener_hoja(tipo_cliente.strip().upper())
+
+def obtener_catalogo_sincronizacion(desde=None):
+    """Devuelve el JSON del catálogo para la copia local de la PWA.
+
+    Con `desde` (cursor de una respuesta anterior) solo lo que cambió después;
+    si ese cursor ya no sirve, o sin él, el árbol completo.
+    """
+    if desde is not None:
+        cuerpo = sincronizacion.cambios_desde(desde)
+        if cuerpo is not None:
+            return cuerpo
+    return sincronizacion.catalogo_completo()
+
+# --- Estadísticas de la caché del catálogo ---
+
+def obtener_estadisticas_cache_catalogo():
+    """Devuelve contadores de aciertos/fallos/reconstrucciones de la caché del catálogo."""
+    cache = catalogo_cache.obtener_cache()
+    estadisticas = cache.estadisticas() if cache is not None else {}
+    estadisticas['habilitada'] = bool(current_app.config.get('CATALOGO_CACHE_HABILITADO', True))
+    estadisticas['hojas_precios'] = hojas_precios.obtener_estadisticas()
+    estadisticas['fragmentos'] = fragmentos.obtener_estadisticas()
+    return estadisticas
+
 # Puedes añadir más funciones de servicio según necesites (ej. para eliminar, buscar, etc.)
\ No newline at end of file
@@ -0,0 +1,224 @@
+"""Sincronización incremental del catálogo para la copia local de la PWA.
+
+El service worker guarda el catálogo en IndexedDB y lo mantiene al día con
+GET /productos/api/catalogo:
+
+* sin parámetros devuelve el árbol completo (productos con sus subproductos y
+  precios, y las modificaciones) y un `cursor`;
+* con `?since=<cursor>` devuelve solo los registros creados, modificados
+  (incluida la baja lógica, activo = False) o borrados desde ese cursor, y el
+  cursor nuevo. Si el cursor ya no sirve (cambios compactados, demasiados
+  cambios o una carga masiva de por medio) responde el árbol completo con
+  `completo: true`.
+
+El cursor es el id de la tabla `cambios_catalogo` (CambioCatalogo). Cada
+flush que toca Producto, Subproducto, Modificacion o Precio agrega una fila
+por registro en la misma transacción, así que un cambio y su registro se
+confirman o se descartan juntos. Los cambios en las tablas de asociación de
+modificaciones se registran como cambio del producto o subproducto. Las
+escrituras con sentencias Core (carga masiva, ver
+catalogo_cache.marcar_catalogo_modificado) no dicen qué filas tocaron: dejan
+un REINICIO que obliga a los clientes a bajar todo de nuevo.
+
+Los registros del delta se leen de la BD en el momento de responder, no de la
+fila de cambio: varios cambios del mismo registro se entregan una sola vez y
+siempre con su estado actual. Aplicar un registro dos veces no hace daño, por
+eso basta con leer el cursor antes que los datos.
+
+Nota: la numeración depende de que SQLite serializa las escrituras (un id
+menor nunca se confirma después de uno mayor).
+"""
+import json
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, event, func, inspect, insert, select
+from sqlalchemy.orm import Session
+
+from app import db
+from app.models import (
+    Producto, Subproducto, Modificacion, Precio, CambioCatalogo,
+    producto_modificacion_association, subproducto_modificacion_association
+)
+from app.productos import catalogo_cache
+
+GUARDADO = 'GUARDADO'
+BORRADO = 'BORRADO'
+REINICIO = 'REINICIO'
+
+# Entidad -> modelo, en el orden en que conviene aplicarlas en el cliente
+ENTIDADES = {
+    'modificacion': Modificacion,
+    'producto': Producto,
+    'subproducto': Subproducto,
+    'precio': Precio,
+}
+# Nombre de la lista de cada entidad en las respuestas
+LISTAS = {
+    'modificacion': 'modificaciones',
+    'producto': 'productos',
+    'subproducto': 'subproductos',
+    'precio': 'precios',
+}
+# Relación de modificaciones cuyo cambio cuenta como cambio del registro
+ASOCIACIONES = {
+    Producto: 'modificaciones_directas',
+    Subproducto: 'modificaciones_aplicables',
+}
+
+def _entidad_de(obj):
+    for entidad, modelo in ENTIDADES.items():
+        if isinstance(obj, modelo):
+            return entidad
+    return None
+
+def _cambio_en_asociacion(obj):
+    relacion = ASOCIACIONES.get(type(obj))
+    return relacion is not None and inspect(obj).attrs[relacion].history.has_changes()
+
+# --- Registro de cambios (eventos de sesión) ---
+
+@event.listens_for(Session, 'after_flush')
+def _registrar_cambios(session, flush_context):
+    cambios = {}
+    for obj in session.new:
+        if _entidad_de(obj):
+            cambios[(_entidad_de(obj), str(obj.id))] = GUARDADO
+    for obj in session.dirty:
+        if _entidad_de(obj) and (session.is_modified(obj, include_collections=False) or _cambio_en_asociacion(obj)):
+            cambios[(_entidad_de(obj), str(obj.id))] = GUARDADO
+    for obj in session.deleted:
+        if _entidad_de(obj):
+            cambios[(_entidad_de(obj), str(obj.id))] = BORRADO
+    if cambios:
+        session.connection().execute(insert(CambioCatalogo.__table__), [
+            {'entidad': entidad, 'clave': clave, 'operacion': operacion, 'fecha': datetime.utcnow()}
+            for (entidad, clave), operacion in cambios.items()
+        ])
+
+@event.listens_for(Session, 'before_commit')
+def _registrar_reinicio(session):
+    if session.info.pop('catalogo_escritura_core', False):
+        session.connection().execute(insert(CambioCatalogo.__table__), [
+            {'entidad': 'catalogo', 'clave': None, 'operacion': REINICIO, 'fecha': datetime.utcnow()}
+        ])
+
+@event.listens_for(Session, 'after_soft_rollback')
+def _descartar_reinicio(session, previous_transaction):
+    session.info.pop('catalogo_escritura_core', None)
+
+# --- Registros que se envían ---
+
+def _valor(valor):
+    return valor.isoformat() if isinstance(valor, (date, datetime)) else valor
+
+def _registro(entidad, origen, modificaciones=None):
+    """Campos de la tabla de `entidad` tomados de una fila o de un registro de la foto."""
+    registro = {columna.key: _valor(getattr(origen, columna.key)) for columna in ENTIDADES[entidad].__table__.columns}
+    if modificaciones is not None:
+        registro['modificaciones'] = sorted(modificaciones)
+    return registro
+
+def _arbol(snapshot):
+    productos = []
+    for producto in snapshot.productos:
+        subproductos = []
+        for sub in producto.subproductos:
+            registro = _registro('subproducto', sub, [m.id for m in sub.modificaciones])
+            registro['precios'] = [_registro('precio', precio) for precio in sub.precios]
+            subproductos.append(registro)
+        registro = _registro('producto', producto, [m.id for m in producto.modificaciones])
+        registro['subproductos'] = subproductos
+        registro['precios'] = [_registro('precio', precio) for precio in producto.precios]
+        productos.append(registro)
+    return {
+        'cursor': snapshot.cursor_cambios,
+        'completo': True,
+        'modificaciones': [_registro('modificacion', mod) for mod in snapshot.modificaciones],
+        'productos': productos,
+    }
+
+def _serializar(documento):
+    return json.dumps(documento, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def init_app(app):
+    # (versión del catálogo, cuerpo del árbol completo ya serializado)
+    app.extensions['sincronizacion_catalogo'] = (None, None)
+
+def catalogo_completo():
+    """Cuerpo JSON del árbol completo. Con la caché del catálogo se serializa una vez por versión."""
+    snapshot = catalogo_cache.obtener_snapshot()
+    if snapshot is None:
+        return _serializar(_arbol(catalogo_cache.construir_snapshot(catalogo_cache.version_catalogo())))
+    version, cuerpo = current_app.extensions['sincronizacion_catalogo']
+    if version != snapshot.version:
+        cuerpo = _serializar(_arbol(snapshot))
+        current_app.extensions['sincronizacion_catalogo'] = (snapshot.version, cuerpo)
+    return cuerpo
+
+def _id(entidad, clave):
+    """La clave del registro de cambios con el tipo del id del modelo (Producto usa códigos de texto)."""
+    return clave if entidad == 'producto' else int(clave)
+
+def _leer_registros(conn, entidad, claves):
+    modelo = ENTIDADES[entidad]
+    ids = [_id(entidad, clave) for clave in claves]
+    filas = conn.execute(select(modelo.__table__).where(modelo.id.in_(ids))).all()
+    asociacion = {'producto': producto_modificacion_association,
+                  'subproducto': subproducto_modificacion_association}.get(entidad)
+    if asociacion is None:
+        return [_registro(entidad, fila) for fila in filas]
+    columna = asociacion.c.producto_id if entidad == 'producto' else asociacion.c.subproducto_id
+    modificaciones = {}
+    for registro_id, modificacion_id in conn.execute(
+            select(columna, asociacion.c.modificacion_id).where(columna.in_(ids))):
+        modificaciones.setdefault(registro_id, []).append(modificacion_id)
+    return [_registro(entidad, fila, modificaciones.get(fila.id, ())) for fila in filas]
+
+def cambios_desde(desde):
+    """Cuerpo JSON con lo que cambió después del cursor `desde`, o None si hay que mandar el árbol completo."""
+    maximo = current_app.config.get('SINCRONIZACION_MAX_CAMBIOS', 2000)
+    with db.engine.connect() as conn:
+        cursor, primero = conn.execute(select(func.max(CambioCatalogo.id), func.min(CambioCatalogo.id))).one()
+        cursor = cursor or 0
+        if desde > cursor:
+            return None # Cursor de otra BD (o de antes de restaurar un respaldo)
+        if desde < cursor and primero > desde + 1:
+            return None # Los cambios siguientes al cursor ya se compactaron
+        filas = conn.execute(
+            select(CambioCatalogo.entidad, CambioCatalogo.clave, CambioCatalogo.operacion)
+            .where(CambioCatalogo.id > desde, CambioCatalogo.id <= cursor)
+            .order_by(CambioCatalogo.id)
+            .limit(maximo + 1)
+        ).all()
+        if len(filas) > maximo or any(fila.operacion == REINICIO for fila in filas):
+            return None
+
+        ultimos = {}
+        for fila in filas:
+            ultimos[(fila.entidad, fila.clave)] = fila.operacion
+        documento = {'cursor': cursor, 'completo': False}
+        eliminados = {}
+        for entidad, lista in LISTAS.items():
+            guardados = [clave for (ent, clave), operacion in ultimos.items() if ent == entidad and operacion == GUARDADO]
+            registros = _leer_registros(conn, entidad, guardados) if guardados else []
+            documento[lista] = registros
+            # Lo que se guardó y ya no existe se borró después del cursor: se informa como borrado
+            vigentes = {str(registro['id']) for registro in registros}
+            eliminados[lista] = sorted(
+                _id(entidad, clave) for (ent, clave) in ultimos if ent == entidad and clave not in vigentes
+            )
+        documento['eliminados'] = eliminados
+    return _serializar(documento)
+
+def compactar(dias):
+    """Borra los cambios de más de `dias` días (sin commit). Siempre conserva el último. Devuelve cuántos borró."""
+    limite = datetime.utcnow() - timedelta(days=dias)
+    ultimo = db.session.execute(select(func.max(CambioCatalogo.id))).scalar()
+    frontera = db.session.execute(
+        select(func.max(CambioCatalogo.id)).where(CambioCatalogo.fecha < limite, CambioCatalogo.id < ultimo)
+    ).scalar() if ultimo else None
+    if frontera is None:
+        return 0
+    # Por id y no por fecha: lo compactado es siempre un prefijo y un hueco delata un cursor viejo
+    return db.session.execute(delete(CambioCatalogo).where(CambioCatalogo.id <= frontera)).rowcount
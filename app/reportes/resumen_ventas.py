@@ -0,0 +1,170 @@
+"""Mantenimiento de los resúmenes diarios de ventas.
+
+`ventas_diarias` (por pedido), `ventas_diarias_articulos` (por artículo) y
+`ventas_mensuales_articulos` (por artículo y mes) se actualizan con un UPSERT
+por conjuntos dentro de la misma transacción en la que se insertan los
+pedidos (app/pedidos/services.py), así que quedan confirmados o revertidos
+junto con ellos. Los reportes leen solo estas tablas
+(ver app/reportes/services.py).
+
+`reconstruir(desde, hasta)` recalcula un rango de días desde las tablas de
+pedidos con INSERT ... SELECT; sirve para cargas históricas o si algún pedido
+entró sin pasar por el servicio.
+
+El día de un pedido es la fecha de `fecha_pedido` (UTC) más
+VENTAS_DESFASE_HORAS.
+"""
+from datetime import datetime, time, timedelta
+from functools import lru_cache
+
+from flask import current_app, has_app_context
+from sqlalchemy import delete, func, insert, select
+
+from app import db
+from app.models import (Pedido, PedidoItem, Subproducto, ventas_diarias, ventas_diarias_articulos,
+                        ventas_mensuales_articulos)
+
+def desfase_horas():
+    return int(current_app.config.get('VENTAS_DESFASE_HORAS', 0)) if has_app_context() else 0
+
+def dia_de(fecha_pedido):
+    """Día de venta de un `fecha_pedido` (datetime UTC)."""
+    return (fecha_pedido + timedelta(hours=desfase_horas())).date()
+
+# Columnas llave y métricas de cada resumen
+LLAVES_PEDIDO = ('fecha', 'tipo_cliente', 'usuario_id')
+METRICAS_PEDIDO = ('pedidos', 'importe_items', 'importe_adicionales', 'total')
+LLAVES_ARTICULO = ('producto_id', 'subproducto_id', 'tipo_cliente', 'usuario_id')
+METRICAS_ARTICULO = ('items', 'cantidad_kg', 'importe')
+
+def mes_de(fecha):
+    return fecha.strftime('%Y-%m')
+
+def primer_dia_mes_siguiente(fecha):
+    return (fecha.replace(day=28) + timedelta(days=4)).replace(day=1)
+
+@lru_cache(maxsize=None)
+def _sentencia_suma(tabla, llaves, metricas):
+    """UPSERT que inserta las llaves nuevas y suma las métricas a las existentes.
+
+    Es SQL del driver con parámetros posicionales: un lote de pedidos genera
+    cientos de filas de resumen y armar/compilar la sentencia y procesar los
+    parámetros con SQLAlchemy costaba más que ejecutarla.
+    """
+    columnas = (*llaves, *metricas)
+    return (
+        f"INSERT INTO {tabla.name} ({', '.join(columnas)}) VALUES ({', '.join('?' * len(columnas))}) "
+        f"ON CONFLICT ({', '.join(llaves)}) DO UPDATE SET "
+        + ', '.join(f"{columna} = {columna} + excluded.{columna}" for columna in metricas)
+    )
+
+def _sumar(conn, tabla, llaves, metricas, acumulados):
+    """UPSERT por conjuntos de `acumulados` (llave -> valores de las métricas)."""
+    if acumulados:
+        conn.exec_driver_sql(
+            _sentencia_suma(tabla, llaves, metricas),
+            [(*llave, *valores) for llave, valores in acumulados.items()]
+        )
+
+def acumular_pedidos(conn, pedidos, padres):
+    """Suma al resumen un lote de pedidos recién insertados (en la transacción de `conn`).
+
+    `pedidos` es una lista de (pedido, items) con los diccionarios que se
+    insertaron; `padres` mapea subproducto_id -> producto_id del padre.
+    """
+    por_pedido = {} # (fecha, tipo_cliente, usuario_id) -> [pedidos, items, adicionales, total]
+    por_articulo = {} # (fecha, producto_id, subproducto_id, tipo_cliente, usuario_id) -> [items, kg, importe]
+    for pedido, items in pedidos:
+        fecha = dia_de(pedido['fecha_pedido']).isoformat() # Como guarda SQLAlchemy las columnas Date
+        clave = (fecha, pedido['tipo_cliente'], pedido['usuario_id'])
+        acumulado = por_pedido.setdefault(clave, [0, 0.0, 0.0, 0.0])
+        acumulado[0] += 1
+        acumulado[1] += pedido['subtotal_items']
+        acumulado[2] += pedido['subtotal_adicionales']
+        acumulado[3] += pedido['total']
+        for item in items:
+            if item['subproducto_id'] is not None:
+                articulo = (padres[item['subproducto_id']], item['subproducto_id'])
+            else:
+                articulo = (item['producto_id'], 0)
+            acumulado = por_articulo.setdefault((fecha, *articulo, *clave[1:]), [0, 0.0, 0.0])
+            acumulado[0] += 1
+            acumulado[1] += item['cantidad_kg']
+            acumulado[2] += item['subtotal']
+
+    por_mes = {}
+    for (fecha, *resto), valores in por_articulo.items():
+        acumulado = por_mes.setdefault((fecha[:7], *resto), [0, 0.0, 0.0])
+        for i, valor in enumerate(valores):
+            acumulado[i] += valor
+
+    _sumar(conn, ventas_diarias, LLAVES_PEDIDO, METRICAS_PEDIDO, por_pedido)
+    _sumar(conn, ventas_diarias_articulos, ('fecha', *LLAVES_ARTICULO), METRICAS_ARTICULO, por_articulo)
+    _sumar(conn, ventas_mensuales_articulos, ('mes', *LLAVES_ARTICULO), METRICAS_ARTICULO, por_mes)
+
+def reconstruir(desde=None, hasta=None):
+    """Recalcula los resúmenes de los días [desde, hasta] (todos si se omiten) desde los pedidos.
+
+    Se ejecuta en la transacción de la sesión (sin commit). Devuelve
+    (filas de ventas_diarias, filas de ventas_diarias_articulos) escritas.
+    """
+    conn = db.session.connection()
+    desfase = desfase_horas()
+    dia = func.date(Pedido.fecha_pedido, f'{desfase:+d} hours')
+
+    # El rango de días se traduce a un rango de fecha_pedido para usar su índice
+    filtros_pedido = []
+    filtros_resumen = [[], []]
+    if desde is not None:
+        filtros_pedido.append(Pedido.fecha_pedido >= datetime.combine(desde, time.min) - timedelta(hours=desfase))
+        filtros_resumen[0].append(ventas_diarias.c.fecha >= desde)
+        filtros_resumen[1].append(ventas_diarias_articulos.c.fecha >= desde)
+    if hasta is not None:
+        filtros_pedido.append(
+            Pedido.fecha_pedido < datetime.combine(hasta + timedelta(days=1), time.min) - timedelta(hours=desfase)
+        )
+        filtros_resumen[0].append(ventas_diarias.c.fecha <= hasta)
+        filtros_resumen[1].append(ventas_diarias_articulos.c.fecha <= hasta)
+
+    conn.execute(delete(ventas_diarias).where(*filtros_resumen[0]))
+    conn.execute(delete(ventas_diarias_articulos).where(*filtros_resumen[1]))
+
+    por_pedido = select(
+        dia, Pedido.tipo_cliente, Pedido.usuario_id, func.count(),
+        func.sum(Pedido.subtotal_items), func.sum(Pedido.subtotal_adicionales), func.sum(Pedido.total)
+    ).where(*filtros_pedido).group_by(dia, Pedido.tipo_cliente, Pedido.usuario_id)
+    filas_pedido = conn.execute(
+        insert(ventas_diarias).from_select([*LLAVES_PEDIDO, *METRICAS_PEDIDO], por_pedido)
+    ).rowcount
+
+    producto = func.coalesce(PedidoItem.producto_id, Subproducto.producto_padre_id)
+    subproducto = func.coalesce(PedidoItem.subproducto_id, 0)
+    por_articulo = select(
+        dia, producto, subproducto, Pedido.tipo_cliente, Pedido.usuario_id,
+        func.count(), func.sum(PedidoItem.cantidad_kg), func.sum(PedidoItem.subtotal)
+    ).select_from(PedidoItem).join(Pedido, Pedido.id == PedidoItem.pedido_id).outerjoin(
+        Subproducto, Subproducto.id == PedidoItem.subproducto_id
+    ).where(*filtros_pedido).group_by(dia, producto, subproducto, Pedido.tipo_cliente, Pedido.usuario_id)
+    filas_articulo = conn.execute(
+        insert(ventas_diarias_articulos).from_select(['fecha', *LLAVES_ARTICULO, *METRICAS_ARTICULO], por_articulo)
+    ).rowcount
+
+    # Los meses tocados por el rango se recalculan completos desde el resumen diario, ya al día
+    diario = ventas_diarias_articulos
+    mes = func.strftime('%Y-%m', diario.c.fecha)
+    filtros_mes = [[], []]
+    if desde is not None:
+        filtros_mes[0].append(ventas_mensuales_articulos.c.mes >= mes_de(desde))
+        filtros_mes[1].append(diario.c.fecha >= desde.replace(day=1))
+    if hasta is not None:
+        filtros_mes[0].append(ventas_mensuales_articulos.c.mes <= mes_de(hasta))
+        filtros_mes[1].append(diario.c.fecha < primer_dia_mes_siguiente(hasta))
+    conn.execute(delete(ventas_mensuales_articulos).where(*filtros_mes[0]))
+    llaves = [diario.c[columna] for columna in LLAVES_ARTICULO]
+    por_mes = select(
+        mes, *llaves, *(func.sum(diario.c[columna]) for columna in METRICAS_ARTICULO)
+    ).where(*filtros_mes[1]).group_by(mes, *llaves)
+    conn.execute(
+        insert(ventas_mensuales_articulos).from_select(['mes', *LLAVES_ARTICULO, *METRICAS_ARTICULO], por_mes)
+    )
+    return filas_pedido, filas_articulo
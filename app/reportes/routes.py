@@ -0,0 +1,37 @@
+from datetime import date
+
+from flask import request, abort, jsonify
+from flask_login import login_required, current_user
+from app.reportes import bp
+from app.reportes import services # Importar el módulo de servicios
+
+def _fecha(nombre, defecto):
+    valor = request.args.get(nombre)
+    if not valor:
+        return defecto
+    try:
+        return date.fromisoformat(valor)
+    except ValueError:
+        raise services.ReporteInvalido(f"'{nombre}' debe tener formato AAAA-MM-DD.")
+
+# Ruta de VENTAS desde los resúmenes diarios:
+# ?desde=AAAA-MM-DD&hasta=AAAA-MM-DD&agrupar=fecha,producto&tipo_cliente=&usuario_id=&producto_id=
+@bp.route('/ventas')
+@login_required
+def ventas():
+    if current_user.rol != 'ADMINISTRADOR':
+        abort(403)
+    desde_defecto, hasta_defecto = services.rango_por_defecto()
+    agrupar = [d.strip() for d in request.args.get('agrupar', 'fecha').split(',') if d.strip()]
+    try:
+        desde = _fecha('desde', desde_defecto)
+        hasta = _fecha('hasta', hasta_defecto)
+        filas = services.ventas(
+            desde, hasta, agrupar,
+            tipo_cliente=request.args.get('tipo_cliente') or None,
+            usuario_id=request.args.get('usuario_id', type=int),
+            producto_id=request.args.get('producto_id') or None
+        )
+    except services.ReporteInvalido as e:
+        return jsonify({'errores': [str(e)]}), 400
+    return jsonify({'desde': desde.isoformat(), 'hasta': hasta.isoformat(), 'agrupar': agrupar, 'filas': filas})
@@ -0,0 +1,160 @@
+"""Reportes de ventas que leen solo los resúmenes diarios.
+
+Las consultas agrupan las filas de `ventas_diarias` o
+`ventas_diarias_articulos` (una por día y combinación de dimensiones), nunca
+las tablas de pedidos, así que un año de ventas son unos cuantos miles de
+filas sin importar cuántos pedidos hubo. Los nombres de productos salen de la
+foto del catálogo y los de usuarios de una sola consulta.
+"""
+from datetime import date, timedelta
+
+from sqlalchemy import func, select, union_all
+
+from app import db
+from app.models import Usuario, ventas_diarias, ventas_diarias_articulos, ventas_mensuales_articulos
+from app.productos import catalogo_cache
+from app.reportes.resumen_ventas import LLAVES_ARTICULO, METRICAS_ARTICULO, mes_de, primer_dia_mes_siguiente
+
+# Dimensiones por las que se puede agrupar; 'producto' y 'articulo' requieren el resumen por artículo
+DIMENSIONES = ('fecha', 'mes', 'tipo_cliente', 'usuario', 'producto', 'articulo')
+DIMENSIONES_ARTICULO = ('producto', 'articulo')
+
+MAX_DIAS_REPORTE = 366 * 3
+
+class ReporteInvalido(ValueError):
+    """Parámetros de reporte inválidos."""
+
+def _columnas(tabla, dimension):
+    """Columnas (etiquetadas) de una dimensión sobre `tabla`."""
+    if dimension == 'fecha':
+        return [tabla.c.fecha.label('fecha')]
+    if dimension == 'mes':
+        return [tabla.c.mes if 'mes' in tabla.c else func.strftime('%Y-%m', tabla.c.fecha).label('mes')]
+    if dimension == 'tipo_cliente':
+        return [tabla.c.tipo_cliente]
+    if dimension == 'usuario':
+        return [tabla.c.usuario_id]
+    if dimension == 'producto':
+        return [tabla.c.producto_id]
+    return [tabla.c.producto_id, tabla.c.subproducto_id] # articulo
+
+def _validar(desde, hasta, agrupar):
+    if desde > hasta:
+        raise ReporteInvalido("'desde' no puede ser posterior a 'hasta'.")
+    if (hasta - desde).days >= MAX_DIAS_REPORTE:
+        raise ReporteInvalido(f'El rango máximo es de {MAX_DIAS_REPORTE} días.')
+    desconocidas = [d for d in agrupar if d not in DIMENSIONES]
+    if desconocidas:
+        raise ReporteInvalido(f"Dimensiones no válidas: {', '.join(desconocidas)}. Usa: {', '.join(DIMENSIONES)}.")
+    if 'fecha' in agrupar and 'mes' in agrupar:
+        raise ReporteInvalido("Agrupa por 'fecha' o por 'mes', no por ambas.")
+
+def ventas(desde, hasta, agrupar=('fecha',), tipo_cliente=None, usuario_id=None, producto_id=None):
+    """Ventas entre `desde` y `hasta` (inclusive) agrupadas por `agrupar`.
+
+    Sin dimensiones de artículo ni filtro de producto se lee `ventas_diarias`
+    (pedidos, importes y total); si no, el resumen por artículo (items, kilos e
+    importe): el diario si se agrupa por fecha y, si no, los meses completos
+    del mensual más los días sueltos de los extremos. Devuelve una lista de
+    diccionarios ordenada por las dimensiones.
+    """
+    agrupar = tuple(dict.fromkeys(agrupar)) # Sin repetidos, en el orden pedido
+    _validar(desde, hasta, agrupar)
+    por_articulo = producto_id is not None or any(d in DIMENSIONES_ARTICULO for d in agrupar)
+    if 'producto' in agrupar and 'articulo' in agrupar:
+        agrupar = tuple(d for d in agrupar if d != 'producto')
+
+    filtros = {'tipo_cliente': tipo_cliente, 'usuario_id': usuario_id, 'producto_id': producto_id}
+    if por_articulo:
+        if 'fecha' in agrupar:
+            tabla = ventas_diarias_articulos
+            condiciones = _filtros(tabla, filtros) + [tabla.c.fecha >= desde, tabla.c.fecha <= hasta]
+        else:
+            tabla = _articulos_por_tramos(desde, hasta, filtros)
+            condiciones = []
+        metricas = [
+            func.sum(tabla.c['items']).label('items'),
+            func.round(func.sum(tabla.c.cantidad_kg), 3).label('cantidad_kg'),
+            func.round(func.sum(tabla.c.importe), 2).label('importe'),
+        ]
+    else:
+        tabla = ventas_diarias
+        condiciones = _filtros(tabla, filtros) + [tabla.c.fecha >= desde, tabla.c.fecha <= hasta]
+        metricas = [
+            func.sum(tabla.c.pedidos).label('pedidos'),
+            func.round(func.sum(tabla.c.importe_items), 2).label('importe_items'),
+            func.round(func.sum(tabla.c.importe_adicionales), 2).label('importe_adicionales'),
+            func.round(func.sum(tabla.c.total), 2).label('total'),
+        ]
+
+    dimensiones = [columna for dimension in agrupar for columna in _columnas(tabla, dimension)]
+    consulta = select(*dimensiones, *metricas).where(*condiciones)
+    if dimensiones:
+        consulta = consulta.group_by(*dimensiones).order_by(*dimensiones)
+    filas = [dict(fila) for fila in db.session.execute(consulta).mappings()]
+    if not dimensiones and filas and filas[0][metricas[0].name] is None:
+        filas = [] # Agregado sin filas en el rango
+
+    for fila in filas:
+        if isinstance(fila.get('fecha'), date):
+            fila['fecha'] = fila['fecha'].isoformat()
+    _agregar_nombres(filas, agrupar)
+    return filas
+
+def _filtros(tabla, filtros):
+    return [tabla.c[columna] == valor for columna, valor in filtros.items() if valor is not None]
+
+def _articulos_por_tramos(desde, hasta, filtros):
+    """Subconsulta con el resumen por artículo del rango, con el mes como periodo.
+
+    Los meses completos salen de `ventas_mensuales_articulos` y solo los días
+    sueltos de los extremos de `ventas_diarias_articulos`.
+    """
+    inicio_meses = desde if desde.day == 1 else primer_dia_mes_siguiente(desde)
+    siguiente = hasta + timedelta(days=1)
+    fin_meses = siguiente if siguiente.day == 1 else hasta.replace(day=1)
+    diario = ventas_diarias_articulos
+    columnas_diario = [func.strftime('%Y-%m', diario.c.fecha).label('mes')] + \
+        [diario.c[columna] for columna in (*LLAVES_ARTICULO, *METRICAS_ARTICULO)]
+    if inicio_meses >= fin_meses: # El rango no cubre ningún mes completo
+        return select(*columnas_diario).where(
+            diario.c.fecha >= desde, diario.c.fecha <= hasta, *_filtros(diario, filtros)
+        ).subquery()
+
+    mensual = ventas_mensuales_articulos
+    partes = [select(mensual).where(
+        mensual.c.mes >= mes_de(inicio_meses), mensual.c.mes < mes_de(fin_meses), *_filtros(mensual, filtros)
+    )]
+    if desde < inicio_meses:
+        partes.append(select(*columnas_diario).where(
+            diario.c.fecha >= desde, diario.c.fecha < inicio_meses, *_filtros(diario, filtros)
+        ))
+    if fin_meses <= hasta:
+        partes.append(select(*columnas_diario).where(
+            diario.c.fecha >= fin_meses, diario.c.fecha <= hasta, *_filtros(diario, filtros)
+        ))
+    return union_all(*partes).subquery()
+
+def _agregar_nombres(filas, agrupar):
+    """Nombres de producto/subproducto (foto del catálogo) y de usuario (una consulta)."""
+    if 'producto' in agrupar or 'articulo' in agrupar:
+        catalogo = catalogo_cache.obtener_snapshot()
+        if catalogo is None:
+            catalogo = catalogo_cache.construir_snapshot(catalogo_cache.version_catalogo())
+        for fila in filas:
+            producto = catalogo.productos_por_id.get(fila['producto_id'])
+            fila['producto'] = producto.nombre if producto else None
+            if fila.get('subproducto_id'):
+                subproducto = catalogo.subproductos_por_id.get(fila['subproducto_id'])
+                fila['subproducto'] = subproducto.nombre if subproducto else None
+    if 'usuario' in agrupar and filas:
+        nombres = dict(db.session.execute(
+            select(Usuario.id, Usuario.username).where(Usuario.id.in_({fila['usuario_id'] for fila in filas}))
+        ).all())
+        for fila in filas:
+            fila['usuario'] = nombres.get(fila['usuario_id'])
+
+def rango_por_defecto(hoy=None):
+    """Últimos 30 días, incluido hoy."""
+    hoy = hoy or date.today()
+    return hoy - timedelta(days=29), hoy
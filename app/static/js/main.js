@@ -21,6 +21,13 @@ document.addEventListener('DOMContentLoaded', function() {
                 console.log('Fallo en el registro del Service Worker:', err);
             });
         });
+
+        // Al volver la conexión, pedir al Service Worker que envíe los pedidos capturados sin red
+        window.addEventListener('online', function() {
+            if (navigator.serviceWorker.controller) {
+                navigator.serviceWorker.controller.postMessage({ tipo: 'sincronizar-pedidos' });
+            }
+        });
     } else {
         console.log('Tu navegador no soporta Service Workers.');
     }
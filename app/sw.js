@@ -1,5 +1,6 @@
-// Nombre de la caché. Se recomienda versionar el nombre.
-const CACHE_NAME = 'polleria-mvp-cache-v4'; // Incrementa la versión para forzar la actualización
+// CACHE_NAME y PRECACHE los antepone el servidor al servir /sw.js (ver app/estaticos.py):
+// la versión de la caché y las URLs con huella salen del manifiesto de
+// `flask construir-estaticos`. Cambia cualquier recurso -> nueva versión -> la caché anterior se elimina.
 
 // Lista de archivos esenciales que forman el "app shell"
 // Estos archivos se cachearán durante la instalación del Service Worker
@@ -7,16 +8,7 @@ const urlsToCache = [
     // '/', // Eliminar la página de inicio de la caché inicial si usas Network-first para HTML
     // '/dashboard', // Eliminar páginas HTML de la caché inicial
     // '/auth/login', // Eliminar páginas HTML de la caché inicial
-    '/static/css/estilo.css',
-    '/static/js/main.js',
-    '/static/img/logo.png', // Tu logo principal si se usa directamente
-    '/static/img/logo-48x48.png', // Iconos del manifest
-    '/static/img/logo-72x72.png',
-    '/static/img/logo-96x96.png',
-    '/static/img/logo-144x144.png',
-    '/static/img/logo-168x168.png',
-    '/static/img/logo-192x192.png',
-    '/static/img/logo-512x512.png',
+    ...PRECACHE, // CSS, JS, logo e iconos (con huella de contenido si se construyó el manifiesto)
     // Añadir recursos externos que son parte del app shell visual
     'https://cdnjs.cloudflare.com/ajax/libs/moment.js/2.29.4/moment-with-locales.min.js',
     'https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap',
@@ -67,15 +59,31 @@ self.addEventListener('activate', (event) => {
 // Aquí interceptamos las solicitudes y decidimos cómo responder (desde caché o red).
 self.addEventListener('fetch', (event) => {
     // console.log('[Service Worker] Interceptando fetch:', event.request.url);
+    const url = new URL(event.request.url);
+
+    // Captura de pedidos: con clave de idempotencia y a la cola si no hay conexión
+    if (event.request.method === 'POST' && url.origin === self.location.origin && url.pathname === URL_PEDIDO) {
+        event.respondWith(capturarPedido(event.request));
+        return;
+    }
+    if (event.request.method !== 'GET') {
+        return; // Otros envíos van directo a la red
+    }
 
     // Estrategia para solicitudes de navegación (HTML): Network-first, luego cache
     if (event.request.mode === 'navigate') {
         event.respondWith(
-            fetch(event.request)
-                .then((networkResponse) => {
+            fetchNavegacion(event.request)
+                .then(({ networkResponse, revalidada }) => {
                     // Si la solicitud de red es exitosa, devuelve la respuesta de red
                     // Opcional: Cachear la respuesta de red para usarla como fallback offline
                     if (networkResponse.status === 200) {
+                         // Hay conexión: aprovechar para vaciar la cola de pedidos
+                         event.waitUntil(sincronizarPedidos().catch(() => 0));
+                         event.waitUntil(sincronizarCatalogo().catch(() => 0));
+                         if (revalidada) {
+                             return networkResponse; // El servidor respondió 304: la copia guardada sigue vigente
+                         }
                          const responseToCache = networkResponse.clone();
                          caches.open(CACHE_NAME).then((cache) => {
                              cache.put(event.request, responseToCache);
@@ -146,5 +154,313 @@ self.addEventListener('fetch', (event) => {
     }
 });
 
+// --- Revalidación de páginas ---
+// Si la copia guardada de una página trae ETag (páginas del catálogo), se pide con
+// If-None-Match: mientras el catálogo no cambie, el servidor responde 304 sin cuerpo
+// ni trabajo y se sirve la copia guardada. Resuelve { networkResponse, revalidada }.
+function fetchNavegacion(request) {
+    return caches.match(request, { ignoreVary: true }).then((guardada) => {
+        const etag = guardada && guardada.headers.get('ETag');
+        if (!etag) {
+            return fetch(request).then((networkResponse) => ({ networkResponse, revalidada: false }));
+        }
+        return fetch(request.url, {
+            credentials: 'same-origin',
+            redirect: 'manual',
+            headers: { 'If-None-Match': etag },
+        }).then((respuesta) => {
+            if (respuesta.status === 304) {
+                return { networkResponse: guardada, revalidada: true };
+            }
+            if (respuesta.type === 'opaqueredirect') {
+                // Sesión vencida o sin permiso: se repite como navegación normal para seguir la redirección
+                return fetch(request).then((networkResponse) => ({ networkResponse, revalidada: false }));
+            }
+            return { networkResponse: respuesta, revalidada: false };
+        });
+    });
+}
+
 // Puedes añadir más eventos y estrategias de caché según necesites
 // (ej. network-first para APIs, stale-while-revalidate para recursos que cambian a menudo)
+
+
+// --- Cola de pedidos sin conexión ---
+// Todo POST a /pedidos/ sale con `clave_idempotencia` (se genera aquí si la página
+// no la puso) y `capturado_en`. Si la red falla, el pedido se guarda en IndexedDB y
+// se responde 202; la cola se envía por lotes a /pedidos/sincronizar (una
+// transacción por lote) al volver la conexión. El servidor ignora las claves ya
+// registradas, así que reenviar un lote cuya respuesta se perdió no duplica nada.
+const DB_COLA = 'polleria-cola';
+const STORE_PEDIDOS = 'pedidos'; // Pendientes de enviar, por clave
+const STORE_RECHAZADOS = 'rechazados'; // Rechazados por el servidor (con sus errores), para revisión
+const URL_PEDIDO = '/pedidos/';
+const URL_SINCRONIZAR = '/pedidos/sincronizar';
+const TAG_SINCRONIZAR = 'sincronizar-pedidos';
+const PEDIDOS_POR_LOTE = 200;
+const ESTADOS_SIN_SERVIDOR = [502, 503, 504]; // El proxy responde pero la app no: también se encola
+const PATRON_CLAVE = /^[A-Za-z0-9_-]{8,64}$/; // El mismo formato que exige el servidor (pedidos/services.py)
+
+function abrirCola() {
+    return new Promise((resolve, reject) => {
+        const solicitud = indexedDB.open(DB_COLA, 1);
+        solicitud.onupgradeneeded = () => {
+            solicitud.result.createObjectStore(STORE_PEDIDOS, { keyPath: 'clave_idempotencia' });
+            solicitud.result.createObjectStore(STORE_RECHAZADOS, { keyPath: 'clave_idempotencia' });
+        };
+        solicitud.onsuccess = () => resolve(solicitud.result);
+        solicitud.onerror = () => reject(solicitud.error);
+    });
+}
+
+// Ejecuta `operacion(...stores)` en una transacción de la BD que abre `abrir`; resuelve con
+// el resultado de la solicitud que devuelva (si devuelve una) cuando la transacción se confirma.
+function transaccionEn(abrir, nombres, modo, operacion) {
+    return abrir().then((db) => new Promise((resolve, reject) => {
+        const tx = db.transaction(nombres, modo);
+        const solicitud = operacion(...nombres.map((nombre) => tx.objectStore(nombre)));
+        tx.oncomplete = () => { db.close(); resolve(solicitud ? solicitud.result : undefined); };
+        tx.onerror = tx.onabort = () => { db.close(); reject(tx.error); };
+    }));
+}
+
+function transaccionCola(nombres, modo, operacion) {
+    return transaccionEn(abrirCola, nombres, modo, operacion);
+}
+
+function nuevaClave() {
+    if (self.crypto && crypto.randomUUID) {
+        return crypto.randomUUID();
+    }
+    const bytes = crypto.getRandomValues(new Uint8Array(16));
+    return Array.from(bytes, (b) => b.toString(16).padStart(2, '0')).join('');
+}
+
+function respuestaJson(datos, status) {
+    return new Response(JSON.stringify(datos), { status, headers: { 'Content-Type': 'application/json' } });
+}
+
+function encolarPedido(pedido) {
+    return transaccionCola([STORE_PEDIDOS], 'readwrite', (pedidos) => { pedidos.put(pedido); })
+        .then(() => {
+            console.log('[Service Worker] Pedido encolado sin conexión:', pedido.clave_idempotencia);
+            if (self.registration.sync) {
+                // Background Sync: el navegador reintenta aunque la pestaña se cierre
+                return self.registration.sync.register(TAG_SINCRONIZAR).catch(() => {});
+            }
+        })
+        .then(() => respuestaJson({ encolado: true, clave_idempotencia: pedido.clave_idempotencia }, 202));
+}
+
+function capturarPedido(request) {
+    return request.clone().json().catch(() => null).then((pedido) => {
+        if (!pedido || typeof pedido !== 'object' || Array.isArray(pedido)) {
+            return fetch(request); // No es un pedido que podamos encolar: que responda el servidor
+        }
+        // La clave se fija ANTES del primer intento: si la respuesta se pierde, el reenvío no duplica
+        // (una clave con formato inválido se reemplaza: el servidor la rechazaría en cada sincronización)
+        if (typeof pedido.clave_idempotencia !== 'string' || !PATRON_CLAVE.test(pedido.clave_idempotencia)) {
+            pedido.clave_idempotencia = nuevaClave();
+        }
+        pedido.capturado_en = pedido.capturado_en || new Date().toISOString();
+        return fetch(URL_PEDIDO, {
+            method: 'POST',
+            credentials: 'same-origin',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(pedido),
+        }).then((respuesta) => {
+            if (ESTADOS_SIN_SERVIDOR.includes(respuesta.status)) {
+                return encolarPedido(pedido);
+            }
+            sincronizarPedidos().catch(() => 0); // Hay conexión: enviar lo que haya quedado pendiente
+            return respuesta;
+        }, () => encolarPedido(pedido));
+    });
+}
+
+// Quita de la cola lo que el servidor ya tiene y aparta los rechazados con sus errores.
+// El servidor responde en el orden de entrada, así que cada resultado se empareja por
+// posición (un pedido sin clave válida vuelve con clave null). Un pedido sin resultado
+// que le corresponda también se aparta: dejarlo en la cola lo reenviaría sin fin.
+// Resuelve con cuántos pedidos salieron de la cola.
+function aplicarResultados(enviados, resultados) {
+    let quitados = 0;
+    return transaccionCola([STORE_PEDIDOS, STORE_RECHAZADOS], 'readwrite', (pedidos, rechazados) => {
+        enviados.forEach((pedido, posicion) => {
+            const resultado = Array.isArray(resultados) ? resultados[posicion] : undefined;
+            const emparejado = resultado && (resultado.clave === null || resultado.clave === pedido.clave_idempotencia);
+            pedidos.delete(pedido.clave_idempotencia);
+            quitados += 1;
+            if (!emparejado) {
+                rechazados.put(Object.assign({}, pedido, { errores: ['El servidor no devolvió un resultado para este pedido.'] }));
+            } else if (resultado.estado === 'RECHAZADO') {
+                rechazados.put(Object.assign({}, pedido, { errores: resultado.errores }));
+            }
+        });
+    }).then(() => quitados);
+}
+
+async function enviarCola() {
+    let enviados = 0;
+    for (;;) {
+        const lote = await transaccionCola([STORE_PEDIDOS], 'readonly', (pedidos) => pedidos.getAll(null, PEDIDOS_POR_LOTE));
+        if (!lote.length) {
+            break;
+        }
+        const respuesta = await fetch(URL_SINCRONIZAR, {
+            method: 'POST',
+            credentials: 'same-origin',
+            redirect: 'manual', // Sesión vencida: el login redirige y se reintenta más tarde
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ pedidos: lote }),
+        });
+        if (!respuesta.ok) {
+            throw new Error(`La sincronización respondió ${respuesta.status || respuesta.type}`);
+        }
+        const datos = await respuesta.json();
+        const quitados = await aplicarResultados(lote, datos.resultados);
+        enviados += lote.length;
+        console.log(`[Service Worker] Sincronizados ${datos.registrados} pedidos (${datos.duplicados} ya registrados, ${datos.rechazados} rechazados)`);
+        if (!quitados) {
+            break; // El lote no avanzó: se reintenta en la próxima sincronización en vez de reenviarlo sin fin
+        }
+    }
+    if (enviados) {
+        avisarClientes({ tipo: 'pedidos-sincronizados', enviados });
+    }
+    return enviados;
+}
+
+// Una sola sincronización a la vez (navegación, Background Sync y mensajes pueden coincidir)
+let sincronizacionEnCurso = null;
+function sincronizarPedidos() {
+    if (!sincronizacionEnCurso) {
+        sincronizacionEnCurso = enviarCola().finally(() => { sincronizacionEnCurso = null; });
+    }
+    return sincronizacionEnCurso;
+}
+
+function estadoCola() {
+    return Promise.all([
+        transaccionCola([STORE_PEDIDOS], 'readonly', (pedidos) => pedidos.count()),
+        transaccionCola([STORE_RECHAZADOS], 'readonly', (rechazados) => rechazados.getAll()),
+    ]).then(([pendientes, rechazados]) => ({ tipo: 'estado-cola', pendientes, rechazados }));
+}
+
+function avisarClientes(mensaje) {
+    self.clients.matchAll().then((clientes) => clientes.forEach((cliente) => cliente.postMessage(mensaje)));
+}
+
+self.addEventListener('sync', (event) => {
+    if (event.tag === TAG_SINCRONIZAR) {
+        event.waitUntil(sincronizarPedidos()); // Si falla, el navegador reprograma el intento
+    }
+});
+
+// Mensajes de la página: {tipo: 'sincronizar-pedidos'} (p. ej. al volver 'online'), {tipo: 'estado-cola'}
+// y {tipo: 'sincronizar-catalogo'} (inmediata, sin esperar el intervalo)
+self.addEventListener('message', (event) => {
+    const tipo = event.data && event.data.tipo;
+    if (tipo === 'sincronizar-pedidos') {
+        event.waitUntil(sincronizarPedidos().catch((error) => {
+            console.error('[Service Worker] Sincronización de pedidos pendiente:', error);
+        }));
+    } else if (tipo === 'sincronizar-catalogo') {
+        event.waitUntil(sincronizarCatalogo(true).catch((error) => {
+            console.error('[Service Worker] Sincronización del catálogo pendiente:', error);
+        }));
+    } else if (tipo === 'estado-cola' && event.source) {
+        event.waitUntil(estadoCola().then((estado) => event.source.postMessage(estado)));
+    }
+});
+
+
+// --- Copia local del catálogo ---
+// El catálogo se guarda en IndexedDB (un store por entidad, por id) para que las
+// páginas lo consulten sin conexión. La primera vez se baja el árbol completo de
+// /productos/api/catalogo; después solo se pide lo que cambió desde el último
+// `cursor` (?since=). Si el servidor no puede dar el delta responde `completo: true`
+// y la copia se reemplaza entera. Todo se aplica en una sola transacción junto con
+// el cursor nuevo: una sincronización interrumpida no deja la copia a medias.
+const DB_CATALOGO = 'polleria-catalogo';
+const STORES_CATALOGO = ['modificaciones', 'productos', 'subproductos', 'precios'];
+const STORE_META = 'meta'; // { clave: 'cursor', valor }
+const URL_CATALOGO = '/productos/api/catalogo';
+const CATALOGO_INTERVALO_MS = 30000; // Las navegaciones no consultan más seguido que esto
+
+function abrirCatalogo() {
+    return new Promise((resolve, reject) => {
+        const solicitud = indexedDB.open(DB_CATALOGO, 1);
+        solicitud.onupgradeneeded = () => {
+            STORES_CATALOGO.forEach((nombre) => solicitud.result.createObjectStore(nombre, { keyPath: 'id' }));
+            solicitud.result.createObjectStore(STORE_META, { keyPath: 'clave' });
+        };
+        solicitud.onsuccess = () => resolve(solicitud.result);
+        solicitud.onerror = () => reject(solicitud.error);
+    });
+}
+
+function transaccionCatalogo(nombres, modo, operacion) {
+    return transaccionEn(abrirCatalogo, nombres, modo, operacion);
+}
+
+// Separa el árbol completo en registros planos, como llegan en un delta
+function aplanarCatalogo(datos) {
+    const registros = { modificaciones: datos.modificaciones, productos: [], subproductos: [], precios: [] };
+    datos.productos.forEach(({ subproductos, precios, ...producto }) => {
+        registros.productos.push(producto);
+        registros.precios.push(...precios);
+        subproductos.forEach(({ precios: preciosSub, ...subproducto }) => {
+            registros.subproductos.push(subproducto);
+            registros.precios.push(...preciosSub);
+        });
+    });
+    return registros;
+}
+
+function aplicarCatalogo(datos) {
+    const registros = datos.completo ? aplanarCatalogo(datos) : datos;
+    return transaccionCatalogo([...STORES_CATALOGO, STORE_META], 'readwrite', (...stores) => {
+        const meta = stores.pop();
+        stores.forEach((store, i) => {
+            const nombre = STORES_CATALOGO[i];
+            if (datos.completo) {
+                store.clear();
+            } else {
+                datos.eliminados[nombre].forEach((id) => store.delete(id));
+            }
+            registros[nombre].forEach((registro) => store.put(registro));
+        });
+        meta.put({ clave: 'cursor', valor: datos.cursor });
+    });
+}
+
+async function actualizarCatalogo() {
+    const guardado = await transaccionCatalogo([STORE_META], 'readonly', (meta) => meta.get('cursor'));
+    const url = guardado ? `${URL_CATALOGO}?since=${guardado.valor}` : URL_CATALOGO;
+    const respuesta = await fetch(url, {
+        credentials: 'same-origin',
+        redirect: 'manual', // Sin sesión el login redirige: se reintenta en la siguiente navegación
+    });
+    if (!respuesta.ok) {
+        throw new Error(`El catálogo respondió ${respuesta.status || respuesta.type}`);
+    }
+    const datos = await respuesta.json();
+    if (!datos.completo && guardado && datos.cursor === guardado.valor) {
+        return datos; // Sin cambios
+    }
+    await aplicarCatalogo(datos);
+    avisarClientes({ tipo: 'catalogo-sincronizado', cursor: datos.cursor, completo: datos.completo });
+    return datos;
+}
+
+// Una sincronización a la vez y, salvo que se pida `inmediata`, no más de una por intervalo
+let catalogoEnCurso = null;
+let catalogoUltimaVez = 0;
+function sincronizarCatalogo(inmediata = false) {
+    if (!catalogoEnCurso && (inmediata || Date.now() - catalogoUltimaVez >= CATALOGO_INTERVALO_MS)) {
+        catalogoUltimaVez = Date.now();
+        catalogoEnCurso = actualizarCatalogo().finally(() => { catalogoEnCurso = null; });
+    }
+    return catalogoEnCurso || Promise.resolve(null);
+}
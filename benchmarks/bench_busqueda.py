@@ -0,0 +1,70 @@
+"""Benchmark del índice de búsqueda FTS5 del catálogo.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_busqueda.py [--filas 50000] [--consultas 2000]
+
+Crea una BD SQLite temporal con `--filas` modificaciones sintéticas (más el
+catálogo de `seed-db`), construye el índice y mide p50/p95/p99 de
+`busqueda.buscar` con fragmentos típicos de mostrador.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+PALABRAS = ['Pulpa', 'Milanesa', 'Freír', 'Asar', 'Pechuga', 'Pierna', 'Muslo', 'Alas', 'Cubos',
+            'Molida', 'Fajitas', 'Filetes', 'Hígado', 'Molleja', 'Retazo', 'Huacal', 'Sin Piel', 'Entera']
+CONSULTAS = ['pulpa', 'mila', 'freir', 'PP-', 'pech', 'higado', 'sin piel', 'asar mus', 'fa', 'cubos pul']
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--filas', type=int, default=50000)
+    parser.add_argument('--consultas', type=int, default=2000)
+    args = parser.parse_args()
+
+    fd, ruta_db = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    os.environ['DATABASE_URL'] = 'sqlite:///' + ruta_db
+
+    from app import create_app, db
+    from app.models import Modificacion
+    from app.productos import busqueda
+    import run
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        run.seed_catalogo()
+
+        rnd = random.Random(7)
+        filas = [
+            {'codigo_modif': f'SINT{i}', 'nombre': f'{rnd.choice(PALABRAS)} {rnd.choice(PALABRAS)} {i}',
+             'descripcion': None, 'activo': True}
+            for i in range(args.filas)
+        ]
+        db.session.execute(Modificacion.__table__.insert(), filas)
+        db.session.commit()
+
+        inicio = time.perf_counter()
+        documentos = busqueda.reindexar()
+        print(f"Índice construido: {documentos} documentos en {time.perf_counter() - inicio:.2f} s")
+
+        tiempos = []
+        for i in range(args.consultas):
+            consulta = CONSULTAS[i % len(CONSULTAS)]
+            inicio = time.perf_counter()
+            busqueda.buscar(consulta)
+            tiempos.append((time.perf_counter() - inicio) * 1000)
+
+    os.remove(ruta_db)
+    percentiles = statistics.quantiles(tiempos, n=100)
+    print(f"{args.consultas} consultas: p50 {percentiles[49]:.2f} ms, "
+          f"p95 {percentiles[94]:.2f} ms, p99 {percentiles[98]:.2f} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,156 @@
+"""Benchmark de la búsqueda de clientes (nombre, alias y teléfono) para el mostrador.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_busqueda_clientes.py [--clientes 200000] [--consultas 2000] [--perfil produccion]
+
+Crea una BD SQLite temporal con `--clientes` clientes sintéticos (nombres con
+acentos, 30 % con alias, uno o dos teléfonos), construye el índice con
+`busqueda.reindexar` y mide p50/p95/p99 de `busqueda.buscar` con lo que
+teclea un cajero: fragmentos de nombre sin acentos, alias, los últimos dígitos
+o el inicio del teléfono. Como referencia mide el LIKE '%...%' equivalente.
+
+Al final registra clientes y teléfonos con el ORM para medir el costo de
+mantener el índice en el flush y comprobar que aparecen en la búsqueda.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from catalogo_sintetico import preparar_app, eliminar_bd
+
+NOMBRES = ['José', 'María', 'Juan', 'Ángel', 'Sofía', 'Luis', 'Guadalupe', 'Jesús', 'Verónica', 'Raúl',
+           'Andrés', 'Lucía', 'Martín', 'Rocío', 'Héctor', 'Mónica', 'Óscar', 'Inés', 'Iván', 'Elena']
+APELLIDOS = ['Pérez', 'Hernández', 'García', 'López', 'Martínez', 'Gómez', 'Rodríguez', 'Sánchez', 'Ramírez',
+             'Cruz', 'Flores', 'Núñez', 'Jiménez', 'Vázquez', 'Ordóñez', 'Muñoz', 'Díaz', 'Castañeda']
+ALIAS = ['el Güero', 'la Flaca', 'Don Chuy', 'Tacos Pepe', 'Cocina Económica', 'la Güera', 'el Chino',
+         'Pollos Lupita', 'Doña Mary', 'el Compadre']
+CONSULTAS = ['juan per', 'perez', 'jose hern', 'guero', 'maria lopez g', 'oscar nun', 'tacos',
+             'doña', 'rocio', 'castaneda', 'j', 'luis 4821']
+
+def generar_clientes(cantidad, azar):
+    clientes, telefonos = [], []
+    for i in range(1, cantidad + 1):
+        clientes.append({
+            'id': i,
+            'nombre': azar.choice(NOMBRES),
+            'apellidos': f'{azar.choice(APELLIDOS)} {azar.choice(APELLIDOS)}',
+            'alias': f'{azar.choice(ALIAS)} {i % 97}' if azar.random() < 0.3 else None,
+            'tipo_cliente': azar.choice(['PUBLICO', 'PUBLICO', 'COCINA', 'MAYOREO']),
+            'activo': azar.random() > 0.05,
+        })
+        for _ in range(azar.choice((1, 1, 2))):
+            numero = f'55{azar.randrange(10 ** 8):08d}'
+            telefonos.append({'cliente_id': i, 'numero': numero, 'numero_invertido': numero[::-1], 'tipo': 'CELULAR'})
+    return clientes, telefonos
+
+def _percentiles(tiempos):
+    tiempos = sorted(tiempos)
+    return (statistics.median(tiempos), tiempos[int(len(tiempos) * 0.95)], tiempos[int(len(tiempos) * 0.99)])
+
+def _ms(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return tiempos
+
+def buscar_con_like(consulta):
+    """Lo que haría una búsqueda sin índice: LIKE '%término%' sobre nombre, apellidos y alias."""
+    from app import db
+    from app.models import Cliente
+
+    filtro = Cliente.activo.is_(True)
+    for termino in consulta.split():
+        patron = f'%{termino}%'
+        filtro &= db.or_(Cliente.nombre.ilike(patron), Cliente.apellidos.ilike(patron), Cliente.alias.ilike(patron))
+    return db.session.execute(db.select(Cliente.id).where(filtro).order_by(Cliente.nombre).limit(10)).all()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clientes', type=int, default=200_000)
+    parser.add_argument('--consultas', type=int, default=2000)
+    parser.add_argument('--perfil', default='produccion', help='Perfil SQLite (config.PERFILES_SQLITE)')
+    args = parser.parse_args()
+
+    from config import PERFILES_SQLITE
+    app, ruta_db = preparar_app(SQLITE_PRAGMAS=PERFILES_SQLITE[args.perfil]['pragmas'], TELEMETRIA_WRITE_BEHIND=False)
+    with app.app_context():
+        from app import db
+        from app.clientes import busqueda
+        from app.models import Cliente, Telefono
+
+        azar = random.Random(5)
+        clientes, telefonos = generar_clientes(args.clientes, azar)
+        for inicio in range(0, len(clientes), 20_000):
+            db.session.execute(Cliente.__table__.insert(), clientes[inicio:inicio + 20_000])
+        for inicio in range(0, len(telefonos), 20_000):
+            db.session.execute(Telefono.__table__.insert(), telefonos[inicio:inicio + 20_000])
+        db.session.commit()
+
+        inicio = time.perf_counter()
+        indexados = busqueda.reindexar()
+        print(f"{args.clientes} clientes ({len(telefonos)} teléfonos), índice de {indexados} clientes activos "
+              f"en {time.perf_counter() - inicio:.2f} s, perfil SQLite '{args.perfil}'\n")
+
+        activos = [c for c in clientes if c['activo']]
+        con_telefono = {t['cliente_id']: t['numero'] for t in telefonos}
+        muestras = azar.sample(activos, 50)
+        consultas = list(CONSULTAS)
+        consultas += [con_telefono[c['id']][-4:] for c in muestras[:20]] # Últimos 4 dígitos
+        consultas += [con_telefono[c['id']][:6] for c in muestras[20:30]] # Inicio del número
+        consultas += [con_telefono[c['id']] for c in muestras[30:40]] # Número completo
+
+        # Respuestas correctas: el teléfono completo encuentra a su cliente, sin acentos también
+        for cliente in muestras[30:40]:
+            numero = con_telefono[cliente['id']]
+            formateado = f'({numero[:2]}) {numero[2:6]}-{numero[6:]}'
+            assert cliente['id'] in {r['id'] for r in busqueda.buscar(formateado)}, formateado
+        assert all('Pérez' in r['nombre'] for r in busqueda.buscar('juan perez'))
+
+        tiempos, por_tipo = [], {}
+        for i in range(args.consultas):
+            consulta = consultas[i % len(consultas)]
+            inicio = time.perf_counter()
+            busqueda.buscar(consulta)
+            ms = (time.perf_counter() - inicio) * 1000
+            tiempos.append(ms)
+            tipo = 'teléfono' if consulta.isdigit() else 'texto'
+            por_tipo.setdefault(tipo, []).append(ms)
+        p50, p95, p99 = _percentiles(tiempos)
+        print(f"busqueda.buscar, {args.consultas} consultas: p50 {p50:.2f} ms  p95 {p95:.2f} ms  p99 {p99:.2f} ms"
+              f"  máx {max(tiempos):.2f} ms")
+        for tipo, ms in por_tipo.items():
+            p50, p95, p99 = _percentiles(ms)
+            print(f"  {tipo:<10} p50 {p50:.2f} ms  p95 {p95:.2f} ms  p99 {p99:.2f} ms")
+
+        print("\nPor consulta (p50 de 20; índice vs. LIKE '%...%'):")
+        for consulta in CONSULTAS[:6] + [consultas[len(CONSULTAS)]]:
+            indice = statistics.median(_ms(lambda: busqueda.buscar(consulta), 20))
+            if consulta.isdigit():
+                like = statistics.median(_ms(lambda: db.session.execute(
+                    db.select(Telefono.cliente_id).where(Telefono.numero.like(f'%{consulta}')).limit(10)).all(), 3))
+            else:
+                like = statistics.median(_ms(lambda: buscar_con_like(consulta), 3))
+            print(f"  {consulta!r:<18} {indice:>7.2f} ms   LIKE {like:>8.2f} ms")
+
+        # Mantenimiento en el flush: clientes nuevos con el ORM, buscables al confirmar
+        inicio = time.perf_counter()
+        for i in range(1000):
+            cliente = Cliente(nombre='Zacarías', apellidos=f'Ibáñez {i}', alias='el Nuevo')
+            cliente.telefonos.append(Telefono(numero=f'(33) 9{i:03d}-0000'))
+            db.session.add(cliente)
+            if i % 100 == 99:
+                db.session.commit()
+        segundos = time.perf_counter() - inicio
+        assert len(busqueda.buscar('zacarias ibanez', limite=50)) == 50
+        assert busqueda.buscar('99990000')[0]['nombre'] == 'Zacarías Ibáñez 999'
+        print(f"\n1000 clientes con teléfono por el ORM (commit cada 100): {segundos * 1000:.0f} ms con el índice al día")
+
+        db.session.remove()
+        db.engine.dispose()
+    eliminar_bd(ruta_db)
+
+if __name__ == '__main__':
+    main()
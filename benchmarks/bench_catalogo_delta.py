@@ -0,0 +1,92 @@
+"""Benchmark de la sincronización del catálogo de la PWA: árbol completo vs. delta desde un cursor.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_catalogo_delta.py [--productos 500] [--peticiones 50]
+
+Crea una BD SQLite temporal con un catálogo sintético (`--productos`
+productos con 5 subproductos, 3 escalones y 5 tipos de cliente) y mide con el
+cliente de pruebas GET /productos/api/catalogo como lo consulta el service
+worker:
+
+* árbol completo (primera sincronización), con y sin el cuerpo ya serializado;
+* delta sin cambios (la consulta de cada navegación);
+* delta tras cambiar 1, 10 y 100 precios por el ORM, y tras dar de baja un
+  producto.
+
+Para cada caso informa latencia y bytes transferidos.
+"""
+import argparse
+import statistics
+import time
+
+from catalogo_sintetico import preparar_app, construir_catalogo, crear_usuario, eliminar_bd, TIPOS_CLIENTE
+
+URL = '/productos/api/catalogo'
+
+def _medir(cliente, url, peticiones):
+    tiempos = []
+    for _ in range(peticiones):
+        inicio = time.perf_counter()
+        respuesta = cliente.get(url)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+        assert respuesta.status_code == 200, respuesta.status_code
+    return statistics.median(tiempos), respuesta.get_json(), len(respuesta.data)
+
+def _reportar(nombre, ms, datos, transferido):
+    modo = 'completo' if datos['completo'] else 'delta'
+    print(f"{nombre:<34} p50 {ms:>8.2f} ms  {transferido / 1024:>9.1f} KiB  ({modo}, cursor {datos['cursor']})")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--productos', type=int, default=500)
+    parser.add_argument('--peticiones', type=int, default=50)
+    args = parser.parse_args()
+
+    app, ruta_db = preparar_app(TELEMETRIA_WRITE_BEHIND=False)
+    with app.app_context():
+        from app import db
+        from app.models import Precio, Producto
+
+        construir_catalogo(productos=args.productos, subproductos=5, modificaciones=100, escalones=3,
+                           tipos_cliente=len(TIPOS_CLIENTE))
+        crear_usuario('cajero_bench', rol='CAJERO')
+        ids_precios = db.session.execute(db.select(Precio.id).order_by(Precio.id)).scalars().all()
+        producto_id = db.session.execute(db.select(Producto.id)).scalars().first()
+        db.session.remove()
+
+    cliente = app.test_client()
+    cliente.post('/auth/login', data={'username': 'cajero_bench', 'password': 'bench-secreto'}, follow_redirects=True)
+    print(f"{args.productos} productos x 5 subproductos, {len(ids_precios)} precios, {args.peticiones} peticiones por caso\n")
+
+    app.config['CATALOGO_CACHE_HABILITADO'] = False
+    _reportar('completo (armado en cada petición)', *_medir(cliente, URL, max(args.peticiones // 5, 3)))
+    app.config['CATALOGO_CACHE_HABILITADO'] = True
+    ms, datos, transferido = _medir(cliente, URL, args.peticiones)
+    _reportar('completo (ya serializado)', ms, datos, transferido)
+    completo = transferido
+    cursor = datos['cursor']
+    _reportar('delta sin cambios', *_medir(cliente, f'{URL}?since={cursor}', args.peticiones))
+
+    for cambios in (1, 10, 100):
+        with app.app_context():
+            for precio_id in ids_precios[:cambios]:
+                db.session.get(Precio, precio_id).precio_kg += 1
+            db.session.commit()
+            db.session.remove()
+        ms, datos, transferido = _medir(cliente, f'{URL}?since={cursor}', args.peticiones)
+        _reportar(f'delta tras {cambios} precio(s)', ms, datos, transferido)
+        print(f"{'':<34} {completo / transferido:>8.0f}x menos que el completo")
+        cursor = datos['cursor']
+
+    with app.app_context():
+        db.session.get(Producto, producto_id).activo = False
+        db.session.commit()
+        db.session.remove()
+    _reportar('delta tras dar de baja un producto', *_medir(cliente, f'{URL}?since={cursor}', args.peticiones))
+
+    with app.app_context():
+        db.engine.dispose()
+    eliminar_bd(ruta_db)
+
+if __name__ == '__main__':
+    main()
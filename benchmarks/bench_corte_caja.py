@@ -0,0 +1,132 @@
+"""Benchmark del corte de caja: acumulados incrementales vs. recorrer los movimientos.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_corte_caja.py [--tamanos 1000 10000 100000] [--perfil produccion]
+
+Para cada tamaño abre un turno, registra ese número de movimientos (ventas en
+efectivo con billetes y cambio, ventas con tarjeta y egresos) en lotes de
+1000 y mide:
+
+* "recorrido ORM": lo que haría un corte ingenuo; cargar todos los
+  movimientos del turno y sus denominaciones y sumarlos en Python.
+* `verificar_corte`: el recálculo desde el libro con GROUP BY (la pasada de
+  verificación).
+* `resumen_corte` y `cerrar_corte`: leen solo los acumulados.
+
+También mide el costo de registrar un movimiento suelto con su commit.
+"""
+import argparse
+import random
+import statistics
+import time
+
+from catalogo_sintetico import preparar_app, crear_usuario, eliminar_bd
+
+def generar_movimientos(corte_id, cantidad, semilla):
+    rnd = random.Random(semilla)
+    movimientos = []
+    for _ in range(cantidad):
+        suerte = rnd.random()
+        if suerte < 0.6:
+            monto = rnd.choice((35, 60, 85, 120, 145, 180, 230, 310))
+            pagado = 500 if monto > 200 else (200 if monto > 100 else 100)
+            cambio = pagado - monto
+            denominaciones = {pagado: 1}
+            for billete in (100, 50, 20, 10, 5):
+                if cambio >= billete:
+                    denominaciones[billete] = denominaciones.get(billete, 0) - cambio // billete
+                    cambio %= billete
+            movimientos.append({'corte_id': corte_id, 'tipo': 'VENTA', 'monto': monto, 'denominaciones': denominaciones})
+        elif suerte < 0.9:
+            movimientos.append({'corte_id': corte_id, 'tipo': 'VENTA', 'forma_pago': 'TARJETA',
+                                'monto': round(rnd.uniform(50, 900), 2)})
+        else:
+            movimientos.append({'corte_id': corte_id, 'tipo': 'EGRESO', 'monto': 20, 'concepto': 'Bolsas',
+                                'denominaciones': {20: 1}})
+    return movimientos
+
+def recorrido_orm(corte_id):
+    """Corte ingenuo: todos los movimientos y denominaciones del turno a memoria."""
+    from app import db
+    from app.models import MovimientoCaja, MovimientoDenominacion
+    from app.caja.services import SIGNOS
+
+    por_tipo = {}
+    denominaciones = {}
+    movimientos = db.session.scalars(db.select(MovimientoCaja).where(MovimientoCaja.corte_id == corte_id)).all()
+    signos = {}
+    for movimiento in movimientos:
+        clave = (movimiento.tipo, movimiento.forma_pago)
+        por_tipo[clave] = por_tipo.get(clave, 0.0) + movimiento.monto
+        signos[movimiento.id] = SIGNOS[movimiento.tipo]
+    filas = db.session.scalars(
+        db.select(MovimientoDenominacion).join(MovimientoCaja).where(MovimientoCaja.corte_id == corte_id)
+    ).all()
+    for fila in filas:
+        denominaciones[fila.denominacion] = denominaciones.get(fila.denominacion, 0) + signos[fila.movimiento_id] * fila.cantidad
+    db.session.expunge_all()
+    return por_tipo, denominaciones
+
+def _ms(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tamanos', type=int, nargs='+', default=[1000, 10000, 100000],
+                        help='Movimientos por turno')
+    parser.add_argument('--perfil', default='produccion', help='Perfil SQLite (config.PERFILES_SQLITE)')
+    args = parser.parse_args()
+
+    from config import PERFILES_SQLITE
+    app, ruta_db = preparar_app(SQLITE_PRAGMAS=PERFILES_SQLITE[args.perfil]['pragmas'], TELEMETRIA_WRITE_BEHIND=False)
+    with app.app_context():
+        from app import db
+        from app.caja import services
+
+        usuario_id = crear_usuario('cajero_bench', rol='CAJERO').id
+
+        # Movimiento suelto con su commit (UPSERT de acumulados incluido)
+        corte = services.abrir_corte('SUELTOS', usuario_id, 1000, {500: 2})
+        db.session.commit()
+        sueltos = generar_movimientos(corte.id, 1000, semilla=1)
+        latencias = []
+        for datos in sueltos:
+            inicio = time.perf_counter()
+            services.registrar_movimiento(datos, usuario_id)
+            db.session.commit()
+            latencias.append((time.perf_counter() - inicio) * 1000)
+        cuantiles = statistics.quantiles(latencias, n=100)
+        print(f"Movimiento suelto + commit: p50 {cuantiles[49]:.2f} ms  p95 {cuantiles[94]:.2f} ms\n")
+
+        print(f"{'movimientos':>11} {'carga/s':>9} {'recorrido ORM':>14} {'verificar':>10} {'resumen':>8} {'cerrar':>8}  (ms)")
+        for tamano in args.tamanos:
+            corte = services.abrir_corte(f'CAJA{tamano}', usuario_id, 1000, {500: 2})
+            db.session.commit()
+            movimientos = generar_movimientos(corte.id, tamano, semilla=tamano)
+            inicio = time.perf_counter()
+            for i in range(0, tamano, 1000):
+                services.registrar_movimientos(movimientos[i:i + 1000], usuario_id)
+                db.session.commit()
+            carga = tamano / (time.perf_counter() - inicio)
+
+            ms_orm = _ms(lambda: recorrido_orm(corte.id), 3)
+            ms_verificar = _ms(lambda: services.verificar_corte(corte.id), 3)
+            assert services.verificar_corte(corte.id).correcto
+            ms_resumen = _ms(lambda: services.resumen_corte(corte.id), 50)
+            inicio = time.perf_counter()
+            services.cerrar_corte(corte.id, usuario_id, {500: 2})
+            db.session.commit()
+            ms_cerrar = (time.perf_counter() - inicio) * 1000
+            print(f"{tamano:>11} {carga:>9.0f} {ms_orm:>14.2f} {ms_verificar:>10.2f} {ms_resumen:>8.3f} {ms_cerrar:>8.2f}")
+
+        db.session.remove()
+        db.engine.dispose()
+    eliminar_bd(ruta_db)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,202 @@
+"""Benchmark del despacho de entregas a domicilio: cola en memoria vs. consultar los pedidos abiertos.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_despacho.py [--pedidos 5000] [--repartidores 40] [--zonas 12] [--horas 10] [--perfil produccion]
+
+Simula minuto a minuto un servicio de `--horas` horas: los pedidos DOMICILIO
+llegan repartidos en el tiempo (un 20 % con hora de entrega programada) y se
+registran con `services.registrar_pedidos`; cada repartidor que regresa pide
+su próximo viaje, que tarda según cuántas entregas lleva. La llegada de
+pedidos supera lo que los repartidores alcanzan a entregar, así que la cola
+crece hasta miles de pendientes. La misma simulación se corre dos veces:
+
+* `despacho.asignar_siguiente`: montículos en memoria, O(log n) por entrega;
+* ingenuo: en cada asignación lee todos los pedidos abiertos, los ordena por
+  hora prometida y arma el viaje (lo que haría una consulta por repartidor).
+
+Solo se mide el tiempo de asignar (incluido el UPDATE y el commit) y se
+comprueba que ambas estrategias asignan exactamente los mismos viajes.
+Al final mide la cola sola (`Despachador`) con `--en-memoria` entregas.
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import datetime, timedelta
+
+from catalogo_sintetico import preparar_app, construir_catalogo, crear_usuario, eliminar_bd
+from bench_pedidos import generar_pedidos
+
+def generar_llegadas(base, args):
+    """{minuto: [pedido]} con zona y, a veces, hora programada; igual en las dos corridas."""
+    azar = random.Random(7)
+    minutos = args.horas * 60
+    llegadas = {}
+    inicio = datetime(2026, 1, 5, 10, 0)
+    for n in range(args.pedidos):
+        minuto = azar.randrange(minutos)
+        pedido = dict(base[n % len(base)], tipo_venta='DOMICILIO', zona_entrega=f'Z{azar.randrange(args.zonas):02d}')
+        if azar.random() < 0.2:
+            pedido['fecha_entrega_programada'] = (inicio + timedelta(minutes=minuto + azar.randint(60, 240))).isoformat()
+        llegadas.setdefault(minuto, []).append(pedido)
+    return inicio, llegadas
+
+def asignar_ingenuo(repartidor_id, capacidad, ventana):
+    """Lee todos los pedidos abiertos y arma el viaje en Python; devuelve las entregas asignadas."""
+    from app import db
+    from app.models import Pedido
+    from app.pedidos import despacho
+
+    tabla = Pedido.__table__
+    filas = db.session.execute(
+        db.select(tabla.c.id, tabla.c.fecha_pedido, tabla.c.fecha_entrega_programada, tabla.c.zona_entrega)
+        .where(tabla.c.tipo_venta == despacho.TIPO_VENTA_DOMICILIO, tabla.c.repartidor_id.is_(None),
+               tabla.c.estado.in_(despacho.ESTADOS_DESPACHABLES))
+    ).all()
+    if not filas:
+        return None
+    abiertos = sorted(
+        (despacho.hora_prometida(fila.fecha_pedido, fila.fecha_entrega_programada), fila.id, fila.zona_entrega or '')
+        for fila in filas
+    )
+    prometido, _, zona = abiertos[0]
+    viaje = [
+        despacho.EntregaPendiente(pedido_id, hora, zona) for hora, pedido_id, z in abiertos
+        if z == zona and hora <= prometido + ventana
+    ][:capacidad]
+    db.session.execute(
+        db.update(tabla).where(tabla.c.id.in_([entrega.pedido_id for entrega in viaje])).values(repartidor_id=repartidor_id)
+    )
+    return viaje
+
+def simular(estrategia, args, base_config):
+    app, ruta_db = preparar_app(**base_config)
+    with app.app_context():
+        from app import db
+        from app.pedidos import despacho, services
+        from app.productos import catalogo_cache
+
+        construir_catalogo(productos=20, subproductos=5, modificaciones=10, escalones=3)
+        cajero = crear_usuario('cajero_bench', rol='CAJERO').id
+        repartidores = [crear_usuario(f'repartidor{i:02d}', rol='REPARTIDOR').id for i in range(args.repartidores)]
+        base = generar_pedidos(catalogo_cache.obtener_snapshot(), 200, args.items)
+        inicio, llegadas = generar_llegadas(base, args)
+        capacidad = app.config['DESPACHO_CAPACIDAD']
+        ventana = timedelta(minutes=app.config['DESPACHO_VENTANA_MINUTOS'])
+
+        regreso = dict.fromkeys(repartidores, 0) # minuto en que cada repartidor vuelve a estar libre
+        viajes, latencias, tarde, entregados, max_cola = [], [], 0, 0, 0
+        abiertos = 0
+        minuto = 0
+        while minuto < args.horas * 60 or abiertos:
+            ahora = inicio + timedelta(minutes=minuto)
+            if minuto in llegadas:
+                services.registrar_pedidos(llegadas[minuto], cajero, fecha=ahora)
+                db.session.commit()
+                abiertos += len(llegadas[minuto])
+            max_cola = max(max_cola, abiertos)
+            for repartidor_id in repartidores:
+                if regreso[repartidor_id] > minuto or not abiertos:
+                    continue
+                t0 = time.perf_counter()
+                if estrategia == 'cola':
+                    asignacion = despacho.asignar_siguiente(repartidor_id)
+                    viaje = list(asignacion.entregas) if asignacion else None
+                else:
+                    viaje = asignar_ingenuo(repartidor_id, capacidad, ventana)
+                db.session.commit()
+                latencias.append((time.perf_counter() - t0) * 1000)
+                if not viaje:
+                    break
+                viajes.append((repartidor_id, tuple(entrega.pedido_id for entrega in viaje)))
+                abiertos -= len(viaje)
+                # Recorrido determinista: 10 min de salida y 8 por entrega, más el regreso
+                for k, entrega in enumerate(viaje, 1):
+                    entregados += 1
+                    tarde += ahora + timedelta(minutes=10 + 8 * k) > entrega.prometido
+                regreso[repartidor_id] = minuto + 20 + 8 * len(viaje)
+            minuto += 1
+
+        estadisticas = despacho.obtener_estadisticas() if estrategia == 'cola' else None
+        db.session.remove()
+        db.engine.dispose()
+    eliminar_bd(ruta_db)
+    return {
+        'viajes': viajes, 'latencias': latencias, 'tarde': tarde, 'entregados': entregados,
+        'max_cola': max_cola, 'minutos': minuto, 'estadisticas': estadisticas,
+    }
+
+def _reportar(nombre, resultado):
+    latencias = sorted(resultado['latencias'])
+    p95 = latencias[int(len(latencias) * 0.95)]
+    print(f"{nombre:<28} {len(resultado['viajes']):>6} viajes  total {sum(latencias):>8.0f} ms"
+          f"  p50 {statistics.median(latencias):>6.2f} ms  p95 {p95:>6.2f} ms  máx {latencias[-1]:>7.2f} ms")
+
+def bench_en_memoria(cantidad, zonas):
+    from app.pedidos.despacho import Despachador, EntregaPendiente
+
+    azar = random.Random(3)
+    inicio = datetime(2026, 1, 5, 10, 0)
+    entregas = [
+        EntregaPendiente(i, inicio + timedelta(seconds=azar.randrange(36000)), f'Z{azar.randrange(zonas):02d}')
+        for i in range(cantidad)
+    ]
+    despachador = Despachador(capacidad=3, ventana=timedelta(minutes=30))
+    t0 = time.perf_counter()
+    despachador.cargar(entregas)
+    ms_cargar = (time.perf_counter() - t0) * 1000
+
+    despachador = Despachador(capacidad=3, ventana=timedelta(minutes=30))
+    despachador.cargar([])
+    t0 = time.perf_counter()
+    for entrega in entregas:
+        despachador.agregar((entrega,))
+    s_agregar = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    viajes = tomadas = 0
+    while True:
+        viaje = despachador.siguiente_viaje()
+        if not viaje:
+            break
+        viajes += 1
+        tomadas += len(viaje)
+    s_viajes = time.perf_counter() - t0
+    assert tomadas == cantidad
+    print(f"\nDespachador en memoria, {cantidad} entregas en {zonas} zonas:")
+    print(f"  cargar (heapify):   {ms_cargar:>8.1f} ms")
+    print(f"  agregar una a una:  {cantidad / s_agregar:>8.0f} entregas/s")
+    print(f"  siguiente_viaje:    {viajes / s_viajes:>8.0f} viajes/s ({tomadas / s_viajes:.0f} entregas/s, "
+          f"{tomadas / viajes:.2f} por viaje)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pedidos', type=int, default=5000)
+    parser.add_argument('--repartidores', type=int, default=40)
+    parser.add_argument('--zonas', type=int, default=12)
+    parser.add_argument('--horas', type=int, default=10, help='Horas de llegada de pedidos')
+    parser.add_argument('--items', type=int, default=3, help='Artículos por pedido')
+    parser.add_argument('--en-memoria', type=int, default=100_000, help='Entregas para medir la cola sola')
+    parser.add_argument('--perfil', default='produccion', help='Perfil SQLite (config.PERFILES_SQLITE)')
+    args = parser.parse_args()
+
+    from config import PERFILES_SQLITE
+    config = dict(SQLITE_PRAGMAS=PERFILES_SQLITE[args.perfil]['pragmas'], TELEMETRIA_WRITE_BEHIND=False)
+    print(f"{args.pedidos} pedidos DOMICILIO en {args.horas} h, {args.zonas} zonas, "
+          f"{args.repartidores} repartidores, perfil SQLite '{args.perfil}'\n")
+
+    cola = simular('cola', args, config)
+    ingenuo = simular('ingenuo', args, config)
+    assert cola['viajes'] == ingenuo['viajes'], 'Las estrategias asignaron viajes distintos'
+    _reportar('cola (asignar_siguiente)', cola)
+    _reportar('ingenuo (lee los abiertos)', ingenuo)
+    print(f"\nMismos viajes en ambas; {cola['entregados']} entregas en {cola['minutos']} min simulados, "
+          f"{cola['entregados'] / len(cola['viajes']):.2f} por viaje, {cola['tarde']} después de la hora prometida, "
+          f"máximo {cola['max_cola']} pedidos en espera")
+    print(f"Cola: {cola['estadisticas']['recargas']} lecturas completas de la BD, "
+          f"{cola['estadisticas']['descartadas']} entregas descartadas")
+
+    bench_en_memoria(args.en_memoria, args.zonas)
+
+if __name__ == '__main__':
+    main()
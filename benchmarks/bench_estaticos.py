@@ -0,0 +1,99 @@
+"""Benchmark de los recursos estáticos: /static sin comprimir vs. /activos con huella y precomprimidos.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_estaticos.py [--peticiones 500]
+
+Construye el manifiesto en una copia temporal de app/static (no toca el
+árbol del proyecto) y mide, con el cliente de pruebas, lo que baja un
+navegador que acepta gzip/br al cargar la página de login:
+
+* primera visita: bytes transferidos por CSS, JS y logo;
+* visitas siguientes: peticiones que siguen llegando al servidor. /static
+  responde sin max-age, así que el navegador revalida cada recurso; los de
+  /activos son `immutable` y no se vuelven a pedir;
+* latencia por petición de cada ruta, y lo que costaría comprimir con gzip
+  en cada respuesta en lugar de precomprimir.
+"""
+import argparse
+import gzip
+import os
+import re
+import shutil
+import statistics
+import tempfile
+import time
+
+from catalogo_sintetico import preparar_app, eliminar_bd
+
+ENCABEZADOS = {'Accept-Encoding': 'gzip, deflate, br'}
+
+def _recursos_de_pagina(cliente):
+    html = cliente.get('/auth/login').data.decode('utf-8')
+    return [url for url in re.findall(r'(?:href|src)="(/(?:static|activos)/[^"]+)"', html)
+            if not url.endswith('manifest.json')]
+
+def _ms(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+def medir(app, peticiones):
+    cliente = app.test_client()
+    urls = _recursos_de_pagina(cliente)
+    bytes_primera, revalidaciones = 0, 0
+    for url in urls:
+        respuesta = cliente.get(url, headers=ENCABEZADOS)
+        assert respuesta.status_code == 200, (url, respuesta.status_code)
+        bytes_primera += len(respuesta.data)
+        # Una visita siguiente solo llega al servidor si la respuesta no es inmutable
+        revalidaciones += 'immutable' not in (respuesta.headers.get('Cache-Control') or '')
+        respuesta.close()
+    por_peticion = {url: _ms(lambda: cliente.get(url, headers=ENCABEZADOS).close(), peticiones) for url in urls}
+    return urls, bytes_primera, revalidaciones, por_peticion
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--peticiones', type=int, default=500)
+    args = parser.parse_args()
+
+    from app import estaticos
+
+    carpeta = tempfile.mkdtemp(prefix='bench_estaticos_')
+    static = os.path.join(carpeta, 'static')
+    raiz = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'app', 'static'))
+    shutil.copytree(raiz, static, ignore=shutil.ignore_patterns(estaticos.CARPETA_DIST))
+
+    inicio = time.perf_counter()
+    manifiesto = estaticos.construir(static)
+    print(f"construir-estaticos: {len(manifiesto['activos'])} recursos en {(time.perf_counter() - inicio) * 1000:.0f} ms"
+          f" (brotli {'disponible' if estaticos.brotli else 'no instalado: solo gzip'})\n")
+
+    resultados = {}
+    for nombre, con_manifiesto in (('/static', False), ('/activos', True)):
+        app, ruta_db = preparar_app(TELEMETRIA_WRITE_BEHIND=False)
+        app.static_folder = static
+        app.extensions['estaticos'] = estaticos.Estaticos(static, manifiesto if con_manifiesto else None)
+        resultados[nombre] = medir(app, args.peticiones)
+        with app.app_context():
+            from app import db
+            db.engine.dispose()
+        eliminar_bd(ruta_db)
+
+    for nombre, (urls, bytes_primera, revalidaciones, por_peticion) in resultados.items():
+        print(f"{nombre}: primera visita {bytes_primera / 1024:.1f} KiB en {len(urls)} recursos; "
+              f"{revalidaciones} peticiones por cada visita siguiente")
+        for url, ms in por_peticion.items():
+            print(f"  {url:<48} p50 {ms:.3f} ms")
+
+    css = os.path.join(static, 'css', 'estilo.css')
+    with open(css, 'rb') as archivo:
+        contenido = archivo.read()
+    ms_gzip = _ms(lambda: gzip.compress(contenido, compresslevel=6), 200)
+    print(f"\nComprimir estilo.css con gzip en cada respuesta costaría {ms_gzip:.3f} ms; precomprimido, 0")
+    shutil.rmtree(carpeta)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,98 @@
+"""Benchmark de las hojas de precios por tipo de cliente: armar en cada petición vs. materializada con ETag.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_hojas_precios.py [--productos 500] [--peticiones 300] [--perfil produccion]
+
+Crea una BD SQLite temporal con un catálogo sintético (`--productos`
+productos con 5 subproductos, 3 escalones y 5 tipos de cliente) y mide con el
+cliente de pruebas GET /productos/precios/<tipo_cliente> como lo consultan las
+terminales y la PWA:
+
+* sin materializar: CATALOGO_CACHE_HABILITADO = False, la hoja se arma desde
+  la BD en cada petición;
+* materializada: la hoja ya serializada, respuesta 200 completa;
+* revalidación: la terminal manda If-None-Match y recibe 304 sin cuerpo.
+
+Al final cambia un precio y mide la primera petición (regeneración), y edita
+una modificación para comprobar que el ETag no cambia.
+"""
+import argparse
+import statistics
+import time
+
+from catalogo_sintetico import preparar_app, construir_catalogo, crear_usuario, eliminar_bd, TIPOS_CLIENTE
+
+def _medir(cliente, peticiones, encabezados=None, estado=200):
+    tiempos, transferido = [], 0
+    for i in range(peticiones):
+        tipo = TIPOS_CLIENTE[i % len(TIPOS_CLIENTE)]
+        inicio = time.perf_counter()
+        respuesta = cliente.get(f'/productos/precios/{tipo}', headers=(encabezados or {}).get(tipo))
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+        assert respuesta.status_code == estado, respuesta.status_code
+        transferido += len(respuesta.data)
+    return tiempos, transferido
+
+def _reportar(nombre, tiempos, transferido):
+    tiempos = sorted(tiempos)
+    print(f"{nombre:<24} p50 {statistics.median(tiempos):>8.2f} ms  p95 {tiempos[int(len(tiempos) * 0.95)]:>8.2f} ms"
+          f"  {len(tiempos) / (sum(tiempos) / 1000):>8.0f} pet/s  {transferido / len(tiempos) / 1024:>7.1f} KiB/pet")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--productos', type=int, default=500)
+    parser.add_argument('--peticiones', type=int, default=300)
+    parser.add_argument('--perfil', default='produccion', help='Perfil SQLite (config.PERFILES_SQLITE)')
+    args = parser.parse_args()
+
+    from config import PERFILES_SQLITE
+    app, ruta_db = preparar_app(SQLITE_PRAGMAS=PERFILES_SQLITE[args.perfil]['pragmas'], TELEMETRIA_WRITE_BEHIND=False)
+    with app.app_context():
+        from app import db
+        from app.models import Modificacion, Precio
+        from app.productos import hojas_precios
+
+        construir_catalogo(productos=args.productos, subproductos=5, modificaciones=100, escalones=3,
+                           tipos_cliente=len(TIPOS_CLIENTE))
+        crear_usuario('cajero_bench', rol='CAJERO')
+        cliente = app.test_client()
+        cliente.post('/auth/login', data={'username': 'cajero_bench', 'password': 'bench-secreto'})
+        print(f"{args.productos} productos x 5 subproductos, {len(TIPOS_CLIENTE)} tipos de cliente, "
+              f"{args.peticiones} peticiones, perfil SQLite '{args.perfil}'\n")
+
+        app.config['CATALOGO_CACHE_HABILITADO'] = False
+        _reportar('sin materializar', *_medir(cliente, max(args.peticiones // 10, len(TIPOS_CLIENTE))))
+        app.config['CATALOGO_CACHE_HABILITADO'] = True
+
+        etags = {tipo: cliente.get(f'/productos/precios/{tipo}').headers['ETag'] for tipo in TIPOS_CLIENTE}
+        _reportar('materializada (200)', *_medir(cliente, args.peticiones))
+        encabezados = {tipo: {'If-None-Match': etag} for tipo, etag in etags.items()}
+        _reportar('revalidación (304)', *_medir(cliente, args.peticiones, encabezados, estado=304))
+
+        # Cambio de precio: solo cambia la hoja del tipo afectado
+        precio = db.session.execute(db.select(Precio).where(Precio.tipo_cliente == 'COCINA')).scalars().first()
+        precio.precio_kg += 1
+        db.session.commit()
+        inicio = time.perf_counter()
+        respuesta = cliente.get('/productos/precios/COCINA', headers=encabezados['COCINA'])
+        ms = (time.perf_counter() - inicio) * 1000
+        assert respuesta.status_code == 200 and respuesta.headers['ETag'] != etags['COCINA']
+        armado = hojas_precios.obtener_estadisticas()['ms_ultima_generacion']
+        assert cliente.get('/productos/precios/PUBLICO', headers=encabezados['PUBLICO']).status_code == 304
+        print(f"\nTras cambiar un precio de COCINA: primera petición {ms:.1f} ms (nuevo ETag), de ellos {armado:.1f} ms "
+              f"armando la hoja y el resto en la foto del catálogo; PUBLICO sigue en 304")
+
+        # Editar una modificación invalida la versión del catálogo, pero no el contenido de la hoja
+        etags['COCINA'] = respuesta.headers['ETag']
+        modificacion = db.session.execute(db.select(Modificacion)).scalars().first()
+        modificacion.nombre += ' (editada)'
+        db.session.commit()
+        assert cliente.get('/productos/precios/COCINA', headers={'If-None-Match': etags['COCINA']}).status_code == 304
+        print("Tras editar una modificación: la hoja se regenera con el mismo ETag (304)")
+
+        db.session.remove()
+        db.engine.dispose()
+    eliminar_bd(ruta_db)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,122 @@
+"""Latencia del catálogo durante una ráfaga de logins, con y sin el pool de hash.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_login_tormenta.py [--logins 8] [--segundos 5] [--trabajadores 1] [--cola 4]
+
+Levanta la app en un servidor WSGI con hilos (como en producción) sobre una BD
+temporal. Un cliente consulta `ver_producto` sin parar mientras `--logins`
+hilos inician sesión en bucle (esperando 0.5 s tras un 503). Se compara la
+latencia del catálogo en reposo y durante la ráfaga, calculando el hash en el
+hilo de la petición (HASH_TRABAJADORES=0, comportamiento anterior) y en el
+pool acotado.
+"""
+import argparse
+import http.cookiejar
+import logging
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from catalogo_sintetico import preparar_app, construir_catalogo, crear_usuario, eliminar_bd
+
+PASSWORD = 'bench-secreto'
+
+class _SinRedireccion(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+def _cliente():
+    return urllib.request.build_opener(
+        urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _SinRedireccion()
+    )
+
+def _login(cliente, base, username):
+    datos = urllib.parse.urlencode({'username': username, 'password': PASSWORD}).encode()
+    try:
+        with cliente.open(base + '/auth/login', datos) as respuesta:
+            return respuesta.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+def _latencias_catalogo(cliente, base, segundos):
+    latencias = []
+    fin = time.perf_counter() + segundos
+    n = 0
+    while time.perf_counter() < fin:
+        inicio = time.perf_counter()
+        with cliente.open(f'{base}/productos/ver/P{n % 50:05d}') as respuesta:
+            respuesta.read()
+        latencias.append((time.perf_counter() - inicio) * 1000)
+        n += 1
+    return latencias
+
+def _resumen(latencias):
+    cuantiles = statistics.quantiles(latencias, n=100)
+    return f"p50 {cuantiles[49]:>7.2f} ms  p95 {cuantiles[94]:>7.2f} ms  ({len(latencias)} peticiones)"
+
+def escenario(nombre, args, **config):
+    from werkzeug.serving import make_server
+
+    app, ruta_db = preparar_app(**config)
+    with app.app_context():
+        construir_catalogo(productos=50, subproductos=5, modificaciones=50, escalones=3)
+        crear_usuario('admin_bench', PASSWORD)
+        for i in range(args.logins):
+            crear_usuario(f'cajero{i}', PASSWORD, rol='CAJERO')
+
+    servidor = make_server('127.0.0.1', 0, app, threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{servidor.server_port}'
+
+    cliente = _cliente()
+    assert _login(cliente, base, 'admin_bench') == 302
+    reposo = _latencias_catalogo(cliente, base, min(2.0, args.segundos))
+
+    detener = threading.Event()
+    codigos = []
+    def _tormenta(i):
+        while not detener.is_set():
+            codigo = _login(_cliente(), base, f'cajero{i}')
+            codigos.append(codigo)
+            if codigo == 503: # Como un cajero: espera un momento y reintenta
+                detener.wait(0.5)
+    hilos = [threading.Thread(target=_tormenta, args=(i,)) for i in range(args.logins)]
+    for hilo in hilos:
+        hilo.start()
+    time.sleep(0.2)
+    rafaga = _latencias_catalogo(cliente, base, args.segundos)
+    detener.set()
+    for hilo in hilos:
+        hilo.join()
+    servidor.shutdown()
+    with app.app_context():
+        from app import db
+        app.extensions['telemetria_usuarios'].vaciar()
+        db.engine.dispose()
+    eliminar_bd(ruta_db)
+
+    exitosos = codigos.count(302)
+    rechazados = codigos.count(503)
+    print(f"{nombre}")
+    print(f"  catálogo en reposo:   {_resumen(reposo)}")
+    print(f"  catálogo con ráfaga:  {_resumen(rafaga)}")
+    print(f"  logins: {exitosos / args.segundos:.1f}/s correctos, {rechazados} rechazados (503)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--logins', type=int, default=8, help='Hilos que inician sesión en bucle')
+    parser.add_argument('--segundos', type=float, default=5.0)
+    parser.add_argument('--trabajadores', type=int, default=1, help='HASH_TRABAJADORES del escenario con pool')
+    parser.add_argument('--cola', type=int, default=4, help='HASH_COLA_MAXIMA del escenario con pool')
+    args = parser.parse_args()
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+
+    escenario('Hash en el hilo de la petición (HASH_TRABAJADORES=0)', args, HASH_TRABAJADORES=0)
+    escenario(f'Pool acotado (HASH_TRABAJADORES={args.trabajadores}, HASH_COLA_MAXIMA={args.cola})', args,
+              HASH_TRABAJADORES=args.trabajadores, HASH_COLA_MAXIMA=args.cola)
+
+if __name__ == '__main__':
+    main()
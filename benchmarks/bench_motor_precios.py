@@ -0,0 +1,95 @@
+"""Benchmark del motor de precios: consulta directa a la BD vs. tabla compilada.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_motor_precios.py [--cotizaciones 20000]
+
+Crea una BD SQLite temporal, la puebla con `seed-db` y mide cotizaciones por
+segundo con el método "antes" (una consulta de Precio por cotización) y
+"después" (motor_precios.cotizar / cotizar_lote). Las del motor se miden
+`--rondas` veces y se informa la mejor.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+def cotizar_desde_bd(db, Precio, tipo_cliente, cantidad_kg, producto_id=None, subproducto_id=None):
+    """Lo que tendría que hacer cada llamador sin el motor: filtrar Precio en la BD."""
+    hoy = date.today()
+    consulta = Precio.query.filter(
+        Precio.tipo_cliente == tipo_cliente,
+        Precio.activo.is_(True),
+        Precio.cantidad_minima_kg <= cantidad_kg,
+        db.or_(Precio.fecha_inicio_vigencia.is_(None), Precio.fecha_inicio_vigencia <= hoy),
+        db.or_(Precio.fecha_fin_vigencia.is_(None), Precio.fecha_fin_vigencia >= hoy),
+    )
+    if subproducto_id is not None:
+        consulta = consulta.filter(Precio.subproducto_id == subproducto_id)
+    else:
+        consulta = consulta.filter(Precio.producto_id == producto_id)
+    return consulta.order_by(Precio.cantidad_minima_kg.desc()).first()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--cotizaciones', type=int, default=20000)
+    parser.add_argument('--rondas', type=int, default=5)
+    args = parser.parse_args()
+
+    fd, ruta_db = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    os.environ['DATABASE_URL'] = 'sqlite:///' + ruta_db
+
+    from app import create_app, db
+    from app.models import Precio
+    from app.productos import motor_precios
+    import run
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        run.seed_catalogo()
+
+        objetivos = [(p.producto_id, p.subproducto_id) for p in Precio.query.all()]
+        tipos = ['PUBLICO', 'COCINA', 'LEAL', 'ALIADO', 'MAYOREO']
+        rnd = random.Random(42)
+        carrito = [
+            {'producto_id': prod, 'subproducto_id': sub,
+             'tipo_cliente': rnd.choice(tipos), 'cantidad_kg': round(rnd.uniform(0.25, 15), 2)}
+            for prod, sub in (rnd.choice(objetivos) for _ in range(args.cotizaciones))
+        ]
+
+        # Antes: una consulta por cotización (limitado a una muestra para no tardar demasiado)
+        muestra = carrito[:min(len(carrito), 2000)]
+        inicio = time.perf_counter()
+        for item in muestra:
+            cotizar_desde_bd(db, Precio, item['tipo_cliente'], item['cantidad_kg'], item['producto_id'], item['subproducto_id'])
+        antes = len(muestra) / (time.perf_counter() - inicio)
+
+        motor_precios.obtener_tabla_precios() # Compilación inicial fuera de la medición
+
+        individual = lote = 0
+        for _ in range(args.rondas):
+            inicio = time.perf_counter()
+            uno_a_uno = [
+                motor_precios.cotizar(item['tipo_cliente'], item['cantidad_kg'], item['producto_id'], item['subproducto_id'])
+                for item in carrito
+            ]
+            individual = max(individual, len(carrito) / (time.perf_counter() - inicio))
+
+            inicio = time.perf_counter()
+            en_lote = motor_precios.cotizar_lote(carrito, 'PUBLICO')
+            lote = max(lote, len(carrito) / (time.perf_counter() - inicio))
+        assert uno_a_uno == en_lote
+
+    os.remove(ruta_db)
+    print(f"Antes (consulta por cotización): {antes:>12,.0f} cotizaciones/s")
+    print(f"Motor, llamada individual:       {individual:>12,.0f} cotizaciones/s")
+    print(f"Motor, lote:                     {lote:>12,.0f} cotizaciones/s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""Benchmark de captura de pedidos: ORM artículo por artículo vs. servicio por conjuntos.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_pedidos.py [--pedidos 1000] [--items 8] [--lote 50] [--perfil produccion]
+
+Crea una BD SQLite temporal con un catálogo sintético y registra `--pedidos`
+pedidos de `--items` artículos (con y sin modificación) de tres formas:
+
+* "ORM por artículo": lo que haría una vista ingenua; por cada artículo un
+  `session.get` del producto/subproducto, una consulta de modificaciones
+  aplicables y una consulta de Precio; objetos ORM y un commit por pedido.
+* `services.registrar_pedido` con un commit por pedido.
+* `services.registrar_pedidos` con un commit cada `--lote` pedidos.
+"""
+import argparse
+import random
+import statistics
+import time
+from datetime import date
+
+from catalogo_sintetico import preparar_app, construir_catalogo, crear_usuario, eliminar_bd, TIPOS_CLIENTE
+
+def generar_pedidos(snapshot, cantidad, items_por_pedido, semilla=11):
+    """Pedidos sintéticos válidos sobre la foto del catálogo."""
+    rnd = random.Random(semilla)
+    articulos = []
+    for producto in snapshot.productos:
+        if producto.activo:
+            articulos.append(({'producto_id': producto.id}, producto.modificaciones))
+            articulos += [({'subproducto_id': sub.id}, sub.modificaciones) for sub in producto.subproductos if sub.activo]
+    pedidos = []
+    for _ in range(cantidad):
+        items = []
+        for articulo, modificaciones in rnd.sample(articulos, items_por_pedido):
+            item = dict(articulo, cantidad_kg=round(rnd.uniform(0.25, 8), 2))
+            if modificaciones and rnd.random() < 0.4:
+                item['modificacion_id'] = rnd.choice(modificaciones).id
+            items.append(item)
+        pedido = {'tipo_cliente': rnd.choice(TIPOS_CLIENTE[:3]), 'items': items, 'forma_pago': 'EFECTIVO'}
+        if rnd.random() < 0.3:
+            pedido['adicionales'] = [{'nombre': 'Tortillas', 'cantidad': 1, 'precio_unitario': 22.0}]
+        pedidos.append(pedido)
+    return pedidos
+
+def registrar_orm(datos, usuario_id):
+    """Versión ingenua: validación y precio con consultas por artículo, objetos ORM."""
+    from app import db
+    from app.models import (Pedido, PedidoItem, ProductoAdicional, Producto, Subproducto, Modificacion, Precio,
+                            producto_modificacion_association, subproducto_modificacion_association)
+
+    hoy = date.today()
+    pedido = Pedido(usuario_id=usuario_id, tipo_cliente=datos['tipo_cliente'], forma_pago=datos.get('forma_pago'))
+    db.session.add(pedido)
+    subtotal_items = 0.0
+    for item in datos['items']:
+        if 'producto_id' in item:
+            articulo = db.session.get(Producto, item['producto_id'])
+            filtro_precio = Precio.producto_id == articulo.id
+            asociacion, columna = producto_modificacion_association, producto_modificacion_association.c.producto_id
+        else:
+            articulo = db.session.get(Subproducto, item['subproducto_id'])
+            filtro_precio = Precio.subproducto_id == articulo.id
+            asociacion, columna = subproducto_modificacion_association, subproducto_modificacion_association.c.subproducto_id
+        descripcion = articulo.nombre
+        if item.get('modificacion_id'):
+            modificacion = db.session.scalars(
+                db.select(Modificacion).join(asociacion).where(
+                    columna == articulo.id, Modificacion.id == item['modificacion_id']
+                )
+            ).first()
+            descripcion = f'{articulo.nombre} ({modificacion.nombre})'
+        precio = db.session.scalars(
+            db.select(Precio).where(
+                filtro_precio, Precio.tipo_cliente == datos['tipo_cliente'], Precio.activo.is_(True),
+                Precio.cantidad_minima_kg <= item['cantidad_kg'],
+                db.or_(Precio.fecha_inicio_vigencia.is_(None), Precio.fecha_inicio_vigencia <= hoy),
+                db.or_(Precio.fecha_fin_vigencia.is_(None), Precio.fecha_fin_vigencia >= hoy),
+            ).order_by(Precio.cantidad_minima_kg.desc())
+        ).first()
+        subtotal = round(precio.precio_kg * item['cantidad_kg'], 2)
+        subtotal_items += subtotal
+        pedido.items.append(PedidoItem(
+            producto_id=item.get('producto_id'), subproducto_id=item.get('subproducto_id'),
+            modificacion_id=item.get('modificacion_id'), descripcion=descripcion,
+            cantidad_kg=item['cantidad_kg'], precio_kg=precio.precio_kg, subtotal=subtotal,
+            tipo_cliente_aplicado=precio.tipo_cliente, precio_id=precio.id
+        ))
+    subtotal_adicionales = 0.0
+    for adicional in datos.get('adicionales', []):
+        subtotal = round(adicional['cantidad'] * adicional['precio_unitario'], 2)
+        subtotal_adicionales += subtotal
+        pedido.adicionales.append(ProductoAdicional(subtotal=subtotal, **adicional))
+    pedido.subtotal_items = round(subtotal_items, 2)
+    pedido.subtotal_adicionales = subtotal_adicionales
+    pedido.total = round(subtotal_items + subtotal_adicionales, 2)
+    db.session.commit()
+
+def _medir(nombre, pedidos, items_por_pedido, funcion):
+    latencias = []
+    inicio = time.perf_counter()
+    for grupo in funcion():
+        latencias.append(grupo)
+    segundos = time.perf_counter() - inicio
+    por_segundo = len(pedidos) / segundos
+    cuantiles = statistics.quantiles(latencias, n=100) if len(latencias) > 1 else latencias * 99
+    print(f"{nombre:<38} {por_segundo:>8.0f} pedidos/s {por_segundo * items_por_pedido:>9.0f} items/s"
+          f"  commit p50 {cuantiles[49]:>6.2f} ms  p95 {cuantiles[94]:>6.2f} ms")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pedidos', type=int, default=1000)
+    parser.add_argument('--items', type=int, default=8, help='Artículos por pedido')
+    parser.add_argument('--lote', type=int, default=50, help='Pedidos por commit en el modo por lotes')
+    parser.add_argument('--perfil', default='produccion', help='Perfil SQLite (config.PERFILES_SQLITE)')
+    args = parser.parse_args()
+
+    from config import PERFILES_SQLITE
+    app, ruta_db = preparar_app(SQLITE_PRAGMAS=PERFILES_SQLITE[args.perfil]['pragmas'])
+    with app.app_context():
+        from app import db
+        from app.pedidos import services
+        from app.productos import catalogo_cache
+
+        construir_catalogo(productos=200, subproductos=5, modificaciones=100, escalones=3)
+        usuario_id = crear_usuario('cajero_bench', rol='CAJERO').id
+        pedidos = generar_pedidos(catalogo_cache.obtener_snapshot(), args.pedidos, args.items)
+        print(f"{args.pedidos} pedidos x {args.items} artículos, perfil SQLite '{args.perfil}'")
+
+        def _orm():
+            for datos in pedidos:
+                inicio = time.perf_counter()
+                registrar_orm(datos, usuario_id)
+                yield (time.perf_counter() - inicio) * 1000
+
+        def _servicio():
+            for datos in pedidos:
+                inicio = time.perf_counter()
+                services.registrar_pedido(datos, usuario_id)
+                db.session.commit()
+                yield (time.perf_counter() - inicio) * 1000
+
+        def _lotes():
+            for i in range(0, len(pedidos), args.lote):
+                inicio = time.perf_counter()
+                services.registrar_pedidos(pedidos[i:i + args.lote], usuario_id)
+                db.session.commit()
+                yield (time.perf_counter() - inicio) * 1000
+
+        _medir('ORM por artículo (commit por pedido)', pedidos, args.items, _orm)
+        _medir('registrar_pedido (commit por pedido)', pedidos, args.items, _servicio)
+        _medir(f'registrar_pedidos (lotes de {args.lote})', pedidos, args.items, _lotes)
+
+        db.session.remove()
+        db.engine.dispose()
+    eliminar_bd(ruta_db)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+"""Benchmark de reportes de ventas: GROUP BY sobre pedidos vs. resúmenes diarios.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_resumen_ventas.py [--dias 365] [--pedidos-por-dia 200] [--items 4] [--perfil produccion]
+
+Registra `--dias` días de pedidos con `services.registrar_pedidos` (un lote
+por día, con la fecha de ese día), lo que va llenando los resúmenes de forma
+incremental, y mide para un año de ventas:
+
+* el reporte por día, por mes y tipo de cliente, y por producto, calculado con
+  GROUP BY sobre `pedidos`/`pedido_items` (lo que haría un reporte ingenuo);
+* los mismos reportes con `reportes.services.ventas`, que lee solo los
+  resúmenes;
+* `resumen_ventas.reconstruir` del rango completo (y de un mes suelto), comprobando que deja los
+  mismos resúmenes que la actualización incremental.
+
+También mide cuánto agrega el UPSERT de los resúmenes a un lote de pedidos.
+"""
+import argparse
+import statistics
+import time
+from datetime import date, datetime, timedelta
+
+from catalogo_sintetico import preparar_app, construir_catalogo, crear_usuario, eliminar_bd
+from bench_pedidos import generar_pedidos
+
+def _ms(funcion, repeticiones):
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+    return statistics.median(tiempos)
+
+def reportes_directos(desde, hasta):
+    """Los tres reportes con GROUP BY sobre las tablas de pedidos."""
+    from app import db
+    from app.models import Pedido, PedidoItem, Subproducto
+
+    inicio = datetime.combine(desde, datetime.min.time())
+    fin = datetime.combine(hasta + timedelta(days=1), datetime.min.time())
+    rango = (Pedido.fecha_pedido >= inicio, Pedido.fecha_pedido < fin)
+    dia = db.func.date(Pedido.fecha_pedido)
+    mes = db.func.strftime('%Y-%m', Pedido.fecha_pedido)
+    producto = db.func.coalesce(PedidoItem.producto_id, Subproducto.producto_padre_id)
+    return (
+        db.session.execute(
+            db.select(dia, db.func.count(), db.func.sum(Pedido.total)).where(*rango).group_by(dia)
+        ).all(),
+        db.session.execute(
+            db.select(mes, Pedido.tipo_cliente, db.func.count(), db.func.sum(Pedido.total))
+            .where(*rango).group_by(mes, Pedido.tipo_cliente)
+        ).all(),
+        db.session.execute(
+            db.select(producto, db.func.sum(PedidoItem.cantidad_kg), db.func.sum(PedidoItem.subtotal))
+            .select_from(PedidoItem).join(Pedido).outerjoin(Subproducto, Subproducto.id == PedidoItem.subproducto_id)
+            .where(*rango).group_by(producto)
+        ).all(),
+    )
+
+def reportes_resumen(desde, hasta):
+    from app.reportes import services
+    return (
+        services.ventas(desde, hasta, ['fecha']),
+        services.ventas(desde, hasta, ['mes', 'tipo_cliente']),
+        services.ventas(desde, hasta, ['producto']),
+    )
+
+def _contenido_resumenes():
+    from app import db
+    from app.models import ventas_diarias, ventas_diarias_articulos, ventas_mensuales_articulos
+    contenido = []
+    for tabla in (ventas_diarias, ventas_diarias_articulos, ventas_mensuales_articulos):
+        filas = db.session.execute(db.select(tabla).order_by(*tabla.primary_key.columns)).all()
+        # Los importes se comparan redondeados: el orden de las sumas cambia los últimos bits
+        contenido.append([tuple(round(v, 6) if isinstance(v, float) else v for v in fila) for fila in filas])
+    return contenido
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--dias', type=int, default=365)
+    parser.add_argument('--pedidos-por-dia', type=int, default=200)
+    parser.add_argument('--items', type=int, default=4, help='Artículos por pedido')
+    parser.add_argument('--perfil', default='produccion', help='Perfil SQLite (config.PERFILES_SQLITE)')
+    args = parser.parse_args()
+
+    from config import PERFILES_SQLITE
+    app, ruta_db = preparar_app(SQLITE_PRAGMAS=PERFILES_SQLITE[args.perfil]['pragmas'], TELEMETRIA_WRITE_BEHIND=False)
+    with app.app_context():
+        from app import db
+        from app.pedidos import services
+        from app.productos import catalogo_cache
+        from app.reportes import resumen_ventas
+
+        # Catálogo del tamaño de una pollería: el resumen por artículo crece con él, no con los pedidos
+        construir_catalogo(productos=20, subproductos=5, modificaciones=10, escalones=3)
+        cajeros = [crear_usuario(f'cajero_bench{i}', rol='CAJERO').id for i in range(3)]
+        pedidos = generar_pedidos(catalogo_cache.obtener_snapshot(), args.pedidos_por_dia, args.items)
+        hasta = date.today()
+        desde = hasta - timedelta(days=args.dias - 1)
+
+        inicio = time.perf_counter()
+        latencias = []
+        for n in range(args.dias):
+            fecha = datetime.combine(desde + timedelta(days=n), datetime.min.time()) + timedelta(hours=12)
+            inicio_lote = time.perf_counter()
+            services.registrar_pedidos(pedidos, cajeros[n % len(cajeros)], fecha=fecha)
+            db.session.commit()
+            latencias.append((time.perf_counter() - inicio_lote) * 1000)
+        total_pedidos = args.dias * args.pedidos_por_dia
+        print(f"{total_pedidos} pedidos x {args.items} artículos en {args.dias} días "
+              f"({total_pedidos / (time.perf_counter() - inicio):.0f} pedidos/s, "
+              f"lote de {args.pedidos_por_dia}: p50 {statistics.median(latencias):.1f} ms), perfil '{args.perfil}'")
+
+        # Costo del UPSERT de resúmenes dentro de un lote: mismo lote con y sin acumular
+        original = resumen_ventas.acumular_pedidos
+        fecha = datetime.combine(hasta, datetime.min.time())
+        con_resumen = _ms(lambda: (services.registrar_pedidos(pedidos, cajeros[0], fecha=fecha), db.session.rollback()), 5)
+        resumen_ventas.acumular_pedidos = lambda *args, **kwargs: None
+        try:
+            sin_resumen = _ms(lambda: (services.registrar_pedidos(pedidos, cajeros[0], fecha=fecha), db.session.rollback()), 5)
+        finally:
+            resumen_ventas.acumular_pedidos = original
+        print(f"Lote de {args.pedidos_por_dia} pedidos: {sin_resumen:.1f} ms sin resúmenes, {con_resumen:.1f} ms con resúmenes\n")
+
+        directos = reportes_directos(desde, hasta)
+        por_resumen = reportes_resumen(desde, hasta)
+        assert len(directos[0]) == len(por_resumen[0]) and len(directos[2]) == len(por_resumen[2])
+        assert all(abs(d[2] - r['importe']) < 0.01 for d, r in zip(sorted(directos[2]), por_resumen[2]))
+        assert abs(sum(f[2] for f in directos[0]) - sum(f['total'] for f in por_resumen[0])) < 0.01 * args.dias
+
+        ms_directo = _ms(lambda: reportes_directos(desde, hasta), 3)
+        ms_resumen = _ms(lambda: reportes_resumen(desde, hasta), 20)
+        print(f"Reportes de un año (por día, por mes y tipo de cliente, por producto):")
+        print(f"  GROUP BY sobre pedidos:   {ms_directo:>9.2f} ms")
+        print(f"  resúmenes diarios:        {ms_resumen:>9.2f} ms")
+        for nombre, agrupar in (('por día', ['fecha']), ('por mes y tipo de cliente', ['mes', 'tipo_cliente']),
+                                ('por producto', ['producto']), ('por artículo y cajero', ['articulo', 'usuario'])):
+            from app.reportes import services as reportes
+            ms = _ms(lambda: reportes.ventas(desde, hasta, agrupar), 20)
+            print(f"    {nombre:<28} {ms:>7.2f} ms")
+
+        incremental = _contenido_resumenes()
+        inicio = time.perf_counter()
+        filas = resumen_ventas.reconstruir(desde, hasta)
+        db.session.commit()
+        ms_reconstruir = (time.perf_counter() - inicio) * 1000
+        assert _contenido_resumenes() == incremental, 'La reconstrucción no coincide con los resúmenes incrementales'
+        resumen_ventas.reconstruir(desde + timedelta(days=40), desde + timedelta(days=45))
+        db.session.commit()
+        assert _contenido_resumenes() == incremental, 'La reconstrucción parcial no coincide'
+        print(f"\nreconstruir ({filas[0]} + {filas[1]} filas): {ms_reconstruir:.0f} ms; coincide con los incrementales")
+
+        db.session.remove()
+        db.engine.dispose()
+    eliminar_bd(ruta_db)
+
+if __name__ == '__main__':
+    main()
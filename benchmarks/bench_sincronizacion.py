@@ -0,0 +1,94 @@
+"""Benchmark de la sincronización de pedidos capturados sin conexión.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_sincronizacion.py [--pedidos 500] [--items 6] [--lote 200] [--rtt-ms 150] [--perfil produccion]
+
+Simula la cola del service worker después de un corte: `--pedidos` pedidos
+con clave de idempotencia y hora de captura, y los envía con el cliente de
+pruebas de Flask (sin red) de dos formas:
+
+* uno por uno a `POST /pedidos/` (lo que harían los formularios reenviados);
+* en lotes de `--lote` a `POST /pedidos/sincronizar`, una transacción por lote.
+
+Después reenvía todos los lotes (como si se hubieran perdido las respuestas)
+y comprueba que no se duplicó ningún pedido. Como el cliente de pruebas no
+tiene latencia de red, también muestra el tiempo estimado sumando `--rtt-ms`
+por petición.
+"""
+import argparse
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+from catalogo_sintetico import preparar_app, construir_catalogo, crear_usuario, eliminar_bd
+from bench_pedidos import generar_pedidos
+
+def encolar(pedidos):
+    """Los pedidos como los deja el service worker: con clave y hora de captura."""
+    inicio = datetime.now(timezone.utc) - timedelta(hours=2)
+    return [
+        dict(pedido, clave_idempotencia=str(uuid.uuid4()),
+             capturado_en=(inicio + timedelta(seconds=15 * i)).isoformat())
+        for i, pedido in enumerate(pedidos)
+    ]
+
+def _reportar(nombre, peticiones, segundos, pedidos, rtt_ms):
+    estimado = segundos + peticiones * rtt_ms / 1000
+    print(f"{nombre:<34} {peticiones:>6} peticiones {segundos * 1000:>9.0f} ms"
+          f" {len(pedidos) / segundos:>7.0f} pedidos/s   con RTT {estimado:>7.2f} s")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pedidos', type=int, default=500)
+    parser.add_argument('--items', type=int, default=6, help='Artículos por pedido')
+    parser.add_argument('--lote', type=int, default=200, help='Pedidos por sincronización (máx. 500)')
+    parser.add_argument('--rtt-ms', type=float, default=150, help='Latencia de ida y vuelta a sumar por petición')
+    parser.add_argument('--perfil', default='produccion', help='Perfil SQLite (config.PERFILES_SQLITE)')
+    args = parser.parse_args()
+
+    from config import PERFILES_SQLITE
+    app, ruta_db = preparar_app(SQLITE_PRAGMAS=PERFILES_SQLITE[args.perfil]['pragmas'], TELEMETRIA_WRITE_BEHIND=False)
+    with app.app_context():
+        from app import db
+        from app.models import Pedido
+        from app.productos import catalogo_cache
+
+        construir_catalogo(productos=200, subproductos=5, modificaciones=100, escalones=3)
+        crear_usuario('cajero_bench', rol='CAJERO')
+        base = generar_pedidos(catalogo_cache.obtener_snapshot(), args.pedidos, args.items)
+        db.session.commit()
+
+    cliente = app.test_client()
+    cliente.post('/auth/login', data={'username': 'cajero_bench', 'password': 'bench-secreto'})
+    print(f"Cola de {args.pedidos} pedidos x {args.items} artículos, perfil SQLite '{args.perfil}'")
+
+    pedidos = encolar(base)
+    inicio = time.perf_counter()
+    for pedido in pedidos:
+        assert cliente.post('/pedidos/', json=pedido).status_code == 201
+    _reportar('uno por uno (POST /pedidos/)', len(pedidos), time.perf_counter() - inicio, pedidos, args.rtt_ms)
+
+    pedidos = encolar(base)
+    lotes = [pedidos[i:i + args.lote] for i in range(0, len(pedidos), args.lote)]
+    inicio = time.perf_counter()
+    for lote in lotes:
+        respuesta = cliente.post('/pedidos/sincronizar', json={'pedidos': lote}).get_json()
+        assert respuesta['registrados'] == len(lote), respuesta
+    _reportar(f'sincronizar (lotes de {args.lote})', len(lotes), time.perf_counter() - inicio, pedidos, args.rtt_ms)
+
+    inicio = time.perf_counter()
+    for lote in lotes:
+        respuesta = cliente.post('/pedidos/sincronizar', json={'pedidos': lote}).get_json()
+        assert respuesta['duplicados'] == len(lote), respuesta
+    _reportar('reenvío de los mismos lotes', len(lotes), time.perf_counter() - inicio, pedidos, args.rtt_ms)
+
+    with app.app_context():
+        total = db.session.scalar(db.select(db.func.count()).select_from(Pedido))
+        assert total == 2 * args.pedidos, total
+        print(f"\nPedidos en la BD: {total} (ningún duplicado por el reenvío)")
+        db.session.remove()
+        db.engine.dispose()
+    eliminar_bd(ruta_db)
+
+if __name__ == '__main__':
+    main()
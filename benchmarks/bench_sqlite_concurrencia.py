@@ -0,0 +1,103 @@
+"""Benchmark de lectura/escritura concurrente con cada perfil SQLite (config.PERFILES_SQLITE).
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_sqlite_concurrencia.py [--lectores 4] [--escritores 2] [--segundos 5]
+
+Para cada perfil crea una BD temporal con un catálogo sintético y lanza
+procesos independientes (como varios workers de gunicorn): los lectores cargan
+el árbol de productos al azar y los escritores actualizan precios con un
+commit por operación. Reporta operaciones por segundo, latencia p95 de
+escritura y errores "database is locked".
+"""
+import argparse
+import multiprocessing
+import random
+import statistics
+import time
+
+from catalogo_sintetico import preparar_app, construir_catalogo, eliminar_bd
+
+PRODUCTOS = 200
+
+def _trabajador(ruta_db, perfil, escritor, segundos, semilla, cola):
+    from sqlalchemy import update
+    from sqlalchemy.exc import OperationalError
+    from config import PERFILES_SQLITE, opciones_engine
+    from app import db
+    from app.models import Precio
+    from app.productos import services
+
+    app, _ = preparar_app(
+        ruta_db, crear_esquema=False, CATALOGO_CACHE_HABILITADO=False,
+        SQLITE_PRAGMAS=PERFILES_SQLITE[perfil]['pragmas'],
+        SQLALCHEMY_ENGINE_OPTIONS=opciones_engine(perfil, 'sqlite:///' + ruta_db)
+    )
+    rnd = random.Random(semilla)
+    operaciones, errores, latencias = 0, 0, []
+    fin = time.perf_counter() + segundos
+    with app.app_context():
+        total_precios = db.session.query(Precio).count()
+        while time.perf_counter() < fin:
+            inicio = time.perf_counter()
+            try:
+                if escritor:
+                    db.session.execute(
+                        update(Precio).where(Precio.id == rnd.randint(1, total_precios))
+                        .values(precio_kg=round(rnd.uniform(20, 200), 2))
+                    )
+                    db.session.commit()
+                else:
+                    services.cargar_arbol_producto(f'P{rnd.randrange(PRODUCTOS):05d}')
+                    db.session.rollback() # Cierra la transacción de lectura
+                operaciones += 1
+                latencias.append((time.perf_counter() - inicio) * 1000)
+            except OperationalError:
+                db.session.rollback()
+                errores += 1
+        db.engine.dispose()
+    cola.put((escritor, operaciones, errores, latencias))
+
+def medir_perfil(perfil, args):
+    from config import PERFILES_SQLITE, opciones_engine
+
+    app, ruta_db = preparar_app(
+        CATALOGO_CACHE_HABILITADO=False,
+        SQLITE_PRAGMAS=PERFILES_SQLITE[perfil]['pragmas'],
+    )
+    with app.app_context():
+        from app import db
+        construir_catalogo(productos=PRODUCTOS, subproductos=5, modificaciones=100, escalones=3)
+        db.engine.dispose()
+
+    cola = multiprocessing.Queue()
+    procesos = [
+        multiprocessing.Process(target=_trabajador, args=(ruta_db, perfil, escritor, args.segundos, n, cola))
+        for n, escritor in enumerate([False] * args.lectores + [True] * args.escritores)
+    ]
+    for proceso in procesos:
+        proceso.start()
+    resultados = [cola.get() for _ in procesos]
+    for proceso in procesos:
+        proceso.join()
+    eliminar_bd(ruta_db)
+
+    lecturas = sum(r[1] for r in resultados if not r[0])
+    escrituras = sum(r[1] for r in resultados if r[0])
+    errores = sum(r[2] for r in resultados)
+    lat_escritura = sorted(l for r in resultados if r[0] for l in r[3])
+    p95 = statistics.quantiles(lat_escritura, n=100)[94] if len(lat_escritura) > 1 else float('nan')
+    print(f"{perfil:<12} lecturas/s {lecturas / args.segundos:>9.1f}  escrituras/s {escrituras / args.segundos:>8.1f}  "
+          f"p95 escritura {p95:>8.2f} ms  errores 'locked' {errores:>5}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--lectores', type=int, default=4)
+    parser.add_argument('--escritores', type=int, default=2)
+    parser.add_argument('--segundos', type=float, default=5.0)
+    parser.add_argument('--perfiles', nargs='+', default=['desarrollo', 'produccion'])
+    args = parser.parse_args()
+    for perfil in args.perfiles:
+        medir_perfil(perfil, args)
+
+if __name__ == '__main__':
+    main()
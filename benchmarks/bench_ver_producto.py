@@ -0,0 +1,73 @@
+"""Verifica que `ver_producto` carga el árbol del producto con un número fijo de consultas.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/bench_ver_producto.py [--tamanos 1 10 100 500]
+
+Para cada tamaño crea un producto con ese número de subproductos (cada uno con
+modificaciones y precios) en una BD SQLite temporal, cuenta las sentencias SQL
+que ejecuta `services.cargar_arbol_producto` y termina con código 1 si el
+conteo crece con el tamaño del catálogo.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tamanos', type=int, nargs='+', default=[1, 10, 100, 500])
+    args = parser.parse_args()
+
+    fd, ruta_db = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+    os.environ['DATABASE_URL'] = 'sqlite:///' + ruta_db
+
+    from sqlalchemy import event
+    from app import create_app, db
+    from app.models import Producto, Subproducto, Modificacion, Precio
+    from app.productos import services
+
+    app = create_app()
+    app.config['CATALOGO_CACHE_HABILITADO'] = False # Medimos la carga desde la BD
+
+    sentencias = []
+    conteos = {}
+    with app.app_context():
+        db.create_all()
+        event.listen(db.engine, 'before_cursor_execute', lambda *a: sentencias.append(a[2]))
+
+        mods = [Modificacion(codigo_modif=f'MOD{i}', nombre=f'Modificación {i}') for i in range(5)]
+        db.session.add_all(mods)
+        for tamano in args.tamanos:
+            producto = Producto(id=f'P{tamano}', nombre=f'Producto {tamano}', categoria='Producto')
+            db.session.add(producto)
+            producto.modificaciones_directas.extend(mods)
+            db.session.add(Precio(producto_base=producto, tipo_cliente='PUBLICO', precio_kg=100.0))
+            for i in range(tamano):
+                sub = Subproducto(producto_padre=producto, codigo_subprod=f'S{tamano}-{i}', nombre=f'Sub {i}')
+                db.session.add(sub)
+                sub.modificaciones_aplicables.extend(mods[:3])
+                db.session.add(Precio(subproducto_base=sub, tipo_cliente='PUBLICO', precio_kg=90.0))
+        db.session.commit()
+
+        for tamano in args.tamanos:
+            db.session.expunge_all()
+            del sentencias[:]
+            inicio = time.perf_counter()
+            arbol = services.cargar_arbol_producto(f'P{tamano}')
+            ms = (time.perf_counter() - inicio) * 1000
+            assert len(arbol.subproductos) == tamano
+            conteos[tamano] = len(sentencias)
+            print(f"{tamano:>5} subproductos: {len(sentencias)} consultas, {ms:.2f} ms")
+
+    os.remove(ruta_db)
+    if len(set(conteos.values())) != 1:
+        print("ERROR: el número de consultas depende del tamaño del catálogo.")
+        sys.exit(1)
+    print("OK: número de consultas constante.")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""Utilidades compartidas por los benchmarks: BD temporal, app y catálogo sintético.
+
+    from catalogo_sintetico import preparar_app, construir_catalogo
+
+`preparar_app()` crea una BD SQLite temporal, fija DATABASE_URL (para que
+`run.py` y cualquier `create_app()` posterior apunten a ella), crea el esquema
+y el índice de búsqueda y devuelve la app. Debe llamarse antes de importar
+`run`.
+"""
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+TIPOS_CLIENTE = ('PUBLICO', 'COCINA', 'LEAL', 'ALIADO', 'MAYOREO')
+CATEGORIAS = ('Producto', 'Subproducto', 'Especial', 'Corte')
+PALABRAS = ('Pechuga', 'Pierna', 'Muslo', 'Alas', 'Pulpa', 'Retazo', 'Huacal', 'Cadera', 'Molleja',
+            'Hígado', 'Milanesa', 'Asar', 'Freír', 'Cubos', 'Molida', 'Fajitas', 'Filetes', 'Sin Piel')
+
+def preparar_app(ruta_db=None, crear_esquema=True, **config):
+    """Crea la app sobre una BD SQLite temporal (o `ruta_db`). Devuelve (app, ruta_db).
+
+    Los argumentos con nombre se agregan a la configuración (p. ej.
+    CATALOGO_CACHE_HABILITADO=False). CSRF queda desactivado para poder
+    enviar formularios con el cliente de pruebas. Con crear_esquema=False se
+    asume que la BD ya existe (p. ej. en procesos hijos de un benchmark).
+    """
+    if ruta_db is None:
+        fd, ruta_db = tempfile.mkstemp(suffix='.db', prefix='bench_')
+        os.close(fd)
+    os.environ['DATABASE_URL'] = 'sqlite:///' + ruta_db
+
+    from config import Config
+    from app import create_app, db
+    from app.productos import busqueda
+
+    atributos = {'SQLALCHEMY_DATABASE_URI': 'sqlite:///' + ruta_db, 'WTF_CSRF_ENABLED': False}
+    atributos.update(config)
+    app = create_app(type('ConfigBenchmark', (Config,), atributos))
+    if crear_esquema:
+        with app.app_context():
+            db.create_all()
+            busqueda.reindexar()
+    return app, ruta_db
+
+def eliminar_bd(ruta_db):
+    for sufijo in ('', '-wal', '-shm', '-journal'):
+        if os.path.exists(ruta_db + sufijo):
+            os.remove(ruta_db + sufijo)
+
+def datos_catalogo(productos=200, subproductos=5, modificaciones=100, escalones=3,
+                   tipos_cliente=3, mods_por_articulo=4, semilla=7):
+    """Genera (sin tocar la BD) los argumentos de `carga_masiva.cargar_catalogo` para un catálogo sintético.
+
+    - productos: número de productos
+    - subproductos: subproductos por producto
+    - modificaciones: modificaciones en total
+    - escalones: escalones de precio (cantidad mínima) por artículo y tipo de cliente
+    - tipos_cliente: cuántos de TIPOS_CLIENTE tienen precio
+    - mods_por_articulo: modificaciones asociadas a cada producto/subproducto
+    """
+    rnd = random.Random(semilla)
+    mods = [
+        {'codigo_modif': f'M{i:05d}', 'nombre': f'{rnd.choice(PALABRAS)} {rnd.choice(PALABRAS)} {i}'}
+        for i in range(modificaciones)
+    ]
+    codigos_mod = [m['codigo_modif'] for m in mods]
+    prods, subs, asoc_prod, asoc_sub, precios = [], [], [], [], []
+
+    def _precios(destino):
+        for tipo in TIPOS_CLIENTE[:tipos_cliente]:
+            base = round(rnd.uniform(20, 200), 2)
+            for escalon in range(escalones):
+                precio = dict(destino, tipo_cliente=tipo, precio_kg=round(base * (1 - 0.05 * escalon), 2),
+                              cantidad_minima_kg=float(escalon * 2))
+                precios.append(precio)
+
+    for i in range(productos):
+        producto_id = f'P{i:05d}'
+        prods.append({'id': producto_id, 'nombre': f'{rnd.choice(PALABRAS)} {i}',
+                      'categoria': rnd.choice(CATEGORIAS), 'activo': rnd.random() > 0.1})
+        asoc_prod += [(producto_id, cod) for cod in rnd.sample(codigos_mod, min(mods_por_articulo, len(codigos_mod)))]
+        _precios({'producto_id': producto_id})
+        for j in range(subproductos):
+            codigo = f'S{i:05d}-{j}'
+            subs.append({'codigo_subprod': codigo, 'producto_padre_id': producto_id,
+                         'nombre': f'{rnd.choice(PALABRAS)} {i}-{j}'})
+            asoc_sub += [(codigo, cod) for cod in rnd.sample(codigos_mod, min(mods_por_articulo, len(codigos_mod)))]
+            _precios({'codigo_subprod': codigo})
+
+    return {'modificaciones': mods, 'productos': prods, 'subproductos': subs,
+            'asoc_productos': asoc_prod, 'asoc_subproductos': asoc_sub, 'precios': precios}
+
+def construir_catalogo(**parametros):
+    """Carga un catálogo sintético (ver `datos_catalogo`) en la BD de la app actual. Devuelve el ResultadoCarga."""
+    from app import db
+    from app.productos import carga_masiva
+
+    resultado = carga_masiva.cargar_catalogo(**datos_catalogo(**parametros))
+    carga_masiva.finalizar_carga()
+    db.session.commit()
+    return resultado
+
+def crear_usuario(username='bench', password='bench-secreto', rol='ADMINISTRADOR'):
+    from app import db
+    from app.models import Usuario
+
+    usuario = Usuario(username=username, nombre_completo=f'Usuario {username}', rol=rol)
+    usuario.set_password(password)
+    db.session.add(usuario)
+    db.session.commit()
+    return usuario
@@ -0,0 +1,57 @@
+"""Compara dos resultados de `benchmarks/suite.py` y señala regresiones.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/comparar.py base.json nuevo.json [--umbral 20] [--metrica ms_p95]
+
+Un escenario tiene regresión si la métrica de tiempo empeora más del umbral
+(en %) o si ejecuta más sentencias SQL por iteración que en la base. Termina
+con código 1 si hay alguna regresión, para poder usarlo en CI.
+"""
+import argparse
+import json
+import sys
+
+def _cargar(ruta):
+    with open(ruta, encoding='utf-8') as f:
+        return json.load(f)
+
+def comparar(base, nuevo, metrica='ms_p95', umbral=20.0):
+    """Devuelve una lista de (escenario, valor_base, valor_nuevo, cambio_pct, sql_base, sql_nuevo, regresion)."""
+    filas = []
+    for nombre, actual in nuevo['escenarios'].items():
+        anterior = base['escenarios'].get(nombre)
+        if anterior is None:
+            continue
+        valor_base, valor_nuevo = anterior[metrica], actual[metrica]
+        cambio = (valor_nuevo - valor_base) / valor_base * 100 if valor_base else 0.0
+        regresion = cambio > umbral or actual['sql_media'] > anterior['sql_media']
+        filas.append((nombre, valor_base, valor_nuevo, cambio, anterior['sql_media'], actual['sql_media'], regresion))
+    return filas
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('base')
+    parser.add_argument('nuevo')
+    parser.add_argument('--umbral', type=float, default=20.0, help='Empeoramiento tolerado en %% (defecto 20)')
+    parser.add_argument('--metrica', default='ms_p95', choices=['ms_p50', 'ms_p95', 'ms_p99', 'ms_media'])
+    args = parser.parse_args()
+
+    base, nuevo = _cargar(args.base), _cargar(args.nuevo)
+    if base['meta']['parametros'] != nuevo['meta']['parametros']:
+        print(f"Aviso: parámetros distintos\n  base:  {base['meta']['parametros']}\n  nuevo: {nuevo['meta']['parametros']}")
+
+    filas = comparar(base, nuevo, args.metrica, args.umbral)
+    print(f"{'escenario':<38} {args.metrica + ' base':>14} {'nuevo':>10} {'cambio':>9} {'SQL':>13}")
+    for nombre, valor_base, valor_nuevo, cambio, sql_base, sql_nuevo, regresion in filas:
+        marca = '  << REGRESIÓN' if regresion else ''
+        print(f"{nombre:<38} {valor_base:>14.3f} {valor_nuevo:>10.3f} {cambio:>+8.1f}% "
+              f"{sql_base:>6.1f}->{sql_nuevo:<6.1f}{marca}")
+
+    regresiones = [fila[0] for fila in filas if fila[-1]]
+    if regresiones:
+        print(f"{len(regresiones)} regresiones: {', '.join(regresiones)}")
+        sys.exit(1)
+    print("Sin regresiones.")
+
+if __name__ == '__main__':
+    main()
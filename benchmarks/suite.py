@@ -0,0 +1,263 @@
+"""Suite reproducible de benchmarks: rutas, servicios y seeding.
+
+Uso (desde la raíz del proyecto):
+    python benchmarks/suite.py [--productos 200] [--subproductos 5] [--modificaciones 100]
+                               [--escalones 3] [--iteraciones 200] [--salida resultados.json]
+                               [--solo listar_productos ver_producto ...] [--sin-cache] [--sin-fragmentos]
+
+Construye un catálogo sintético del tamaño indicado en una BD SQLite temporal
+(vía `create_app`) y mide cada escenario: las rutas se recorren con el cliente
+de pruebas de Flask y los servicios se llaman directamente. Para cada
+escenario se guardan p50/p95/p99 (ms), sentencias SQL por iteración y el pico
+de memoria (tracemalloc, en una pasada aparte para no afectar los tiempos).
+
+El resultado es un JSON que se compara con `python benchmarks/comparar.py`.
+Con --sin-fragmentos las plantillas del catálogo se renderizan completas en
+cada petición (FRAGMENTOS_CACHE_MAXIMO = 0): comparar una corrida con y otra
+sin muestra el tiempo de render que ahorra la caché de fragmentos.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from catalogo_sintetico import preparar_app, construir_catalogo, crear_usuario, eliminar_bd
+
+RAIZ = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+PASADAS_MEMORIA = 20
+USUARIO, PASSWORD = 'bench', 'bench-secreto'
+
+class ContadorSQL:
+    """Cuenta las sentencias que llegan al cursor en cualquier engine (evento before_cursor_execute)."""
+
+    def __init__(self):
+        from sqlalchemy import event
+        from sqlalchemy.engine import Engine
+        self.total = 0
+        event.listen(Engine, 'before_cursor_execute', self._contar)
+
+    def _contar(self, *args):
+        self.total += 1
+
+def _percentil(ordenados, p):
+    if len(ordenados) == 1:
+        return ordenados[0]
+    return statistics.quantiles(ordenados, n=100, method='inclusive')[p - 1]
+
+def medir(funcion, iteraciones, calentamiento, contador):
+    """Ejecuta `funcion(i)` y devuelve tiempos, sentencias SQL y pico de memoria."""
+    for i in range(calentamiento):
+        funcion(i)
+
+    tiempos, sentencias = [], []
+    for i in range(iteraciones):
+        antes = contador.total
+        inicio = time.perf_counter()
+        funcion(i)
+        tiempos.append((time.perf_counter() - inicio) * 1000)
+        sentencias.append(contador.total - antes)
+
+    tracemalloc.start()
+    picos = []
+    for i in range(min(iteraciones, PASADAS_MEMORIA)):
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        funcion(i)
+        picos.append(tracemalloc.get_traced_memory()[1] - base)
+    tracemalloc.stop()
+
+    ordenados = sorted(tiempos)
+    return {
+        'iteraciones': iteraciones,
+        'ms_p50': round(_percentil(ordenados, 50), 4),
+        'ms_p95': round(_percentil(ordenados, 95), 4),
+        'ms_p99': round(_percentil(ordenados, 99), 4),
+        'ms_media': round(statistics.fmean(tiempos), 4),
+        'ms_min': round(ordenados[0], 4),
+        'ms_max': round(ordenados[-1], 4),
+        'sql_media': round(statistics.fmean(sentencias), 2),
+        'sql_max': max(sentencias),
+        'memoria_pico_kb': round(max(picos) / 1024, 1),
+    }
+
+def _verificar(respuesta, esperado=200):
+    if respuesta.status_code != esperado:
+        raise RuntimeError(f"{respuesta.request.path}: HTTP {respuesta.status_code} (se esperaba {esperado})")
+
+def escenarios(app, args):
+    """Devuelve {nombre: (función, iteraciones)}; cada función recibe el número de iteración."""
+    from app import db
+    from app.productos import services, motor_precios
+    from catalogo_sintetico import datos_catalogo
+
+    rnd = random.Random(11)
+    ids_productos = [f'P{i:05d}' for i in range(args.productos)]
+    ids_ver = [rnd.choice(ids_productos) for _ in range(args.iteraciones)]
+
+    cliente = app.test_client()
+    _verificar(cliente.post('/auth/login', data={'username': USUARIO, 'password': PASSWORD}), 302)
+    cliente_login = app.test_client()
+
+    def listar_productos(i):
+        _verificar(cliente.get('/productos/'))
+
+    def listar_productos_filtrado(i):
+        _verificar(cliente.get('/productos/?activo=1&categoria=Corte&orden=desc'))
+
+    def ver_producto(i):
+        _verificar(cliente.get(f'/productos/ver/{ids_ver[i % len(ids_ver)]}'))
+
+    def listar_modificaciones(i):
+        _verificar(cliente.get('/productos/modificaciones'))
+
+    def buscar(i):
+        _verificar(cliente.get('/productos/buscar?q=' + ('pulpa', 'mila', 'pech', 'sin piel')[i % 4]))
+
+    # Revalidación con el ETag de una respuesta previa (GET condicional; sin caché no hay validador)
+    etags = {}
+
+    def revalidar(url):
+        _verificar(cliente.get(url, headers={'If-None-Match': etags[url]}), 304)
+
+    def login(i):
+        _verificar(cliente_login.post('/auth/login', data={'username': USUARIO, 'password': PASSWORD}), 302)
+        _verificar(cliente_login.get('/auth/logout'), 302)
+
+    articulos = [{'producto_id': pid, 'cantidad_kg': 1.5 + (n % 7)} for n, pid in enumerate(ids_ver[:20])]
+
+    def servicio(fn):
+        def _ejecutar(i):
+            with app.app_context():
+                fn(i)
+                db.session.remove()
+        return _ejecutar
+
+    datos_seed = datos_catalogo(productos=max(1, args.productos // 10), subproductos=args.subproductos,
+                                modificaciones=max(1, args.modificaciones // 10), escalones=args.escalones,
+                                semilla=99)
+
+    import run
+
+    def seed_vacia(i):
+        # Seed + catálogo sintético sobre una BD vacía; incluye crear el esquema
+        # (la BD se crea y elimina en cada iteración)
+        from app.productos import carga_masiva
+        app_seed, ruta = preparar_app(CATALOGO_CACHE_HABILITADO=app.config['CATALOGO_CACHE_HABILITADO'])
+        try:
+            with app_seed.app_context():
+                run.seed_catalogo()
+                carga_masiva.cargar_catalogo(**datos_seed)
+                db.session.commit()
+                db.session.remove()
+        finally:
+            with app_seed.app_context():
+                db.engine.dispose()
+            eliminar_bd(ruta)
+
+    def seed_repetido(i):
+        # seed-db sobre el catálogo ya cargado (no inserta nada: solo verifica llaves)
+        result = app.test_cli_runner().invoke(run.seed_db_command)
+        if result.exit_code != 0:
+            raise RuntimeError(result.output)
+
+    iteraciones = args.iteraciones
+    condicionales = {
+        'listar_productos_304': (lambda i: revalidar('/productos/'), iteraciones),
+        'ver_producto_304': (lambda i: revalidar(f'/productos/ver/{ids_ver[i % len(ids_ver)]}'), iteraciones),
+    } if app.config['CATALOGO_CACHE_HABILITADO'] else {}
+    if condicionales:
+        cliente.get('/') # Consume el flash del login: con mensajes pendientes no hay validador
+        for url in {'/productos/', *(f'/productos/ver/{producto_id}' for producto_id in ids_ver)}:
+            etags[url] = cliente.get(url).headers['ETag']
+    return {
+        'listar_productos': (listar_productos, iteraciones),
+        'listar_productos_filtrado': (listar_productos_filtrado, iteraciones),
+        'ver_producto': (ver_producto, iteraciones),
+        'listar_modificaciones': (listar_modificaciones, iteraciones),
+        **condicionales,
+        'buscar': (buscar, iteraciones),
+        'login': (login, max(5, iteraciones // 10)), # El hash de contraseña domina: menos iteraciones
+        'seed_vacia': (seed_vacia, max(3, iteraciones // 40)),
+        'seed_repetido': (seed_repetido, max(5, iteraciones // 10)),
+        'servicio_obtener_todos_los_productos': (servicio(lambda i: services.obtener_todos_los_productos()), iteraciones),
+        'servicio_paginar_productos': (servicio(lambda i: services.paginar_productos(tamano=50)), iteraciones),
+        'servicio_cargar_arbol_producto': (
+            servicio(lambda i: services.cargar_arbol_producto(ids_ver[i % len(ids_ver)])), iteraciones),
+        'servicio_cotizar_lote': (
+            servicio(lambda i: motor_precios.cotizar_lote(articulos, 'COCINA')), iteraciones),
+        'servicio_buscar_en_catalogo': (
+            servicio(lambda i: services.buscar_en_catalogo('pulpa')), iteraciones),
+    }
+
+def _commit_git():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--productos', type=int, default=200)
+    parser.add_argument('--subproductos', type=int, default=5, help='Subproductos por producto')
+    parser.add_argument('--modificaciones', type=int, default=100)
+    parser.add_argument('--escalones', type=int, default=3, help='Escalones de precio por artículo y tipo de cliente')
+    parser.add_argument('--iteraciones', type=int, default=200)
+    parser.add_argument('--calentamiento', type=int, default=5)
+    parser.add_argument('--solo', nargs='+', metavar='ESCENARIO', help='Ejecutar solo estos escenarios')
+    parser.add_argument('--sin-cache', action='store_true', help='Desactiva CATALOGO_CACHE_HABILITADO')
+    parser.add_argument('--sin-fragmentos', action='store_true', help='Desactiva la caché de fragmentos de plantillas')
+    parser.add_argument('--salida', default=os.path.join(os.path.dirname(__file__), 'resultados.json'))
+    args = parser.parse_args()
+
+    app, ruta_db = preparar_app(CATALOGO_CACHE_HABILITADO=not args.sin_cache,
+                                FRAGMENTOS_CACHE_MAXIMO=0 if args.sin_fragmentos else 2000)
+    from app import db
+
+    parametros = {k: getattr(args, k) for k in ('productos', 'subproductos', 'modificaciones', 'escalones')}
+    with app.app_context():
+        inicio = time.perf_counter()
+        carga = construir_catalogo(**parametros)
+        crear_usuario(USUARIO, PASSWORD)
+        print(f"Catálogo sintético: {sum(carga.insertados.values())} filas en {time.perf_counter() - inicio:.2f} s")
+    contador = ContadorSQL()
+
+    resultados = {}
+    try:
+        for nombre, (funcion, iteraciones) in escenarios(app, args).items():
+            if args.solo and nombre not in args.solo:
+                continue
+            r = medir(funcion, iteraciones, args.calentamiento, contador)
+            resultados[nombre] = r
+            print(f"{nombre:<38} p50 {r['ms_p50']:>8.3f} ms  p95 {r['ms_p95']:>8.3f} ms  "
+                  f"p99 {r['ms_p99']:>8.3f} ms  SQL {r['sql_media']:>6.1f}  mem {r['memoria_pico_kb']:>8.1f} KB")
+    finally:
+        with app.app_context():
+            db.engine.dispose()
+        eliminar_bd(ruta_db)
+
+    informe = {
+        'meta': {
+            'fecha': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'commit': _commit_git(),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'plataforma': platform.platform(),
+            'parametros': dict(parametros, iteraciones=args.iteraciones, cache=not args.sin_cache,
+                               fragmentos=not args.sin_cache and not args.sin_fragmentos),
+        },
+        'escenarios': resultados,
+    }
+    with open(args.salida, 'w', encoding='utf-8') as f:
+        json.dump(informe, f, indent=2, ensure_ascii=False)
+    print(f"Resultados guardados en {args.salida}")
+
+if __name__ == '__main__':
+    main()
@@ -7,12 +7,112 @@ load_dotenv()
 # Obtener la ruta base del proyecto
 basedir = os.path.abspath(os.path.dirname(__file__))
 
+# --- Perfiles del engine SQLite ---
+# 'desarrollo' deja los valores por defecto de SQLite (journal DELETE, fsync en
+# cada commit). 'produccion' está pensado para varios workers de gunicorn sobre
+# el mismo archivo: WAL permite leer mientras otro proceso escribe,
+# synchronous=NORMAL evita el fsync por commit (en WAL sigue siendo seguro ante
+# caídas del proceso) y busy_timeout hace esperar en lugar de fallar con
+# "database is locked". Los PRAGMA se aplican en cada conexión nueva (ver
+# app/bd_sqlite.py).
+PERFILES_SQLITE = {
+    'desarrollo': {
+        'pragmas': {},
+        'engine': {},
+    },
+    'produccion': {
+        'pragmas': {
+            'busy_timeout': 5000,        # ms esperando un bloqueo antes de fallar
+            'journal_mode': 'WAL',
+            'synchronous': 'NORMAL',
+            'foreign_keys': 'ON',
+            'cache_size': -20000,        # negativo = KiB (unos 20 MB por conexión)
+            'mmap_size': 268435456,      # 256 MB de lectura mapeada en memoria
+            'temp_store': 'MEMORY',
+        },
+        'engine': {
+            'pool_size': 10,
+            'max_overflow': 10,
+            'pool_timeout': 30,
+        },
+    },
+}
+
+def opciones_engine(perfil, uri):
+    """SQLALCHEMY_ENGINE_OPTIONS del perfil (el pool no aplica a SQLite en memoria)."""
+    if uri.startswith('sqlite') and (uri.endswith(':memory:') or uri in ('sqlite://', 'sqlite:///')):
+        return {}
+    return dict(PERFILES_SQLITE[perfil]['engine'])
+
 class Config:
     SECRET_KEY = os.environ.get('SECRET_KEY') or '104070'
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///' + os.path.join(basedir, 'app.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+    # Perfil del engine SQLite: 'desarrollo' o 'produccion' (ver PERFILES_SQLITE)
+    SQLITE_PERFIL = os.environ.get('SQLITE_PERFIL', 'desarrollo')
+    SQLITE_PRAGMAS = PERFILES_SQLITE[SQLITE_PERFIL]['pragmas']
+    SQLALCHEMY_ENGINE_OPTIONS = opciones_engine(SQLITE_PERFIL, SQLALCHEMY_DATABASE_URI)
+
+    # Caché en memoria del catálogo (Producto/Subproducto/Modificacion/Precio).
+    # Cada proceso tiene la suya; los cambios de otros workers se detectan con el
+    # registro compartido cambios_catalogo (ver app/productos/catalogo_cache.py).
+    CATALOGO_CACHE_HABILITADO = os.environ.get('CATALOGO_CACHE_HABILITADO', '1') != '0'
+    # Cada cuánto (segundos) un proceso consulta ese registro; 0 = en cada petición.
+    CATALOGO_COMPROBACION_SEGUNDOS = float(os.environ.get('CATALOGO_COMPROBACION_SEGUNDOS', '1'))
+    # Fragmentos HTML de las plantillas del catálogo guardados en un LRU ({% cache %},
+    # ver app/productos/fragmentos.py). 0 los desactiva.
+    FRAGMENTOS_CACHE_MAXIMO = int(os.environ.get('FRAGMENTOS_CACHE_MAXIMO', '2000'))
+
+    # Sincronización incremental del catálogo (/productos/api/catalogo?since=): más
+    # cambios que esto desde el cursor del cliente se responden con el árbol completo.
+    # `flask catalogo-compactar-cambios` borra los registros de más de N días.
+    SINCRONIZACION_MAX_CAMBIOS = int(os.environ.get('SINCRONIZACION_MAX_CAMBIOS', '2000'))
+    SINCRONIZACION_RETENCION_DIAS = int(os.environ.get('SINCRONIZACION_RETENCION_DIAS', '30'))
+
+    # Caché de identidades (id, username, rol, activo) del user_loader de Flask-Login.
+    # El TTL acota cuánto tarda en verse un cambio hecho por otro proceso.
+    IDENTIDAD_CACHE_HABILITADO = os.environ.get('IDENTIDAD_CACHE_HABILITADO', '1') != '0'
+    IDENTIDAD_CACHE_TTL = float(os.environ.get('IDENTIDAD_CACHE_TTL', '300'))
+    IDENTIDAD_CACHE_MAXIMO = int(os.environ.get('IDENTIDAD_CACHE_MAXIMO', '1000'))
+
+    # ultimo_login (y otra telemetría de usuarios) se acumula en memoria y se escribe
+    # por lotes cada TELEMETRIA_INTERVALO_SEGUNDOS desde un hilo en segundo plano.
+    TELEMETRIA_WRITE_BEHIND = os.environ.get('TELEMETRIA_WRITE_BEHIND', '1') != '0'
+    TELEMETRIA_INTERVALO_SEGUNDOS = float(os.environ.get('TELEMETRIA_INTERVALO_SEGUNDOS', '5'))
+
+    # Hash de contraseñas: método de Werkzeug ('scrypt', 'scrypt:16384:8:1',
+    # 'pbkdf2:sha256:600000', ...) y pool acotado donde se calcula. Los hashes con
+    # otros parámetros se regeneran en el siguiente login. HASH_TRABAJADORES=0
+    # calcula el hash en el hilo de la petición.
+    HASH_METODO = os.environ.get('HASH_METODO', 'scrypt')
+    HASH_TRABAJADORES = int(os.environ.get('HASH_TRABAJADORES', '2'))
+    HASH_COLA_MAXIMA = int(os.environ.get('HASH_COLA_MAXIMA', '16'))
+    HASH_TIMEOUT_SEGUNDOS = float(os.environ.get('HASH_TIMEOUT_SEGUNDOS', '10'))
+
+    # Los pedidos guardan fecha_pedido en UTC; los resúmenes de ventas por día se
+    # calculan con este desfase (ej: -6 para la hora del centro de México).
+    VENTAS_DESFASE_HORAS = int(os.environ.get('VENTAS_DESFASE_HORAS', '0'))
+
+    # Pedidos capturados sin conexión (cola del service worker): antigüedad máxima
+    # de `capturado_en` que acepta /pedidos/sincronizar.
+    PEDIDOS_SYNC_MAX_HORAS = int(os.environ.get('PEDIDOS_SYNC_MAX_HORAS', '72'))
+
+    # Despacho de entregas a domicilio (ver app/pedidos/despacho.py): pedidos por
+    # viaje, minutos que puede separarse la hora prometida dentro de un viaje,
+    # promesa por defecto desde la hora del pedido y relectura de la cola.
+    DESPACHO_CAPACIDAD = int(os.environ.get('DESPACHO_CAPACIDAD', '3'))
+    DESPACHO_VENTANA_MINUTOS = int(os.environ.get('DESPACHO_VENTANA_MINUTOS', '30'))
+    DESPACHO_PROMESA_MINUTOS = int(os.environ.get('DESPACHO_PROMESA_MINUTOS', '45'))
+    DESPACHO_RECARGA_SEGUNDOS = int(os.environ.get('DESPACHO_RECARGA_SEGUNDOS', '60'))
+
+    # Perfilador de SQL por petición (cabecera Server-Timing, N+1 y consultas lentas en el log).
+    # Desactivado por defecto: no agrega costo si no se usa.
+    PERFILADOR_SQL_HABILITADO = os.environ.get('PERFILADOR_SQL', '0') == '1'
+    PERFILADOR_SQL_UMBRAL_LENTO_MS = float(os.environ.get('PERFILADOR_SQL_UMBRAL_LENTO_MS', '100'))
+    PERFILADOR_SQL_UMBRAL_REPETIDAS = int(os.environ.get('PERFILADOR_SQL_UMBRAL_REPETIDAS', '5'))
+
     # Podríamos añadir más configuraciones aquí a medida que las necesitemos
     # Ejemplo:
     # DEBUG = True # O leerlo de una variable de entorno
@@ -51,6 +51,15 @@ def get_metadata():
     return target_db.metadata
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    # Los índices FTS5 del catálogo y de clientes y sus tablas internas se
+    # gestionan en sus propias migraciones (app/productos/busqueda.py,
+    # app/clientes/busqueda.py); autogenerate no los conoce.
+    if type_ == 'table' and reflected and name.startswith(('busqueda_catalogo', 'busqueda_clientes')):
+        return False
+    return True
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -93,6 +102,8 @@ def run_migrations_online():
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    if conf_args.get("include_object") is None:
+        conf_args["include_object"] = include_object
 
     connectable = get_engine()
 
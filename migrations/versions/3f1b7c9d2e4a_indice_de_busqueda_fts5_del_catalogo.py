@@ -0,0 +1,68 @@
+"""Indice de busqueda FTS5 del catalogo
+
+Revision ID: 3f1b7c9d2e4a
+Revises: 6ca58832193c
+Create Date: 2025-06-08 11:20:14.318402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1b7c9d2e4a'
+down_revision = '6ca58832193c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Tabla virtual FTS5 (no la genera autogenerate) y tabla de claves.
+    # Solo aplica a SQLite; en otros motores la búsqueda usa LIKE.
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute(
+        "CREATE VIRTUAL TABLE busqueda_catalogo USING fts5("
+        "codigo, nombre, descripcion, "
+        "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+    )
+    op.execute(
+        "CREATE TABLE busqueda_catalogo_claves ("
+        "id INTEGER PRIMARY KEY, tipo VARCHAR(20) NOT NULL, ref_id VARCHAR(20) NOT NULL, "
+        "producto_id VARCHAR(10), UNIQUE (tipo, ref_id))"
+    )
+    # Poblar con el catálogo existente
+    op.execute(
+        "INSERT INTO busqueda_catalogo_claves (tipo, ref_id, producto_id) "
+        "SELECT 'producto', id, id FROM productos"
+    )
+    op.execute(
+        "INSERT INTO busqueda_catalogo_claves (tipo, ref_id, producto_id) "
+        "SELECT 'subproducto', CAST(id AS TEXT), producto_padre_id FROM subproductos"
+    )
+    op.execute(
+        "INSERT INTO busqueda_catalogo_claves (tipo, ref_id, producto_id) "
+        "SELECT 'modificacion', CAST(id AS TEXT), NULL FROM modificaciones"
+    )
+    op.execute(
+        "INSERT INTO busqueda_catalogo (rowid, codigo, nombre, descripcion) "
+        "SELECT c.id, p.id, p.nombre, COALESCE(p.descripcion, '') FROM productos p "
+        "JOIN busqueda_catalogo_claves c ON c.tipo = 'producto' AND c.ref_id = p.id"
+    )
+    op.execute(
+        "INSERT INTO busqueda_catalogo (rowid, codigo, nombre, descripcion) "
+        "SELECT c.id, s.codigo_subprod, s.nombre, COALESCE(s.descripcion, '') FROM subproductos s "
+        "JOIN busqueda_catalogo_claves c ON c.tipo = 'subproducto' AND c.ref_id = CAST(s.id AS TEXT)"
+    )
+    op.execute(
+        "INSERT INTO busqueda_catalogo (rowid, codigo, nombre, descripcion) "
+        "SELECT c.id, m.codigo_modif, m.nombre, COALESCE(m.descripcion, '') FROM modificaciones m "
+        "JOIN busqueda_catalogo_claves c ON c.tipo = 'modificacion' AND c.ref_id = CAST(m.id AS TEXT)"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("DROP TABLE IF EXISTS busqueda_catalogo")
+    op.execute("DROP TABLE IF EXISTS busqueda_catalogo_claves")
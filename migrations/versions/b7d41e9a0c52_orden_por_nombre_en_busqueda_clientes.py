@@ -0,0 +1,54 @@
+"""Orden por nombre en el indice de busqueda de clientes
+
+Revision ID: b7d41e9a0c52
+Revises: ed256f38f1b8
+Create Date: 2026-10-18 18:05:12.417903
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d41e9a0c52'
+down_revision = 'ed256f38f1b8'
+branch_labels = None
+depends_on = None
+
+HUECO_ORDEN = 2 ** 32 # Igual que app/clientes/busqueda.py
+
+
+def upgrade():
+    # El rowid de busqueda_clientes pasa a ser la posicion del cliente en el orden
+    # por nombre (con huecos); busqueda_clientes_claves lo asocia con el cliente.
+    # Solo aplica a SQLite; en otros motores la búsqueda usa LIKE.
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute(
+        "CREATE TABLE busqueda_clientes_claves ("
+        "cliente_id INTEGER PRIMARY KEY, clave INTEGER NOT NULL UNIQUE, orden TEXT NOT NULL)"
+    )
+    op.execute("CREATE INDEX ix_busqueda_clientes_claves_orden ON busqueda_clientes_claves (orden, cliente_id)")
+    op.execute(
+        "INSERT INTO busqueda_clientes_claves (cliente_id, clave, orden) "
+        f"SELECT id, ROW_NUMBER() OVER (ORDER BY orden, id) * {HUECO_ORDEN}, orden FROM ("
+        "  SELECT id, nombre || COALESCE(' ' || NULLIF(apellidos, ''), '') AS orden FROM clientes WHERE activo = 1)"
+    )
+    op.execute("DELETE FROM busqueda_clientes")
+    op.execute(
+        "INSERT INTO busqueda_clientes (rowid, nombre, alias) "
+        "SELECT k.clave, k.orden, COALESCE(c.alias, '') FROM busqueda_clientes_claves k "
+        "JOIN clientes c ON c.id = k.cliente_id ORDER BY k.clave"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    op.execute("DELETE FROM busqueda_clientes")
+    op.execute(
+        "INSERT INTO busqueda_clientes (rowid, nombre, alias) "
+        "SELECT id, nombre || COALESCE(' ' || apellidos, ''), COALESCE(alias, '') FROM clientes WHERE activo = 1"
+    )
+    op.execute("DROP INDEX IF EXISTS ix_busqueda_clientes_claves_orden")
+    op.execute("DROP TABLE IF EXISTS busqueda_clientes_claves")
@@ -1,57 +1,202 @@
-from PIL import Image
+"""Genera los íconos de la PWA a partir de logo.png (PNG con compresión máxima y WebP).
+
+Uso (desde la raíz del proyecto):
+    python resize_logo.py [--trabajadores N] [--forzar] [--colores 256] [--sin-webp]
+
+Cada tamaño de SIZES se redimensiona en un proceso del pool (el logo se
+decodifica una vez por proceso) y se guarda como PNG con compresión máxima y como WebP
+sin pérdida. Un manifiesto pequeño (`app/static/img/.iconos.json`) registra,
+por archivo de salida, el hash del logo, los parámetros y el hash del archivo
+generado: en la siguiente ejecución solo se rehace lo que cambió o lo que se
+editó/borró a mano. Al final se reescribe la lista `icons` de
+app/static/manifest.json con los íconos generados.
+
+Con --colores N los PNG se reducen a una paleta de N colores (con pérdida,
+mucho más chicos); por defecto son PNG sin pérdida.
+"""
+import argparse
+import hashlib
+import json
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from PIL import Image
 
 # Configuración
 INPUT_LOGO_PATH = 'app/static/img/logo.png' # Asegúrate de que esta ruta sea correcta para tu logo original
 OUTPUT_DIR = 'app/static/img/'
+PWA_MANIFEST_PATH = 'app/static/manifest.json'
+ICONOS_MANIFEST_PATH = os.path.join(OUTPUT_DIR, '.iconos.json')
+URL_ICONOS = '/static/img/'
 SIZES = [
+    (48, 48),
+    (72, 72),
+    (96, 96),
+    (144, 144),
+    (168, 168),
     (192, 192),
     (512, 512),
-    # Puedes añadir más tamaños si los necesitas para otros usos
-    #(168, 168),
-    #(144, 144),
-    #(96, 96),
-    #(72, 72),
-    #(48, 48),
 ]
 
-def resize_logo(input_path, output_dir, sizes):
-    """
-    Redimensiona una imagen a múltiples tamaños y los guarda en un directorio.
-    """
-    if not os.path.exists(input_path):
-        print(f"Error: El archivo de entrada no se encontró en {input_path}")
-        return
+# Formato -> (extensión, tipo MIME, opciones de Image.save)
+FORMATOS = {
+    # compress_level=9 deja estos íconos más chicos que optimize=True (que además tarda más)
+    'PNG': ('png', 'image/png', {'compress_level': 9}),
+    'WEBP': ('webp', 'image/webp', {'lossless': True, 'method': 6}),
+}
+# Cambiarla obliga a regenerar todo (p. ej. si cambia el remuestreo)
+VERSION_PARAMETROS = 1
+
+def _sha256(ruta):
+    with open(ruta, 'rb') as archivo:
+        return hashlib.sha256(archivo.read()).hexdigest()
+
+def nombre_salida(size, formato):
+    width, height = size
+    return f"logo-{width}x{height}.{FORMATOS[formato][0]}"
 
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-        print(f"Directorio de salida creado: {output_dir}")
+def parametros(size, formato, colores):
+    return {
+        'tamano': list(size),
+        'formato': formato,
+        'colores': colores if formato == 'PNG' else 0,
+        'opciones': FORMATOS[formato][2],
+        'version': VERSION_PARAMETROS,
+    }
 
-    try:
-        img = Image.open(input_path)
-        print(f"Imagen de entrada cargada: {input_path}")
+# --- Trabajo de cada proceso ---
 
-        # Convertir a RGBA si no lo está para manejar transparencia si existe
-        img = img.convert("RGBA")
+_ORIGEN = None
 
-        for size in sizes:
-            width, height = size
-            output_filename = f"logo-{width}x{height}.png"
-            output_path = os.path.join(output_dir, output_filename)
+def _iniciar_trabajador(input_path):
+    """Decodifica el logo una sola vez por proceso del pool."""
+    global _ORIGEN
+    # Convertir a RGBA si no lo está para manejar transparencia si existe
+    _ORIGEN = Image.open(input_path).convert("RGBA")
 
-            print(f"Redimensionando a {width}x{height}...")
-            # Usar Image.Resampling.LANCZOS para mejor calidad al reducir
-            resized_img = img.resize(size, Image.Resampling.LANCZOS)
+def generar(size, salidas, output_dir, colores):
+    """Redimensiona a `size` y guarda cada formato de `salidas`. Devuelve (size, {nombre: sha256}, ms de CPU)."""
+    inicio = time.process_time() # CPU del proceso: no se infla si hay más procesos que núcleos
+    # Usar Image.Resampling.LANCZOS para mejor calidad al reducir
+    resized_img = _ORIGEN.resize(size, Image.Resampling.LANCZOS)
+    generados = {}
+    for formato in salidas:
+        imagen = resized_img
+        if formato == 'PNG' and colores:
+            imagen = resized_img.quantize(colores, method=Image.Quantize.FASTOCTREE)
+        nombre = nombre_salida(size, formato)
+        output_path = os.path.join(output_dir, nombre)
+        temporal = output_path + '.tmp'
+        imagen.save(temporal, formato, **FORMATOS[formato][2])
+        os.replace(temporal, output_path)
+        generados[nombre] = _sha256(output_path)
+    return size, generados, (time.process_time() - inicio) * 1000
 
-            resized_img.save(output_path, 'PNG')
-            print(f"Guardado: {output_path}")
+# --- Manifiestos ---
 
-        print("Proceso de redimensionamiento completado.")
+def cargar_manifiesto(ruta):
+    if not os.path.exists(ruta):
+        return {}
+    with open(ruta, encoding='utf-8') as archivo:
+        return json.load(archivo)
 
-    except FileNotFoundError:
+def guardar_json(ruta, datos):
+    """Escribe `datos` solo si cambió el contenido. Devuelve True si escribió."""
+    contenido = json.dumps(datos, indent=4, ensure_ascii=False) + '\n'
+    if os.path.exists(ruta):
+        with open(ruta, encoding='utf-8') as archivo:
+            if archivo.read() == contenido:
+                return False
+    with open(ruta, 'w', encoding='utf-8') as archivo:
+        archivo.write(contenido)
+    return True
+
+def vigente(entrada, hash_origen, params, output_path):
+    """La salida existe, es la que se generó y se generó con el mismo logo y parámetros."""
+    return (entrada is not None and entrada['origen'] == hash_origen and entrada['parametros'] == params
+            and os.path.exists(output_path) and _sha256(output_path) == entrada['salida'])
+
+def actualizar_manifest_pwa(ruta, sizes, formatos):
+    """Reescribe la lista `icons` del manifest.json de la PWA (PNG primero, luego WebP)."""
+    with open(ruta, encoding='utf-8') as archivo:
+        manifest = json.load(archivo)
+    manifest['icons'] = [
+        {
+            'src': URL_ICONOS + nombre_salida(size, formato),
+            'sizes': f"{size[0]}x{size[1]}",
+            'type': FORMATOS[formato][1],
+        }
+        for formato in formatos for size in sizes
+    ]
+    return guardar_json(ruta, manifest)
+
+# --- Orquestación ---
+
+def resize_logo(input_path, output_dir, sizes, formatos=tuple(FORMATOS), trabajadores=None, forzar=False, colores=0):
+    """
+    Redimensiona una imagen a múltiples tamaños y formatos; solo rehace las salidas que no están vigentes.
+    """
+    if not os.path.exists(input_path):
         print(f"Error: El archivo de entrada no se encontró en {input_path}")
-    except Exception as e:
-        print(f"Ocurrió un error: {e}")
+        return False
+    os.makedirs(output_dir, exist_ok=True)
+
+    inicio = time.perf_counter()
+    hash_origen = _sha256(input_path)
+    manifiesto = cargar_manifiesto(ICONOS_MANIFEST_PATH)
+    pendientes = {}
+    for size in sizes:
+        for formato in formatos:
+            nombre = nombre_salida(size, formato)
+            params = parametros(size, formato, colores)
+            if forzar or not vigente(manifiesto.get(nombre), hash_origen, params,
+                                     os.path.join(output_dir, nombre)):
+                pendientes.setdefault(size, []).append(formato)
+    omitidos = len(sizes) * len(formatos) - sum(len(salidas) for salidas in pendientes.values())
+
+    trabajadores = max(1, min(trabajadores or os.cpu_count() or 1, len(pendientes) or 1))
+    tareas = [(size, salidas, output_dir, colores) for size, salidas in pendientes.items()]
+    if trabajadores == 1 or len(tareas) <= 1:
+        if tareas:
+            _iniciar_trabajador(input_path)
+        resultados = [generar(*tarea) for tarea in tareas]
+    else:
+        with ProcessPoolExecutor(trabajadores, initializer=_iniciar_trabajador, initargs=(input_path,)) as pool:
+            resultados = list(pool.map(generar, *zip(*tareas)))
+
+    for size, generados, ms in sorted(resultados):
+        for nombre, hash_salida in generados.items():
+            formato = next(f for f in formatos if nombre == nombre_salida(size, f))
+            manifiesto[nombre] = {
+                'origen': hash_origen,
+                'parametros': parametros(size, formato, colores),
+                'salida': hash_salida,
+                'bytes': os.path.getsize(os.path.join(output_dir, nombre)),
+            }
+        print(f"  {size[0]}x{size[1]}: {', '.join(generados)} en {ms:.0f} ms de CPU")
+    guardar_json(ICONOS_MANIFEST_PATH, dict(sorted(manifiesto.items())))
+    pwa_actualizado = actualizar_manifest_pwa(PWA_MANIFEST_PATH, sizes, formatos)
+
+    total = (time.perf_counter() - inicio) * 1000
+    secuencial = sum(ms for _, _, ms in resultados)
+    print(f"{sum(len(g) for _, g, _ in resultados)} íconos generados, {omitidos} vigentes sin tocar; "
+          f"{total:.0f} ms con {trabajadores} proceso(s) en {os.cpu_count()} núcleo(s)")
+    if resultados:
+        # Lo que tardaría una sola pasada secuencial frente al tiempo real (que incluye arrancar el pool)
+        print(f"CPU de los redimensionamientos {secuencial:.0f} ms: aceleración x{secuencial / total:.2f}")
+    print(f"{PWA_MANIFEST_PATH}: {'íconos actualizados' if pwa_actualizado else 'sin cambios'}")
+    return True
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--trabajadores', type=int, default=None, help='Procesos del pool (por defecto, núcleos)')
+    parser.add_argument('--forzar', action='store_true', help='Regenera todo aunque esté vigente')
+    parser.add_argument('--colores', type=int, default=0, help='Reduce los PNG a una paleta de N colores (con pérdida)')
+    parser.add_argument('--sin-webp', action='store_true', help='Solo PNG')
+    args = parser.parse_args()
+    formatos = ('PNG',) if args.sin_webp else tuple(FORMATOS)
+    resize_logo(INPUT_LOGO_PATH, OUTPUT_DIR, SIZES, formatos, args.trabajadores, args.forzar, args.colores)
 
 if __name__ == "__main__":
-    resize_logo(INPUT_LOGO_PATH, OUTPUT_DIR, SIZES)
\ No newline at end of file
+    main()
@@ -2,6 +2,7 @@
 import click
 from flask.cli import with_appcontext
 from app.models import Producto, Subproducto, Modificacion, Precio, Usuario # Importar Usuario si se necesita para seeding de usuarios
+from app.productos import carga_masiva, intercambio
 
 app = create_app()
 
@@ -44,305 +45,249 @@ def clear_data():
     # db.session.execute(text('PRAGMA foreign_keys = ON;')) # SQLAlchemy 2.x requires text()
 
 
-def seed_modificaciones_data():
-    modificaciones_data = [
-        # Genéricas (pueden aplicar a varios)
-        {'codigo_modif': 'ENT', 'nombre': 'Entera/o'},
-        {'codigo_modif': 'CORT', 'nombre': 'Cortada/o'},
-        {'codigo_modif': 'ASAR', 'nombre': 'Para Asar'},
-        {'codigo_modif': 'MILA', 'nombre': 'Milanesa'},
-        {'codigo_modif': 'CUBOS', 'nombre': 'En Cubos'},
-        {'codigo_modif': 'MOLI', 'nombre': 'Molida/o'},
-        {'codigo_modif': 'FILE', 'nombre': 'Filetes'},
-        {'codigo_modif': 'FREIR', 'nombre': 'Para Freír'},
-        {'codigo_modif': 'SINPIEL', 'nombre': 'Sin Piel'},
-        {'codigo_modif': 'FAJI', 'nombre': 'Fajitas'},
-        {'codigo_modif': 'LIMP', 'nombre': 'Limpia/o'},
-        {'codigo_modif': 'SINGRASA', 'nombre': 'Sin Grasa'},
-
-        # Específicas de Pechuga (PECH)
-        {'codigo_modif': 'ENT_PECH', 'nombre': 'Entera (Pechuga)'},
-        {'codigo_modif': 'CORT2_PECH', 'nombre': 'Cortada en 2 (Pechuga)'},
-        {'codigo_modif': 'CORT3_PECH', 'nombre': 'Cortada en 3 (Pechuga)'},
-        {'codigo_modif': 'CORT4_PECH', 'nombre': 'Cortada en 4 (Pechuga)'},
-        {'codigo_modif': 'CORT6_PECH', 'nombre': 'Cortada en 6 (Pechuga)'},
-        {'codigo_modif': 'ASAR_PECH', 'nombre': 'Para Asar (Pechuga)'},
-        {'codigo_modif': 'FREIR_PECH', 'nombre': 'Para Freír (Pechuga)'},
-        {'codigo_modif': 'MILA_PECH', 'nombre': 'Milanesa (Pechuga)'},
-        {'codigo_modif': 'FAJI_PECH', 'nombre': 'Fajitas (Pechuga)'},
-        {'codigo_modif': 'CUBOS_PECH', 'nombre': 'En Cubos (Pechuga)'},
-        {'codigo_modif': 'MOLI_PECH', 'nombre': 'Molida (Pechuga)'},
-        {'codigo_modif': 'FILE_PECH', 'nombre': 'Filetes (Pechuga)'},
-
-        # Específicas de Pulpa de Pechuga (PP)
-        {'codigo_modif': 'ASAR_PP', 'nombre': 'Para Asar (Pulpa Pechuga)'},
-        {'codigo_modif': 'MILA_PP', 'nombre': 'Milanesa (Pulpa Pechuga)'},
-        {'codigo_modif': 'CUBOS_PP', 'nombre': 'En Cubos (Pulpa Pechuga)'},
-        {'codigo_modif': 'MOLI_PP', 'nombre': 'Molida (Pulpa Pechuga)'},
-        {'codigo_modif': 'FILE_PP', 'nombre': 'Filetes (Pulpa Pechuga)'},
-        {'codigo_modif': 'ENT_PP', 'nombre': 'Entera (Pulpa Pechuga)'},
-
-        # Específicas de Alas (AL)
-        {'codigo_modif': 'ENT_AL', 'nombre': 'Enteras (Alas)'},
-        {'codigo_modif': 'CORT2_AL', 'nombre': 'Cortadas en 2 (Alas)'},
-        {'codigo_modif': 'CORT3_AL', 'nombre': 'Cortadas en 3 (Alas)'},
-
-        # Específicas de Cadera (CD)
-        {'codigo_modif': 'ENT_CD', 'nombre': 'Entera (Cadera)'},
-        {'codigo_modif': 'CORT_CD', 'nombre': 'Cortada (Cadera)'},
-        {'codigo_modif': 'SINPIEL_CD', 'nombre': 'Sin Piel (Cadera)'},
-
-        # Específicas de Huacal (HCL)
-        {'codigo_modif': 'ENT_HCL', 'nombre': 'Entero (Huacal)'},
-        {'codigo_modif': 'CORT_HCL', 'nombre': 'Cortado (Huacal)'},
-
-        # Específicas de Retazo (RTZ)
-        {'codigo_modif': 'ENT_RTZ', 'nombre': 'Entero (Retazo)'},
-        {'codigo_modif': 'CORT_RTZ', 'nombre': 'Cortado (Retazo)'},
-        {'codigo_modif': 'SINPIEL_RTZ', 'nombre': 'Sin Piel (Retazo)'},
-
-        # Específicas de Pierna (PG)
-        {'codigo_modif': 'ENT_PG', 'nombre': 'Enteras (Pierna)'},
-        {'codigo_modif': 'ASAR_PG', 'nombre': 'Para Asar (Pierna)'},
-        {'codigo_modif': 'MILA_PG', 'nombre': 'Milanesa (Pierna)'},
-        {'codigo_modif': 'FREIR_PG', 'nombre': 'Para Freír (Pierna)'},
-        {'codigo_modif': 'SINPIEL_PG', 'nombre': 'Sin Piel (Pierna)'},
-
-        # Específicas de Muslo (MSL)
-        {'codigo_modif': 'ENT_MSL', 'nombre': 'Entero(s) (Muslo)'},
-        {'codigo_modif': 'ASAR_MSL', 'nombre': 'Para Asar (Muslo)'},
-        {'codigo_modif': 'FREIR_MSL', 'nombre': 'Para Freír (Muslo)'},
-        {'codigo_modif': 'MILA_MSL', 'nombre': 'Milanesa (Muslo)'},
-        {'codigo_modif': 'SINPIEL_MSL', 'nombre': 'Sin Piel (Muslo)'},
-
-        # Específicas de Pulpa de Perniles (PP-PM)
-        {'codigo_modif': 'ASAR_PPPM', 'nombre': 'Para Asar (Pulpa Pernil)'},
-        {'codigo_modif': 'MILA_PPPM', 'nombre': 'Milanesa (Pulpa Pernil)'},
-        {'codigo_modif': 'FAJI_PPPM', 'nombre': 'Fajitas (Pulpa Pernil)'},
-        {'codigo_modif': 'ENT_PPPM', 'nombre': 'Entera (Pulpa Pernil)'},
-
-        # Específicas de Molida de Perniles (M-PM) - ninguna realmente, ya es estado final
-        {'codigo_modif': 'NINGUNA_MPM', 'nombre': 'Molida de Pernil (Sin mod. adicional)'},
-
-        # Específicas de Perniles (PM)
-        {'codigo_modif': 'ENT_PM', 'nombre': 'Enteros (Perniles Unidos)'},
-        {'codigo_modif': 'CORT_PM', 'nombre': 'Cortados (Pierna y Muslo Separados)'},
-        {'codigo_modif': 'ASAR_PM', 'nombre': 'Para Asar (Perniles Unidos)'},
-        {'codigo_modif': 'MILA_PM', 'nombre': 'Milanesa (Perniles)'},
-        {'codigo_modif': 'FREIR_PM', 'nombre': 'Para Freír (Perniles Unidos)'},
-        {'codigo_modif': 'SINPIEL_PM', 'nombre': 'Sin Piel (Perniles)'},
-
-        # Específicas de Patas (PT)
-        {'codigo_modif': 'LIMP_PT', 'nombre': 'Limpias (Patas)'},
-        {'codigo_modif': 'ENT_PT', 'nombre': 'Enteras (Patas)'},
-
-        # Específicas de Molleja (MLJ)
-        {'codigo_modif': 'SINGRASA_MLJ', 'nombre': 'Sin Grasa (Molleja)'},
-        {'codigo_modif': 'LIMP_MLJ', 'nombre': 'Limpia (Molleja)'},
-
-        # Específicas de Higado (HGD)
-        {'codigo_modif': 'LIMP_HGD', 'nombre': 'Limpio (Hígado)'},
-
-        # Específicas de Molleja con Hígado (MHG)
-        {'codigo_modif': 'SINGRASA_MHG', 'nombre': 'Sin Grasa (Molleja c/Hígado)'},
-        {'codigo_modif': 'LIMP_MHG', 'nombre': 'Limpios (Molleja c/Hígado)'},
-
-        # Específicas de Pollo Surtido (SRT)
-        {'codigo_modif': 'CONHCL_SRT', 'nombre': 'Con Huacal (Surtida)'},
-        {'codigo_modif': 'CONCD_SRT', 'nombre': 'Con Cadera (Surtida)'},
-        {'codigo_modif': 'SINPIEL_SRT', 'nombre': 'Predominantemente Sin Piel (Surtida)'},
-        {'codigo_modif': 'PZGRANDE_SRT', 'nombre': 'Piezas Grandes (Surtida)'}, # Ajustado PiezasaGrandes
-        {'codigo_modif': 'PZCHICA_SRT', 'nombre': 'Piezas Chicas/Medianas (Surtida)'} # Ajustado PiezasChicas
-    ]
-    for mod_data in modificaciones_data:
-        mod = Modificacion.query.filter_by(codigo_modif=mod_data['codigo_modif']).first()
-        if not mod:
-            mod = Modificacion(**mod_data)
-            db.session.add(mod)
-    db.session.commit()
-    print("Modificaciones pobladas.")
-
-def seed_productos_subproductos_data():
-    productos_data = [
-        {'id': 'PECH', 'nombre': 'Pechuga de Pollo', 'categoria': 'Pollo Crudo', 'activo': True,
-         'mod_directas_cods': ['ENT_PECH', 'CORT2_PECH', 'CORT3_PECH', 'CORT4_PECH', 'CORT6_PECH', 'ASAR_PECH', 'FREIR_PECH', 'MILA_PECH', 'FAJI_PECH', 'CUBOS_PECH', 'MOLI_PECH', 'FILE_PECH'],
-         'subproductos': [
-             {'codigo_subprod': 'PP', 'nombre': 'Pulpa de Pechuga', 'activo': True,
-              'mod_aplicables_cods': ['ASAR_PP', 'MILA_PP', 'CUBOS_PP', 'MOLI_PP', 'FILE_PP', 'ENT_PP']}
-         ]},
-        {'id': 'AL', 'nombre': 'Alas de Pollo', 'categoria': 'Pollo Crudo', 'activo': True,
-         'mod_directas_cods': ['ENT_AL', 'CORT2_AL', 'CORT3_AL'],
-         'subproductos': []},
-        {'id': 'RTZ', 'nombre': 'Retazo de Pollo', 'categoria': 'Pollo Crudo', 'activo': True,
-         'mod_directas_cods': ['ENT_RTZ', 'CORT_RTZ', 'SINPIEL_RTZ'],
-         'subproductos': [
-             {'codigo_subprod': 'CD', 'nombre': 'Cadera de Pollo', 'activo': True,
-              'mod_aplicables_cods': ['ENT_CD', 'CORT_CD', 'SINPIEL_CD']},
-             {'codigo_subprod': 'HCL', 'nombre': 'Huacal de Pollo', 'activo': True,
-              'mod_aplicables_cods': ['ENT_HCL', 'CORT_HCL']}
-         ]},
-        {'id': 'PM', 'nombre': 'Perniles (Pierna y Muslo)', 'categoria': 'Pollo Crudo', 'activo': True,
-         'mod_directas_cods': ['ENT_PM', 'CORT_PM', 'ASAR_PM', 'MILA_PM', 'FREIR_PM', 'SINPIEL_PM'],
-         'subproductos': [
-             {'codigo_subprod': 'PG', 'nombre': 'Pierna de Pollo', 'activo': True,
-              'mod_aplicables_cods': ['ENT_PG', 'ASAR_PG', 'MILA_PG', 'FREIR_PG', 'SINPIEL_PG']},
-             {'codigo_subprod': 'MSL', 'nombre': 'Muslo de Pollo', 'activo': True,
-              'mod_aplicables_cods': ['ENT_MSL', 'ASAR_MSL', 'FREIR_MSL', 'MILA_MSL', 'SINPIEL_MSL']},
-             {'codigo_subprod': 'PP-PM', 'nombre': 'Pulpa de Perniles (Pierna y Muslo)', 'activo': True,
-              'mod_aplicables_cods': ['ASAR_PPPM', 'MILA_PPPM', 'FAJI_PPPM', 'ENT_PPPM']},
-             {'codigo_subprod': 'M-PM', 'nombre': 'Molida de Perniles (Pierna y Muslo)', 'activo': True,
-              'mod_aplicables_cods': ['NINGUNA_MPM']}
-         ]},
-        {'id': 'PT', 'nombre': 'Patas de Pollo', 'categoria': 'Menudencia', 'activo': True,
-         'mod_directas_cods': ['LIMP_PT', 'ENT_PT'],
-         'subproductos': []},
-        {'id': 'MHG', 'nombre': 'Molleja con Hígado (Paquete)', 'categoria': 'Menudencia', 'activo': True,
-         'mod_directas_cods': ['SINGRASA_MHG', 'LIMP_MHG'],
-         'subproductos': [
-             {'codigo_subprod': 'MLJ', 'nombre': 'Molleja de Pollo (Sola)', 'activo': True,
-              'mod_aplicables_cods': ['SINGRASA_MLJ', 'LIMP_MLJ']},
-             {'codigo_subprod': 'HGD', 'nombre': 'Hígado de Pollo (Solo)', 'activo': True,
-              'mod_aplicables_cods': ['LIMP_HGD']}
-         ]},
-        {'id': 'SRT', 'nombre': 'Pollo Surtido (Piezas Variadas)', 'categoria': 'Pollo Crudo', 'activo': True, 'descripcion': 'Mezcla de diferentes piezas de pollo.',
-         'mod_directas_cods': ['CONHCL_SRT', 'CONCD_SRT', 'SINPIEL_SRT', 'PZGRANDE_SRT', 'PZCHICA_SRT'],
-         'subproductos': []}
-    ]
-
-    for prod_data in productos_data:
-        producto = Producto.query.filter_by(id=prod_data['id']).first()
-        if not producto:
-            producto = Producto(id=prod_data['id'], nombre=prod_data['nombre'], categoria=prod_data['categoria'], activo=prod_data['activo'], descripcion=prod_data.get('descripcion'))
-            db.session.add(producto)
-
-        # Asociar modificaciones directas al producto
-        for mod_cod in prod_data.get('mod_directas_cods', []):
-            mod = Modificacion.query.filter_by(codigo_modif=mod_cod).first()
-            if mod: # Asegurarse de que la modificación exista
-                 if mod not in producto.modificaciones_directas:
-                    producto.modificaciones_directas.append(mod)
-            else:
-                 print(f"Advertencia: Modificación con código '{mod_cod}' no encontrada para el producto '{producto.id}'.")
-
-
+# --- Datos iniciales del catálogo ---
+
+MODIFICACIONES_SEED = [
+    # Genéricas (pueden aplicar a varios)
+    {'codigo_modif': 'ENT', 'nombre': 'Entera/o'},
+    {'codigo_modif': 'CORT', 'nombre': 'Cortada/o'},
+    {'codigo_modif': 'ASAR', 'nombre': 'Para Asar'},
+    {'codigo_modif': 'MILA', 'nombre': 'Milanesa'},
+    {'codigo_modif': 'CUBOS', 'nombre': 'En Cubos'},
+    {'codigo_modif': 'MOLI', 'nombre': 'Molida/o'},
+    {'codigo_modif': 'FILE', 'nombre': 'Filetes'},
+    {'codigo_modif': 'FREIR', 'nombre': 'Para Freír'},
+    {'codigo_modif': 'SINPIEL', 'nombre': 'Sin Piel'},
+    {'codigo_modif': 'FAJI', 'nombre': 'Fajitas'},
+    {'codigo_modif': 'LIMP', 'nombre': 'Limpia/o'},
+    {'codigo_modif': 'SINGRASA', 'nombre': 'Sin Grasa'},
+
+    # Específicas de Pechuga (PECH)
+    {'codigo_modif': 'ENT_PECH', 'nombre': 'Entera (Pechuga)'},
+    {'codigo_modif': 'CORT2_PECH', 'nombre': 'Cortada en 2 (Pechuga)'},
+    {'codigo_modif': 'CORT3_PECH', 'nombre': 'Cortada en 3 (Pechuga)'},
+    {'codigo_modif': 'CORT4_PECH', 'nombre': 'Cortada en 4 (Pechuga)'},
+    {'codigo_modif': 'CORT6_PECH', 'nombre': 'Cortada en 6 (Pechuga)'},
+    {'codigo_modif': 'ASAR_PECH', 'nombre': 'Para Asar (Pechuga)'},
+    {'codigo_modif': 'FREIR_PECH', 'nombre': 'Para Freír (Pechuga)'},
+    {'codigo_modif': 'MILA_PECH', 'nombre': 'Milanesa (Pechuga)'},
+    {'codigo_modif': 'FAJI_PECH', 'nombre': 'Fajitas (Pechuga)'},
+    {'codigo_modif': 'CUBOS_PECH', 'nombre': 'En Cubos (Pechuga)'},
+    {'codigo_modif': 'MOLI_PECH', 'nombre': 'Molida (Pechuga)'},
+    {'codigo_modif': 'FILE_PECH', 'nombre': 'Filetes (Pechuga)'},
+
+    # Específicas de Pulpa de Pechuga (PP)
+    {'codigo_modif': 'ASAR_PP', 'nombre': 'Para Asar (Pulpa Pechuga)'},
+    {'codigo_modif': 'MILA_PP', 'nombre': 'Milanesa (Pulpa Pechuga)'},
+    {'codigo_modif': 'CUBOS_PP', 'nombre': 'En Cubos (Pulpa Pechuga)'},
+    {'codigo_modif': 'MOLI_PP', 'nombre': 'Molida (Pulpa Pechuga)'},
+    {'codigo_modif': 'FILE_PP', 'nombre': 'Filetes (Pulpa Pechuga)'},
+    {'codigo_modif': 'ENT_PP', 'nombre': 'Entera (Pulpa Pechuga)'},
+
+    # Específicas de Alas (AL)
+    {'codigo_modif': 'ENT_AL', 'nombre': 'Enteras (Alas)'},
+    {'codigo_modif': 'CORT2_AL', 'nombre': 'Cortadas en 2 (Alas)'},
+    {'codigo_modif': 'CORT3_AL', 'nombre': 'Cortadas en 3 (Alas)'},
+
+    # Específicas de Cadera (CD)
+    {'codigo_modif': 'ENT_CD', 'nombre': 'Entera (Cadera)'},
+    {'codigo_modif': 'CORT_CD', 'nombre': 'Cortada (Cadera)'},
+    {'codigo_modif': 'SINPIEL_CD', 'nombre': 'Sin Piel (Cadera)'},
+
+    # Específicas de Huacal (HCL)
+    {'codigo_modif': 'ENT_HCL', 'nombre': 'Entero (Huacal)'},
+    {'codigo_modif': 'CORT_HCL', 'nombre': 'Cortado (Huacal)'},
+
+    # Específicas de Retazo (RTZ)
+    {'codigo_modif': 'ENT_RTZ', 'nombre': 'Entero (Retazo)'},
+    {'codigo_modif': 'CORT_RTZ', 'nombre': 'Cortado (Retazo)'},
+    {'codigo_modif': 'SINPIEL_RTZ', 'nombre': 'Sin Piel (Retazo)'},
+
+    # Específicas de Pierna (PG)
+    {'codigo_modif': 'ENT_PG', 'nombre': 'Enteras (Pierna)'},
+    {'codigo_modif': 'ASAR_PG', 'nombre': 'Para Asar (Pierna)'},
+    {'codigo_modif': 'MILA_PG', 'nombre': 'Milanesa (Pierna)'},
+    {'codigo_modif': 'FREIR_PG', 'nombre': 'Para Freír (Pierna)'},
+    {'codigo_modif': 'SINPIEL_PG', 'nombre': 'Sin Piel (Pierna)'},
+
+    # Específicas de Muslo (MSL)
+    {'codigo_modif': 'ENT_MSL', 'nombre': 'Entero(s) (Muslo)'},
+    {'codigo_modif': 'ASAR_MSL', 'nombre': 'Para Asar (Muslo)'},
+    {'codigo_modif': 'FREIR_MSL', 'nombre': 'Para Freír (Muslo)'},
+    {'codigo_modif': 'MILA_MSL', 'nombre': 'Milanesa (Muslo)'},
+    {'codigo_modif': 'SINPIEL_MSL', 'nombre': 'Sin Piel (Muslo)'},
+
+    # Específicas de Pulpa de Perniles (PP-PM)
+    {'codigo_modif': 'ASAR_PPPM', 'nombre': 'Para Asar (Pulpa Pernil)'},
+    {'codigo_modif': 'MILA_PPPM', 'nombre': 'Milanesa (Pulpa Pernil)'},
+    {'codigo_modif': 'FAJI_PPPM', 'nombre': 'Fajitas (Pulpa Pernil)'},
+    {'codigo_modif': 'ENT_PPPM', 'nombre': 'Entera (Pulpa Pernil)'},
+
+    # Específicas de Molida de Perniles (M-PM) - ninguna realmente, ya es estado final
+    {'codigo_modif': 'NINGUNA_MPM', 'nombre': 'Molida de Pernil (Sin mod. adicional)'},
+
+    # Específicas de Perniles (PM)
+    {'codigo_modif': 'ENT_PM', 'nombre': 'Enteros (Perniles Unidos)'},
+    {'codigo_modif': 'CORT_PM', 'nombre': 'Cortados (Pierna y Muslo Separados)'},
+    {'codigo_modif': 'ASAR_PM', 'nombre': 'Para Asar (Perniles Unidos)'},
+    {'codigo_modif': 'MILA_PM', 'nombre': 'Milanesa (Perniles)'},
+    {'codigo_modif': 'FREIR_PM', 'nombre': 'Para Freír (Perniles Unidos)'},
+    {'codigo_modif': 'SINPIEL_PM', 'nombre': 'Sin Piel (Perniles)'},
+
+    # Específicas de Patas (PT)
+    {'codigo_modif': 'LIMP_PT', 'nombre': 'Limpias (Patas)'},
+    {'codigo_modif': 'ENT_PT', 'nombre': 'Enteras (Patas)'},
+
+    # Específicas de Molleja (MLJ)
+    {'codigo_modif': 'SINGRASA_MLJ', 'nombre': 'Sin Grasa (Molleja)'},
+    {'codigo_modif': 'LIMP_MLJ', 'nombre': 'Limpia (Molleja)'},
+
+    # Específicas de Higado (HGD)
+    {'codigo_modif': 'LIMP_HGD', 'nombre': 'Limpio (Hígado)'},
+
+    # Específicas de Molleja con Hígado (MHG)
+    {'codigo_modif': 'SINGRASA_MHG', 'nombre': 'Sin Grasa (Molleja c/Hígado)'},
+    {'codigo_modif': 'LIMP_MHG', 'nombre': 'Limpios (Molleja c/Hígado)'},
+
+    # Específicas de Pollo Surtido (SRT)
+    {'codigo_modif': 'CONHCL_SRT', 'nombre': 'Con Huacal (Surtida)'},
+    {'codigo_modif': 'CONCD_SRT', 'nombre': 'Con Cadera (Surtida)'},
+    {'codigo_modif': 'SINPIEL_SRT', 'nombre': 'Predominantemente Sin Piel (Surtida)'},
+    {'codigo_modif': 'PZGRANDE_SRT', 'nombre': 'Piezas Grandes (Surtida)'}, # Ajustado PiezasaGrandes
+    {'codigo_modif': 'PZCHICA_SRT', 'nombre': 'Piezas Chicas/Medianas (Surtida)'} # Ajustado PiezasChicas
+]
+
+PRODUCTOS_SEED = [
+    {'id': 'PECH', 'nombre': 'Pechuga de Pollo', 'categoria': 'Pollo Crudo', 'activo': True,
+     'mod_directas_cods': ['ENT_PECH', 'CORT2_PECH', 'CORT3_PECH', 'CORT4_PECH', 'CORT6_PECH', 'ASAR_PECH', 'FREIR_PECH', 'MILA_PECH', 'FAJI_PECH', 'CUBOS_PECH', 'MOLI_PECH', 'FILE_PECH'],
+     'subproductos': [
+         {'codigo_subprod': 'PP', 'nombre': 'Pulpa de Pechuga', 'activo': True,
+          'mod_aplicables_cods': ['ASAR_PP', 'MILA_PP', 'CUBOS_PP', 'MOLI_PP', 'FILE_PP', 'ENT_PP']}
+     ]},
+    {'id': 'AL', 'nombre': 'Alas de Pollo', 'categoria': 'Pollo Crudo', 'activo': True,
+     'mod_directas_cods': ['ENT_AL', 'CORT2_AL', 'CORT3_AL'],
+     'subproductos': []},
+    {'id': 'RTZ', 'nombre': 'Retazo de Pollo', 'categoria': 'Pollo Crudo', 'activo': True,
+     'mod_directas_cods': ['ENT_RTZ', 'CORT_RTZ', 'SINPIEL_RTZ'],
+     'subproductos': [
+         {'codigo_subprod': 'CD', 'nombre': 'Cadera de Pollo', 'activo': True,
+          'mod_aplicables_cods': ['ENT_CD', 'CORT_CD', 'SINPIEL_CD']},
+         {'codigo_subprod': 'HCL', 'nombre': 'Huacal de Pollo', 'activo': True,
+          'mod_aplicables_cods': ['ENT_HCL', 'CORT_HCL']}
+     ]},
+    {'id': 'PM', 'nombre': 'Perniles (Pierna y Muslo)', 'categoria': 'Pollo Crudo', 'activo': True,
+     'mod_directas_cods': ['ENT_PM', 'CORT_PM', 'ASAR_PM', 'MILA_PM', 'FREIR_PM', 'SINPIEL_PM'],
+     'subproductos': [
+         {'codigo_subprod': 'PG', 'nombre': 'Pierna de Pollo', 'activo': True,
+          'mod_aplicables_cods': ['ENT_PG', 'ASAR_PG', 'MILA_PG', 'FREIR_PG', 'SINPIEL_PG']},
+         {'codigo_subprod': 'MSL', 'nombre': 'Muslo de Pollo', 'activo': True,
+          'mod_aplicables_cods': ['ENT_MSL', 'ASAR_MSL', 'FREIR_MSL', 'MILA_MSL', 'SINPIEL_MSL']},
+         {'codigo_subprod': 'PP-PM', 'nombre': 'Pulpa de Perniles (Pierna y Muslo)', 'activo': True,
+          'mod_aplicables_cods': ['ASAR_PPPM', 'MILA_PPPM', 'FAJI_PPPM', 'ENT_PPPM']},
+         {'codigo_subprod': 'M-PM', 'nombre': 'Molida de Perniles (Pierna y Muslo)', 'activo': True,
+          'mod_aplicables_cods': ['NINGUNA_MPM']}
+     ]},
+    {'id': 'PT', 'nombre': 'Patas de Pollo', 'categoria': 'Menudencia', 'activo': True,
+     'mod_directas_cods': ['LIMP_PT', 'ENT_PT'],
+     'subproductos': []},
+    {'id': 'MHG', 'nombre': 'Molleja con Hígado (Paquete)', 'categoria': 'Menudencia', 'activo': True,
+     'mod_directas_cods': ['SINGRASA_MHG', 'LIMP_MHG'],
+     'subproductos': [
+         {'codigo_subprod': 'MLJ', 'nombre': 'Molleja de Pollo (Sola)', 'activo': True,
+          'mod_aplicables_cods': ['SINGRASA_MLJ', 'LIMP_MLJ']},
+         {'codigo_subprod': 'HGD', 'nombre': 'Hígado de Pollo (Solo)', 'activo': True,
+          'mod_aplicables_cods': ['LIMP_HGD']}
+     ]},
+    {'id': 'SRT', 'nombre': 'Pollo Surtido (Piezas Variadas)', 'categoria': 'Pollo Crudo', 'activo': True, 'descripcion': 'Mezcla de diferentes piezas de pollo.',
+     'mod_directas_cods': ['CONHCL_SRT', 'CONCD_SRT', 'SINPIEL_SRT', 'PZGRANDE_SRT', 'PZCHICA_SRT'],
+     'subproductos': []}
+]
+
+# Los precios de subproductos se refieren al subproducto por su código
+PRECIOS_SEED = [
+    # Precios Pechuga (PECH)
+    {'producto_id': 'PECH', 'tipo_cliente': 'PUBLICO', 'precio_kg': 120.00},
+    {'producto_id': 'PECH', 'tipo_cliente': 'COCINA', 'precio_kg': 115.00},
+    {'producto_id': 'PECH', 'tipo_cliente': 'LEAL', 'precio_kg': 110.00},
+    {'producto_id': 'PECH', 'tipo_cliente': 'ALIADO', 'precio_kg': 105.00},
+    {'producto_id': 'PECH', 'tipo_cliente': 'MAYOREO', 'precio_kg': 100.00, 'cantidad_minima_kg': 10, 'etiqueta_promo': 'Precio Mayoreo (desde 10kg)'},
+    # Precios Pulpa de Pechuga (PP) - subproducto
+    {'codigo_subprod': 'PP', 'tipo_cliente': 'PUBLICO', 'precio_kg': 185.00},
+    {'codigo_subprod': 'PP', 'tipo_cliente': 'COCINA', 'precio_kg': 165.00},
+    # Precios Alas (AL)
+    {'producto_id': 'AL', 'tipo_cliente': 'PUBLICO', 'precio_kg': 118.00},
+    {'producto_id': 'AL', 'tipo_cliente': 'PUBLICO', 'precio_kg': 115.00, 'cantidad_minima_kg': 10, 'etiqueta_promo': 'Paquete Alas 10kg'},
+    {'producto_id': 'AL', 'tipo_cliente': 'COCINA', 'precio_kg': 107.00},
+    {'producto_id': 'AL', 'tipo_cliente': 'MAYOREO', 'precio_kg': 100.00, 'cantidad_minima_kg': 10, 'etiqueta_promo': 'Precio Mayoreo (desde 10kg)'},
+    # Precios Retazo (RTZ)
+    {'producto_id': 'RTZ', 'tipo_cliente': 'PUBLICO', 'precio_kg': 40.00},
+    {'producto_id': 'RTZ', 'tipo_cliente': 'PUBLICO', 'precio_kg': 25.00, 'cantidad_minima_kg': 2, 'etiqueta_promo': 'Promo Retazo 2kg'},
+    {'producto_id': 'RTZ', 'tipo_cliente': 'PUBLICO', 'precio_kg': 20.00, 'cantidad_minima_kg': 3, 'etiqueta_promo': 'Promo Retazo 3kg'},
+    # Precios Cadera (CD) - subproducto
+    {'codigo_subprod': 'CD', 'tipo_cliente': 'PUBLICO', 'precio_kg': 45.00},
+    # Precios Huacal (HCL) - subproducto
+    {'codigo_subprod': 'HCL', 'tipo_cliente': 'PUBLICO', 'precio_kg': 25.00},
+    # Precios Perniles (PM)
+    {'producto_id': 'PM', 'tipo_cliente': 'PUBLICO', 'precio_kg': 85.00},
+    {'producto_id': 'PM', 'tipo_cliente': 'PUBLICO', 'precio_kg': 80.00, 'cantidad_minima_kg': 2, 'etiqueta_promo': 'Promo Perniles 2kg'},
+    {'producto_id': 'PM', 'tipo_cliente': 'COCINA', 'precio_kg': 70.00},
+    # Precios Pierna (PG) - subproducto
+    {'codigo_subprod': 'PG', 'tipo_cliente': 'PUBLICO', 'precio_kg': 95.00},
+    # Precios Muslo (MSL) - subproducto
+    {'codigo_subprod': 'MSL', 'tipo_cliente': 'PUBLICO', 'precio_kg': 85.00},
+    # Precios Pulpa de Perniles (PP-PM) - subproducto
+    {'codigo_subprod': 'PP-PM', 'tipo_cliente': 'PUBLICO', 'precio_kg': 105.00},
+    {'codigo_subprod': 'PP-PM', 'tipo_cliente': 'MAYOREO', 'precio_kg': 95.00, 'cantidad_minima_kg': 5, 'etiqueta_promo': 'Mayoreo Pulpa Pernil (desde 5kg)'},
+    # Precios Molida de Perniles (M-PM) - subproducto
+    {'codigo_subprod': 'M-PM', 'tipo_cliente': 'PUBLICO', 'precio_kg': 110.00},
+    # Precios Patas (PT)
+    {'producto_id': 'PT', 'tipo_cliente': 'PUBLICO', 'precio_kg': 65.00},
+    {'producto_id': 'PT', 'tipo_cliente': 'PUBLICO', 'precio_kg': 55.00, 'cantidad_minima_kg': 2, 'etiqueta_promo': 'Promo Patas 2kg'},
+    # Precios Molleja con Hígado (MHG)
+    {'producto_id': 'MHG', 'tipo_cliente': 'PUBLICO', 'precio_kg': 35.00},
+    {'producto_id': 'MHG', 'tipo_cliente': 'PUBLICO', 'precio_kg': 25.00, 'cantidad_minima_kg': 2, 'etiqueta_promo': 'Promo Molleja c/Hígado 2kg'},
+    # Precios Molleja Sola (MLJ) - subproducto
+    {'codigo_subprod': 'MLJ', 'tipo_cliente': 'PUBLICO', 'precio_kg': 65.00},
+    # Precios Hígado Solo (HGD) - subproducto
+    {'codigo_subprod': 'HGD', 'tipo_cliente': 'PUBLICO', 'precio_kg': 25.00},
+    # Precios Pollo Surtido (SRT)
+    {'producto_id': 'SRT', 'tipo_cliente': 'PUBLICO', 'precio_kg': 68.00},
+    {'producto_id': 'SRT', 'tipo_cliente': 'PUBLICO', 'precio_kg': 65.00, 'cantidad_minima_kg': 2, 'etiqueta_promo': 'Promo Surtida 2kg'},
+    {'producto_id': 'SRT', 'tipo_cliente': 'PUBLICO', 'precio_kg': 60.00, 'cantidad_minima_kg': 3, 'etiqueta_promo': 'Promo Surtida 3kg'},
+    {'producto_id': 'SRT', 'tipo_cliente': 'COCINA', 'precio_kg': 60.00},
+]
+
+def seed_catalogo():
+    """Pobla el catálogo por conjuntos en una sola transacción (idempotente).
+
+    Precarga las llaves existentes y solo inserta lo que falta; ver
+    app/productos/carga_masiva.py. Devuelve el ResultadoCarga.
+    """
+    subproductos = []
+    asoc_productos = []
+    asoc_subproductos = []
+    for prod_data in PRODUCTOS_SEED:
+        asoc_productos += [(prod_data['id'], cod) for cod in prod_data.get('mod_directas_cods', [])]
         for sub_data in prod_data.get('subproductos', []):
-            subproducto = Subproducto.query.filter_by(codigo_subprod=sub_data['codigo_subprod']).first()
-            if not subproducto:
-                subproducto = Subproducto(
-                    producto_padre_id=producto.id,
-                    codigo_subprod=sub_data['codigo_subprod'],
-                    nombre=sub_data['nombre'],
-                    activo=sub_data['activo']
-                )
-                db.session.add(subproducto)
-
-            # Asociar modificaciones aplicables al subproducto
-            for mod_cod_sub in sub_data.get('mod_aplicables_cods', []):
-                mod_sub = Modificacion.query.filter_by(codigo_modif=mod_cod_sub).first()
-                if mod_sub: # Asegurarse de que la modificación exista
-                    if mod_sub not in subproducto.modificaciones_aplicables:
-                        subproducto.modificaciones_aplicables.append(mod_sub)
-                else:
-                    print(f"Advertencia: Modificación con código '{mod_cod_sub}' no encontrada para el subproducto '{subproducto.codigo_subprod}'.")
-
-    db.session.commit()
-    print("Productos y subproductos poblados con sus modificaciones.")
-
-def seed_precios_data():
-    # Es importante que los subproductos ya existan para obtener sus IDs numéricos
-    precios_data = [
-        # Precios Pechuga (PECH)
-        {'producto_id': 'PECH', 'tipo_cliente': 'PUBLICO', 'precio_kg': 120.00},
-        {'producto_id': 'PECH', 'tipo_cliente': 'COCINA', 'precio_kg': 115.00},
-        {'producto_id': 'PECH', 'tipo_cliente': 'LEAL', 'precio_kg': 110.00},
-        {'producto_id': 'PECH', 'tipo_cliente': 'ALIADO', 'precio_kg': 105.00},
-        {'producto_id': 'PECH', 'tipo_cliente': 'MAYOREO', 'precio_kg': 100.00, 'cantidad_minima_kg': 10, 'etiqueta_promo': 'Precio Mayoreo (desde 10kg)'},
-        # Precios Pulpa de Pechuga (PP) - requiere subproducto_id
-        {'codigo_subprod_ref': 'PP', 'tipo_cliente': 'PUBLICO', 'precio_kg': 185.00},
-        {'codigo_subprod_ref': 'PP', 'tipo_cliente': 'COCINA', 'precio_kg': 165.00},
-        # Precios Alas (AL)
-        {'producto_id': 'AL', 'tipo_cliente': 'PUBLICO', 'precio_kg': 118.00},
-        {'producto_id': 'AL', 'tipo_cliente': 'PUBLICO', 'precio_kg': 115.00, 'cantidad_minima_kg': 10, 'etiqueta_promo': 'Paquete Alas 10kg'},
-        {'producto_id': 'AL', 'tipo_cliente': 'COCINA', 'precio_kg': 107.00},
-        {'producto_id': 'AL', 'tipo_cliente': 'MAYOREO', 'precio_kg': 100.00, 'cantidad_minima_kg': 10, 'etiqueta_promo': 'Precio Mayoreo (desde 10kg)'},
-        # Precios Retazo (RTZ)
-        {'producto_id': 'RTZ', 'tipo_cliente': 'PUBLICO', 'precio_kg': 40.00},
-        {'producto_id': 'RTZ', 'tipo_cliente': 'PUBLICO', 'precio_kg': 25.00, 'cantidad_minima_kg': 2, 'etiqueta_promo': 'Promo Retazo 2kg'},
-        {'producto_id': 'RTZ', 'tipo_cliente': 'PUBLICO', 'precio_kg': 20.00, 'cantidad_minima_kg': 3, 'etiqueta_promo': 'Promo Retazo 3kg'},
-        # Precios Cadera (CD) - subproducto
-        {'codigo_subprod_ref': 'CD', 'tipo_cliente': 'PUBLICO', 'precio_kg': 45.00},
-        # Precios Huacal (HCL) - subproducto
-        {'codigo_subprod_ref': 'HCL', 'tipo_cliente': 'PUBLICO', 'precio_kg': 25.00},
-        # Precios Perniles (PM)
-        {'producto_id': 'PM', 'tipo_cliente': 'PUBLICO', 'precio_kg': 85.00},
-        {'producto_id': 'PM', 'tipo_cliente': 'PUBLICO', 'precio_kg': 80.00, 'cantidad_minima_kg': 2, 'etiqueta_promo': 'Promo Perniles 2kg'},
-        {'producto_id': 'PM', 'tipo_cliente': 'COCINA', 'precio_kg': 70.00},
-        # Precios Pierna (PG) - subproducto
-        {'codigo_subprod_ref': 'PG', 'tipo_cliente': 'PUBLICO', 'precio_kg': 95.00},
-        # Precios Muslo (MSL) - subproducto
-        {'codigo_subprod_ref': 'MSL', 'tipo_cliente': 'PUBLICO', 'precio_kg': 85.00},
-        # Precios Pulpa de Perniles (PP-PM) - subproducto
-        {'codigo_subprod_ref': 'PP-PM', 'tipo_cliente': 'PUBLICO', 'precio_kg': 105.00},
-        {'codigo_subprod_ref': 'PP-PM', 'tipo_cliente': 'MAYOREO', 'precio_kg': 95.00, 'cantidad_minima_kg': 5, 'etiqueta_promo': 'Mayoreo Pulpa Pernil (desde 5kg)'},
-        # Precios Molida de Perniles (M-PM) - subproducto
-        {'codigo_subprod_ref': 'M-PM', 'tipo_cliente': 'PUBLICO', 'precio_kg': 110.00},
-        # Precios Patas (PT)
-        {'producto_id': 'PT', 'tipo_cliente': 'PUBLICO', 'precio_kg': 65.00},
-        {'producto_id': 'PT', 'tipo_cliente': 'PUBLICO', 'precio_kg': 55.00, 'cantidad_minima_kg': 2, 'etiqueta_promo': 'Promo Patas 2kg'},
-        # Precios Molleja con Hígado (MHG)
-        {'producto_id': 'MHG', 'tipo_cliente': 'PUBLICO', 'precio_kg': 35.00},
-        {'producto_id': 'MHG', 'tipo_cliente': 'PUBLICO', 'precio_kg': 25.00, 'cantidad_minima_kg': 2, 'etiqueta_promo': 'Promo Molleja c/Hígado 2kg'},
-        # Precios Molleja Sola (MLJ) - subproducto
-        {'codigo_subprod_ref': 'MLJ', 'tipo_cliente': 'PUBLICO', 'precio_kg': 65.00},
-        # Precios Hígado Solo (HGD) - subproducto
-        {'codigo_subprod_ref': 'HGD', 'tipo_cliente': 'PUBLICO', 'precio_kg': 25.00},
-        # Precios Pollo Surtido (SRT)
-        {'producto_id': 'SRT', 'tipo_cliente': 'PUBLICO', 'precio_kg': 68.00},
-        {'producto_id': 'SRT', 'tipo_cliente': 'PUBLICO', 'precio_kg': 65.00, 'cantidad_minima_kg': 2, 'etiqueta_promo': 'Promo Surtida 2kg'},
-        {'producto_id': 'SRT', 'tipo_cliente': 'PUBLICO', 'precio_kg': 60.00, 'cantidad_minima_kg': 3, 'etiqueta_promo': 'Promo Surtida 3kg'},
-        {'producto_id': 'SRT', 'tipo_cliente': 'COCINA', 'precio_kg': 60.00},
-    ]
-
-    for precio_info in precios_data:
-        # Crear una copia para no modificar el diccionario original
-        precio_data_db = precio_info.copy()
-
-        # Si es un precio para subproducto, obtener el ID del subproducto
-        if 'codigo_subprod_ref' in precio_data_db:
-            codigo_sub = precio_data_db.pop('codigo_subprod_ref')
-            subprod = Subproducto.query.filter_by(codigo_subprod=codigo_sub).first()
-            if subprod:
-                precio_data_db['subproducto_id'] = subprod.id
-            else:
-                print(f"ADVERTENCIA: Subproducto con código '{codigo_sub}' no encontrado para el precio. Saltando.")
-                continue
-
-        # Asegurar que cantidad_minima_kg tenga un valor si no está presente
-        precio_data_db.setdefault('cantidad_minima_kg', 0.0)
-
-        # Verificar si el precio ya existe usando las UniqueConstraints
-        existing_precio = None
-        if precio_data_db.get('producto_id'):
-            existing_precio = Precio.query.filter_by(
-                producto_id=precio_data_db['producto_id'],
-                tipo_cliente=precio_data_db['tipo_cliente'],
-                cantidad_minima_kg=precio_data_db['cantidad_minima_kg']
-            ).first()
-        elif precio_data_db.get('subproducto_id'):
-             existing_precio = Precio.query.filter_by(
-                subproducto_id=precio_data_db['subproducto_id'],
-                tipo_cliente=precio_data_db['tipo_cliente'],
-                cantidad_minima_kg=precio_data_db['cantidad_minima_kg']
-            ).first()
-
-        if not existing_precio:
-            precio = Precio(**precio_data_db)
-            db.session.add(precio)
-        # else:
-            # print(f"Precio ya existente para: {precio_data_db}")
-
-    db.session.commit()
-    print("Precios poblados.")
+            subproductos.append(dict(sub_data, producto_padre_id=prod_data['id']))
+            asoc_subproductos += [(sub_data['codigo_subprod'], cod) for cod in sub_data.get('mod_aplicables_cods', [])]
+
+    try:
+        resultado = carga_masiva.cargar_catalogo(
+            modificaciones=MODIFICACIONES_SEED,
+            productos=PRODUCTOS_SEED,
+            subproductos=subproductos,
+            asoc_productos=asoc_productos,
+            asoc_subproductos=asoc_subproductos,
+            precios=PRECIOS_SEED
+        )
+        if any(resultado.insertados.values()):
+            carga_masiva.finalizar_carga()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return resultado
 
 
 @app.cli.command("seed-db")
@@ -353,13 +298,148 @@ def seed_db_command():
     # clear_data()
     # print("Datos de catálogo anteriores eliminados.")
 
-    # Opción 2: No limpiar, las funciones de seed intentarán no duplicar por código/ID.
+    # Opción 2: No limpiar, la carga por conjuntos no duplica por código/ID.
     #           Esto es más seguro si se ejecuta el comando varias veces.
 
-    seed_modificaciones_data()
-    seed_productos_subproductos_data() # Esta función ahora también asocia modificaciones
-    seed_precios_data()
+    resultado = seed_catalogo()
+    for advertencia in resultado.advertencias:
+        click.echo(f"Advertencia: {advertencia}")
+    for linea in resultado.resumen():
+        click.echo(linea)
     click.echo("Base de datos poblada/actualizada con datos de catálogo.")
 
+@app.cli.command("reindexar-busqueda")
+@with_appcontext
+def reindexar_busqueda_command():
+    """Crea (si falta) y reconstruye el índice FTS5 de búsqueda del catálogo."""
+    from app.productos import busqueda
+    total = busqueda.reindexar()
+    click.echo(f"Índice de búsqueda reconstruido: {total} documentos.")
+
+@app.cli.command("reindexar-clientes")
+@with_appcontext
+def reindexar_clientes_command():
+    """Crea (si falta) y reconstruye el índice FTS5 de búsqueda de clientes."""
+    from app.clientes import busqueda as busqueda_clientes
+    total = busqueda_clientes.reindexar()
+    click.echo(f"Índice de clientes reconstruido: {total} clientes activos.")
+
+@app.cli.command("catalog-export")
+@click.argument("archivo", type=click.File("w", encoding="utf-8", lazy=False), default="-")
+@click.option("--formato", type=click.Choice(intercambio.FORMATOS), default="jsonl", show_default=True,
+              help="Formato de salida.")
+@click.option("--tipo", "tipos", multiple=True, type=click.Choice(intercambio.TIPOS_REGISTRO),
+              help="Exportar solo estos tipos de registro (repetible). Por defecto, todos.")
+@with_appcontext
+def catalog_export_command(archivo, formato, tipos):
+    """Exporta el catálogo a ARCHIVO (JSONL o CSV; '-' para la salida estándar)."""
+    total = intercambio.exportar(archivo, formato, tipos or intercambio.TIPOS_REGISTRO)
+    click.echo(f"{total} registros exportados.", err=True)
+
+@app.cli.command("catalog-import")
+@click.argument("archivo", type=click.File("r", encoding="utf-8-sig"))
+@click.option("--formato", type=click.Choice(intercambio.FORMATOS), default=None,
+              help="Formato de entrada (por defecto se deduce de la extensión).")
+@click.option("--dry-run", "simular", is_flag=True,
+              help="No escribe nada: muestra qué se insertaría/actualizaría.")
+@click.option("--solo-nuevos", is_flag=True, help="No actualiza los registros que ya existen.")
+@click.option("--lote", "tamano_lote", type=click.IntRange(min=1), default=intercambio.TAMANO_LOTE,
+              show_default=True, help="Registros por lote (un commit por lote).")
+@with_appcontext
+def catalog_import_command(archivo, formato, simular, solo_nuevos, tamano_lote):
+    """Importa el catálogo desde ARCHIVO (JSONL o CSV; '-' para la entrada estándar)."""
+    formato = formato or ('csv' if archivo.name.lower().endswith('.csv') else 'jsonl')
+    resultado = intercambio.importar(
+        archivo, formato,
+        actualizar_existentes=not solo_nuevos,
+        simular=simular,
+        tamano_lote=tamano_lote
+    )
+    for advertencia in resultado.advertencias:
+        click.echo(f"Advertencia: {advertencia}")
+    if simular:
+        for accion, tabla, llave in resultado.muestras:
+            click.echo(f"  [{accion}] {tabla}: {llave}")
+        click.echo("Simulación (--dry-run): no se escribió nada.")
+    for linea in resultado.resumen():
+        click.echo(linea)
+
+@app.cli.command("caja-verificar")
+@click.argument("corte_id", type=int)
+@click.option("--reconstruir", is_flag=True,
+              help="Si hay diferencias, reemplaza los acumulados por los recalculados desde los movimientos.")
+@with_appcontext
+def caja_verificar_command(corte_id, reconstruir):
+    """Compara los acumulados del turno CORTE_ID con su libro de movimientos."""
+    from app.caja import services as caja_services
+    try:
+        resultado = caja_services.verificar_corte(corte_id, reconstruir=reconstruir)
+        db.session.commit()
+    except caja_services.ErrorCaja as e:
+        db.session.rollback()
+        raise click.ClickException(str(e))
+    click.echo(f"Turno {corte_id}: {resultado.movimientos} movimientos en el libro.")
+    for diferencia in resultado.diferencias:
+        click.echo(f"  Diferencia: {diferencia}")
+    if resultado.correcto:
+        click.echo("Los acumulados cuadran con los movimientos.")
+    elif resultado.reconstruido:
+        click.echo("Acumulados reconstruidos desde los movimientos.")
+    else:
+        click.echo("Usa --reconstruir para corregir los acumulados.")
+
+@app.cli.command("ventas-reconstruir")
+@click.option("--desde", type=click.DateTime(formats=["%Y-%m-%d"]), default=None,
+              help="Primer día a recalcular (AAAA-MM-DD). Por defecto, desde el primer pedido.")
+@click.option("--hasta", type=click.DateTime(formats=["%Y-%m-%d"]), default=None,
+              help="Último día a recalcular (AAAA-MM-DD). Por defecto, hasta el último pedido.")
+@with_appcontext
+def ventas_reconstruir_command(desde, hasta):
+    """Recalcula los resúmenes diarios de ventas desde las tablas de pedidos."""
+    from app.reportes import resumen_ventas
+    desde = desde.date() if desde else None
+    hasta = hasta.date() if hasta else None
+    if desde and hasta and desde > hasta:
+        raise click.BadParameter("--desde no puede ser posterior a --hasta.")
+    try:
+        filas_pedido, filas_articulo = resumen_ventas.reconstruir(desde, hasta)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    click.echo(f"Resúmenes reconstruidos: {filas_pedido} filas por pedido, {filas_articulo} filas por artículo.")
+
+@app.cli.command("catalogo-compactar-cambios")
+@click.option("--dias", type=click.IntRange(min=0), default=None,
+              help="Antigüedad mínima de los cambios a borrar. Por defecto, SINCRONIZACION_RETENCION_DIAS.")
+@with_appcontext
+def catalogo_compactar_cambios_command(dias):
+    """Borra los cambios viejos del registro de sincronización del catálogo."""
+    from app.productos import sincronizacion
+    dias = app.config['SINCRONIZACION_RETENCION_DIAS'] if dias is None else dias
+    try:
+        borrados = sincronizacion.compactar(dias)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    click.echo(f"{borrados} cambios de más de {dias} días borrados. "
+               "Los clientes con un cursor anterior recibirán el catálogo completo.")
+
+@app.cli.command("construir-estaticos")
+@click.option("--limpiar", is_flag=True, help="Borra de app/static/dist los archivos de construcciones anteriores.")
+@with_appcontext
+def construir_estaticos_command(limpiar):
+    """Genera los recursos estáticos con huella, sus variantes gzip/brotli y el manifiesto."""
+    from app import estaticos
+    manifiesto = estaticos.construir(app.static_folder, limpiar=limpiar)
+    if estaticos.brotli is None:
+        click.echo("Aviso: sin el paquete 'brotli' solo se generan variantes gzip.")
+    for ruta, datos in sorted(manifiesto['activos'].items()):
+        variantes = ', '.join(f"{nombre} {tamano} B" for nombre, tamano in datos['codificaciones'].items())
+        click.echo(f"  {ruta} -> {datos['ruta']} ({datos['bytes']} B{'; ' + variantes if variantes else ''})")
+    click.echo(f"{len(manifiesto['activos'])} recursos, versión {manifiesto['version']}. "
+               "Reinicia la aplicación para usar el nuevo manifiesto.")
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0')